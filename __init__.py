@@ -187,6 +187,10 @@ def register():
 
 
 def unregister():
+    # 关闭并行预处理的常驻工作进程
+    from .utils.parallel_preprocess import shutdown_worker_pool
+    shutdown_worker_pool()
+
     # 蓝图系统
     blueprint_node_cross_ib.unregister()
     blueprint_nest_navigate.unregister()
@@ -8,12 +8,15 @@ import numpy
 
 from ..utils.format_utils import FormatUtils
 from dataclasses import dataclass, field
-from typing import Dict
+from types import MappingProxyType
+from typing import Mapping
 from ..base.d3d11_element import D3D11Element
 
 
 # Designed to read from json file for game type config
-@dataclass
+# 由D3D11GameTypeRegistry在所有调用方之间共享，所以构造完成后不可修改：
+# 列表字段是tuple，字典字段是MappingProxyType
+@dataclass(frozen=True)
 class D3D11GameType:
     # Read config from json file, easy to modify and test.
     FilePath:str = field(repr=False)
@@ -25,46 +28,39 @@ class D3D11GameType:
     # Is GPU-PreSkinning or CPU-PreSkinning
     GPU_PreSkinning:bool = field(init=False,default=False)
     # All d3d11 element,should be already ordered in config json.
-    D3D11ElementList:list[D3D11Element] = field(init=False,repr=False)
+    D3D11ElementList:tuple[D3D11Element, ...] = field(init=False,repr=False)
     # Ordered ElementName list.
-    OrderedFullElementList:list[str] = field(init=False,repr=False)
+    OrderedFullElementList:tuple[str, ...] = field(init=False,repr=False)
     # 按顺序排列的CategoryName
-    OrderedCategoryNameList:list[str] = field(init=False,repr=False)
+    OrderedCategoryNameList:tuple[str, ...] = field(init=False,repr=False)
     # Category name and draw category name, used to decide the category should draw on which category's TextureOverrideVB.
-    CategoryDrawCategoryDict:Dict[str,str] = field(init=False,repr=False)
+    CategoryDrawCategoryDict:Mapping[str,str] = field(init=False,repr=False)
 
 
     # Generated
-    ElementNameD3D11ElementDict:Dict[str,D3D11Element] = field(init=False,repr=False)
-    CategoryExtractSlotDict:Dict[str,str] =  field(init=False,repr=False)
-    CategoryExtractTechniqueDict:Dict[str,str] =  field(init=False,repr=False)
-    CategoryStrideDict:Dict[str,int] =  field(init=False,repr=False)
+    ElementNameD3D11ElementDict:Mapping[str,D3D11Element] = field(init=False,repr=False)
+    CategoryExtractSlotDict:Mapping[str,str] =  field(init=False,repr=False)
+    CategoryExtractTechniqueDict:Mapping[str,str] =  field(init=False,repr=False)
+    CategoryStrideDict:Mapping[str,int] =  field(init=False,repr=False)
+    # 每个Category在一整条顶点数据中的起始字节偏移，按OrderedCategoryNameList的顺序依次排列
+    CategoryByteOffsetDict:Mapping[str,int] =  field(init=False,repr=False)
 
     def __post_init__(self):
-        self.FileName = os.path.basename(self.FilePath)
-        self.GameTypeName = os.path.splitext(self.FileName)[0]
-        
+        file_name = os.path.basename(self.FilePath)
 
-        self.OrderedFullElementList = []
-        self.OrderedCategoryNameList = []
-        self.D3D11ElementList = []
+        ordered_full_element_list = []
+        ordered_category_name_list = []
+        d3d11_element_list = []
 
-        self.CategoryDrawCategoryDict = {}
-        self.CategoryExtractSlotDict = {}
-        self.CategoryExtractTechniqueDict = {}
-        self.CategoryStrideDict = {}
-        self.ElementNameD3D11ElementDict = {}
+        category_extract_slot_dict = {}
+        category_extract_technique_dict = {}
+        category_stride_dict = {}
+        element_name_d3d11_element_dict = {}
 
         # read config from json file.
         with open(self.FilePath, 'r', encoding='utf-8') as f:
             game_type_json = json.load(f)
-        
-        self.GPU_PreSkinning = game_type_json.get("GPU-PreSkinning",False)
 
-        self.GameTypeName = game_type_json.get("WorkGameType","")
-
-        # self.OrderedFullElementList = game_type_json.get("OrderedFullElementList",[])
-        self.CategoryDrawCategoryDict = game_type_json.get("CategoryDrawCategoryMap",{})
         d3d11_element_list_json = game_type_json.get("D3D11ElementList",[])
         aligned_byte_offset = 0
         for d3d11_element_json in d3d11_element_list_json:
@@ -79,18 +75,49 @@ class D3D11GameType:
                 AlignedByteOffset=aligned_byte_offset
             )
             aligned_byte_offset = aligned_byte_offset + d3d11_element.ByteWidth
-            self.D3D11ElementList.append(d3d11_element)
+            d3d11_element_list.append(d3d11_element)
 
             # 这俩常用
-            self.OrderedFullElementList.append(d3d11_element.get_indexed_semantic_name())
-            if d3d11_element.Category not in self.OrderedCategoryNameList:
-                self.OrderedCategoryNameList.append(d3d11_element.Category)
-        
-        for d3d11_element in self.D3D11ElementList:
-            self.CategoryExtractSlotDict[d3d11_element.Category] = d3d11_element.ExtractSlot
-            self.CategoryExtractTechniqueDict[d3d11_element.Category] = d3d11_element.ExtractTechnique
-            self.CategoryStrideDict[d3d11_element.Category] = self.CategoryStrideDict.get(d3d11_element.Category,0) + d3d11_element.ByteWidth
-            self.ElementNameD3D11ElementDict[d3d11_element.ElementName] = d3d11_element
+            ordered_full_element_list.append(d3d11_element.get_indexed_semantic_name())
+            if d3d11_element.Category not in ordered_category_name_list:
+                ordered_category_name_list.append(d3d11_element.Category)
+
+        for d3d11_element in d3d11_element_list:
+            category_extract_slot_dict[d3d11_element.Category] = d3d11_element.ExtractSlot
+            category_extract_technique_dict[d3d11_element.Category] = d3d11_element.ExtractTechnique
+            category_stride_dict[d3d11_element.Category] = category_stride_dict.get(d3d11_element.Category,0) + d3d11_element.ByteWidth
+            element_name_d3d11_element_dict[d3d11_element.ElementName] = d3d11_element
+
+        category_byte_offset_dict = {}
+        category_byte_offset = 0
+        for category_name in ordered_category_name_list:
+            category_byte_offset_dict[category_name] = category_byte_offset
+            category_byte_offset = category_byte_offset + category_stride_dict[category_name]
+
+        # frozen的dataclass只能在这里通过object.__setattr__赋值
+        object.__setattr__(self, "FileName", file_name)
+        object.__setattr__(self, "GameTypeName", game_type_json.get("WorkGameType",""))
+        object.__setattr__(self, "GPU_PreSkinning", game_type_json.get("GPU-PreSkinning",False))
+        object.__setattr__(self, "D3D11ElementList", tuple(d3d11_element_list))
+        object.__setattr__(self, "OrderedFullElementList", tuple(ordered_full_element_list))
+        object.__setattr__(self, "OrderedCategoryNameList", tuple(ordered_category_name_list))
+        object.__setattr__(self, "CategoryDrawCategoryDict", MappingProxyType(dict(game_type_json.get("CategoryDrawCategoryMap",{}))))
+        object.__setattr__(self, "ElementNameD3D11ElementDict", MappingProxyType(element_name_d3d11_element_dict))
+        object.__setattr__(self, "CategoryExtractSlotDict", MappingProxyType(category_extract_slot_dict))
+        object.__setattr__(self, "CategoryExtractTechniqueDict", MappingProxyType(category_extract_technique_dict))
+        object.__setattr__(self, "CategoryStrideDict", MappingProxyType(category_stride_dict))
+        object.__setattr__(self, "CategoryByteOffsetDict", MappingProxyType(category_byte_offset_dict))
+
+        # 结构化dtype在第一次用到时生成，之后直接复用
+        object.__setattr__(self, "_total_structured_dtype", None)
+
+    # 不可修改的共享对象，复制时直接返回自身
+    # ShapeKeyBufferModel引用了它，ObjDataModel被deepcopy时会连带复制到这里
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
     
     def get_real_category_stride_dict(self) -> dict:
         new_dict = {}
@@ -122,20 +149,90 @@ class D3D11GameType:
             pass
         return 4
 
+    def get_element_numpy_type(self, d3d11_element_name:str):
+        '''
+        返回Element的Format对应的numpy类型，由注册表按Format缓存，不再每次都做正则匹配
+        '''
+        return D3D11GameTypeRegistry.get_nptype_from_format(self.ElementNameD3D11ElementDict[d3d11_element_name].Format)
+
     def get_total_structured_dtype(self) -> numpy.dtype:
-        total_structured_dtype:numpy.dtype = numpy.dtype([])
+        if self._total_structured_dtype is not None:
+            return self._total_structured_dtype
 
+        fields = []
         # 预设的权重个数，也就是每个顶点组受多少个权重影响
         for d3d11_element_name in self.OrderedFullElementList:
             d3d11_element = self.ElementNameD3D11ElementDict[d3d11_element_name]
-            np_type = FormatUtils.get_nptype_from_format(d3d11_element.Format)
+            np_type = self.get_element_numpy_type(d3d11_element_name)
 
             format_len = int(d3d11_element.ByteWidth / numpy.dtype(np_type).itemsize)
                 
             # XXX 长度为1时必须手动指定为(1,)否则会变成1维数组
             if format_len == 1:
-                total_structured_dtype = numpy.dtype(total_structured_dtype.descr + [(d3d11_element_name, (np_type, (1,)))])
+                fields.append((d3d11_element_name, np_type, (1,)))
             else:
-                total_structured_dtype = numpy.dtype(total_structured_dtype.descr + [(d3d11_element_name, (np_type, format_len))])
+                fields.append((d3d11_element_name, np_type, format_len))
+
+        object.__setattr__(self, "_total_structured_dtype", D3D11GameTypeRegistry.get_structured_dtype(tuple(fields)))
+        return self._total_structured_dtype
+
+
+class D3D11GameTypeRegistry:
+    '''
+    进程内共享的数据类型描述注册表
 
-        return total_structured_dtype
\ No newline at end of file
+    - D3D11GameType 按 (文件路径, 修改时间, 文件大小) 缓存，文件没有变化时所有调用方拿到的是同一个对象，
+      不再每个DrawIB、每个SubMesh都重新解析一次json。拿到的对象是共享且不可修改的
+    - 结构化dtype按字段描述缓存，D3D11GameType和FMTFile共用
+    '''
+
+    _game_type_cache:dict[str,tuple] = {}
+    _dtype_cache:dict[tuple,numpy.dtype] = {}
+    _nptype_cache:dict[str,type] = {}
+
+    @staticmethod
+    def _get_file_key(file_path:str):
+        stat = os.stat(file_path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    @classmethod
+    def get_game_type(cls, file_path:str) -> D3D11GameType:
+        abs_path = os.path.abspath(file_path)
+        try:
+            file_key = cls._get_file_key(abs_path)
+        except OSError:
+            # 文件不存在时保持原来的行为，由D3D11GameType抛出异常
+            return D3D11GameType(FilePath=file_path)
+
+        cached = cls._game_type_cache.get(abs_path, None)
+        if cached is not None and cached[0] == file_key:
+            return cached[1]
+
+        d3d11_game_type = D3D11GameType(FilePath=file_path)
+        cls._game_type_cache[abs_path] = (file_key, d3d11_game_type)
+        return d3d11_game_type
+
+    @classmethod
+    def get_nptype_from_format(cls, fmt:str):
+        np_type = cls._nptype_cache.get(fmt, None)
+        if np_type is None:
+            np_type = FormatUtils.get_nptype_from_format(fmt)
+            cls._nptype_cache[fmt] = np_type
+        return np_type
+
+    @classmethod
+    def get_structured_dtype(cls, fields:tuple) -> numpy.dtype:
+        '''
+        fields: ((名称, numpy类型), ...) 或 ((名称, numpy类型, 形状), ...)
+        '''
+        dtype = cls._dtype_cache.get(fields, None)
+        if dtype is None:
+            dtype = numpy.dtype(list(fields))
+            cls._dtype_cache[fields] = dtype
+        return dtype
+
+    @classmethod
+    def clear(cls):
+        cls._game_type_cache.clear()
+        cls._dtype_cache.clear()
+        cls._nptype_cache.clear()
@@ -9,6 +9,7 @@ from ..utils.performance_stats import start_operation, end_operation, print_perf
 from ..utils.preprocess_cache import get_cache_manager, FingerprintCalculator, reset_cache_manager
 
 from ..config.main_config import GlobalConfig, LogicName
+from ..config.config_cache import ConfigCache
 from ..base.m_global_key_counter import M_GlobalKeyCounter
 
 from ..config.properties_generate_mod import Properties_GenerateMod
@@ -118,6 +119,14 @@ class SSMTGenerateModBlueprint(bpy.types.Operator):
             print("Warning: No Node Tree specified for Mod Generation. Using default workspace name logic.")
             BlueprintExportHelper.forced_target_tree_name = None
 
+        # 遍历一次蓝图生成执行计划，后续的物体收集、处理链以及各类节点查询都使用这个计划
+        start_operation("CompileBlueprintPlan")
+        BlueprintExportHelper.compile_export_plan()
+        end_operation("CompileBlueprintPlan")
+
+        # 导出期间工作空间的配置文件只检查一次修改时间，所有DrawIB使用同一份配置
+        ConfigCache.begin_export_snapshot()
+
         # 获取所有要导出的物体及其对应的节点/项目
         start_operation("GetExportObjects")
         obj_node_mapping = self._get_export_objects_with_nodes()
@@ -126,6 +135,8 @@ class SSMTGenerateModBlueprint(bpy.types.Operator):
         
         if total_objects == 0:
             self.report({'WARNING'}, "没有找到要导出的物体")
+            BlueprintExportHelper.clear_export_plan()
+            ConfigCache.end_export_snapshot()
             end_operation("GenerateMod_Total")
             return {'CANCELLED'}
         
@@ -146,10 +157,14 @@ class SSMTGenerateModBlueprint(bpy.types.Operator):
             if use_parallel:
                 if not blend_file_saved:
                     self.report({'ERROR'}, "并行导出需要先保存项目文件")
+                    BlueprintExportHelper.clear_export_plan()
+                    ConfigCache.end_export_snapshot()
                     end_operation("GenerateMod_Total")
                     return {'CANCELLED'}
                 if blend_file_dirty:
                     self.report({'ERROR'}, "项目有未保存的修改，请先保存后再进行并行导出")
+                    BlueprintExportHelper.clear_export_plan()
+                    ConfigCache.end_export_snapshot()
                     end_operation("GenerateMod_Total")
                     return {'CANCELLED'}
             
@@ -303,6 +318,8 @@ class SSMTGenerateModBlueprint(bpy.types.Operator):
         finally:
             # Clean up override
             BlueprintExportHelper.forced_target_tree_name = None
+            BlueprintExportHelper.clear_export_plan()
+            ConfigCache.end_export_snapshot()
             # 恢复原始导出路径
             BlueprintExportHelper.restore_export_path()
             
@@ -337,6 +354,15 @@ class SSMTGenerateModBlueprint(bpy.types.Operator):
     def _get_export_objects_with_nodes(self):
         """获取当前蓝图中所有要导出的物体及其对应的节点，支持递归扫描嵌套蓝图"""
         result = []
+
+        plan = BlueprintExportHelper.get_export_plan()
+        if plan is not None:
+            for obj_name, node_or_item in plan.object_node_list:
+                obj = bpy.data.objects.get(obj_name)
+                if obj and obj.type == 'MESH':
+                    result.append((obj, node_or_item))
+            return result
+
         tree = BlueprintExportHelper.get_current_blueprint_tree()
         if not tree:
             return result
@@ -541,7 +567,14 @@ class SSMTGenerateModBlueprint(bpy.types.Operator):
         2. 对于每个处理节点，收集所有连接到它的物体
         3. 按顺序执行每个处理节点
         4. 对于顶点组处理节点，使用多线程处理多个物体
+
+        存在执行计划时，处理节点顺序和每个节点连接的物体都直接从计划中查询
         """
+        plan = BlueprintExportHelper.get_export_plan()
+        if plan is not None:
+            self._run_processing_chain(copy_mapping, plan.process_nodes, plan.is_object_connected_to_node)
+            return
+
         all_process_nodes = []
         visited = set()
         
@@ -565,13 +598,17 @@ class SSMTGenerateModBlueprint(bpy.types.Operator):
             collect_all_process_nodes(output_node, tree)
         
         all_process_nodes.reverse()
-        
+
+        self._run_processing_chain(copy_mapping, all_process_nodes, lambda obj_name, node: self._is_object_connected_to_node(obj_name, node, tree))
+
+    def _run_processing_chain(self, copy_mapping, all_process_nodes, is_object_connected):
+        """按顺序执行处理节点，is_object_connected(物体名称, 节点) 判断物体是否经过该节点"""
         print(f"[ProcessingChain] 收集到 {len(all_process_nodes)} 个处理节点")
         
         for node, node_type in all_process_nodes:
             connected_objects = []
             for original_name, (copy_obj, node_or_item) in copy_mapping.items():
-                if self._is_object_connected_to_node(original_name, node, tree):
+                if is_object_connected(original_name, node):
                     connected_objects.append((original_name, copy_obj, node_or_item))
             
             if not connected_objects:
@@ -1021,6 +1058,10 @@ class SSMTGenerateModBlueprint(bpy.types.Operator):
         
         新逻辑：从输出节点开始反向收集所有处理节点，然后过滤出连接到当前物体的节点
         """
+        plan = BlueprintExportHelper.get_export_plan()
+        if plan is not None:
+            return list(plan.get_processing_chain(obj_name))
+
         result = []
         visited = set()
         all_process_nodes = []
@@ -1055,6 +1096,10 @@ class SSMTGenerateModBlueprint(bpy.types.Operator):
     
     def _is_object_connected_to_node(self, obj_name, target_node, node_tree):
         """检查物体是否连接到指定的节点（支持嵌套蓝图）"""
+        plan = BlueprintExportHelper.get_export_plan()
+        if plan is not None and node_tree.name == plan.tree_name and target_node.name in plan.process_node_object_names:
+            return plan.is_object_connected_to_node(obj_name, target_node)
+
         visited = set()
         
         def find_all_object_names(current_node, current_tree, depth=0):
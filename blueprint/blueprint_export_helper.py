@@ -1,6 +1,7 @@
 import bpy
 from ..config.main_config import GlobalConfig
 from ..base.m_key import M_Key
+from .blueprint_postprocess_ini import PostProcessIniContext
 
 class BlueprintExportHelper:
 
@@ -14,6 +15,9 @@ class BlueprintExportHelper:
     
     # 静态变量，存储最大导出次数
     max_export_count = 1
+
+    # 静态变量，当前导出的蓝图执行计划，只在生成Mod期间有效
+    current_export_plan = None
     
     @staticmethod
     def get_current_blueprint_tree():
@@ -31,9 +35,44 @@ class BlueprintExportHelper:
         tree = bpy.data.node_groups.get(tree_name)
         return tree
 
+    @staticmethod
+    def compile_export_plan():
+        """遍历一次当前蓝图，生成本次导出使用的执行计划"""
+        from .blueprint_export_plan import BlueprintPlanCompiler
+
+        tree = BlueprintExportHelper.get_current_blueprint_tree()
+        if not tree:
+            BlueprintExportHelper.current_export_plan = None
+            return None
+
+        BlueprintExportHelper.current_export_plan = BlueprintPlanCompiler.compile(tree)
+        return BlueprintExportHelper.current_export_plan
+
+    @staticmethod
+    def get_export_plan():
+        """获取当前蓝图的执行计划，不在导出期间或者蓝图已切换时返回None"""
+        plan = BlueprintExportHelper.current_export_plan
+        if plan is None:
+            return None
+
+        tree = BlueprintExportHelper.get_current_blueprint_tree()
+        if not tree or tree.name != plan.tree_name:
+            return None
+        return plan
+
+    @staticmethod
+    def clear_export_plan():
+        BlueprintExportHelper.current_export_plan = None
+
     @staticmethod
     def find_node_in_all_blueprints(node_name):
         """在所有蓝图中查找指定名称的节点"""
+        plan = BlueprintExportHelper.get_export_plan()
+        if plan is not None:
+            node = plan.find_multifile_export_node(node_name)
+            if node:
+                return node
+
         for node_group in bpy.data.node_groups:
             if node_group.bl_idname == 'SSMTBlueprintTreeType':
                 node = node_group.nodes.get(node_name)
@@ -133,18 +172,34 @@ class BlueprintExportHelper:
     @staticmethod
     def get_current_shapekeyname_mkey_dict():
         """获取当前蓝图及所有嵌套蓝图中所有 ShapeKey 节点的形态键名称和按键列表"""
-        tree = BlueprintExportHelper.get_current_blueprint_tree()
-        if not tree:
-            return {}
-        
+        plan = BlueprintExportHelper.get_export_plan()
+        if plan is not None:
+            shapekey_specs = plan.shapekey_specs
+        else:
+            tree = BlueprintExportHelper.get_current_blueprint_tree()
+            if not tree:
+                return {}
+            shapekey_specs = BlueprintExportHelper._collect_shapekey_specs(tree)
+
         shapekey_name_mkey_dict = {}
+        for key_index, (shapekey_name, key, comment) in enumerate(shapekey_specs):
+            m_key = M_Key()
+            m_key.key_name = "$shapekey" + str(key_index)
+            m_key.initialize_value = 0
+            m_key.initialize_vk_str = key
+            m_key.comment = comment
+
+            shapekey_name_mkey_dict[shapekey_name] = m_key
+        return shapekey_name_mkey_dict
+
+    @staticmethod
+    def _collect_shapekey_specs(tree):
+        """递归收集蓝图及嵌套蓝图中的形态键节点，返回 [(形态键名称, 按键, 备注), ...]"""
+        shapekey_specs = []
         visited_blueprints = set()
-        key_index = 0
         
         def collect_shapekey_nodes(current_tree):
             """递归收集形态键节点"""
-            nonlocal key_index
-            
             if current_tree.name in visited_blueprints:
                 return
             visited_blueprints.add(current_tree.name)
@@ -170,14 +225,7 @@ class BlueprintExportHelper:
                 key = shapekey_node.key
                 comment = getattr(shapekey_node, 'comment', '')
 
-                m_key = M_Key()
-                m_key.key_name = "$shapekey" + str(key_index)
-                m_key.initialize_value = 0
-                m_key.initialize_vk_str = key
-                m_key.comment = comment
-
-                shapekey_name_mkey_dict[shapekey_name] = m_key
-                key_index += 1
+                shapekey_specs.append((shapekey_name, key, comment))
             
             for node in current_tree.nodes:
                 if node.bl_idname == 'SSMTNode_Blueprint_Nest':
@@ -188,15 +236,37 @@ class BlueprintExportHelper:
                             collect_shapekey_nodes(nested_tree)
         
         collect_shapekey_nodes(tree)
-        return shapekey_name_mkey_dict
+        return shapekey_specs
 
     @staticmethod
     def get_datatype_node_info():
         """获取当前蓝图及所有嵌套蓝图中连接到输出节点的数据类型节点信息"""
-        tree = BlueprintExportHelper.get_current_blueprint_tree()
-        if not tree:
+        plan = BlueprintExportHelper.get_export_plan()
+        if plan is not None:
+            datatype_nodes = plan.datatype_nodes
+        else:
+            tree = BlueprintExportHelper.get_current_blueprint_tree()
+            if not tree:
+                return None
+            datatype_nodes = BlueprintExportHelper._collect_datatype_nodes(tree)
+        
+        if not datatype_nodes:
             return None
         
+        node_info_list = []
+        for node in datatype_nodes:
+            node_info_list.append({
+                "draw_ib_match": node.draw_ib_match,
+                "tmp_json_path": node.tmp_json_path,
+                "loaded_data": node.loaded_data,
+                "node": node
+            })
+        
+        return node_info_list
+
+    @staticmethod
+    def _collect_datatype_nodes(tree):
+        """递归收集蓝图及嵌套蓝图中连接到输出节点的数据类型节点"""
         visited_blueprints = set()
         datatype_nodes = []
         
@@ -225,20 +295,7 @@ class BlueprintExportHelper:
                             collect_datatype_nodes(nested_tree)
         
         collect_datatype_nodes(tree)
-        
-        if not datatype_nodes:
-            return None
-        
-        node_info_list = []
-        for node in datatype_nodes:
-            node_info_list.append({
-                "draw_ib_match": node.draw_ib_match,
-                "tmp_json_path": node.tmp_json_path,
-                "loaded_data": node.loaded_data,
-                "node": node
-            })
-        
-        return node_info_list
+        return datatype_nodes
     
     @staticmethod
     def _find_datatype_nodes_connected_to_output(node, visited=None):
@@ -269,10 +326,18 @@ class BlueprintExportHelper:
     @staticmethod
     def get_multifile_export_nodes():
         """获取当前蓝图及所有嵌套蓝图中的多文件导出节点"""
+        plan = BlueprintExportHelper.get_export_plan()
+        if plan is not None:
+            return list(plan.multifile_export_nodes)
+
         tree = BlueprintExportHelper.get_current_blueprint_tree()
         if not tree:
             return []
-        
+        return BlueprintExportHelper._collect_multifile_export_nodes(tree)
+
+    @staticmethod
+    def _collect_multifile_export_nodes(tree):
+        """递归收集蓝图及嵌套蓝图中的多文件导出节点"""
         multifile_nodes = []
         visited_blueprints = set()
         
@@ -381,10 +446,18 @@ class BlueprintExportHelper:
         名称修改节点必须先于其他后处理节点执行，以便传递映射信息
         其他后处理节点按照连接顺序执行（从链条起点到终点）
         """
+        plan = BlueprintExportHelper.get_export_plan()
+        if plan is not None:
+            return list(plan.postprocess_nodes)
+
         tree = BlueprintExportHelper.get_current_blueprint_tree()
         if not tree:
             return []
-        
+        return BlueprintExportHelper._collect_postprocess_nodes(tree)
+
+    @staticmethod
+    def _collect_postprocess_nodes(tree):
+        """从蓝图的输出节点出发收集后处理节点"""
         output_node = BlueprintExportHelper.get_node_from_bl_idname(tree, 'SSMTNode_Result_Output')
         if not output_node:
             return []
@@ -548,7 +621,12 @@ class BlueprintExportHelper:
             return
         
         print(f"找到 {len(postprocess_nodes)} 个后处理节点，开始执行...")
-        
+
+        # 所有节点共享同一份INI文档：每个文件只读取一次，全部节点执行完后只备份和写回一次
+        # 只有全部节点都关闭了备份选项时才不创建备份
+        create_backup = any(getattr(node, 'create_cumulative_backup', True) for node in postprocess_nodes if not node.mute)
+        ini_context = PostProcessIniContext(mod_export_path, create_backup=create_backup)
+
         for index, node in enumerate(postprocess_nodes):
             if node.mute:
                 print(f"跳过已禁用的节点: {node.name}")
@@ -556,25 +634,37 @@ class BlueprintExportHelper:
             
             print(f"执行第 {index + 1}/{len(postprocess_nodes)} 个后处理节点: {node.name}")
             
+            ini_context.checkpoint()
             try:
                 if hasattr(node, 'execute_postprocess'):
-                    node.execute_postprocess(mod_export_path)
+                    node.execute_postprocess(mod_export_path, ini_context)
                 else:
                     print(f"警告: 节点 {node.name} 没有实现 execute_postprocess 方法")
             except Exception as e:
                 print(f"执行后处理节点 {node.name} 时出错: {e}")
                 import traceback
                 traceback.print_exc()
+                ini_context.rollback()
+
+        ini_context.flush()
         
         print("所有后处理节点执行完成")
 
     @staticmethod
     def get_cross_ib_nodes():
         """获取当前蓝图及所有嵌套蓝图中的跨IB节点"""
+        plan = BlueprintExportHelper.get_export_plan()
+        if plan is not None:
+            return list(plan.cross_ib_nodes)
+
         tree = BlueprintExportHelper.get_current_blueprint_tree()
         if not tree:
             return []
-        
+        return BlueprintExportHelper._collect_cross_ib_nodes(tree)
+
+    @staticmethod
+    def _collect_cross_ib_nodes(tree):
+        """递归收集蓝图及嵌套蓝图中的跨IB节点"""
         cross_ib_nodes = []
         visited_blueprints = set()
         
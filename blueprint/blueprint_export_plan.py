@@ -0,0 +1,228 @@
+import bpy
+
+from dataclasses import dataclass
+from types import MappingProxyType
+
+
+@dataclass(frozen=True)
+class BlueprintExportPlan:
+    '''
+    一次导出的蓝图执行计划，由BlueprintPlanCompiler在导出开始时遍历一次蓝图树生成
+
+    导出期间蓝图结构不会变化，所以导出流程和BlueprintExportHelper都查询这个计划，
+    不再每个物体、每个节点都重新遍历节点树（包括嵌套蓝图）
+    计划生成后不可修改
+    '''
+    tree_name:str
+
+    # 输出节点上游的处理节点（顶点组处理、名称修改），按连接顺序排列，上游的在前
+    # [(节点, 'vg_process' | 'name_modify'), ...]
+    process_nodes:tuple
+
+    # 每个处理节点上游能到达的物体名称，处理节点名称 -> frozenset(物体名称)
+    process_node_object_names:MappingProxyType
+
+    # 物体名称 -> 该物体依次经过的处理节点 ((节点, 节点类型), ...)
+    object_processing_chains:MappingProxyType
+
+    # 要导出的物体，[(物体名称, 物体节点或多文件导出节点的项目), ...]
+    object_node_list:tuple
+
+    # 预先收集好的节点集合
+    postprocess_nodes:tuple
+    cross_ib_nodes:tuple
+    multifile_export_nodes:tuple
+    # [(形态键名称, 按键, 备注), ...]
+    shapekey_specs:tuple
+    datatype_nodes:tuple
+
+    def get_processing_chain(self, obj_name:str) -> tuple:
+        return self.object_processing_chains.get(obj_name, ())
+
+    def is_object_connected_to_node(self, obj_name:str, node) -> bool:
+        return obj_name in self.process_node_object_names.get(node.name, frozenset())
+
+    def find_multifile_export_node(self, node_name:str):
+        for node in self.multifile_export_nodes:
+            if node.name == node_name:
+                return node
+        return None
+
+
+class BlueprintPlanCompiler:
+    '''
+    遍历当前蓝图及其嵌套蓝图，生成BlueprintExportPlan
+
+    物体的可达性只计算一次：每个节点上游的物体集合通过记忆化的深度优先遍历得到，
+    同一个节点被多个下游节点引用时直接复用结果
+    '''
+
+    PROCESS_NODE_TYPES = {
+        'SSMTNode_VertexGroupProcess': 'vg_process',
+        'SSMTNode_Object_Name_Modify': 'name_modify',
+    }
+
+    @staticmethod
+    def _get_nested_tree(nest_node):
+        blueprint_name = getattr(nest_node, 'blueprint_name', '')
+        if not blueprint_name or blueprint_name == 'NONE':
+            return None
+        nested_tree = bpy.data.node_groups.get(blueprint_name)
+        if nested_tree and nested_tree.bl_idname == 'SSMTBlueprintTreeType':
+            return nested_tree
+        return None
+
+    @staticmethod
+    def _get_output_nodes(tree) -> list:
+        return [node for node in tree.nodes if node.bl_idname == 'SSMTNode_Result_Output']
+
+    @classmethod
+    def _collect_process_nodes(cls, tree) -> list:
+        '''
+        从输出节点开始深度优先收集处理节点，再反转得到从上游到下游的执行顺序
+        '''
+        process_nodes = []
+        visited = set()
+
+        def collect(node):
+            if node.name in visited:
+                return
+            visited.add(node.name)
+
+            node_type = cls.PROCESS_NODE_TYPES.get(node.bl_idname, None)
+            if node_type is not None:
+                process_nodes.append((node, node_type))
+
+            for input_socket in node.inputs:
+                for link in input_socket.links:
+                    collect(link.from_node)
+
+        for output_node in cls._get_output_nodes(tree):
+            collect(output_node)
+
+        process_nodes.reverse()
+        return process_nodes
+
+    @classmethod
+    def _build_upstream_object_index(cls):
+        '''
+        返回一个查询函数：节点 -> 上游所有物体名称的frozenset，结果按(蓝图名称, 节点名称)缓存
+        嵌套蓝图节点会继续进入嵌套蓝图的输出节点
+        '''
+        upstream_cache:dict[tuple,frozenset] = {}
+
+        def upstream_object_names(node, tree) -> frozenset:
+            key = (tree.name, node.name)
+            cached = upstream_cache.get(key, None)
+            if cached is not None:
+                return cached
+            # 先占位，节点图中存在环时不会无限递归
+            upstream_cache[key] = frozenset()
+
+            object_names = set()
+            if node.bl_idname == 'SSMTNode_Object_Info':
+                found_name = getattr(node, 'object_name', '')
+                if found_name:
+                    upstream_cache[key] = frozenset((found_name,))
+                    return upstream_cache[key]
+
+            elif node.bl_idname == 'SSMTNode_MultiFile_Export':
+                for item in getattr(node, 'object_list', []):
+                    item_name = getattr(item, 'object_name', '')
+                    if item_name:
+                        object_names.add(item_name)
+                if object_names:
+                    upstream_cache[key] = frozenset(object_names)
+                    return upstream_cache[key]
+
+            elif node.bl_idname == 'SSMTNode_Blueprint_Nest':
+                nested_tree = cls._get_nested_tree(node)
+                if nested_tree is not None:
+                    for nested_output_node in cls._get_output_nodes(nested_tree):
+                        object_names.update(upstream_object_names(nested_output_node, nested_tree))
+
+            for input_socket in node.inputs:
+                for link in input_socket.links:
+                    object_names.update(upstream_object_names(link.from_node, tree))
+
+            upstream_cache[key] = frozenset(object_names)
+            return upstream_cache[key]
+
+        return upstream_object_names
+
+    @classmethod
+    def _collect_export_object_nodes(cls, tree) -> list:
+        '''
+        收集输出节点上游所有未禁用的物体节点和多文件导出节点中的物体，包括嵌套蓝图
+        '''
+        object_node_list = []
+        visited_nodes = set()
+        visited_blueprints = set()
+
+        def collect(node, current_tree):
+            key = (current_tree.name, node.name)
+            if key in visited_nodes or node.mute:
+                return
+            visited_nodes.add(key)
+
+            if node.bl_idname == 'SSMTNode_Object_Info':
+                obj_name = getattr(node, 'object_name', '')
+                if obj_name:
+                    object_node_list.append((obj_name, node))
+            elif node.bl_idname == 'SSMTNode_MultiFile_Export':
+                for item in node.object_list:
+                    obj_name = getattr(item, 'object_name', '')
+                    if obj_name:
+                        object_node_list.append((obj_name, item))
+            elif node.bl_idname == 'SSMTNode_Blueprint_Nest':
+                nested_tree = cls._get_nested_tree(node)
+                if nested_tree is not None and nested_tree.name not in visited_blueprints:
+                    visited_blueprints.add(nested_tree.name)
+                    print(f"[Blueprint Nest] 扫描嵌套蓝图: {nested_tree.name}")
+                    nested_output_nodes = cls._get_output_nodes(nested_tree)
+                    if not nested_output_nodes:
+                        print(f"[Blueprint Nest] 警告: 嵌套蓝图 {nested_tree.name} 没有输出节点")
+                    for nested_output_node in nested_output_nodes:
+                        collect(nested_output_node, nested_tree)
+
+            for input_socket in node.inputs:
+                for link in input_socket.links:
+                    if link.from_node:
+                        collect(link.from_node, current_tree)
+
+        for output_node in cls._get_output_nodes(tree):
+            collect(output_node, tree)
+
+        print(f"[Blueprint Nest] 共扫描 {len(visited_blueprints)} 个嵌套蓝图，找到 {len(object_node_list)} 个物体")
+        return object_node_list
+
+    @classmethod
+    def compile(cls, tree) -> BlueprintExportPlan:
+        # 节点集合的收集逻辑仍然由BlueprintExportHelper提供，这里每种只收集一次
+        from .blueprint_export_helper import BlueprintExportHelper
+
+        process_nodes = cls._collect_process_nodes(tree)
+
+        upstream_object_names = cls._build_upstream_object_index()
+        process_node_object_names = {}
+        object_processing_chains:dict[str,list] = {}
+        for node, node_type in process_nodes:
+            object_names = upstream_object_names(node, tree)
+            process_node_object_names[node.name] = object_names
+            for obj_name in object_names:
+                object_processing_chains.setdefault(obj_name, []).append((node, node_type))
+
+        object_node_list = cls._collect_export_object_nodes(tree)
+
+        return BlueprintExportPlan(
+            tree_name=tree.name,
+            process_nodes=tuple(process_nodes),
+            process_node_object_names=MappingProxyType(process_node_object_names),
+            object_processing_chains=MappingProxyType({obj_name: tuple(chain) for obj_name, chain in object_processing_chains.items()}),
+            object_node_list=tuple(object_node_list),
+            postprocess_nodes=tuple(BlueprintExportHelper._collect_postprocess_nodes(tree)),
+            cross_ib_nodes=tuple(BlueprintExportHelper._collect_cross_ib_nodes(tree)),
+            multifile_export_nodes=tuple(BlueprintExportHelper._collect_multifile_export_nodes(tree)),
+            shapekey_specs=tuple(BlueprintExportHelper._collect_shapekey_specs(tree)),
+            datatype_nodes=tuple(BlueprintExportHelper._collect_datatype_nodes(tree)),
+        )
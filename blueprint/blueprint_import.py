@@ -10,7 +10,7 @@ from ..utils.timer_utils import TimerUtils
 from ..config.main_config import GlobalConfig, LogicName
 from ..config.properties_import_model import Properties_ImportModel
 
-from ..importer.mesh_importer import MeshImporter,MigotoBinaryFile
+from ..importer.mesh_importer import MeshImporter
 from ..base.drawib_pair import DrawIBPair
 from .blueprint_drag_drop import set_importing_state, refresh_workspace_cache
 
@@ -32,6 +32,10 @@ def ImportFromWorkSpaceSSMT4(self, context):
 
     foldername_gametypename_dict = {}
 
+    # 先收集所有要导入的fmt文件，最后统一并行导入
+    fmt_path_mesh_name_list:list[tuple[str,str]] = []
+    import_success_message_list:list[str] = []
+
     for import_folder_path in workspace_subfolders:
         import_folder_name = os.path.basename(import_folder_path)
         print("Import FolderName: " + import_folder_name)
@@ -78,9 +82,7 @@ def ImportFromWorkSpaceSSMT4(self, context):
                 print(f"找不到 fmt 文件: {fmt_file_path}")
                 continue
                 
-            mbf = MigotoBinaryFile(fmt_path=fmt_file_path,mesh_name= import_folder_name + ".自定义名称")
-            MeshImporter.create_mesh_obj_from_mbf(mbf=mbf,import_collection=workspace_collection)
-
+            fmt_path_mesh_name_list.append((fmt_file_path, import_folder_name + ".自定义名称"))
 
             import_json_path = os.path.join(import_folder_path, "import.json")
             if os.path.exists(import_json_path):
@@ -95,9 +97,14 @@ def ImportFromWorkSpaceSSMT4(self, context):
                     work_game_type = ""
                     
             foldername_gametypename_dict[import_folder_name] = work_game_type
-            self.report({'INFO'}, "成功导入" + import_folder_name + " 的数据类型: " + gametype_name)
+            import_success_message_list.append("成功导入" + import_folder_name + " 的数据类型: " + gametype_name)
             break
 
+    # 文件读取和数据解码在线程池中并行执行，主线程只负责按顺序创建mesh
+    MeshImporter.create_mesh_objs_parallel(fmt_path_mesh_name_list=fmt_path_mesh_name_list, import_collection=workspace_collection)
+    for import_success_message in import_success_message_list:
+        self.report({'INFO'}, import_success_message)
+
     save_import_json_path = os.path.join(GlobalConfig.path_workspace_folder(),"Import.json")
     JsonUtils.SaveToFile(json_dict=foldername_gametypename_dict,filepath=save_import_json_path)
     
@@ -199,6 +206,10 @@ def ImprotFromWorkSpaceSSMT3(self, context):
     draw_ib_pair_list:list[DrawIBPair] = ConfigUtils.get_extract_drawib_list_from_workspace_config_json()
 
     draw_ib_gametypename_dict = {}
+
+    # 先收集所有要导入的fmt文件，最后统一并行导入
+    fmt_path_mesh_name_list:list[tuple[str,str]] = []
+    import_success_message_list:list[str] = []
     
     for draw_ib_pair in draw_ib_pair_list:
         draw_ib = draw_ib_pair.DrawIB
@@ -250,17 +261,21 @@ def ImprotFromWorkSpaceSSMT3(self, context):
             for prefix in import_prefix_list:
                 
                 fmt_file_path = os.path.join(import_folder_path, prefix + ".fmt")
-                mbf = MigotoBinaryFile(fmt_path=fmt_file_path,mesh_name=draw_ib + "-" + str(part_count) + "-" + alias_name)
-                MeshImporter.create_mesh_obj_from_mbf(mbf=mbf,import_collection=workspace_collection)
+                fmt_path_mesh_name_list.append((fmt_file_path, draw_ib + "-" + str(part_count) + "-" + alias_name))
 
                 part_count = part_count + 1
 
             tmp_json = ConfigUtils.read_tmp_json(import_folder_path)
             work_game_type = tmp_json.get("WorkGameType","")
             draw_ib_gametypename_dict[draw_ib] = work_game_type
-            self.report({'INFO'}, "成功导入DrawIB " + draw_ib + " 的数据类型: " + gametype_name)
+            import_success_message_list.append("成功导入DrawIB " + draw_ib + " 的数据类型: " + gametype_name)
             break
 
+    # 文件读取和数据解码在线程池中并行执行，主线程只负责按顺序创建mesh
+    MeshImporter.create_mesh_objs_parallel(fmt_path_mesh_name_list=fmt_path_mesh_name_list, import_collection=workspace_collection)
+    for import_success_message in import_success_message_list:
+        self.report({'INFO'}, import_success_message)
+
     save_import_json_path = os.path.join(GlobalConfig.path_workspace_folder(),"Import.json")
     JsonUtils.SaveToFile(json_dict=draw_ib_gametypename_dict,filepath=save_import_json_path)
     
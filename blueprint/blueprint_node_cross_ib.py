@@ -343,7 +343,7 @@ class SSMTNode_PostProcess_CrossIB(SSMTNodeBase):
         layout.label(text="跨IB后处理节点", icon='FILE_REFRESH')
         layout.label(text="自动复制HLSL文件到res目录")
 
-    def execute_postprocess(self, mod_export_path):
+    def execute_postprocess(self, mod_export_path, ini_context=None):
         self._copy_hlsl_files(mod_export_path)
 
     def _copy_hlsl_files(self, mod_export_path):
@@ -1,4 +1,6 @@
 import bpy
+import os
+import numpy
 import traceback
 from bpy.types import Node, NodeSocket
 from bpy.props import StringProperty, CollectionProperty, BoolProperty, IntProperty
@@ -6,6 +8,7 @@ from bpy.props import StringProperty, CollectionProperty, BoolProperty, IntPrope
 from ..config.main_config import GlobalConfig
 from .blueprint_node_base import SSMTNodeBase
 from ..utils.obj_utils import mesh_triangulate_beauty
+from ..utils.animation_split_utils import AnimationSplitUtils
 
 
 class SSMT_OT_MultiFileExport_SplitAnimation(bpy.types.Operator):
@@ -54,6 +57,16 @@ class SSMT_OT_MultiFileExport_SplitAnimation(bpy.types.Operator):
             return {'CANCELLED'}
         
         scene = context.scene
+
+        # 仅采集顶点位置时不创建物体，直接把每一帧的位置写入.npz文件
+        positions_file_path = ""
+        if node.split_positions_only:
+            if node.split_positions_folder.startswith("//") and not bpy.data.filepath:
+                self.report({'WARNING'}, "请先保存.blend文件，或为顶点位置指定一个绝对路径的输出目录")
+                return {'CANCELLED'}
+            positions_folder = bpy.path.abspath(node.split_positions_folder)
+            os.makedirs(positions_folder, exist_ok=True)
+            positions_file_path = os.path.join(positions_folder, f"{obj.name}_Split.npz")
         
         # 保存原始状态
         original_frame = scene.frame_current
@@ -61,17 +74,19 @@ class SSMT_OT_MultiFileExport_SplitAnimation(bpy.types.Operator):
         original_active = context.active_object
         
         # 创建或清空目标集合
-        target_collection_name = f"{obj.name}_Split"
-        target_collection = bpy.data.collections.get(target_collection_name)
-        
-        if not target_collection:
-            # 创建新集合
-            target_collection = bpy.data.collections.new(target_collection_name)
-            scene.collection.children.link(target_collection)
-        else:
-            # 清空现有集合
-            for obj_to_remove in list(target_collection.objects):
-                bpy.data.objects.remove(obj_to_remove, do_unlink=True)
+        target_collection = None
+        if not node.split_positions_only:
+            target_collection_name = f"{obj.name}_Split"
+            target_collection = bpy.data.collections.get(target_collection_name)
+            
+            if not target_collection:
+                # 创建新集合
+                target_collection = bpy.data.collections.new(target_collection_name)
+                scene.collection.children.link(target_collection)
+            else:
+                # 清空现有集合
+                for obj_to_remove in list(target_collection.objects):
+                    bpy.data.objects.remove(obj_to_remove, do_unlink=True)
         
         # 保存原始插值类型并设置线性插值
         original_interpolations = {}
@@ -87,41 +102,33 @@ class SSMT_OT_MultiFileExport_SplitAnimation(bpy.types.Operator):
         # 拆分动画
         split_objects = []
         try:
-            for frame in range(start_frame, end_frame + 1):
-                # 根据选项选择跳转模式
-                if node.split_use_precise_mode:
-                    # 高精度模式：从第0帧开始播放到目标帧
-                    for f in range(0, frame + 1):
-                        scene.frame_set(f)
-                else:
-                    # 普通模式：直接跳转到目标帧
-                    scene.frame_set(frame)
-                
-                # 使用依赖图创建网格数据（支持曲线、曲面等各种类型）
+            if node.split_positions_only:
+                frame_positions_dict = AnimationSplitUtils.capture_world_positions(context, obj, start_frame, end_frame, node.split_use_precise_mode)
+                # 每一帧一个数组，键名为 frame_帧号，拓扑变化的帧顶点数可以不同
+                numpy.savez(positions_file_path, **{f"frame_{frame:03d}": positions for frame, positions in frame_positions_dict.items()})
+                self.report({'INFO'}, f"已采集 {len(frame_positions_dict)} 帧顶点位置: {positions_file_path}")
+                return {'FINISHED'}
+
+            # 高精度模式只从第0帧向后播放一遍，在播放过程中依次采集每个目标帧
+            # 第一帧的网格作为模板，后续拓扑不变的帧只复制模板并替换顶点位置
+            template_mesh = None
+            for frame in AnimationSplitUtils.step_frames(scene, start_frame, end_frame, node.split_use_precise_mode):
                 depsgraph = context.evaluated_depsgraph_get()
                 eval_obj = obj.evaluated_get(depsgraph)
-                mesh_data = bpy.data.meshes.new_from_object(eval_obj)
-                matrix = eval_obj.matrix_world.copy()
-                mesh_data.transform(matrix)
+                mesh_data = AnimationSplitUtils.create_frame_mesh(obj, eval_obj, template_mesh)
+                if template_mesh is None:
+                    template_mesh = mesh_data
                 
                 # 创建新物体
                 obj_name = f"{obj.name}_{frame:03d}"
                 new_obj = bpy.data.objects.new(obj_name, mesh_data)
                 
-                # 复制材质
-                for slot in obj.material_slots:
-                    if slot.material:
-                        new_obj.data.materials.append(slot.material)
-                
                 # 移动到目标集合
                 target_collection.objects.link(new_obj)
                 
                 split_objects.append(new_obj.name)
                 
                 self.report({'INFO'}, f"已创建帧 {frame}: {new_obj.name}")
-                
-                # 清理
-                eval_obj.to_mesh_clear()
         
         except Exception as e:
             self.report({'ERROR'}, f"动画拆分失败: {e}")
@@ -360,7 +367,7 @@ class SSMTNode_MultiFile_Export(SSMTNodeBase):
     ) # type: ignore
     split_use_precise_mode: bpy.props.BoolProperty(
         name="高精度模式",
-        description="使用高精度模式逐帧跳转，确保动画准确性",
+        description="从第0帧开始逐帧播放到结束帧，确保物理、布料等模拟的准确性",
         default=True
     ) # type: ignore
     split_set_linear: bpy.props.BoolProperty(
@@ -368,6 +375,17 @@ class SSMTNode_MultiFile_Export(SSMTNodeBase):
         description="将关键帧插值设为线性，防止拆分时出现过冲",
         default=True
     ) # type: ignore
+    split_positions_only: bpy.props.BoolProperty(
+        name="仅采集顶点位置",
+        description="不创建拆分物体，把每一帧世界空间的顶点位置直接写入输出目录下的 物体名_Split.npz 文件",
+        default=False
+    ) # type: ignore
+    split_positions_folder: bpy.props.StringProperty(
+        name="顶点位置输出目录",
+        description="仅采集顶点位置时.npz文件的输出目录，//开头表示相对.blend文件所在目录",
+        default="//",
+        subtype='DIR_PATH'
+    ) # type: ignore
     
     def init(self, context):
         self.outputs.new('SSMTSocketObject', "Output")
@@ -431,6 +449,11 @@ class SSMTNode_MultiFile_Export(SSMTNodeBase):
         row = box.row(align=True)
         row.prop(self, "split_use_precise_mode", text="高精度模式")
         row.prop(self, "split_set_linear", text="线性插值")
+
+        row = box.row(align=True)
+        row.prop(self, "split_positions_only", text="仅采集顶点位置")
+        if self.split_positions_only:
+            row.prop(self, "split_positions_folder", text="")
         
         row = box.row(align=True)
         row.operator("ssmt.multifile_export_split_animation", text="拆分选中物体动画", icon='ANIM').node_name = self.name
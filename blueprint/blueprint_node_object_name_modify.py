@@ -246,7 +246,7 @@ class SSMTNode_Object_Name_Modify(SSMTNodeBase):
         
         return result
     
-    def execute_postprocess(self, mod_export_path):
+    def execute_postprocess(self, mod_export_path, ini_context=None):
         """
         后处理阶段执行：修改配置表中的物体名称（仅用于识别）
         
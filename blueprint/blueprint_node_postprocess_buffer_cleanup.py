@@ -4,6 +4,7 @@ import glob
 import re
 
 from .blueprint_node_postprocess_base import SSMTNode_PostProcess_Base
+from .blueprint_postprocess_ini import PostProcessIniContext
 
 
 class SSMTNode_PostProcess_BufferCleanup(SSMTNode_PostProcess_Base):
@@ -16,26 +17,30 @@ class SSMTNode_PostProcess_BufferCleanup(SSMTNode_PostProcess_Base):
         layout.label(text="此操作将永久删除未引用的.buf文件", icon='ERROR')
         layout.label(text="建议先备份文件夹", icon='INFO')
 
-    def _find_unused_buffers(self, config_path):
+    def _find_unused_buffers(self, config_path, ini_context):
+        # 引用关系从共享的INI文档中读取，前面的节点修改过但还没写回的引用也会被计入
         referenced_files = set()
         filename_pattern = re.compile(r'^\s*filename\s*=\s*(.+)', re.IGNORECASE)
-        for ini_file in glob.glob(os.path.join(config_path, "*.ini")):
-            try:
-                with open(ini_file, 'r', encoding='utf-8') as f:
-                    for line in f:
-                        match = filename_pattern.match(line)
-                        if match:
-                            referenced_files.add(os.path.normpath(os.path.join(config_path, match.group(1).strip().replace('/', os.sep))))
-            except Exception as e:
-                print(f"读取INI文件失败 {ini_file}: {e}")
+        for ini_document in ini_context.get_documents():
+            for line in ini_document.to_text().splitlines():
+                match = filename_pattern.match(line)
+                if match:
+                    referenced_files.add(os.path.normpath(os.path.join(config_path, match.group(1).strip().replace('/', os.sep))))
         disk_buf_files = glob.glob(os.path.join(config_path, '**', '*.buf'), recursive=True)
         return [abs_path for buf_file in disk_buf_files if (abs_path := os.path.normpath(buf_file)) not in referenced_files]
 
-    def execute_postprocess(self, mod_export_path):
+    def execute_postprocess(self, mod_export_path, ini_context=None):
         print(f"缓冲区清理后处理节点开始执行，Mod导出路径: {mod_export_path}")
 
+        if ini_context is None:
+            ini_context = PostProcessIniContext(mod_export_path)
+
         print("正在扫描未引用的.buf文件...")
-        files_to_delete = self._find_unused_buffers(mod_export_path)
+        try:
+            files_to_delete = self._find_unused_buffers(mod_export_path, ini_context)
+        except Exception as e:
+            print(f"读取INI文件失败: {e}")
+            return
 
         if not files_to_delete:
             print("未找到任何未被引用的.buf文件。")
@@ -1,9 +1,9 @@
 import bpy
 import os
-import glob
 import re
 
 from .blueprint_node_postprocess_base import SSMTNode_PostProcess_Base
+from .blueprint_postprocess_ini import PostProcessIniContext
 
 
 class SSMTNode_PostProcess_HealthDetection(SSMTNode_PostProcess_Base):
@@ -55,31 +55,31 @@ class SSMTNode_PostProcess_HealthDetection(SSMTNode_PostProcess_Base):
         layout.prop(self, "health_param_name")
         layout.prop(self, "health_levels")
 
-    def execute_postprocess(self, mod_export_path):
+    def execute_postprocess(self, mod_export_path, ini_context=None):
         print(f"血量检测后处理节点开始执行，Mod导出路径: {mod_export_path}")
 
         if not self.health_character_hash:
             print("错误: 未设置角色哈希值")
             return
 
-        ini_files = glob.glob(os.path.join(mod_export_path, "*.ini"))
-        if not ini_files:
+        own_context = ini_context is None
+        if own_context:
+            ini_context = PostProcessIniContext(mod_export_path)
+
+        if not ini_context.get_ini_file_paths():
             print("路径中未找到任何.ini文件")
             return
 
-        target_ini_file = ini_files[0]
-
         try:
-            with open(target_ini_file, 'r', encoding='utf-8') as f:
-                if "; --- AUTO-APPENDED HEALTH DETECTION MODULE ---" in f.read():
-                    print("血量检测模块配置已存在于文件中。请手动删除后再生成。")
-                    return
+            ini_document = ini_context.get_first_document()
+            target_ini_file = ini_document.ini_file_path
+            if ini_document.contains_text("; --- AUTO-APPENDED HEALTH DETECTION MODULE ---"):
+                print("血量检测模块配置已存在于文件中。请手动删除后再生成。")
+                return
         except Exception as e:
             print(f"读取目标INI文件以进行检查时出错: {e}")
             return
 
-        self._create_cumulative_backup(target_ini_file, mod_export_path)
-
         try:
             module_content = self._get_module_template()
             
@@ -92,12 +92,15 @@ class SSMTNode_PostProcess_HealthDetection(SSMTNode_PostProcess_Base):
             module_content = module_content.replace("; 每一帧重置状态，等待下一帧重新检测", 
                                                        f"; 每一帧重置状态，等待下一帧重新检测\n\n{health_mapping_section}")
             
-            with open(target_ini_file, "a", encoding='utf-8') as f_out:
-                f_out.write("\n\n")
-                f_out.write("; ==============================================================================")
-                f_out.write("\n; --- AUTO-APPENDED HEALTH DETECTION MODULE ---")
-                f_out.write("\n; ==============================================================================\n\n")
-                f_out.write(module_content)
+            ini_document.append_text(
+                "\n\n"
+                "; =============================================================================="
+                "\n; --- AUTO-APPENDED HEALTH DETECTION MODULE ---"
+                "\n; ==============================================================================\n\n"
+                + module_content
+            )
+            if own_context:
+                ini_context.flush()
 
             print(f"血量检测模块配置已追加到: {os.path.basename(target_ini_file)}")
             print(f"角色哈希: {self.health_character_hash}")
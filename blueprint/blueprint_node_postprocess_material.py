@@ -1,11 +1,11 @@
 import bpy
 import os
-import glob
 import re
 from collections import OrderedDict
 import shutil
 
 from .blueprint_node_postprocess_base import SSMTNode_PostProcess_Base
+from .blueprint_postprocess_ini import PostProcessIniContext
 
 _name_mapping_cache = {}
 _reverse_name_mapping_cache = {}
@@ -218,30 +218,6 @@ class SSMTNode_PostProcess_Material(SSMTNode_PostProcess_Base):
             print(f"复制纹理文件失败: {e}")
             return None
 
-    def _read_ini_to_ordered_dict(self, ini_file_path):
-        sections = OrderedDict()
-        current_section = None
-        try:
-            with open(ini_file_path, 'r', encoding='utf-8') as f:
-                for line in f:
-                    stripped_line = line.strip()
-                    if stripped_line.startswith('[') and stripped_line.endswith(']'):
-                        current_section = stripped_line
-                        sections[current_section] = []
-                    elif current_section is not None:
-                        sections[current_section].append(line.rstrip())
-        except FileNotFoundError:
-            return None
-        return sections
-
-    def _write_ordered_dict_to_ini(self, sections, ini_file_path):
-        with open(ini_file_path, 'w', encoding='utf-8') as f:
-            for section_name, lines in sections.items():
-                f.write(f"{section_name}\n")
-                for line in lines:
-                    f.write(f"{line}\n")
-                f.write("\n")
-
     def define_swapkeys_in_sections(self, sections, keys_to_define):
         if not keys_to_define: return
         if '[Constants]' not in sections:
@@ -422,38 +398,19 @@ class SSMTNode_PostProcess_Material(SSMTNode_PostProcess_Base):
                     del lines[start_move_idx:end_move_idx]
         return next_swap_key_num
 
-    def execute_postprocess(self, mod_export_path):
+    def execute_postprocess(self, mod_export_path, ini_context=None):
         print(f"材质转资源后处理节点开始执行，Mod导出路径: {mod_export_path}")
 
-        ini_files = glob.glob(os.path.join(mod_export_path, "*.ini"))
-        if not ini_files:
+        own_context = ini_context is None
+        if own_context:
+            ini_context = PostProcessIniContext(mod_export_path)
+
+        if not ini_context.get_ini_file_paths():
             print("在路径中未找到任何.ini文件")
             return
 
-        for ini_file in ini_files:
-            self._create_cumulative_backup(ini_file, mod_export_path)
-
-            with open(ini_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-
-            slider_panel_content = ""
-            slider_marker = "; --- AUTO-APPENDED SLIDER CONTROL PANEL ---"
-            if slider_marker in content:
-                marker_pos = content.find(slider_marker)
-                slider_panel_content = content[marker_pos:]
-                content = content[:marker_pos]
-                print("[MaterialToResource] 检测到滑块面板内容，将保留")
-
-            sections = OrderedDict()
-            current_section = None
-            for line in content.splitlines():
-                stripped = line.strip()
-                if stripped.startswith('[') and stripped.endswith(']'):
-                    current_section = stripped
-                    sections[current_section] = []
-                elif current_section:
-                    sections[current_section].append(line)
-
+        for ini_document in ini_context.get_documents():
+            sections = ini_document.sections
             sections['_config_path'] = mod_export_path
 
             transparency_sections_to_add = OrderedDict()
@@ -476,26 +433,13 @@ class SSMTNode_PostProcess_Material(SSMTNode_PostProcess_Base):
 
             self.define_swapkeys_in_sections(sections, used_swap_keys)
 
-            new_content = []
-            for section_name, lines in sections.items():
-                new_content.append(section_name)
-                new_content.extend(lines)
-                new_content.append('')
-
             if transparency_sections_to_add:
-                new_content.append('\n;MARK:CustomShaderTransparency----------------------------------------------------------')
+                sections[';MARK:CustomShaderTransparency----------------------------------------------------------'] = []
                 for shader_name, lines in transparency_sections_to_add.items():
-                    new_content.append(f"[{shader_name}]")
-                    new_content.extend(lines)
-                    new_content.append('')
-
-            if slider_panel_content:
-                new_content.append('')
-                new_content.append(slider_panel_content)
-
-            with open(ini_file, 'w', encoding='utf-8') as f:
-                f.write("\n".join(new_content))
+                    sections[f"[{shader_name}]"] = lines
 
+        if own_context:
+            ini_context.flush()
         print("材质转资源引用完成！")
 
 
@@ -1,9 +1,7 @@
 import bpy
 import os
-import glob
 import re
 import shutil
-from collections import OrderedDict
 
 try:
     import numpy as np
@@ -12,6 +10,7 @@ except ImportError:
     NUMPY_AVAILABLE = False
 
 from .blueprint_node_postprocess_base import SSMTNode_PostProcess_Base
+from .blueprint_postprocess_ini import PostProcessIniContext
 
 
 class SSMTNode_PostProcess_MultiFile(SSMTNode_PostProcess_Base):
@@ -20,6 +19,10 @@ class SSMTNode_PostProcess_MultiFile(SSMTNode_PostProcess_Base):
     bl_label = '多文件配置'
     bl_description = '为指定哈希值的物体生成多文件动画配置，支持紧凑缓冲区和顶点增量存储'
 
+    # 批量计算紧凑缓冲区时每批堆叠的帧数，限制内存占用
+    FRAME_BATCH_SIZE = 16
+    POSITION_DELTA_TOLERANCE = 1e-6
+
     hash_values: bpy.props.StringProperty(
         name="哈希值",
         description="需要处理的哈希值，多个用逗号分隔（如：4816de84,5c0240db）",
@@ -177,57 +180,99 @@ class SSMTNode_PostProcess_MultiFile(SSMTNode_PostProcess_Base):
             print(f"读取缓冲区文件失败: {buffer_path}. 原因: {e}")
             return None
 
+    def _open_buffer_file(self, buffer_path):
+        """以只读内存映射打开缓冲区文件，不会一次性读入内存"""
+        try:
+            if os.path.getsize(buffer_path) == 0:
+                return np.empty(0, dtype=np.float32)
+            return np.memmap(buffer_path, dtype=np.float32, mode='r')
+        except Exception as e:
+            print(f"读取缓冲区文件失败: {buffer_path}. 原因: {e}")
+            return None
+
     def _write_buffer_file(self, buffer_data, buffer_path):
+        from ..helper.buffer_export_helper import BufferExportHelper
         try:
-            os.makedirs(os.path.dirname(buffer_path), exist_ok=True)
-            buffer_data.tofile(buffer_path)
+            BufferExportHelper.write_buffer(buffer_data, buffer_path)
             return True
         except Exception as e:
             print(f"写入缓冲区文件失败: {buffer_path}. 原因: {e}")
             return False
 
-    def _calculate_deltas(self, base_buffer, target_buffer):
-        return target_buffer - base_buffer
+    def _open_frame_buffers(self, mod_export_path, buffer_folders, hash_value):
+        '''
+        打开每个目标帧的Position缓冲区，返回 (找到文件的帧文件夹列表, 对应的缓冲区列表)
+        放在单独的函数中，调用方del返回的列表后不会再有变量引用内存映射
+        '''
+        frame_buffer_folders = []
+        target_buffers = []
+        for buffer_folder in buffer_folders:
+            target_buffer_full_path = os.path.join(mod_export_path, buffer_folder, f"{hash_value}-Position.buf")
+            if not os.path.exists(target_buffer_full_path):
+                continue
+            target_buffer = self._open_buffer_file(target_buffer_full_path)
+            if target_buffer is None:
+                continue
+            frame_buffer_folders.append(buffer_folder)
+            target_buffers.append(target_buffer)
+        return frame_buffer_folders, target_buffers
 
     def _create_packed_buffers(self, base_buffer, target_buffer, use_delta=True):
-        try:
-            if use_delta:
-                deltas = self._calculate_deltas(base_buffer, target_buffer)
-            else:
-                deltas = target_buffer.copy()
+        return self._create_packed_buffers_for_frames(base_buffer, [target_buffer], use_delta)[0]
+
+    def _create_packed_buffers_for_frames(self, base_buffer, target_buffers, use_delta=True):
+        """
+        为多个目标帧批量创建紧凑缓冲区，返回与 target_buffers 一一对应的 (map_array, position_deltas_array) 列表
+        每批最多 FRAME_BATCH_SIZE 帧堆叠成 (帧数, 顶点数, 顶点大小) 的数组，一次比较得到所有帧的变化顶点，
+        目标帧可以是内存映射，只有在计算到这一批时才真正读取
+        """
+        empty_result = (np.array([], dtype=np.int32), np.array([], dtype=np.float32))
+        results = [empty_result] * len(target_buffers)
 
+        try:
             vertex_size = self._get_vertex_size()
-            changed_indices = []
-            changed_values = []
+            buffer_length = len(base_buffer)
+
+            if buffer_length % vertex_size != 0:
+                print(f"缓冲区长度不是顶点大小的整数倍: {buffer_length} % {vertex_size} != 0")
+            vertex_count = buffer_length // vertex_size
+            adjusted_length = vertex_count * vertex_size
+            position_size = min(3, vertex_size)
+
+            base_positions = np.asarray(base_buffer[:adjusted_length]).reshape(vertex_count, vertex_size)[:, :position_size]
+
+            valid_frame_indices = []
+            for frame_index, target_buffer in enumerate(target_buffers):
+                if len(target_buffer) != buffer_length:
+                    print(f"创建紧凑缓冲区失败: 目标帧长度 {len(target_buffer)} 与基准帧长度 {buffer_length} 不一致")
+                    continue
+                valid_frame_indices.append(frame_index)
 
-            if len(deltas) % vertex_size != 0:
-                print(f"缓冲区长度不是顶点大小的整数倍: {len(deltas)} % {vertex_size} != 0")
-                adjusted_length = (len(deltas) // vertex_size) * vertex_size
-                deltas = deltas[:adjusted_length]
+            for batch_start in range(0, len(valid_frame_indices), self.FRAME_BATCH_SIZE):
+                batch_frame_indices = valid_frame_indices[batch_start:batch_start + self.FRAME_BATCH_SIZE]
+
+                # (帧数, 顶点数, 位置分量数)
+                positions = np.stack([
+                    np.asarray(target_buffers[frame_index][:adjusted_length]).reshape(vertex_count, vertex_size)[:, :position_size]
+                    for frame_index in batch_frame_indices
+                ])
                 if use_delta:
-                    target_buffer = target_buffer[:adjusted_length]
-
-            for i in range(0, len(deltas), vertex_size):
-                position_delta = deltas[i:i+3]
-                if not np.allclose(position_delta, [0, 0, 0], atol=1e-6):
-                    changed_indices.append(i // vertex_size)
-                    if use_delta:
-                        changed_values.extend(position_delta)
-                    else:
-                        changed_values.extend(target_buffer[i:i+3])
+                    positions = positions - base_positions
 
-            map_array = np.full(len(deltas) // vertex_size, -1, dtype=np.int32)
-            for idx, vert_idx in enumerate(changed_indices):
-                map_array[vert_idx] = idx
+                # 和 np.allclose(position_delta, [0, 0, 0], atol=1e-6) 一致：按float64比较，NaN视为有变化
+                changed_mask = ~np.all(np.abs(positions.astype(np.float64)) <= self.POSITION_DELTA_TOLERANCE, axis=2)
+                map_arrays = np.where(changed_mask, np.cumsum(changed_mask, axis=1) - 1, -1).astype(np.int32)
 
-            position_deltas_array = np.array(changed_values, dtype=np.float32)
+                for batch_index, frame_index in enumerate(batch_frame_indices):
+                    position_deltas_array = positions[batch_index][changed_mask[batch_index]].reshape(-1).astype(np.float32)
+                    results[frame_index] = (map_arrays[batch_index], position_deltas_array)
 
-            print(f"创建紧凑缓冲区: {len(changed_indices)}个顶点变化，原始顶点数: {len(deltas) // vertex_size}，顶点大小: {vertex_size}个float")
+                    print(f"创建紧凑缓冲区: {int(changed_mask[batch_index].sum())}个顶点变化，原始顶点数: {vertex_count}，顶点大小: {vertex_size}个float")
 
-            return map_array, position_deltas_array
+            return results
         except Exception as e:
             print(f"创建紧凑缓冲区失败: {str(e)}")
-            return np.array([], dtype=np.int32), np.array([], dtype=np.float32)
+            return [empty_result] * len(target_buffers)
 
     def _get_vertex_count(self, ini_sections, hash_value):
         for section_name, lines in ini_sections.items():
@@ -240,46 +285,7 @@ class SSMTNode_PostProcess_MultiFile(SSMTNode_PostProcess_Base):
                             continue
         return None
 
-    def _read_ini_to_ordered_dict(self, ini_file_path):
-        sections = OrderedDict()
-        current_section = None
-        slider_panel_content = ""
-        slider_marker = "; --- AUTO-APPENDED SLIDER CONTROL PANEL ---"
-        
-        try:
-            with open(ini_file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            if slider_marker in content:
-                marker_pos = content.find(slider_marker)
-                slider_panel_content = content[marker_pos:]
-                content = content[:marker_pos]
-                print("[MultiFile] 检测到滑块面板内容，将保留")
-            
-            for line in content.splitlines():
-                stripped_line = line.strip()
-                if stripped_line.startswith('[') and stripped_line.endswith(']'):
-                    current_section = stripped_line
-                    sections[current_section] = []
-                elif current_section is not None:
-                    sections[current_section].append(line)
-        except FileNotFoundError:
-            return None, ""
-        return sections, slider_panel_content
-
-    def _write_ordered_dict_to_ini(self, sections, ini_file_path, slider_panel_content=""):
-        with open(ini_file_path, 'w', encoding='utf-8') as f:
-            for section_name, lines in sections.items():
-                f.write(f"{section_name}\n")
-                for line in lines:
-                    f.write(f"{line}\n")
-                f.write("\n")
-            
-            if slider_panel_content:
-                f.write("\n")
-                f.write(slider_panel_content)
-
-    def execute_postprocess(self, mod_export_path):
+    def execute_postprocess(self, mod_export_path, ini_context=None):
         print(f"多文件配置后处理节点开始执行，Mod导出路径: {mod_export_path}")
 
         if not NUMPY_AVAILABLE:
@@ -291,20 +297,17 @@ class SSMTNode_PostProcess_MultiFile(SSMTNode_PostProcess_Base):
             print("请至少输入一个有效的哈希值")
             return
 
-        try:
-            original_cwd = os.getcwd()
-            os.chdir(mod_export_path)
+        own_context = ini_context is None
+        if own_context:
+            ini_context = PostProcessIniContext(mod_export_path)
 
-            ini_files = glob.glob("*.ini")
-            if not ini_files:
+        try:
+            if not ini_context.get_ini_file_paths():
                 print("在路径中未找到任何.ini文件")
-                os.chdir(original_cwd)
                 return
 
-            for ini_file in ini_files:
-                ini_file_path = os.path.join(mod_export_path, ini_file)
-                self._create_cumulative_backup(ini_file_path, mod_export_path)
-                sections, slider_panel_content = self._read_ini_to_ordered_dict(ini_file_path)
+            for ini_document in ini_context.get_documents():
+                sections = ini_document.sections
                 if not sections:
                     continue
 
@@ -337,44 +340,37 @@ class SSMTNode_PostProcess_MultiFile(SSMTNode_PostProcess_Base):
                         new_section_lines = [f'[Resource{hash_value}Position_1]'] + original_lines
                         sections[resource_section] = new_section_lines
 
+                    frame_buffer_folders, target_buffers = self._open_frame_buffers(mod_export_path, buffer_folders[1:], hash_value)
+                    packed_buffers = self._create_packed_buffers_for_frames(base_buffer, target_buffers, True)
+                    # 计算结果都是新数组，这里释放内存映射，避免文件一直被占用
+                    del target_buffers
+
                     processed_frames = []
-                    for buffer_folder in buffer_folders[1:]:
-                        target_filename = os.path.join(buffer_folder, f"{hash_value}-Position.buf")
-                        target_buffer_full_path = os.path.join(mod_export_path, target_filename)
-
-                        if os.path.exists(target_buffer_full_path):
-                            target_buffer = self._read_buffer_file(target_buffer_full_path)
-                            if target_buffer is None:
-                                continue
-
-                            map_array, pos_deltas_array = self._create_packed_buffers(
-                                base_buffer, target_buffer, True
-                            )
-
-                            pos_output_path = os.path.join(mod_export_path, buffer_folder, f"{hash_value}-Position_pos.buf")
-                            self._write_buffer_file(pos_deltas_array, pos_output_path)
-
-                            map_output_path = os.path.join(mod_export_path, buffer_folder, f"{hash_value}-Position_map.buf")
-                            self._write_buffer_file(map_array, map_output_path)
-
-                            folder_num = int(buffer_folder[-2:])
-                            pos_resource_section = f'[Resource{hash_value}Position{folder_num:02d}_pos]'
-                            stride = 12
-
-                            sections[pos_resource_section] = [
-                                'type = Buffer',
-                                f'stride = {stride}',
-                                f'filename = {buffer_folder}/{hash_value}-Position_pos.buf'
-                            ]
-
-                            map_resource_section = f'[Resource{hash_value}Position{folder_num:02d}_Map]'
-                            sections[map_resource_section] = [
-                                'type = Buffer',
-                                'stride = 4',
-                                f'filename = {buffer_folder}/{hash_value}-Position_map.buf'
-                            ]
-                            
-                            processed_frames.append((folder_num, buffer_folder))
+                    for buffer_folder, (map_array, pos_deltas_array) in zip(frame_buffer_folders, packed_buffers):
+                        pos_output_path = os.path.join(mod_export_path, buffer_folder, f"{hash_value}-Position_pos.buf")
+                        self._write_buffer_file(pos_deltas_array, pos_output_path)
+
+                        map_output_path = os.path.join(mod_export_path, buffer_folder, f"{hash_value}-Position_map.buf")
+                        self._write_buffer_file(map_array, map_output_path)
+
+                        folder_num = int(buffer_folder[-2:])
+                        pos_resource_section = f'[Resource{hash_value}Position{folder_num:02d}_pos]'
+                        stride = 12
+
+                        sections[pos_resource_section] = [
+                            'type = Buffer',
+                            f'stride = {stride}',
+                            f'filename = {buffer_folder}/{hash_value}-Position_pos.buf'
+                        ]
+
+                        map_resource_section = f'[Resource{hash_value}Position{folder_num:02d}_Map]'
+                        sections[map_resource_section] = [
+                            'type = Buffer',
+                            'stride = 4',
+                            f'filename = {buffer_folder}/{hash_value}-Position_map.buf'
+                        ]
+                        
+                        processed_frames.append((folder_num, buffer_folder))
 
                     if not processed_frames:
                         print(f"没有找到有效的目标帧文件，跳过哈希值: {hash_value}")
@@ -480,14 +476,11 @@ class SSMTNode_PostProcess_MultiFile(SSMTNode_PostProcess_Base):
 
                 sections[present_section] = present_lines
 
-                self._write_ordered_dict_to_ini(sections, ini_file, slider_panel_content)
-
-            os.chdir(original_cwd)
+            if own_context:
+                ini_context.flush()
             print("多文件配置生成完成！")
 
         except Exception as e:
-            if 'original_cwd' in locals() and os.path.exists(original_cwd):
-                os.chdir(original_cwd)
             print(f"多文件配置生成过程中出错: {str(e)}")
             import traceback
             traceback.print_exc()
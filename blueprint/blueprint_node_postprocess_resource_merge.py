@@ -1,10 +1,10 @@
 import bpy
 import os
-import glob
 import re
-from collections import OrderedDict
+import hashlib
 
 from .blueprint_node_postprocess_base import SSMTNode_PostProcess_Base
+from .blueprint_postprocess_ini import PostProcessIniContext
 
 
 class SSMTNode_PostProcess_ResourceMerge(SSMTNode_PostProcess_Base):
@@ -23,8 +23,19 @@ class SSMTNode_PostProcess_ResourceMerge(SSMTNode_PostProcess_Base):
         default='FIRST_AND_LAST'
     )
 
+    merge_identical_files: bpy.props.BoolProperty(
+        name="合并内容相同的文件",
+        description="比较资源引用的文件内容，内容完全相同的文件只保留一份，其余引用改为指向保留的文件",
+        default=True
+    )
+
+    # 流式计算文件哈希时每次读取的字节数
+    HASH_CHUNK_SIZE = 1024 * 1024
+    FILENAME_PATTERN = re.compile(r'^\s*filename\s*=\s*(.+)', re.IGNORECASE)
+
     def draw_buttons(self, context, layout):
         layout.prop(self, "resource_key_logic")
+        layout.prop(self, "merge_identical_files")
 
     def extract_resource_key(self, resource_name):
         hash_parts = re.findall(r'[a-f0-9]{8,}', resource_name, re.IGNORECASE)
@@ -43,45 +54,29 @@ class SSMTNode_PostProcess_ResourceMerge(SSMTNode_PostProcess_Base):
                 return resource_name
         return resource_name
 
-    def execute_postprocess(self, mod_export_path):
+    def execute_postprocess(self, mod_export_path, ini_context=None):
         print(f"资源合并后处理节点开始执行，Mod导出路径: {mod_export_path}")
 
-        ini_files = glob.glob(os.path.join(mod_export_path, "*.ini"))
-        if not ini_files:
+        own_context = ini_context is None
+        if own_context:
+            ini_context = PostProcessIniContext(mod_export_path)
+
+        if not ini_context.get_ini_file_paths():
             print("在路径中未找到任何.ini文件")
             return
 
-        for ini_file in ini_files:
-            self.process_ini_file(ini_file, mod_export_path)
-
-        print("资源引用合并完成！")
-
-    def process_ini_file(self, ini_file, mod_export_path):
-        self._create_cumulative_backup(ini_file, mod_export_path)
+        for ini_document in ini_context.get_documents():
+            self.process_ini_file(ini_document, mod_export_path)
 
-        with open(ini_file, 'r', encoding='utf-8') as f:
-            content = f.read()
+        if self.merge_identical_files:
+            self.merge_identical_resource_files(ini_context.get_documents(), mod_export_path)
 
-        slider_panel_content = ""
-        slider_marker = "; --- AUTO-APPENDED SLIDER CONTROL PANEL ---"
-        if slider_marker in content:
-            marker_pos = content.find(slider_marker)
-            slider_panel_content = content[marker_pos:]
-            content = content[:marker_pos]
-            print("[ResourceMerge] 检测到滑块面板内容，将保留")
-
-        lines = content.splitlines()
-
-        sections = OrderedDict()
-        current_section = None
+        if own_context:
+            ini_context.flush()
+        print("资源引用合并完成！")
 
-        for line in lines:
-            stripped = line.strip()
-            if stripped.startswith('[') and stripped.endswith(']'):
-                current_section = stripped
-                sections[current_section] = []
-            elif current_section:
-                sections[current_section].append(line)
+    def process_ini_file(self, ini_document, mod_export_path):
+        sections = ini_document.sections
 
         key_to_first_ref = {}
         files_to_delete = set()
@@ -111,7 +106,6 @@ class SSMTNode_PostProcess_ResourceMerge(SSMTNode_PostProcess_Base):
                     'filename': filename
                 }
 
-        modified = False
         for section_name, section_lines in sections.items():
             if section_name.startswith('[Resource_'):
                 for i, line in enumerate(section_lines):
@@ -123,30 +117,139 @@ class SSMTNode_PostProcess_ResourceMerge(SSMTNode_PostProcess_Base):
                             primary_filename = key_to_first_ref[resource_key]['filename']
                             if original_filename != primary_filename:
                                 section_lines[i] = f"filename = {primary_filename}"
-                                modified = True
                         break
 
-        if modified:
-            new_content = []
-            for section_name, lines in sections.items():
-                new_content.append(section_name)
-                new_content.extend(lines)
-                new_content.append('')
+        for file_path in files_to_delete:
+            try:
+                os.remove(file_path)
+                print(f"  已删除重复文件: {os.path.relpath(file_path, mod_export_path)}")
+            except OSError as e:
+                print(f"删除文件失败 {file_path}: {e}")
 
-            if slider_panel_content:
-                new_content.append('')
-                new_content.append(slider_panel_content)
+    @staticmethod
+    def _resolve_file_path(mod_export_path, filename):
+        # Windows下路径不区分大小写，还可能经过符号链接，统一成真实路径再比较，
+        # 否则同一个文件的两种写法会被当成两个内容相同的文件，删除"重复"的那个就把原文件删掉了
+        file_path = os.path.join(mod_export_path, filename.strip().replace('/', os.sep))
+        return os.path.normcase(os.path.realpath(file_path))
+
+    @staticmethod
+    def _is_same_file(file_path, other_file_path):
+        try:
+            return os.path.samefile(file_path, other_file_path)
+        except OSError:
+            return False
+
+    def _calculate_file_hash(self, file_path):
+        hasher = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            while True:
+                chunk = f.read(self.HASH_CHUNK_SIZE)
+                if not chunk:
+                    break
+                hasher.update(chunk)
+        return hasher.hexdigest()
+
+    def _collect_resource_file_references(self, ini_documents, mod_export_path):
+        '''
+        收集所有INI文件中Resource类型Section的filename引用
+        返回 [(section_lines, 行索引, 写在INI中的文件名, 文件绝对路径), ...]，按INI中出现的顺序排列
+        '''
+        references = []
+        for ini_document in ini_documents:
+            for section_name, section_lines in ini_document.sections.items():
+                if not section_name.startswith('[Resource'):
+                    continue
+                for i, line in enumerate(section_lines):
+                    match = self.FILENAME_PATTERN.match(line)
+                    if match:
+                        filename = match.group(1).strip()
+                        references.append((section_lines, i, filename, self._resolve_file_path(mod_export_path, filename)))
+        return references
+
+    def _group_identical_files(self, file_paths):
+        '''
+        先按文件大小分组，只有大小相同的文件才需要计算内容哈希
+        返回 {文件绝对路径: 内容相同的第一个文件的绝对路径}，只包含需要被替换的文件
+        '''
+        size_to_paths = {}
+        for file_path in file_paths:
+            try:
+                size_to_paths.setdefault(os.path.getsize(file_path), []).append(file_path)
+            except OSError:
+                continue
 
-            with open(ini_file, 'w', encoding='utf-8') as f:
-                f.write("\n".join(new_content))
+        duplicate_to_canonical = {}
+        for size, same_size_paths in size_to_paths.items():
+            if len(same_size_paths) < 2:
+                continue
 
-        for file_path in files_to_delete:
+            hash_to_canonical = {}
+            for file_path in same_size_paths:
+                try:
+                    content_hash = self._calculate_file_hash(file_path)
+                except OSError as e:
+                    print(f"读取文件失败 {file_path}: {e}")
+                    continue
+
+                canonical_path = hash_to_canonical.setdefault(content_hash, file_path)
+                if canonical_path == file_path:
+                    continue
+                # 硬链接指向的是同一个物理文件，不能当作重复文件处理
+                if self._is_same_file(file_path, canonical_path):
+                    continue
+                duplicate_to_canonical[file_path] = canonical_path
+        return duplicate_to_canonical
+
+    def merge_identical_resource_files(self, ini_documents, mod_export_path):
+        '''
+        按文件内容去重：内容完全相同的资源文件只保留INI中最先引用的那一份，
+        其余引用改为指向它，不再被任何INI引用的重复文件会被删除
+        '''
+        references = self._collect_resource_file_references(ini_documents, mod_export_path)
+
+        # dict保持插入顺序，保留的文件是INI中最先出现的那个
+        referenced_paths = list(dict.fromkeys(file_path for _, _, _, file_path in references))
+        duplicate_to_canonical = self._group_identical_files(referenced_paths)
+        if not duplicate_to_canonical:
+            print("未找到内容相同的资源文件。")
+            return
+
+        canonical_path_to_filename = {}
+        for _, _, filename, file_path in references:
+            canonical_path_to_filename.setdefault(file_path, filename)
+
+        for section_lines, line_index, filename, file_path in references:
+            canonical_path = duplicate_to_canonical.get(file_path, None)
+            if canonical_path is not None:
+                section_lines[line_index] = f"filename = {canonical_path_to_filename[canonical_path]}"
+
+        # 重复文件可能还被其它Section引用，重新扫描全部内容确认没有引用后才删除
+        still_referenced_paths = set()
+        for ini_document in ini_documents:
+            for line in ini_document.to_text().splitlines():
+                match = self.FILENAME_PATTERN.match(line)
+                if match:
+                    still_referenced_paths.add(self._resolve_file_path(mod_export_path, match.group(1)))
+
+        removed_count = 0
+        saved_bytes = 0
+        for file_path in duplicate_to_canonical.keys():
+            if file_path in still_referenced_paths:
+                continue
+            if self._is_same_file(file_path, duplicate_to_canonical[file_path]):
+                continue
             try:
+                file_size = os.path.getsize(file_path)
                 os.remove(file_path)
-                print(f"  已删除重复文件: {os.path.relpath(file_path, mod_export_path)}")
+                removed_count += 1
+                saved_bytes += file_size
+                print(f"  已删除内容重复的文件: {os.path.relpath(file_path, mod_export_path)} -> {os.path.relpath(duplicate_to_canonical[file_path], mod_export_path)}")
             except OSError as e:
                 print(f"删除文件失败 {file_path}: {e}")
 
+        print(f"内容去重完成：合并了 {len(duplicate_to_canonical)} 个内容相同的文件，删除 {removed_count} 个，节省 {saved_bytes / (1024 * 1024):.2f} MB ({saved_bytes} 字节)")
+
 
 classes = (
     SSMTNode_PostProcess_ResourceMerge,
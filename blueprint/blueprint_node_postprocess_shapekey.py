@@ -1,6 +1,5 @@
 import bpy
 import os
-import glob
 import re
 import shutil
 import struct
@@ -14,6 +13,7 @@ except ImportError:
     NUMPY_AVAILABLE = False
 
 from .blueprint_node_postprocess_base import SSMTNode_PostProcess_Base
+from .blueprint_postprocess_ini import PostProcessIniContext
 
 
 class SSMTNode_PostProcess_ShapeKey(SSMTNode_PostProcess_Base):
@@ -275,6 +275,8 @@ class SSMTNode_PostProcess_ShapeKey(SSMTNode_PostProcess_Base):
             print("Numpy库未找到，无法执行缓冲区优化。")
             return False
 
+        from ..helper.buffer_export_helper import BufferExportHelper
+
         print(f"开始处理缓冲区 (紧凑:{'是' if use_packed else '否'}, 增量(仅位置):{'是' if use_delta else '否'})...")
 
         buffers_to_process = set()
@@ -335,16 +337,16 @@ class SSMTNode_PostProcess_ShapeKey(SSMTNode_PostProcess_Base):
                     if use_packed:
                         packed_data = data_to_write[pos_diff_mask]
                         data_path = f"{output_prefix}{filename_suffix}.buf"
-                        with open(data_path, 'wb') as f: f.write(packed_data.tobytes())
+                        BufferExportHelper.write_buffer(packed_data, data_path)
 
                         index_map = np.full(num_vertices, -1, dtype=np.int32)
                         index_map[pos_diff_mask] = np.arange(num_active_vertices, dtype=np.int32)
                         map_path = f"{output_prefix}_map.buf"
-                        with open(map_path, 'wb') as f: f.write(index_map.tobytes())
+                        BufferExportHelper.write_buffer(index_map, map_path)
                         print(f"    -> 成功生成: {os.path.basename(data_path)} 和 {os.path.basename(map_path)}")
                     else:
                         data_path = f"{output_prefix}{filename_suffix}.buf"
-                        with open(data_path, 'wb') as f: f.write(data_to_write.tobytes())
+                        BufferExportHelper.write_buffer(data_to_write, data_path)
                         print(f"    -> 成功生成: {os.path.basename(data_path)}")
 
                 elif use_packed:
@@ -360,12 +362,12 @@ class SSMTNode_PostProcess_ShapeKey(SSMTNode_PostProcess_Base):
 
                     packed_data = shapekey_data[diff_mask]
                     data_path = f"{output_prefix}{filename_suffix}.buf"
-                    with open(data_path, 'wb') as f: f.write(packed_data.tobytes())
+                    BufferExportHelper.write_buffer(packed_data, data_path)
 
                     index_map = np.full(num_vertices, -1, dtype=np.int32)
                     index_map[diff_mask] = np.arange(num_active_vertices, dtype=np.int32)
                     map_path = f"{output_prefix}_map.buf"
-                    with open(map_path, 'wb') as f: f.write(index_map.tobytes())
+                    BufferExportHelper.write_buffer(index_map, map_path)
                     print(f"    -> 成功生成: {os.path.basename(data_path)} 和 {os.path.basename(map_path)}")
                 else:
                     print(f"    -> 标准模式，使用原始形态键文件。")
@@ -377,55 +379,6 @@ class SSMTNode_PostProcess_ShapeKey(SSMTNode_PostProcess_Base):
         print("缓冲区处理完成。")
         return True
 
-    def _read_ini_to_ordered_dict(self, ini_file_path):
-        """读取INI文件到有序字典"""
-        sections = OrderedDict()
-        current_section = None
-        slider_panel_content = ""
-        slider_marker = "; --- AUTO-APPENDED SLIDER CONTROL PANEL ---"
-        
-        try:
-            with open(ini_file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            if slider_marker in content:
-                marker_pos = content.find(slider_marker)
-                slider_panel_content = content[marker_pos:]
-                content = content[:marker_pos]
-                print("[ShapeKey] 检测到滑块面板内容，将保留")
-            
-            for line in content.splitlines():
-                stripped_line = line.strip()
-                if stripped_line.startswith('[') and stripped_line.endswith(']'):
-                    current_section = stripped_line
-                    if current_section not in sections:
-                        sections[current_section] = []
-                    continue
-                if current_section:
-                    sections[current_section].append(line)
-        except Exception as e:
-            print(f"读取INI文件失败: {e}")
-        return sections, slider_panel_content
-
-    def _write_ordered_dict_to_ini(self, sections, ini_file_path, slider_panel_content=""):
-        """将有序字典写入INI文件"""
-        try:
-            with open(ini_file_path, 'w', encoding='utf-8') as f:
-                for section_name, lines in sections.items():
-                    if section_name.startswith(';;'):
-                        f.write(section_name + '\n')
-                    else:
-                        f.write(section_name + '\n')
-                    for line in lines:
-                        f.write(line + '\n')
-                    f.write('\n')
-                
-                if slider_panel_content:
-                    f.write('\n')
-                    f.write(slider_panel_content)
-        except Exception as e:
-            print(f"写入INI文件失败: {e}")
-
     def _get_vertex_count(self, sections, hash_value):
         """获取顶点数量"""
         for section_name, lines in sections.items():
@@ -563,7 +516,7 @@ class SSMTNode_PostProcess_ShapeKey(SSMTNode_PostProcess_Base):
             traceback.print_exc()
             return False
 
-    def execute_postprocess(self, mod_export_path):
+    def execute_postprocess(self, mod_export_path, ini_context=None):
         print(f"形态键配置后处理节点开始执行，Mod导出路径: {mod_export_path}")
 
         classification_text_obj = next((t for t in bpy.data.texts if "Shape_Key_Classification" in t.name), None)
@@ -571,12 +524,14 @@ class SSMTNode_PostProcess_ShapeKey(SSMTNode_PostProcess_Base):
             print("未找到 'Shape_Key_Classification' 文本")
             return
 
-        ini_files = glob.glob(os.path.join(mod_export_path, "*.ini"))
-        if not ini_files:
+        own_context = ini_context is None
+        if own_context:
+            ini_context = PostProcessIniContext(mod_export_path)
+
+        if not ini_context.get_ini_file_paths():
             print("路径中未找到任何.ini文件")
             return
 
-        target_ini_file = ini_files[0]
         use_packed = self.use_packed_buffers
         use_delta = self.store_deltas
         
@@ -591,10 +546,11 @@ class SSMTNode_PostProcess_ShapeKey(SSMTNode_PostProcess_Base):
 
         print(f"使用着色器模板: {self._get_shader_template_name()}")
 
-        self._create_cumulative_backup(target_ini_file, mod_export_path)
+        ini_document = ini_context.get_first_document()
+        target_ini_file = ini_document.ini_file_path
 
         try:
-            sections, slider_panel_content = self._read_ini_to_ordered_dict(target_ini_file)
+            sections = ini_document.sections
             slot_to_name_to_objects, unique_hashes, hash_to_objects, all_objects = self._parse_classification_text_final(classification_text_obj.as_string())
             
             if not slot_to_name_to_objects:
@@ -846,7 +802,8 @@ class SSMTNode_PostProcess_ShapeKey(SSMTNode_PostProcess_Base):
                         sections[f"[{res_name}]"].insert(0, f"[{res_name}_0]")
 
             sections.update(compute_blocks_to_add)
-            self._write_ordered_dict_to_ini(sections, target_ini_file, slider_panel_content)
+            if own_context:
+                ini_context.flush()
 
             mode_str = f"紧凑:{'是' if use_packed else '否'}, 增量(仅位置):{'是' if use_delta else '否'}"
             print(f"形态键配置({mode_str})已生成到 {os.path.basename(target_ini_file)}")
@@ -1,11 +1,10 @@
 import bpy
 import os
-import glob
 import re
 import shutil
-from collections import OrderedDict
 
 from .blueprint_node_postprocess_base import SSMTNode_PostProcess_Base
+from .blueprint_postprocess_ini import PostProcessIniContext
 
 
 class SSMTNode_PostProcess_SliderPanel(SSMTNode_PostProcess_Base):
@@ -23,35 +22,27 @@ class SSMTNode_PostProcess_SliderPanel(SSMTNode_PostProcess_Base):
     def draw_buttons(self, context, layout):
         layout.prop(self, "create_cumulative_backup")
 
-    def execute_postprocess(self, mod_export_path):
+    def execute_postprocess(self, mod_export_path, ini_context=None):
         print(f"滑块面板后处理节点开始执行，Mod导出路径: {mod_export_path}")
 
-        ini_files = glob.glob(os.path.join(mod_export_path, "*.ini"))
-        if not ini_files:
+        own_context = ini_context is None
+        if own_context:
+            ini_context = PostProcessIniContext(mod_export_path, create_backup=self.create_cumulative_backup)
+
+        if not ini_context.get_ini_file_paths():
             print("路径中未找到任何.ini文件")
             return
 
-        target_ini_file = ini_files[0]
-
         try:
-            with open(target_ini_file, 'r', encoding='utf-8') as f:
-                if "; --- AUTO-APPENDED SLIDER CONTROL PANEL ---" in f.read():
-                    print("滑块面板配置已存在于文件中。请手动删除后再生成。")
-                    return
+            ini_document = ini_context.get_first_document()
+            target_ini_file = ini_document.ini_file_path
+            if ini_document.contains_text("; --- AUTO-APPENDED SLIDER CONTROL PANEL ---"):
+                print("滑块面板配置已存在于文件中。请手动删除后再生成。")
+                return
         except Exception as e:
             print(f"读取目标INI文件以进行检查时出错: {e}")
             return
 
-        try:
-            with open(target_ini_file, 'r', encoding='utf-8') as f:
-                original_content = f.read()
-
-            if self.create_cumulative_backup:
-                self._create_cumulative_backup(target_ini_file, mod_export_path)
-        except Exception as e:
-            print(f"创建备份时出错: {e}")
-            return
-
         try:
             addon_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
             asset_subdir_name = "Toolset"
@@ -84,7 +75,7 @@ class SSMTNode_PostProcess_SliderPanel(SSMTNode_PostProcess_Base):
             print(f"准备和复制资源文件时出错: {e}")
             return
 
-        sections = self._read_ini_to_ordered_dict(target_ini_file)
+        sections = ini_document.sections
         if not sections:
             print(f"无法读取或解析INI文件: {target_ini_file}")
             return
@@ -363,12 +354,15 @@ class SSMTNode_PostProcess_SliderPanel(SSMTNode_PostProcess_Base):
         content.extend(shader_def)
 
         try:
-            with open(target_ini_file, "a", encoding='utf-8') as f_out:
-                f_out.write("\n\n")
-                f_out.write("; ==============================================================================\n")
-                f_out.write("; --- AUTO-APPENDED SLIDER CONTROL PANEL ---\n")
-                f_out.write("; ==============================================================================\n\n")
-                f_out.write("\n".join(content))
+            ini_document.append_text(
+                "\n\n"
+                "; ==============================================================================\n"
+                "; --- AUTO-APPENDED SLIDER CONTROL PANEL ---\n"
+                "; ==============================================================================\n\n"
+                + "\n".join(content)
+            )
+            if own_context:
+                ini_context.flush()
 
             print(f"滑块控制面板配置已追加到: {os.path.basename(target_ini_file)}")
             print(f"共生成 {num_sliders} 个滑块")
@@ -376,23 +370,6 @@ class SSMTNode_PostProcess_SliderPanel(SSMTNode_PostProcess_Base):
             print(f"追加滑块控制面板配置到文件时失败: {e}")
             return
 
-    def _read_ini_to_ordered_dict(self, ini_file_path):
-        """读取INI文件并返回有序字典"""
-        sections = OrderedDict()
-        current_section = None
-        try:
-            with open(ini_file_path, 'r', encoding='utf-8') as f:
-                for line in f:
-                    stripped_line = line.strip()
-                    if stripped_line.startswith('[') and stripped_line.endswith(']') and len(stripped_line) > 2:
-                        current_section = stripped_line
-                        sections[current_section] = []
-                    elif current_section is not None:
-                        sections[current_section].append(line.rstrip())
-        except FileNotFoundError:
-            return None
-        return sections
-
 
 classes = (
     SSMTNode_PostProcess_SliderPanel,
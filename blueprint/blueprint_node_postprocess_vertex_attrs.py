@@ -131,7 +131,7 @@ class SSMTNode_PostProcess_VertexAttrs(SSMTNode_PostProcess_Base):
         
         return (total_bytes, total_floats, attributes)
 
-    def execute_postprocess(self, mod_export_path):
+    def execute_postprocess(self, mod_export_path, ini_context=None):
         """顶点属性定义节点不执行任何操作，只是提供配置信息"""
         print(f"顶点属性定义节点已配置，Mod导出路径: {mod_export_path}")
 
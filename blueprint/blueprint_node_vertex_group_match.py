@@ -5,87 +5,130 @@
 """
 import bpy
 import bmesh
+import os
 import re
 import time
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from bpy.types import PropertyGroup
 from mathutils import Vector, kdtree
 from typing import Dict, List, Tuple, Optional
 
+try:
+    from scipy.spatial import cKDTree
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
 from .blueprint_node_base import SSMTNodeBase
+from ..utils.vertexgroup_utils import VertexGroupUtils
 
 _keymaps = []
 
 
 class VertexGroupMatcherOptimized:
-    """优化版顶点组匹配器：结合 KD-Tree 预筛选和 Chamfer 距离精确匹配"""
+    """
+    优化版顶点组匹配器：结合 KD-Tree 预筛选和 Chamfer 距离精确匹配
+
+    - 顶点组权重一次性读取为稀疏的 (顶点, 顶点组, 权重) 表，按顶点组排序后切分出每个顶点组的点云
+    - Chamfer 距离的最近点查询使用每个顶点组各自的空间索引（有 scipy 时为 cKDTree，否则分块暴力计算）
+    - 所有候选对的 Chamfer 距离在线程池中并行计算
+    """
     
-    def __init__(self, candidates_count: int = 3, chunk_size: int = 256):
+    def __init__(self, candidates_count: int = 3, chunk_size: int = 256, max_workers: Optional[int] = None):
         self.candidates_count = candidates_count
         self.chunk_size = chunk_size
+        self.max_workers = max_workers or min(8, os.cpu_count() or 1)
+
+    @staticmethod
+    def get_world_positions(obj) -> np.ndarray:
+        """用 foreach_get 读取物体所有顶点的局部坐标并变换到世界空间"""
+        vertex_count = len(obj.data.vertices)
+        co = np.empty(vertex_count * 3, dtype=np.float32)
+        obj.data.vertices.foreach_get("co", co)
+        matrix = np.array(obj.matrix_world, dtype=np.float64)
+        return (co.reshape(vertex_count, 3) @ matrix[:3, :3].T + matrix[:3, 3]).astype(np.float32)
+
+    @staticmethod
+    def get_vertex_group_weight_table(obj) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        返回权重大于0的 (顶点索引, 顶点组索引, 权重) 稀疏表，按顶点索引升序
+        顶点组索引超出物体顶点组数量的条目会被忽略
+        """
+        v_idx_arr, g_arr, w_arr = VertexGroupUtils.get_vertex_group_weight_table(obj.data)
+        valid = g_arr < len(obj.vertex_groups)
+        return v_idx_arr[valid], g_arr[valid], w_arr[valid]
     
     def get_vertex_positions(self, obj, use_shape_key: bool = False, context=None) -> np.ndarray:
         """获取物体所有顶点的世界坐标"""
         if use_shape_key and context:
             depsgraph = context.evaluated_depsgraph_get()
-            eval_obj = obj.evaluated_get(depsgraph)
-            positions = np.array([
-                (eval_obj.matrix_world @ v.co)[:]
-                for v in eval_obj.data.vertices
-            ], dtype=np.float32)
-        else:
-            positions = np.array([
-                (obj.matrix_world @ v.co)[:]
-                for v in obj.data.vertices
-            ], dtype=np.float32)
-        return positions
+            return self.get_world_positions(obj.evaluated_get(depsgraph))
+        return self.get_world_positions(obj)
     
     def get_vg_point_clouds(self, obj, positions: np.ndarray) -> Dict[str, np.ndarray]:
         """获取每个顶点组影响的所有顶点点云"""
-        vg_points = {}
-        vg_weights = {}
-        
-        for vg in obj.vertex_groups:
-            vg_points[vg.name] = []
-            vg_weights[vg.name] = []
-        
-        for vert_idx, vert in enumerate(obj.data.vertices):
-            for vgroup in vert.groups:
-                try:
-                    vg = obj.vertex_groups[vgroup.group]
-                    weight = vgroup.weight
-                    if weight > 0:
-                        vg_points[vg.name].append(positions[vert_idx])
-                        vg_weights[vg.name].append(weight)
-                except (IndexError, RuntimeError):
-                    continue
-        
+        v_idx_arr, g_arr, w_arr = self.get_vertex_group_weight_table(obj)
+        # 使用形态键时positions来自求值后的网格，顶点数可能比原始网格少（例如精简修改器），跳过超出范围的顶点
+        valid = v_idx_arr < len(positions)
+        v_idx_arr, g_arr, w_arr = v_idx_arr[valid], g_arr[valid], w_arr[valid]
+
+        # 按顶点组稳定排序，组内保持顶点顺序，然后按组切分
+        order = np.argsort(g_arr, kind='stable')
+        sorted_groups = g_arr[order]
+        group_indices, group_starts = np.unique(sorted_groups, return_index=True)
+        vertex_splits = np.split(v_idx_arr[order], group_starts[1:])
+        weight_splits = np.split(w_arr[order], group_starts[1:])
+        group_split_dict = {
+            int(group_index): (vertex_indices, weights)
+            for group_index, vertex_indices, weights in zip(group_indices, vertex_splits, weight_splits)
+        }
+
         result = {}
-        for name, points in vg_points.items():
-            if points:
-                result[name] = {
-                    'points': np.array(points, dtype=np.float32),
-                    'weights': np.array(vg_weights[name], dtype=np.float32),
-                    'centroid': np.mean(points, axis=0)
-                }
+        for vg in obj.vertex_groups:
+            split = group_split_dict.get(vg.index, None)
+            if split is None:
+                continue
+            vertex_indices, weights = split
+            points = positions[vertex_indices].astype(np.float32)
+            result[vg.name] = {
+                'points': points,
+                'weights': weights.astype(np.float32),
+                'centroid': np.mean(points, axis=0)
+            }
         return result
+
+    def build_spatial_index(self, points: np.ndarray):
+        """为点云构建最近点查询用的空间索引，没有 scipy 时直接返回点云本身"""
+        if SCIPY_AVAILABLE:
+            return cKDTree(points)
+        return points
+
+    def min_distances(self, points: np.ndarray, spatial_index) -> np.ndarray:
+        """points 中每个点到空间索引中最近点的距离"""
+        if SCIPY_AVAILABLE:
+            distances, _ = spatial_index.query(points, k=1)
+            return distances
+
+        chunks = []
+        for start in range(0, len(points), self.chunk_size):
+            end = min(start + self.chunk_size, len(points))
+            diff = points[start:end, None, :] - spatial_index[None, :, :]
+            chunks.append(np.min(np.linalg.norm(diff, axis=2), axis=1))
+        return np.concatenate(chunks)
     
-    def calculate_chamfer_distance(self, points_a: np.ndarray, points_b: np.ndarray) -> float:
-        """计算双向 Chamfer 距离（分块计算避免内存溢出）"""
-        def min_distances(pa, pb):
-            chunks = []
-            for start in range(0, len(pa), self.chunk_size):
-                end = min(start + self.chunk_size, len(pa))
-                diff = pa[start:end, None, :] - pb[None, :, :]
-                dist = np.min(np.linalg.norm(diff, axis=2), axis=1)
-                chunks.append(dist)
-            return np.concatenate(chunks)
-        
+    def calculate_chamfer_distance(self, points_a: np.ndarray, points_b: np.ndarray, index_a=None, index_b=None) -> float:
+        """计算双向 Chamfer 距离，可以传入预先构建好的空间索引复用"""
         if len(points_a) == 0 or len(points_b) == 0:
             return float('inf')
+
+        if index_a is None:
+            index_a = self.build_spatial_index(points_a)
+        if index_b is None:
+            index_b = self.build_spatial_index(points_b)
         
-        dist_ab = min_distances(points_a, points_b)
-        dist_ba = min_distances(points_b, points_a)
+        dist_ab = self.min_distances(points_a, index_b)
+        dist_ba = self.min_distances(points_b, index_a)
         
         return float(np.mean(dist_ab) + np.mean(dist_ba))
     
@@ -115,27 +158,47 @@ class VertexGroupMatcherOptimized:
             Dict[str, Tuple[str, float]]: {源顶点组名: (目标顶点组名, Chamfer距离)}
         """
         kd_tree, target_names = self.build_kdtree(target_vg)
-        mapping = {}
-        
+
+        # (1) 用质心 KD-Tree 为每个源顶点组预筛选候选目标顶点组
+        source_candidates: Dict[str, List[str]] = {}
         for src_name, src_data in source_vg.items():
-            src_centroid = Vector(src_data['centroid'])
-            src_points = src_data['points']
-            
-            found = kd_tree.find_range(src_centroid, threshold * 10)
-            
+            found = kd_tree.find_range(Vector(src_data['centroid']), threshold * 10)
             if not found:
                 continue
-            
             candidates = sorted(found, key=lambda x: x[2])[:self.candidates_count]
-            
+            source_candidates[src_name] = [target_names[idx] for _, idx, _ in candidates]
+
+        # (2) 每个参与计算的顶点组只构建一次空间索引
+        candidate_pairs = list(dict.fromkeys(
+            (src_name, tgt_name)
+            for src_name, tgt_names in source_candidates.items()
+            for tgt_name in tgt_names
+        ))
+        source_indexes = {name: self.build_spatial_index(source_vg[name]['points']) for name in source_candidates}
+        target_indexes = {
+            name: self.build_spatial_index(target_vg[name]['points'])
+            for name in dict.fromkeys(tgt_name for _, tgt_name in candidate_pairs)
+        }
+
+        # (3) 所有候选对并行计算 Chamfer 距离，最近点查询和numpy运算都会释放GIL
+        def compute_pair(pair: Tuple[str, str]) -> float:
+            src_name, tgt_name = pair
+            return self.calculate_chamfer_distance(
+                source_vg[src_name]['points'], target_vg[tgt_name]['points'],
+                source_indexes[src_name], target_indexes[tgt_name]
+            )
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pair_distances = dict(zip(candidate_pairs, executor.map(compute_pair, candidate_pairs)))
+
+        # (4) 按候选顺序选出距离最小并且低于阈值的目标顶点组
+        mapping = {}
+        for src_name, tgt_names in source_candidates.items():
             best_match = None
             best_distance = float('inf')
             
-            for _, idx, _ in candidates:
-                tgt_name = target_names[idx]
-                tgt_points = target_vg[tgt_name]['points']
-                
-                chamfer_dist = self.calculate_chamfer_distance(src_points, tgt_points)
+            for tgt_name in tgt_names:
+                chamfer_dist = pair_distances[(src_name, tgt_name)]
                 
                 if chamfer_dist < best_distance and chamfer_dist < threshold:
                     best_distance = chamfer_dist
@@ -306,7 +369,7 @@ class SSMTNode_VertexGroupMatch(SSMTNodeBase):
         box.label(text="快速权重: Alt+W")
 
     def get_deformed_vertices(self, context, obj):
-        """获取经过骨骼和形态键变换后的顶点世界坐标"""
+        """获取经过骨骼和形态键变换后的顶点世界坐标，返回 (顶点数, 3) 的数组"""
         if not obj or obj.type != 'MESH':
             return None
         
@@ -316,44 +379,40 @@ class SSMTNode_VertexGroupMatch(SSMTNodeBase):
         if not eval_obj or not eval_obj.data:
             return None
         
-        vertices = []
-        for vert in eval_obj.data.vertices:
-            world_pos = eval_obj.matrix_world @ vert.co
-            vertices.append(world_pos)
-        
-        return vertices
+        return VertexGroupMatcherOptimized.get_world_positions(eval_obj)
 
     def get_vertex_group_centers(self, context, obj, deformed_vertices=None):
-        """获取物体所有顶点组的中心位置"""
+        """获取物体所有顶点组的中心位置（按权重加权平均），同名的顶点组合并计算"""
         if not obj or obj.type != 'MESH':
             return {}
 
-        mesh = obj.data
-        group_centers = {}
-        group_counts = {}
+        positions = deformed_vertices if deformed_vertices is not None else VertexGroupMatcherOptimized.get_world_positions(obj)
+        v_idx_arr, g_arr, w_arr = VertexGroupMatcherOptimized.get_vertex_group_weight_table(obj)
+        valid = v_idx_arr < len(positions)
+        v_idx_arr, g_arr, w_arr = v_idx_arr[valid], g_arr[valid], w_arr[valid]
 
+        # 顶点组索引 -> 原始名称的编号，名称按顶点组顺序首次出现的顺序排列
+        name_index_dict = {}
+        group_name_indices = np.empty(len(obj.vertex_groups), dtype=np.int64)
         for vg in obj.vertex_groups:
             original_name, _ = self.parse_vg_name(vg.name)
-            group_centers[original_name] = Vector((0, 0, 0))
-            group_counts[original_name] = 0
-
-        for i, vert in enumerate(mesh.vertices):
-            global_pos = deformed_vertices[i] if deformed_vertices else obj.matrix_world @ vert.co
-            for vgroup in vert.groups:
-                try:
-                    vg = obj.vertex_groups[vgroup.group]
-                    original_vg_name, _ = self.parse_vg_name(vg.name)
-                    weight = vgroup.weight
-                    if weight > 0 and original_vg_name in group_centers:
-                        group_centers[original_vg_name] += global_pos * weight
-                        group_counts[original_vg_name] += weight
-                except (IndexError, RuntimeError):
-                    continue
+            group_name_indices[vg.index] = name_index_dict.setdefault(original_name, len(name_index_dict))
+
+        name_count = len(name_index_dict)
+        entry_name_indices = group_name_indices[g_arr]
+        weights = w_arr.astype(np.float64)
+        weighted_positions = positions[v_idx_arr].astype(np.float64) * weights[:, None]
+
+        weight_sums = np.bincount(entry_name_indices, weights=weights, minlength=name_count)
+        center_sums = np.stack([
+            np.bincount(entry_name_indices, weights=weighted_positions[:, axis], minlength=name_count)
+            for axis in range(3)
+        ], axis=1)
 
         result = {}
-        for name, center in group_centers.items():
-            if group_counts[name] > 0:
-                result[name] = {'center': center / group_counts[name]}
+        for name, name_index in name_index_dict.items():
+            if weight_sums[name_index] > 0:
+                result[name] = {'center': Vector(center_sums[name_index] / weight_sums[name_index])}
         return result
 
     def parse_vg_name(self, name):
@@ -527,8 +586,9 @@ class SSMTNode_VertexGroupMatch(SSMTNodeBase):
                 chunk_size=256
             )
             
-            source_positions = matcher.get_vertex_positions(source_obj, self.use_shape_key, context)
-            target_positions = matcher.get_vertex_positions(target_obj, self.use_shape_key, context)
+            # 启用形态键时前面已经取过变换后的顶点坐标，直接复用
+            source_positions = source_deformed_data if source_deformed_data is not None else matcher.get_vertex_positions(source_obj, self.use_shape_key, context)
+            target_positions = target_deformed_data if target_deformed_data is not None else matcher.get_vertex_positions(target_obj, self.use_shape_key, context)
             
             source_vg_data = matcher.get_vg_point_clouds(source_obj, source_positions)
             target_vg_data = matcher.get_vg_point_clouds(target_obj, target_positions)
@@ -0,0 +1,321 @@
+import os
+import glob
+import shutil
+import datetime
+from collections import OrderedDict
+
+
+class IniSectionLines(list):
+    '''
+    一个Section的所有行，任何修改都会把这个Section标记为dirty
+    '''
+
+    def __init__(self, lines=()):
+        super().__init__(lines)
+        self.dirty = False
+
+    def _mark_dirty(self):
+        self.dirty = True
+
+    def append(self, line):
+        self._mark_dirty()
+        super().append(line)
+
+    def extend(self, lines):
+        self._mark_dirty()
+        super().extend(lines)
+
+    def insert(self, index, line):
+        self._mark_dirty()
+        super().insert(index, line)
+
+    def remove(self, line):
+        self._mark_dirty()
+        super().remove(line)
+
+    def pop(self, *args):
+        self._mark_dirty()
+        return super().pop(*args)
+
+    def clear(self):
+        self._mark_dirty()
+        super().clear()
+
+    def sort(self, *args, **kwargs):
+        self._mark_dirty()
+        super().sort(*args, **kwargs)
+
+    def reverse(self):
+        self._mark_dirty()
+        super().reverse()
+
+    def __setitem__(self, index, value):
+        self._mark_dirty()
+        super().__setitem__(index, value)
+
+    def __delitem__(self, index):
+        self._mark_dirty()
+        super().__delitem__(index)
+
+    def __iadd__(self, lines):
+        self._mark_dirty()
+        return super().__iadd__(lines)
+
+
+class IniSectionDict(OrderedDict):
+    '''
+    Section名称 -> IniSectionLines
+    增删Section会记录为结构变化，赋值的列表会被包装成IniSectionLines并标记为dirty
+    '''
+
+    def __init__(self, *args, **kwargs):
+        self.structure_dirty = False
+        super().__init__(*args, **kwargs)
+
+    def __setitem__(self, key, value):
+        if isinstance(value, list):
+            if not isinstance(value, IniSectionLines):
+                value = IniSectionLines(value)
+            value.dirty = True
+        self.structure_dirty = True
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self.structure_dirty = True
+        super().__delitem__(key)
+
+    def pop(self, *args):
+        self.structure_dirty = True
+        return super().pop(*args)
+
+    def popitem(self, last=True):
+        self.structure_dirty = True
+        return super().popitem(last)
+
+    def move_to_end(self, key, last=True):
+        self.structure_dirty = True
+        super().move_to_end(key, last)
+
+    def clear(self):
+        self.structure_dirty = True
+        super().clear()
+
+    def update(self, *args, **kwargs):
+        for key, value in OrderedDict(*args, **kwargs).items():
+            self[key] = value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default if default is not None else []
+        return self[key]
+
+
+class IniDocument:
+    '''
+    一个INI文件的内存结构：Section之前的内容、按顺序排列的Section，以及滑块面板标记之后保持原样的追加内容
+
+    后处理节点直接修改sections，就像修改读取出来的OrderedDict一样，
+    所有节点执行完成后只在有修改时写回一次
+    '''
+
+    SLIDER_MARKER = "; --- AUTO-APPENDED SLIDER CONTROL PANEL ---"
+
+    def __init__(self, ini_file_path:str, text:str = ""):
+        self.ini_file_path = ini_file_path
+        self.preamble:list[str] = []
+        self.sections:IniSectionDict = IniSectionDict()
+        self.appended_content:str = ""
+        # 整体替换过内容（追加模块、重新解析）时为True
+        self.content_dirty = False
+        self._parse(text)
+
+    @classmethod
+    def from_file(cls, ini_file_path:str) -> 'IniDocument':
+        with open(ini_file_path, 'r', encoding='utf-8') as f:
+            return cls(ini_file_path, f.read())
+
+    @staticmethod
+    def is_section_header(stripped_line:str) -> bool:
+        return stripped_line.startswith('[') and stripped_line.endswith(']') and len(stripped_line) > 2
+
+    def _parse(self, text:str):
+        appended_content = ""
+        marker_pos = text.find(self.SLIDER_MARKER)
+        if marker_pos >= 0:
+            appended_content = text[marker_pos:]
+            text = text[:marker_pos]
+
+        preamble = []
+        sections = OrderedDict()
+        current_lines = preamble
+        for line in text.splitlines():
+            stripped_line = line.strip()
+            if self.is_section_header(stripped_line):
+                # 重复的Section合并到第一次出现的位置，不丢弃任何内容
+                current_lines = sections.setdefault(stripped_line, [])
+            else:
+                current_lines.append(line)
+
+        # 写出时每个Section后面都会补一个空行，这里去掉末尾的空行，避免每次读写空行越来越多
+        for lines in sections.values():
+            while lines and not lines[-1].strip():
+                lines.pop()
+
+        self.preamble = preamble
+        self.sections = IniSectionDict((name, IniSectionLines(lines)) for name, lines in sections.items())
+        self._clear_dirty_flags()
+        self.appended_content = appended_content
+
+    @property
+    def dirty_section_names(self) -> list[str]:
+        return [name for name, lines in self.sections.items() if getattr(lines, 'dirty', False)]
+
+    @property
+    def is_dirty(self) -> bool:
+        return self.content_dirty or self.sections.structure_dirty or len(self.dirty_section_names) > 0
+
+    def _needs_normalize(self) -> bool:
+        '''
+        节点可能会把以分号开头的注释当作Section名称，或者在行里插入新的Section头，
+        这种情况需要重新解析才能让后面的节点看到和读取文件时一样的结构
+        '''
+        for name, lines in self.sections.items():
+            if not self.is_section_header(name):
+                return True
+            if getattr(lines, 'dirty', False):
+                for line in lines:
+                    if self.is_section_header(line.strip()):
+                        return True
+        return False
+
+    def normalize(self):
+        if not self._needs_normalize():
+            return
+        self.set_text(self.to_text())
+
+    def to_text(self) -> str:
+        output_lines = list(self.preamble)
+        for section_name, lines in self.sections.items():
+            output_lines.append(section_name)
+            output_lines.extend(lines)
+            output_lines.append("")
+
+        text = "\n".join(output_lines) + "\n"
+        if self.appended_content:
+            text += "\n" + self.appended_content
+        return text
+
+    def set_text(self, text:str):
+        '''整体替换内容并重新解析'''
+        self._parse(text)
+        self.content_dirty = True
+
+    def append_text(self, text:str):
+        '''在文件末尾追加内容，效果和以追加模式写入文件后再读取一致'''
+        self.set_text(self.to_text() + text)
+
+    def contains_text(self, text:str) -> bool:
+        return text in self.to_text()
+
+    def save(self):
+        with open(self.ini_file_path, 'w', encoding='utf-8') as f:
+            f.write(self.to_text())
+
+        self.content_dirty = False
+        self._clear_dirty_flags()
+
+    def _clear_dirty_flags(self):
+        self.sections.structure_dirty = False
+        for lines in self.sections.values():
+            if isinstance(lines, IniSectionLines):
+                lines.dirty = False
+
+
+class PostProcessIniContext:
+    '''
+    后处理节点链共享的INI文档集合
+
+    由BlueprintExportHelper.execute_postprocess_nodes创建：每个INI文件只读取和解析一次，
+    所有节点执行完成后把有修改的文档写回一次，写回之前为每个文件创建一次备份
+    '''
+
+    def __init__(self, mod_export_path:str, create_backup:bool = True):
+        self.mod_export_path = mod_export_path
+        self.create_backup = create_backup
+        self._ini_file_paths:list[str] = None
+        self._documents:dict[str,IniDocument] = {}
+        self._checkpoint:dict[str,tuple] = {}
+
+    def get_ini_file_paths(self) -> list[str]:
+        if self._ini_file_paths is None:
+            self._ini_file_paths = glob.glob(os.path.join(self.mod_export_path, "*.ini"))
+        return self._ini_file_paths
+
+    def _create_backup(self, ini_file_path:str):
+        try:
+            if not os.path.exists(ini_file_path):
+                print(f"文件不存在，跳过备份: {ini_file_path}")
+                return
+
+            backup_dir = os.path.join(self.mod_export_path, "Backups")
+            os.makedirs(backup_dir, exist_ok=True)
+
+            base_filename = os.path.basename(ini_file_path)
+            timestamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+            backup_path = os.path.join(backup_dir, f"{base_filename}.{timestamp}.bak")
+
+            shutil.copy2(ini_file_path, backup_path)
+            print(f"已创建备份: {backup_path}")
+        except Exception as e:
+            print(f"创建备份失败: {e}")
+
+    def get_document(self, ini_file_path:str) -> IniDocument:
+        document = self._documents.get(ini_file_path, None)
+        if document is None:
+            document = IniDocument.from_file(ini_file_path)
+            self._documents[ini_file_path] = document
+        else:
+            document.normalize()
+        return document
+
+    def get_first_document(self) -> IniDocument:
+        '''和之前的 glob(...)[0] 一样，返回找到的第一个INI文件'''
+        ini_file_paths = self.get_ini_file_paths()
+        if not ini_file_paths:
+            return None
+        return self.get_document(ini_file_paths[0])
+
+    def get_documents(self) -> list[IniDocument]:
+        return [self.get_document(ini_file_path) for ini_file_path in self.get_ini_file_paths()]
+
+    def checkpoint(self):
+        '''记录当前所有文档的内容，节点执行出错时用rollback恢复，避免把执行了一半的修改写回文件'''
+        self._checkpoint = {
+            ini_file_path: (document.to_text(), document.is_dirty)
+            for ini_file_path, document in self._documents.items()
+        }
+
+    def rollback(self):
+        for ini_file_path in list(self._documents.keys()):
+            if ini_file_path not in self._checkpoint:
+                # 检查点之后才读取的文档还没有写回过，直接丢弃，下次访问时重新读取
+                del self._documents[ini_file_path]
+                continue
+            text, was_dirty = self._checkpoint[ini_file_path]
+            document = self._documents[ini_file_path]
+            document.set_text(text)
+            document.content_dirty = was_dirty
+
+    def flush(self):
+        '''把有修改的文档写回文件'''
+        for document in self._documents.values():
+            document.normalize()
+            if not document.is_dirty:
+                continue
+            try:
+                if self.create_backup:
+                    self._create_backup(document.ini_file_path)
+                document.save()
+                print(f"已写入INI文件: {os.path.basename(document.ini_file_path)}")
+            except Exception as e:
+                print(f"写入INI文件失败 {document.ini_file_path}: {e}")
@@ -19,8 +19,12 @@ from ..config.import_config import ImportConfig
 
 from ..blueprint.blueprint_model import BluePrintModel
 
+from ..blueprint.blueprint_export_helper import BlueprintExportHelper
+
 from ..helper.buffer_export_helper import BufferExportHelper
 
+from ..utils.export_manifest import ExportManifest, ExportInputHasher
+
 class DrawIBModel:
     '''
     这个代表了一个DrawIB的Mod导出模型
@@ -42,29 +46,14 @@ class DrawIBModel:
         self.import_config:ImportConfig = ImportConfig(draw_ib=self.draw_ib)
         self.d3d11GameType:D3D11GameType = self.import_config.d3d11GameType
 
-        '''
-        这里是要得到每个Component对应的obj_data_model列表
-        在这一步之前，需要对当前DrawIB的所有的obj_data_model填充ib和category_buf_dict属性
-        '''
-        self.draw_ib_ordered_obj_data_model_list:list[ObjDataModel] = branch_model.get_buffered_obj_data_model_list_by_draw_ib_and_game_type(draw_ib=draw_ib,d3d11_game_type=self.import_config.d3d11GameType)
+        # 用于写出IB时使用
+        self.PartName_IBResourceName_Dict = {}
+        self.PartName_IBBufferFileName_Dict = {}
+        self.combine_partname_ib_resource_and_filename_dict()
+
         self._component_model_list:list[ComponentModel] = []
         self.component_name_component_model_dict:dict[str,ComponentModel] = {}
-        for part_name in self.import_config.part_name_list:
-            print("part_name: " + part_name)
-            component_obj_data_model_list = []
-            for obj_data_model in self.draw_ib_ordered_obj_data_model_list:
-                if part_name == str(obj_data_model.component_count):
-                    component_obj_data_model_list.append(obj_data_model)
-                    # print(part_name + " 已赋值")
 
-            component_model = ComponentModel(component_name="Component " +part_name, final_ordered_draw_obj_model_list=component_obj_data_model_list)
-     
-            self._component_model_list.append(component_model)
-            self.component_name_component_model_dict[component_model.component_name] = component_model
-        
-        LOG.newline()
-
-        # (4) 根据之前解析集合架构的结果，读取obj对象内容到字典中
         self.componentname_ibbuf_dict:dict[str,list[int]] = {} # 每个Component都生成一个IndexBuffer文件，或者所有Component共用一个IB文件。
         self.__categoryname_bytelist_dict = {} # 每个Category都生成一个CategoryBuffer文件。
         self.draw_number:int = 0 # 每个DrawIB都有总的顶点数，对应CategoryBuffer里的顶点数。
@@ -74,22 +63,153 @@ class DrawIBModel:
         # 用于存储合并后的形态键数据
         self.shapekey_name_bytelist_dict:dict[str, numpy.ndarray] = {}
 
+        # (3) 增量导出：输入没有变化并且上次写出的文件完好时，直接复用已有的Buffer文件
+        # 复用时不会调用get_buffered_obj_data_model_list_by_draw_ib_and_game_type，跳过它的副作用是安全的：
+        # - 它给蓝图中共享的ObjDataModel填充ib、category_buffer_dict、shape_key_buffer_dict，
+        #   这些只在当前DrawIB组装Buffer时读取，复用时IB和形态键数据直接从已有文件读回
+        # - 它对物体做的normalize_all和旋转应用再还原只影响Buffer的内容，
+        #   输入哈希一致说明物体和上次导出前相同，上次写出的文件就是这次会得到的结果
+        # - 多文件导出节点会随导出次数切换物体，这种DrawIB在__get_draw_ib_obj_data_model_list中已经排除，不会复用
+        self.__export_manifest:ExportManifest = None
+        self.__input_hash:str = None
+        if not skip_buffer_export:
+            manifest_entry = self.__find_reusable_manifest_entry(branch_model)
+            if manifest_entry is not None:
+                print(f"[ExportManifest] 输入未变化，复用已有Buffer文件: {self.draw_ib}")
+                self.__restore_from_manifest_entry(branch_model, manifest_entry)
+                return
+
+        '''
+        这里是要得到每个Component对应的obj_data_model列表
+        在这一步之前，需要对当前DrawIB的所有的obj_data_model填充ib和category_buf_dict属性
+        '''
+        self.draw_ib_ordered_obj_data_model_list:list[ObjDataModel] = branch_model.get_buffered_obj_data_model_list_by_draw_ib_and_game_type(draw_ib=draw_ib,d3d11_game_type=self.import_config.d3d11GameType)
+        self.__build_component_model_list(self.draw_ib_ordered_obj_data_model_list)
+        
+        LOG.newline()
+
+        # (4) 根据之前解析集合架构的结果，读取obj对象内容到字典中
         # 读取和解析 buffer 数据（预导出模式也需要这些数据来生成正确的 INI）
         self.__read_component_ib_buf_dict()
         self.parse_categoryname_bytelist_dict()
 
         # (5) 导出Buffer文件，Export Index Buffer files, Category Buffer files. (And Export ShapeKey Buffer Files.(WWMI))
-        # 用于写出IB时使用
-        self.PartName_IBResourceName_Dict = {}
-        self.PartName_IBBufferFileName_Dict = {}
-        self.combine_partname_ib_resource_and_filename_dict()
-        
         # 只在非预导出模式下写出 Buffer 文件
         if not skip_buffer_export:
-            self.write_buffer_files()
+            written_filenames = self.write_buffer_files()
+            self.__record_manifest_entry(written_filenames)
         else:
             print(f"[PreviewExport] 跳过 Buffer 文件写入: {self.draw_ib}")
 
+    def __build_component_model_list(self, obj_data_model_list:list[ObjDataModel]):
+        for part_name in self.import_config.part_name_list:
+            print("part_name: " + part_name)
+            component_obj_data_model_list = []
+            for obj_data_model in obj_data_model_list:
+                if part_name == str(obj_data_model.component_count):
+                    component_obj_data_model_list.append(obj_data_model)
+                    # print(part_name + " 已赋值")
+
+            component_model = ComponentModel(component_name="Component " +part_name, final_ordered_draw_obj_model_list=component_obj_data_model_list)
+     
+            self._component_model_list.append(component_model)
+            self.component_name_component_model_dict[component_model.component_name] = component_model
+
+    def __get_draw_ib_obj_data_model_list(self, branch_model:BluePrintModel) -> list[ObjDataModel]:
+        '''
+        不计算Buffer，只取出蓝图中属于当前DrawIB的ObjDataModel
+        多文件导出节点的物体会随导出次数变化，返回None表示不能使用增量导出
+        '''
+        obj_data_model_list = []
+        for obj_model in branch_model.ordered_draw_obj_data_model_list:
+            if obj_model.draw_ib != self.draw_ib:
+                continue
+            if getattr(obj_model, 'is_multifile_export', False):
+                return None
+            obj_data_model_list.append(obj_model)
+        return obj_data_model_list
+
+    def __find_reusable_manifest_entry(self, branch_model:BluePrintModel):
+        obj_data_model_list = self.__get_draw_ib_obj_data_model_list(branch_model)
+        if obj_data_model_list is None:
+            return None
+
+        TimerUtils.Start("ExportManifest " + self.draw_ib)
+        # 形态键节点的配置决定了要输出哪些形态键Buffer
+        node_parameters = {
+            "shapekey_names": sorted(BlueprintExportHelper.get_current_shapekeyname_mkey_dict().keys()),
+        }
+        self.__input_hash = ExportInputHasher.calculate_draw_ib_input_hash(
+            draw_ib=self.draw_ib,
+            obj_data_model_list=obj_data_model_list,
+            d3d11_game_type=self.d3d11GameType,
+            part_name_list=self.import_config.part_name_list,
+            node_parameters=node_parameters
+        )
+        TimerUtils.End("ExportManifest " + self.draw_ib)
+
+        if self.__input_hash is None:
+            return None
+
+        self.__export_manifest = ExportManifest(GlobalConfig.path_generatemod_buffer_folder())
+        return self.__export_manifest.get_valid_entry(self.draw_ib, self.__input_hash)
+
+    def __restore_from_manifest_entry(self, branch_model:BluePrintModel, manifest_entry:dict):
+        '''
+        从清单记录中恢复生成ini所需的数据，IB和形态键Buffer直接从已有文件读回
+        '''
+        state = manifest_entry["state"]
+        buf_output_folder = GlobalConfig.path_generatemod_buffer_folder()
+
+        self.draw_ib_ordered_obj_data_model_list = [copy.deepcopy(obj_model) for obj_model in self.__get_draw_ib_obj_data_model_list(branch_model)]
+        self.__build_component_model_list(self.draw_ib_ordered_obj_data_model_list)
+
+        for obj_name, drawindexed_dict in state["drawindexed"].items():
+            drawindexed_obj = M_DrawIndexed()
+            drawindexed_obj.__dict__.update(drawindexed_dict)
+            self.__obj_name_drawindexed_dict[obj_name] = drawindexed_obj
+
+        for component_model in self._component_model_list:
+            final_ordered_draw_obj_model_list = []
+            for obj_model in component_model.final_ordered_draw_obj_model_list:
+                drawindexed_obj = self.__obj_name_drawindexed_dict.get(obj_model.obj_name, None)
+                if drawindexed_obj is None:
+                    continue
+                obj_model.drawindexed_obj = drawindexed_obj
+                final_ordered_draw_obj_model_list.append(obj_model)
+            component_model.final_ordered_draw_obj_model_list = final_ordered_draw_obj_model_list
+            self.component_name_component_model_dict[component_model.component_name] = copy.deepcopy(component_model)
+
+        for component_name, ib_filename in state["ib_files"].items():
+            self.componentname_ibbuf_dict[component_name] = numpy.fromfile(os.path.join(buf_output_folder, ib_filename), dtype=numpy.uint32)
+
+        for sk_name, sk_filename in state["shapekey_files"].items():
+            self.shapekey_name_bytelist_dict[sk_name] = numpy.fromfile(os.path.join(buf_output_folder, sk_filename), dtype=numpy.uint8)
+        if self.shapekey_name_bytelist_dict:
+            self.copy_shape_hlsl()
+
+        self.draw_number = state["draw_number"]
+        self.total_index_count = state["total_index_count"]
+
+    def __record_manifest_entry(self, written_filenames:list[str]):
+        if self.__export_manifest is None or self.__input_hash is None:
+            return
+
+        ib_files = {}
+        for partname in self.import_config.part_name_list:
+            component_name = "Component " + partname
+            if component_name in self.componentname_ibbuf_dict:
+                ib_files[component_name] = self.PartName_IBBufferFileName_Dict[partname]
+
+        state = {
+            "drawindexed": {obj_name: dict(drawindexed_obj.__dict__) for obj_name, drawindexed_obj in self.__obj_name_drawindexed_dict.items()},
+            "ib_files": ib_files,
+            "shapekey_files": {sk_name: self.draw_ib + "-Position." + sk_name + ".buf" for sk_name in self.shapekey_name_bytelist_dict.keys()},
+            "draw_number": self.draw_number,
+            "total_index_count": self.total_index_count,
+        }
+        self.__export_manifest.record(self.draw_ib, self.__input_hash, written_filenames, state)
+
 
     def parse_categoryname_bytelist_dict(self):
         # 1. 收集所有对象和唯一的形态键名称
@@ -115,16 +235,9 @@ class DrawIBModel:
         # ShapeKey 容器
         shapekey_data_lists = {name: [] for name in unique_shape_key_names}
 
-        # Pre-calculate Position stride/offset for slicing ShapeKey data
-        pos_cat_offset = 0
-        pos_cat_stride = 0
-        target_cat = "Position"
-        for cat_name in self.d3d11GameType.OrderedCategoryNameList:
-             stride = self.d3d11GameType.CategoryStrideDict.get(cat_name, 0)
-             if cat_name == target_cat:
-                 pos_cat_stride = stride
-                 break
-             pos_cat_offset += stride
+        # Position stride/offset for slicing ShapeKey data, precomputed by the game type
+        pos_cat_offset = self.d3d11GameType.CategoryByteOffsetDict.get("Position", 0)
+        pos_cat_stride = self.d3d11GameType.CategoryStrideDict.get("Position", 0)
 
         # 3. 遍历对象填充容器
         for obj_model in all_ordered_objects:
@@ -309,11 +422,12 @@ class DrawIBModel:
             self.PartName_IBResourceName_Dict[partname] = ib_resource_name
             self.PartName_IBBufferFileName_Dict[partname] = ib_buf_filename
 
-    def write_buffer_files(self):
+    def write_buffer_files(self) -> list[str]:
         '''
-        导出当前Mod的所有Buffer文件
+        导出当前Mod的所有Buffer文件，返回写出的文件名列表
         '''
         buf_output_folder = GlobalConfig.path_generatemod_buffer_folder()
+        written_filenames = []
         # print("Write Buffer Files::")
         # Export Index Buffer files.
         for partname in self.import_config.part_name_list:
@@ -325,36 +439,23 @@ class DrawIBModel:
             else:
                 buf_filename = self.PartName_IBBufferFileName_Dict[partname]
                 BufferExportHelper.write_buf_ib_r32_uint(ib_buf,buf_filename)
+                written_filenames.append(buf_filename)
                 
         # print("Export Category Buffers::")
         # Export category buffer files.
         for category_name, category_buf in self.__categoryname_bytelist_dict.items():
-            buf_path = buf_output_folder + self.draw_ib + "-" + category_name + ".buf"
+            buf_filename = self.draw_ib + "-" + category_name + ".buf"
+            buf_path = buf_output_folder + buf_filename
             # print("write: " + buf_path)
             # print(type(category_buf[0]))
              # 将 list 转换为 numpy 数组
             # category_array = numpy.array(category_buf, dtype=numpy.uint8)
-            with open(buf_path, 'wb') as ibf:
-                category_buf.tofile(ibf)
+            BufferExportHelper.write_buffer(category_buf, buf_path)
+            written_filenames.append(buf_filename)
 
         # Export ShapeKey buffer files.
         if self.shapekey_name_bytelist_dict:
-            # 需要把Shape.hlsl复制到Mod文件夹下面的res文件夹下面
-            res_path = os.path.join(GlobalConfig.path_generate_mod_folder(),"res\\")
-
-            if not os.path.exists(res_path):
-                os.makedirs(res_path)
-
-            # 获取当前文件(draw_ib_model.py)所在目录下的res文件夹
-            current_res_path = os.path.join(os.path.dirname(__file__), "res")
-            shape_hlsl_path = os.path.join(current_res_path, "Shapes.hlsl")
-            
-            if os.path.exists(shape_hlsl_path):
-                if not os.path.exists(res_path):
-                    os.makedirs(res_path)
-                
-                shutil.copy(shape_hlsl_path, res_path)
-                print(f"Copied Shape.hlsl to {res_path}")
+            self.copy_shape_hlsl()
 
             print("Export ShapeKey Buffers::")
             for sk_name, sk_buf in self.shapekey_name_bytelist_dict.items():
@@ -364,10 +465,33 @@ class DrawIBModel:
                 # 通常格式: [Hash]-Position.[SKName].buf
                 # sk_name 直接来自蓝图节点配置的形态键名称
                 
-                buf_path = buf_output_folder + self.draw_ib + "-" + sk_filename
+                buf_filename = self.draw_ib + "-" + sk_filename
+                buf_path = buf_output_folder + buf_filename
                 # print("write sk: " + buf_path)
-                with open(buf_path, 'wb') as skf:
-                    sk_buf.tofile(skf)
+                BufferExportHelper.write_buffer(sk_buf, buf_path)
+                written_filenames.append(buf_filename)
+
+        return written_filenames
+
+    def copy_shape_hlsl(self):
+        '''
+        需要把Shape.hlsl复制到Mod文件夹下面的res文件夹下面
+        '''
+        res_path = os.path.join(GlobalConfig.path_generate_mod_folder(),"res\\")
+
+        if not os.path.exists(res_path):
+            os.makedirs(res_path)
+
+        # 获取当前文件(draw_ib_model.py)所在目录下的res文件夹
+        current_res_path = os.path.join(os.path.dirname(__file__), "res")
+        shape_hlsl_path = os.path.join(current_res_path, "Shapes.hlsl")
+        
+        if os.path.exists(shape_hlsl_path):
+            if not os.path.exists(res_path):
+                os.makedirs(res_path)
+            
+            shutil.copy(shape_hlsl_path, res_path)
+            print(f"Copied Shape.hlsl to {res_path}")
 
 
 
@@ -164,8 +164,7 @@ class DrawIBModelWWMI:
         # 直接遍历 OrderedCategoryNameList 进行写出，保持了顺序和筛选逻辑
         for category_name,category_buf in self.obj_buffer_model_wwmi.category_buffer_dict.items():
             buf_path = GlobalConfig.path_generatemod_buffer_folder() + self.draw_ib + "-" + category_name + ".buf"
-            with open(buf_path, 'wb') as ibf:
-                category_buf.tofile(ibf)
+            BufferExportHelper.write_buffer(category_buf, buf_path)
 
         # 写出ShapeKey相关Buffer文件
         if self.obj_buffer_model_wwmi.export_shapekey:
@@ -262,6 +261,8 @@ class DrawIBModelWWMI:
         print("准备临时对象::")
 
         self.component_real_vg_count_dict = {}
+        # 合并后每个Component物体的稀疏权重表，计算VGCount和BlendRemap时共用，只读取一次
+        component_vg_weight_table_dict:dict[str,tuple] = {}
 
 
         # 3.准备临时对象
@@ -355,8 +356,6 @@ class DrawIBModelWWMI:
 
             # 鸣潮导出时整体预处理，比直接操作Buffer文件中的内容方便且规范
             if GlobalConfig.logic_name == LogicName.WWMI or GlobalConfig.logic_name == LogicName.WuWa:
-                ObjUtils.select_obj(component_obj)
-
                 # 鸣潮需要把旋转角度清零
                 component_obj.rotation_euler[0] = 0
                 component_obj.rotation_euler[1] = 0
@@ -366,7 +365,7 @@ class DrawIBModelWWMI:
                 component_obj.scale = (100,100,100)
                 
                 # 应用旋转和缩放
-                bpy.ops.object.transform_apply(location=False, rotation=True, scale=True)
+                ObjUtils.apply_rotation_scale(component_obj)
 
             # 如果导入时勾选了忽略空顶点组
             # 那么导出时就得按顺序排列并且添加回来那些空的顶点组以确保不会出问题
@@ -381,12 +380,9 @@ class DrawIBModelWWMI:
 
             # Nico: 修复VGCount不准确的问题
             # 此时已经合并了所有的obj，所以可以直接计算真实的VGCount
-            used_vg_indices = set()
-            for v in component_obj.data.vertices:
-                for g in v.groups:
-                    if g.weight > 0.0:
-                        used_vg_indices.add(g.group)
-            real_vg_count = len(used_vg_indices)
+            vg_weight_table = VertexGroupUtils.get_vertex_group_weight_table(component_obj.data)
+            component_vg_weight_table_dict[component_obj.name] = vg_weight_table
+            real_vg_count = int(numpy.count_nonzero(numpy.bincount(vg_weight_table[1])))
             self.component_real_vg_count_dict[component_index] = real_vg_count
             print(f"Calculated real vg_count for Component {component_index}: {real_vg_count}")
             
@@ -395,15 +391,7 @@ class DrawIBModelWWMI:
             drawib_index_count += component.index_count
 
         # 获取到 component_obj_list 后，导出 BlendRemap forward/reverse
-        self.export_blendremap_forward_and_reverse(component_obj_list)
-
-        # 确保选中第一个，否则join_objects会报错
-        if drawib_merged_object:
-            bpy.ops.object.select_all(action='DESELECT')
-            target_active = drawib_merged_object[0]
-            target_active.select_set(True)
-            bpy.context.view_layer.objects.active = target_active
-
+        self.export_blendremap_forward_and_reverse(component_obj_list, component_vg_weight_table_dict)
 
         ObjUtils.join_objects(bpy.context, drawib_merged_object)
         
@@ -444,7 +432,28 @@ class DrawIBModelWWMI:
 
 
 
-    def export_blendremap_forward_and_reverse(self, components_objs):
+    @staticmethod
+    def get_used_vg_ids(vg_weight_table:tuple, num_vgs:int) -> numpy.ndarray:
+        '''
+        每个顶点按权重从大到小取前 num_vgs 个顶点组，返回这些顶点组编号去重后的升序数组
+        vg_weight_table 是 VertexGroupUtils.get_vertex_group_weight_table 返回的稀疏权重表，已经排除了权重为0的条目
+        '''
+        v_idx_arr, g_arr, w_arr = vg_weight_table
+        if len(v_idx_arr) == 0:
+            return numpy.empty(0, dtype=numpy.uint16)
+
+        # 按顶点升序、权重降序排列，权重相同时保持 v.groups 的原始顺序
+        order = numpy.lexsort((-w_arr, v_idx_arr))
+        v_sorted = v_idx_arr[order]
+
+        # 每个条目在所属顶点中的名次
+        group_starts = numpy.flatnonzero(numpy.r_[True, v_sorted[1:] != v_sorted[:-1]])
+        group_sizes = numpy.diff(numpy.r_[group_starts, len(v_sorted)])
+        rank = numpy.arange(len(v_sorted)) - numpy.repeat(group_starts, group_sizes)
+
+        return numpy.unique(g_arr[order][rank < num_vgs]).astype(numpy.uint16)
+
+    def export_blendremap_forward_and_reverse(self, components_objs, component_vg_weight_table_dict:dict = None):
         output_dir = GlobalConfig.path_generatemod_buffer_folder()
         
         # Determine number of VG channels from game type
@@ -459,28 +468,19 @@ class DrawIBModelWWMI:
         # Per-component boolean indicating whether remap was used for that component
         remap_used: dict[str, bool] = {}
 
+        if component_vg_weight_table_dict is None:
+            component_vg_weight_table_dict = {}
+
         for comp_obj in components_objs:
-            # Build per-vertex VG id array for this component
-            vert_vg_ids = numpy.zeros((len(comp_obj.data.vertices), num_vgs), dtype=numpy.uint16)
+            vg_weight_table = component_vg_weight_table_dict.get(comp_obj.name, None)
+            if vg_weight_table is None:
+                vg_weight_table = VertexGroupUtils.get_vertex_group_weight_table(comp_obj.data)
 
             # For remap calculation collect used VG ids for vertices referenced by this component
-            used_vg_set = set()
-
-            for vi, v in enumerate(comp_obj.data.vertices):
-                # vertex.groups is a sequence of group assignments (group index, weight)
-                groups = [(g.group, g.weight) for g in v.groups]
-
-                # sort by weight descending and keep top `num_vgs`
-                if len(groups) > 0:
-                    groups.sort(key=lambda x: x[1], reverse=True)
-                    for i, (gidx, w) in enumerate(groups[:num_vgs]):
-                        vert_vg_ids[vi, i] = int(gidx)
-                        if w > 0:
-                            used_vg_set.add(int(gidx))
+            obj_vg_ids = self.get_used_vg_ids(vg_weight_table, num_vgs)
 
             # Determine whether remapping is needed for this component
-            max_used = (max(used_vg_set) if len(used_vg_set) else 0)
-            if len(used_vg_set) == 0 or max_used < 256:
+            if len(obj_vg_ids) == 0 or int(obj_vg_ids[-1]) < 256:
                 # No remapping required for this component
                 remapped_vgs_counts.append(0)
                 remap_maps[comp_obj.name] = { 'forward': [], 'reverse': {} }
@@ -490,8 +490,6 @@ class DrawIBModelWWMI:
                 self.blend_remap = True
 
             # Create forward and reverse remap arrays (512 entries each, uint16)
-            obj_vg_ids = numpy.array(sorted(used_vg_set), dtype=numpy.uint16)
-
             forward = numpy.zeros(512, dtype=numpy.uint16)
             forward[:len(obj_vg_ids)] = obj_vg_ids
 
@@ -503,7 +501,7 @@ class DrawIBModelWWMI:
             blend_remap_reverse = numpy.concatenate((blend_remap_reverse, reverse), axis=0)
             remapped_vgs_counts.append(len(obj_vg_ids))
             # build simple python mapping structures for later remap usage
-            forward_list = [int(x) for x in obj_vg_ids.tolist()]
+            forward_list = obj_vg_ids.astype(int).tolist()
             reverse_map = { int(v): int(i) for i, v in enumerate(forward_list) }
             remap_maps[comp_obj.name] = { 'forward': forward_list, 'reverse': reverse_map }
             remap_used[comp_obj.name] = True
@@ -516,13 +514,11 @@ class DrawIBModelWWMI:
 
         # 写出BlendRemapForward.buf
         if blend_remap_forward.size != 0:
-            with open(os.path.join(output_dir, f"{self.draw_ib}-BlendRemapForward.buf"), 'wb') as f:
-                blend_remap_forward.tofile(f)
+            BufferExportHelper.write_buffer(blend_remap_forward, os.path.join(output_dir, f"{self.draw_ib}-BlendRemapForward.buf"))
 
         # 写出BlendRemapReverse.buf
         if blend_remap_reverse.size != 0:
-            with open(os.path.join(output_dir, f"{self.draw_ib}-BlendRemapReverse.buf"), 'wb') as f:
-                blend_remap_reverse.tofile(f)
+            BufferExportHelper.write_buffer(blend_remap_reverse, os.path.join(output_dir, f"{self.draw_ib}-BlendRemapReverse.buf"))
 
 
     def replace_remapped_blendindices(self, obj_element_model: ObjElementModel):
@@ -542,13 +538,6 @@ class DrawIBModelWWMI:
         mesh = obj_element_model.mesh
         loops_len = len(mesh.loops)
 
-        # Build loop -> polygon mapping
-        loop_to_poly = numpy.empty(loops_len, dtype=numpy.int32)
-        for poly in mesh.polygons:
-            start = poly.loop_start
-            end = start + poly.loop_total
-            loop_to_poly[start:end] = poly.index
-
         arr = None
         # Source array: original parsed dict if present
         if 'BLENDINDICES' in getattr(obj_element_model, 'original_elementname_data_dict', {}):
@@ -563,45 +552,53 @@ class DrawIBModelWWMI:
             # Nothing to remap
             return
 
-        # 2) polygon -> component object name mapping
+        # 1) 每个原始物体的 reverse 映射合并成一张查找表，每行对应一个物体：lookup_table[物体编号, 原始编号] = 局部编号
+        # 2) polygon -> 物体编号（使用 components[*].objects[*].index_offset 和 index_count），-1 表示不需要替换
         poly_count = len(mesh.polygons)
-        polygon_to_objname = [None] * poly_count
+        polygon_to_table_index = numpy.full(poly_count, -1, dtype=numpy.int64)
 
+        reverse_map_list = []
         for comp in self.merged_object.components:
             for temp_obj in comp.objects:
                 if not hasattr(temp_obj, 'index_offset') or not hasattr(temp_obj, 'index_count'):
                     continue
-                poly_start = int(temp_obj.index_offset // 3)
-                poly_end = poly_start + int(temp_obj.index_count // 3)
-                for p in range(poly_start, poly_end):
-                    if 0 <= p < poly_count:
-                        polygon_to_objname[p] = temp_obj.name
+                poly_start = max(int(temp_obj.index_offset // 3), 0)
+                poly_end = min(int(temp_obj.index_offset // 3) + int(temp_obj.index_count // 3), poly_count)
 
-        # Determine width (number of indices per entry)
-        if getattr(arr, 'ndim', 1) == 1:
-            width = 1
-        else:
-            width = arr.shape[1]
+                remap_entry = self.blend_remap_maps.get(temp_obj.name, None)
+                if not remap_entry:
+                    polygon_to_table_index[poly_start:poly_end] = -1
+                    continue
+                polygon_to_table_index[poly_start:poly_end] = len(reverse_map_list)
+                reverse_map_list.append(remap_entry.get('reverse', {}))
 
-        for li in range(loops_len):
-            poly_idx = int(loop_to_poly[li])
-            comp_obj_name = polygon_to_objname[poly_idx] if (0 <= poly_idx < len(polygon_to_objname)) else None
-            if not comp_obj_name:
-                continue
-            remap_entry = self.blend_remap_maps.get(comp_obj_name, None)
-            if not remap_entry:
-                continue
-            reverse_map = remap_entry.get('reverse', {})
+        if not reverse_map_list:
+            obj_element_model.final_elementname_data_dict['BLENDINDICES'] = arr
+            return
 
-            if width == 1:
-                orig = int(arr[li])
-                new = reverse_map.get(orig, orig)
-                arr[li] = new
-            else:
-                for j in range(width):
-                    orig = int(arr[li, j])
-                    new = reverse_map.get(orig, orig)
-                    arr[li, j] = new
+        max_index = int(arr.max()) if arr.size else 0
+        for reverse_map in reverse_map_list:
+            if reverse_map:
+                max_index = max(max_index, max(reverse_map.keys()))
+
+        # 没有出现在 reverse 映射中的编号保持不变
+        lookup_table = numpy.tile(numpy.arange(max_index + 1, dtype=numpy.int64), (len(reverse_map_list), 1))
+        for table_index, reverse_map in enumerate(reverse_map_list):
+            if reverse_map:
+                lookup_table[table_index, list(reverse_map.keys())] = list(reverse_map.values())
+
+        # 3) loop -> polygon -> 物体编号，一次花式索引完成替换
+        loop_to_table_index = numpy.full(loops_len, -1, dtype=numpy.int64)
+        loop_totals = numpy.empty(poly_count, dtype=int)
+        mesh.polygons.foreach_get("loop_total", loop_totals)
+        loop_to_table_index[ObjBufferHelper._get_polygon_loop_order(mesh)] = numpy.repeat(polygon_to_table_index, loop_totals)
+
+        remap_loop_indices = numpy.flatnonzero(loop_to_table_index >= 0)
+        table_indices = loop_to_table_index[remap_loop_indices]
+        if getattr(arr, 'ndim', 1) == 1:
+            arr[remap_loop_indices] = lookup_table[table_indices, arr[remap_loop_indices]]
+        else:
+            arr[remap_loop_indices] = lookup_table[table_indices[:, None], arr[remap_loop_indices]]
 
         obj_element_model.final_elementname_data_dict['BLENDINDICES'] = arr
 
@@ -41,8 +41,8 @@ class SubMeshModel:
     def calc_buffer(self):
         from ...utils.obj_utils import ObjUtils
         from ...utils.collection_utils import CollectionUtils
-        from ...utils.json_utils import JsonUtils
-        from ...base.d3d11_gametype import D3D11GameType
+        from ...base.d3d11_gametype import D3D11GameTypeRegistry
+        from ...config.config_cache import ConfigCache
         from ...helper.obj_buffer_helper import ObjBufferHelper
         from ...common.obj_element_model import ObjElementModel
         from ...common.obj_buffer_model_unity import ObjBufferModelUnity
@@ -85,12 +85,6 @@ class SubMeshModel:
         if not submesh_temp_obj_list:
             return
 
-        if submesh_temp_obj_list:
-            bpy.ops.object.select_all(action='DESELECT')
-            target_active = submesh_temp_obj_list[0]
-            target_active.select_set(True)
-            bpy.context.view_layer.objects.active = target_active
-
         ObjUtils.join_objects(bpy.context, submesh_temp_obj_list)
 
         submesh_merged_obj = submesh_temp_obj_list[0]
@@ -100,13 +94,13 @@ class SubMeshModel:
         folder_name = self.unique_str
 
         import_json_path = os.path.join(GlobalConfig.path_workspace_folder(), "Import.json")
-        import_json = JsonUtils.LoadFromFile(import_json_path)
+        import_json = ConfigCache.load_json(import_json_path)
         gametype_name = import_json.get(folder_name, "")
         gametype_foldername = "TYPE_" + gametype_name
         import_folder_path = os.path.join(GlobalConfig.path_workspace_folder(), folder_name)
         game_import_json_path = os.path.join(import_folder_path, gametype_foldername, "import.json")
 
-        self.d3d11_game_type = D3D11GameType(FilePath=game_import_json_path)
+        self.d3d11_game_type = D3D11GameTypeRegistry.get_game_type(game_import_json_path)
 
         if self.d3d11_game_type:
             ObjBufferHelper.check_and_verify_attributes(obj=submesh_merged_obj, d3d11_game_type=self.d3d11_game_type)
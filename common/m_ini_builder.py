@@ -1,4 +1,5 @@
 import hashlib
+import os
 
 
 class M_SectionType:
@@ -62,42 +63,122 @@ class M_IniSection:
 
 
 class M_IniBuilder:
+    # save_to_file输出Section的顺序
+    SECTION_TYPE_SAVE_ORDER = (
+        M_SectionType.CrossIBPresent,
+        M_SectionType.ResourceID,
+        M_SectionType.NameSpace,
+        M_SectionType.Key,
+        M_SectionType.Constants,
+        M_SectionType.Present,
+        M_SectionType.IBSkip,
+        M_SectionType.TextureOverrideVertexLimitRaise,
+        M_SectionType.TextureOverrideVB,
+        M_SectionType.TextureOverrideIB,
+        M_SectionType.TextureOverrideShapeKeys,
+        M_SectionType.TextureOverrideGeneral,
+        M_SectionType.CommandList,
+        M_SectionType.ResourceShapeKeysOverride,
+        M_SectionType.ResourceSkeletonOverride,
+        M_SectionType.ResourceBuffer,
+        M_SectionType.ResourceTexture,
+        M_SectionType.TextureOverrideTexture,
+        M_SectionType.ResourceAndTextureOverride_Texture,
+        M_SectionType.ResourceModInfo,
+        M_SectionType.VertexShaderCheck,
+        M_SectionType.CreditInfo,
+    )
+
+    # ini路径 -> (上次写出内容的sha256, 写出后文件的mtime_ns, 文件大小)
+    # 文件没有被改动过时直接用这里的sha256比较，不再重新读取文件
+    written_ini_sha256_cache:dict[str,tuple] = {}
+
     def __init__(self):
         self.line_list = []
         self.ini_section_list:list[M_IniSection] = []
 
+        # 按SectionType分组的Section，保持添加顺序，保存时按SECTION_TYPE_SAVE_ORDER依次拼接
+        self.section_type_bucket_dict:dict[str,list[M_IniSection]] = {}
+
         # 用于控制是否是第一次出现这个名字的Section
         self.ini_section_name_set:set = set()
+
+        self.sha256_hash = hashlib.sha256()
     
     def clear(self):
         self.line_list.clear()
         self.ini_section_list.clear()
+        self.section_type_bucket_dict.clear()
+        self.sha256_hash = hashlib.sha256()
+
+    def __append_line(self,line:str):
+        '''
+        添加一行输出内容，同时更新sha256，不需要最后再遍历一次计算
+        '''
+        self.line_list.append(line)
+        self.sha256_hash.update(line.encode('utf-8'))
 
     def __append_section_line(self,ini_section_type:M_SectionType):
         '''
         Only can be legally call in M_IniBuilder.
         '''
-        for ini_section in self.ini_section_list:
-            if ini_section.SectionType == ini_section_type:
-                section_name_exists = ini_section.SectionName in self.ini_section_name_set
-                if not section_name_exists:
-                    self.line_list.append("\n;MARK:" + ini_section_type + "\n")
+        for ini_section in self.section_type_bucket_dict.get(ini_section_type, ()):
+            section_name_exists = ini_section.SectionName in self.ini_section_name_set
+            if not section_name_exists:
+                self.__append_line("\n;MARK:" + ini_section_type + "\n")
 
-                # SectionName不为空的时候才会自动补SectionName，否则由用户控制
-                if ini_section.SectionName != "" and not section_name_exists:
-                    self.line_list.append("[" + ini_section.SectionName + "]\n")
-                    self.ini_section_name_set.add(ini_section.SectionName)
+            # SectionName不为空的时候才会自动补SectionName，否则由用户控制
+            if ini_section.SectionName != "" and not section_name_exists:
+                self.__append_line("[" + ini_section.SectionName + "]\n")
+                self.ini_section_name_set.add(ini_section.SectionName)
 
-                # 添加Section的内容
-                for line in ini_section.SectionLineList:
-                    self.line_list.append(line + "\n")
-                
+            # 添加Section的内容
+            for line in ini_section.SectionLineList:
+                self.__append_line(line + "\n")
 
     def append_section(self,m_inisection:M_IniSection):
         # 先判断是否为空，如果为空就不往里放了
         if not m_inisection.empty():
             self.ini_section_list.append(m_inisection)
-    
+            self.section_type_bucket_dict.setdefault(m_inisection.SectionType, []).append(m_inisection)
+
+    def __get_previous_sha256(self,config_ini_path:str) -> str:
+        '''
+        上次由这里写出的文件没有被改动过时直接返回缓存的sha256，
+        否则（第一次导出、文件被后处理节点或用户修改过）读取文件中记录的sha256
+        '''
+        cached = M_IniBuilder.written_ini_sha256_cache.get(config_ini_path, None)
+        if cached is not None:
+            try:
+                stat = os.stat(config_ini_path)
+                if (stat.st_mtime_ns, stat.st_size) == cached[1:]:
+                    return cached[0]
+            except OSError:
+                pass
+        return self.get_sha256_from_ini(config_ini_path)
+
+    def __write_if_changed(self,config_ini_path:str):
+        # Add sha256 to verify if ini need to overwrite.
+        sha256 = self.sha256_hash.hexdigest()
+
+        # Add after sha256 calculation.
+        self.line_list.append("\n;sha256=" + sha256 + "\n\n")
+
+        # Read ini and find sha256, if not same then write ini, if same do nothing.
+        ini_sha256 = self.__get_previous_sha256(config_ini_path)
+        if ini_sha256 != sha256:
+            print("Write new mod ini because sha256 is not same.")
+            with open(config_ini_path,"w") as f:
+                f.write("".join(self.line_list))
+        else:
+            print("Skip write mod ini becuase sha256 is same, ini file content not changed so we are safe to skip.")
+
+        try:
+            stat = os.stat(config_ini_path)
+            M_IniBuilder.written_ini_sha256_cache[config_ini_path] = (sha256, stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            M_IniBuilder.written_ini_sha256_cache.pop(config_ini_path, None)
+
     def save_to_file_not_reorder(self,config_ini_path:str):
         '''
         不重新排序的版本，方便我们的ini格式和其它工具生成的ini格式进行对比。
@@ -109,108 +190,21 @@ class M_IniBuilder:
             
             # SectionName不为空的时候才会自动补SectionName，否则由用户控制
             if ini_section.SectionName != "" and not section_name_exists:
-                self.line_list.append("[" + ini_section.SectionName + "]\n")
+                self.__append_line("[" + ini_section.SectionName + "]\n")
                 self.ini_section_name_set.add(ini_section.SectionName)
 
             # 添加Section的内容
             for line in ini_section.SectionLineList:
-                self.line_list.append(line + "\n")
-
-        # Add tools credit.
-        
-        # self.line_list.append("\n\n; Mod generated by TheHerta.\n")
-        
-        # Add sha256 to verify if ini need to overwrite.
-        sha256 = self.calculate_sha256_for_list(self.line_list)
-        # print("sha256: " + sha256)
-
-        # Add after sha256 calculation.
-        self.line_list.append("\n;sha256=" + sha256 + "\n\n") 
+                self.__append_line(line + "\n")
 
-
-        # Read ini and find sha256, if not same then write ini, if same do nothing.
-        ini_sha256 = self.get_sha256_from_ini(config_ini_path)
-        # print("old ini sha256: " + ini_sha256)
-        # print("new ini sha256: " + sha256)
-        if ini_sha256 != sha256:
-            print("Write new mod ini because sha256 is not same.")
-            with open(config_ini_path,"w") as f:
-                f.writelines(self.line_list)
-        else:
-            print("Skip write mod ini becuase sha256 is same, ini file content not changed so we are safe to skip.")
-        pass
+        self.__write_if_changed(config_ini_path)
 
     def save_to_file(self,config_ini_path:str):
-        self.__append_section_line(M_SectionType.CrossIBPresent)
-        
-        self.__append_section_line(M_SectionType.ResourceID)
-
-        self.__append_section_line(M_SectionType.NameSpace)
-
-        self.__append_section_line(M_SectionType.Key)
-
-        self.__append_section_line(M_SectionType.Constants)
-
-        self.__append_section_line(M_SectionType.Present)
-
-
-        self.__append_section_line(M_SectionType.IBSkip)
-
-
-        self.__append_section_line(M_SectionType.TextureOverrideVertexLimitRaise)
-
-        self.__append_section_line(M_SectionType.TextureOverrideVB)
-
-        self.__append_section_line(M_SectionType.TextureOverrideIB)
-
-        self.__append_section_line(M_SectionType.TextureOverrideShapeKeys)
-
-        self.__append_section_line(M_SectionType.TextureOverrideGeneral)
-
-        self.__append_section_line(M_SectionType.CommandList)
-
-        self.__append_section_line(M_SectionType.ResourceShapeKeysOverride)
-
-        self.__append_section_line(M_SectionType.ResourceSkeletonOverride)
-
-        self.__append_section_line(M_SectionType.ResourceBuffer)
-
-        self.__append_section_line(M_SectionType.ResourceTexture)
+        # Section在append_section时已经按类型分好组，这里按固定顺序拼接一次即可
+        for ini_section_type in M_IniBuilder.SECTION_TYPE_SAVE_ORDER:
+            self.__append_section_line(ini_section_type)
 
-        self.__append_section_line(M_SectionType.TextureOverrideTexture)
-
-        self.__append_section_line(M_SectionType.ResourceAndTextureOverride_Texture)
-
-        self.__append_section_line(M_SectionType.ResourceModInfo)
-
-
-        self.__append_section_line(M_SectionType.VertexShaderCheck)
-        
-        self.__append_section_line(M_SectionType.CreditInfo)
-
-
-        # Add tools credit.
-        
-        # self.line_list.append("\n\n; Mod generated by TheHerta.\n")
-
-        # Add sha256 to verify if ini need to overwrite.
-        sha256 = self.calculate_sha256_for_list(self.line_list)
-        # print("sha256: " + sha256)
-
-        # Add after sha256 calculation.
-        self.line_list.append("\n;sha256=" + sha256 + "\n\n") 
-
-
-        # Read ini and find sha256, if not same then write ini, if same do nothing.
-        ini_sha256 = self.get_sha256_from_ini(config_ini_path)
-        # print("old ini sha256: " + ini_sha256)
-        # print("new ini sha256: " + sha256)
-        if ini_sha256 != sha256:
-            print("Write new mod ini because sha256 is not same.")
-            with open(config_ini_path,"w") as f:
-                f.writelines(self.line_list)
-        else:
-            print("Skip write mod ini becuase sha256 is same, ini file content not changed so we are safe to skip.")
+        self.__write_if_changed(config_ini_path)
 
     def calculate_sha256_for_list(self,string_list):
         # 创建一个新的sha256哈希对象
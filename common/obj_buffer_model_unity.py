@@ -97,35 +97,104 @@ class ObjBufferModelUnity:
                 # 这避免了使用 self.element_vertex_ndarray (Loops) 导致的形状不匹配错误
                 base_shape_vertex_ndarray = numpy.zeros(target_count, dtype=self.dtype)
 
-                for sk in shape_keys:
-                    sk_name = sk.name
-                    
-                    # 1. 重置在配置列表中的非当前形态键，未配置的形态键保留原值
-                    ShapeKeyUtils.reset_shapekey_values(self.obj, configured_shapekey_names=shapekey_names, current_shapekey_name=sk_name)
-                    sk.value = 1.0
-                    
-                    # 2. 获取应用了形态键后的 Mesh 数据
-                    # 注意：get_mesh_evaluate_from_obj 生成了一个新的 Mesh 数据块
-                    # 物体在导出前已经被 BEAUTY 三角化，所以这里不需要再次三角化
-                    mesh_eval = ObjUtils.get_mesh_evaluate_from_obj(obj=self.obj)
-
-                    # 计算TANGENT，不然导出丢失部分TANGENT数据导致光影效果错误
-                    mesh_eval.calc_tangents()
-                    
-                    # 3. 构建 ShapeKeyBufferModel (它会自动在 __post_init__ 中计算数据)
+                shapekey_positions_dict = ShapeKeyUtils.evaluate_shapekey_positions(self.obj, shapekey_names, [sk.name for sk in shape_keys])
+                if shapekey_positions_dict is None:
+                    self._build_shape_key_buffers_per_key(shape_keys, shapekey_names, base_shape_vertex_ndarray, indices_map)
+                else:
+                    self._build_shape_key_buffers_batched(shape_keys, shapekey_names, shapekey_positions_dict, base_shape_vertex_ndarray, indices_map)
+
+                # 循环结束后重置状态
+                ShapeKeyUtils.reset_shapekey_values(self.obj)
+                TimerUtils.End(f"Processing {len(shape_keys)} ShapeKeys for {self.obj.name}")
+
+    def _build_shape_key_buffers_per_key(self, shape_keys, shapekey_names, base_shape_vertex_ndarray, indices_map):
+        '''
+        逐个形态键设置值为1并重新计算evaluated mesh，物体还有修改器等无法直接用形态键数据计算的情况使用
+        '''
+        for sk in shape_keys:
+            sk_name = sk.name
+            
+            # 1. 重置在配置列表中的非当前形态键，未配置的形态键保留原值
+            ShapeKeyUtils.reset_shapekey_values(self.obj, configured_shapekey_names=shapekey_names, current_shapekey_name=sk_name)
+            sk.value = 1.0
+            
+            # 2. 获取应用了形态键后的 Mesh 数据
+            # 注意：get_mesh_evaluate_from_obj 生成了一个新的 Mesh 数据块
+            # 物体在导出前已经被 BEAUTY 三角化，所以这里不需要再次三角化
+            mesh_eval = ObjUtils.get_mesh_evaluate_from_obj(obj=self.obj)
+
+            # 计算TANGENT，不然导出丢失部分TANGENT数据导致光影效果错误
+            mesh_eval.calc_tangents()
+            
+            # 3. 构建 ShapeKeyBufferModel (它会自动在 __post_init__ 中计算数据)
+            sb_model = ShapeKeyBufferModel(
+                name=sk_name,
+                base_element_vertex_ndarray=base_shape_vertex_ndarray,
+                mesh=mesh_eval,
+                indices_map=indices_map,
+                d3d11_game_type=self.d3d11_game_type
+            )
+            self.shape_key_buffer_dict[sk_name] = sb_model
+
+    def _build_shape_key_buffers_batched(self, shape_keys, shapekey_names, shapekey_positions_dict, base_shape_vertex_ndarray, indices_map):
+        '''
+        批量计算形态键Buffer
+
+        顶点坐标由ShapeKeyUtils.evaluate_shapekey_positions直接从key_blocks数据算出，
+        只计算一次所有配置的形态键都为0时的mesh，之后每个形态键只需要把坐标写入同一个mesh，
+        让Blender重新计算法线和切线，不再每个形态键都走一遍depsgraph
+        不改变任何顶点的形态键直接复用基础形态的结果
+        '''
+        need_tangents = any(
+            d3d11_element.Category == "Position" and (d3d11_element.ElementName == 'TANGENT' or d3d11_element.ElementName.startswith('BINORMAL'))
+            for d3d11_element in self.d3d11_game_type.D3D11ElementList
+        )
+
+        ShapeKeyUtils.reset_shapekey_values(self.obj, configured_shapekey_names=shapekey_names)
+        obj_eval = self.obj.evaluated_get(bpy.context.evaluated_depsgraph_get())
+        work_mesh = bpy.data.meshes.new_from_object(obj_eval)
+
+        try:
+            # 不改变顶点的形态键共用基础形态的结果，必须在任何形态键改写work_mesh的坐标之前计算
+            base_element_vertex_ndarray = None
+            if any(shapekey_positions_dict[sk.name] is None for sk in shape_keys):
+                if need_tangents:
+                    work_mesh.calc_tangents()
+                base_sb_model = ShapeKeyBufferModel(
+                    name="Basis",
+                    base_element_vertex_ndarray=base_shape_vertex_ndarray,
+                    mesh=work_mesh,
+                    indices_map=indices_map,
+                    d3d11_game_type=self.d3d11_game_type
+                )
+                base_element_vertex_ndarray = base_sb_model.element_vertex_ndarray
+
+            for sk in shape_keys:
+                sk_name = sk.name
+                positions = shapekey_positions_dict[sk_name]
+
+                if positions is None:
                     sb_model = ShapeKeyBufferModel(
                         name=sk_name,
-                        base_element_vertex_ndarray=base_shape_vertex_ndarray,
-                        mesh=mesh_eval,
+                        base_element_vertex_ndarray=base_element_vertex_ndarray,
                         indices_map=indices_map,
                         d3d11_game_type=self.d3d11_game_type
                     )
                     self.shape_key_buffer_dict[sk_name] = sb_model
-                    
-  
-
-                # 循环结束后重置状态
-                ShapeKeyUtils.reset_shapekey_values(self.obj)
-                TimerUtils.End(f"Processing {len(shape_keys)} ShapeKeys for {self.obj.name}")
-
-        
\ No newline at end of file
+                    continue
+
+                work_mesh.vertices.foreach_set('co', positions.ravel())
+                work_mesh.update()
+                if need_tangents:
+                    work_mesh.calc_tangents()
+
+                sb_model = ShapeKeyBufferModel(
+                    name=sk_name,
+                    base_element_vertex_ndarray=base_shape_vertex_ndarray,
+                    mesh=work_mesh,
+                    indices_map=indices_map,
+                    d3d11_game_type=self.d3d11_game_type
+                )
+                self.shape_key_buffer_dict[sk_name] = sb_model
+        finally:
+            bpy.data.meshes.remove(work_mesh, do_unlink=True)
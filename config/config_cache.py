@@ -0,0 +1,98 @@
+import os
+import json
+
+from typing import Callable
+
+
+class ConfigCache:
+    '''
+    工作空间配置文件的解析结果缓存
+
+    每个 (解析方式, 文件路径) 只解析一次，文件的修改时间或大小变化后自动重新解析。
+    返回的对象在多个调用方之间共享，只能读取不能修改。
+
+    导出期间调用begin_export_snapshot后，每个文件只在第一次访问时检查一次修改时间，
+    之后直接使用缓存，直到end_export_snapshot，保证一次导出中所有DrawIB看到同一份配置
+    '''
+
+    # (解析方式, 文件绝对路径) -> ((mtime_ns, size), 解析结果)
+    _entries:dict[tuple,tuple] = {}
+
+    _snapshot_active:bool = False
+    # 本次导出中已经检查过修改时间的条目
+    _snapshot_validated_keys:set = set()
+
+    @staticmethod
+    def _get_file_key(file_path:str):
+        stat = os.stat(file_path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    @classmethod
+    def get(cls, kind:str, file_path:str, loader:Callable):
+        '''
+        kind: 解析方式的名称，同一个文件可以按不同方式解析并分别缓存
+        loader: 接收文件路径，返回解析结果
+        文件不存在时直接调用loader并且不缓存，保持loader原本的报错行为
+        '''
+        abs_path = os.path.abspath(file_path)
+        cache_key = (kind, abs_path)
+        cached = cls._entries.get(cache_key, None)
+
+        if cached is not None and cls._snapshot_active and cache_key in cls._snapshot_validated_keys:
+            return cached[1]
+
+        try:
+            file_key = cls._get_file_key(abs_path)
+        except OSError:
+            cls._entries.pop(cache_key, None)
+            return loader(file_path)
+
+        if cached is None or cached[0] != file_key:
+            cached = (file_key, loader(file_path))
+            cls._entries[cache_key] = cached
+
+        if cls._snapshot_active:
+            cls._snapshot_validated_keys.add(cache_key)
+        return cached[1]
+
+    @classmethod
+    def load_json(cls, file_path:str):
+        '''
+        读取json文件，文件不存在或解析失败时返回空字典，和JsonUtils.LoadFromFile一致
+        '''
+        return cls.get("json", file_path, cls._read_json)
+
+    @staticmethod
+    def _read_json(file_path:str):
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            print(f"Error: The file at {file_path} was not found.")
+            return {}
+        except json.JSONDecodeError:
+            print(f"Error: The file at {file_path} is not a valid JSON file.")
+            return {}
+
+    @classmethod
+    def invalidate(cls, file_path:str):
+        '''文件被插件自己改写后调用，丢弃这个文件的所有解析结果'''
+        abs_path = os.path.abspath(file_path)
+        for cache_key in [cache_key for cache_key in cls._entries.keys() if cache_key[1] == abs_path]:
+            del cls._entries[cache_key]
+            cls._snapshot_validated_keys.discard(cache_key)
+
+    @classmethod
+    def begin_export_snapshot(cls):
+        cls._snapshot_active = True
+        cls._snapshot_validated_keys = set()
+
+    @classmethod
+    def end_export_snapshot(cls):
+        cls._snapshot_active = False
+        cls._snapshot_validated_keys = set()
+
+    @classmethod
+    def clear(cls):
+        cls._entries.clear()
+        cls._snapshot_validated_keys = set()
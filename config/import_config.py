@@ -1,4 +1,5 @@
 import os 
+import copy
 import json
 import bpy
 import json
@@ -9,13 +10,15 @@ import os
 
 from typing import List, Dict, Union, Optional
 from dataclasses import dataclass, field, asdict
+from types import MappingProxyType
 
 from ..utils.json_utils import JsonUtils
 from ..utils.format_utils import Fatal
 
 from .main_config import GlobalConfig
+from .config_cache import ConfigCache
 
-from ..base.d3d11_gametype import D3D11GameType
+from ..base.d3d11_gametype import D3D11GameType, D3D11GameTypeRegistry
 
 
 def check_and_try_generate_import_json() -> dict:
@@ -26,7 +29,8 @@ def check_and_try_generate_import_json() -> dict:
     workspace_import_json_path = os.path.join(GlobalConfig.path_workspace_folder(), "Import.json")
     
     if os.path.exists(workspace_import_json_path):
-        return JsonUtils.LoadFromFile(workspace_import_json_path)
+        # 同一次导出中每个DrawIB都会读取，这里返回缓存的只读结果
+        return MappingProxyType(ConfigCache.load_json(workspace_import_json_path))
     
     print("Import.json 不存在，尝试自动生成...")
     
@@ -80,6 +84,7 @@ def check_and_try_generate_import_json() -> dict:
     
     if draw_ib_gametypename_dict:
         JsonUtils.SaveToFile(json_dict=draw_ib_gametypename_dict, filepath=workspace_import_json_path)
+        ConfigCache.invalidate(workspace_import_json_path)
         print(f"已自动生成 Import.json: {workspace_import_json_path}")
     else:
         print("警告: 无法自动生成 Import.json，没有找到有效的提取数据")
@@ -133,6 +138,61 @@ class TextureMarkUpInfo:
     def get_hash_style_filename(self):
         return self.mark_hash + "-" + self.mark_name + "." + self.mark_filename.split(".")[1]
 
+@dataclass(frozen=True)
+class TmpJsonConfig:
+    '''
+    tmp.json中生成Mod需要用到的内容，解析后不可修改，通过ConfigCache在多个DrawIB和多次导出之间共享
+    '''
+    category_hash_dict: MappingProxyType
+    import_model_list: tuple
+    match_first_index_list: tuple
+    part_name_list: tuple
+    vertex_limit_hash: str
+    work_game_type: str
+    vshash_list: tuple
+    original_vertex_count: int
+    # PartName -> (TextureMarkUpInfo, ...)
+    partname_texturemarkinfolist_dict: MappingProxyType
+
+    @classmethod
+    def from_json_dict(cls, tmp_json_dict:dict) -> 'TmpJsonConfig':
+        # 自动贴图依赖于这个字典
+        partname_texturemarkupinfolist_jsondict = tmp_json_dict["ComponentTextureMarkUpInfoListDict"]
+
+        partname_texturemarkinfolist_dict = {}
+        for partname, texture_markup_info_dict_list in partname_texturemarkupinfolist_jsondict.items():
+
+            texture_markup_info_list = []
+
+            for texture_markup_info_dict in texture_markup_info_dict_list:
+                markup_info = TextureMarkUpInfo()
+                markup_info.mark_name = texture_markup_info_dict["MarkName"]
+                markup_info.mark_type = texture_markup_info_dict["MarkType"]
+                markup_info.mark_slot = texture_markup_info_dict["MarkSlot"]
+                markup_info.mark_hash = texture_markup_info_dict["MarkHash"]
+                markup_info.mark_filename = texture_markup_info_dict["MarkFileName"]
+
+                texture_markup_info_list.append(markup_info)
+
+            partname_texturemarkinfolist_dict[partname] = tuple(texture_markup_info_list)
+
+        return cls(
+            category_hash_dict=MappingProxyType(dict(tmp_json_dict["CategoryHash"])),
+            import_model_list=tuple(tmp_json_dict["ImportModelList"]),
+            match_first_index_list=tuple(tmp_json_dict["MatchFirstIndex"]),
+            part_name_list=tuple(tmp_json_dict["PartNameList"]),
+            vertex_limit_hash=tmp_json_dict["VertexLimitVB"],
+            work_game_type=tmp_json_dict["WorkGameType"],
+            vshash_list=tuple(tmp_json_dict.get("VSHashList",[])),
+            original_vertex_count=tmp_json_dict.get("OriginalVertexCount",0),
+            partname_texturemarkinfolist_dict=MappingProxyType(partname_texturemarkinfolist_dict),
+        )
+
+    @classmethod
+    def load(cls, tmp_json_path:str) -> 'TmpJsonConfig':
+        return ConfigCache.get("tmp_json_config", tmp_json_path, lambda path: cls.from_json_dict(JsonUtils.LoadFromFile(path)))
+
+
 @dataclass
 class ImportConfig:
     '''
@@ -198,60 +258,31 @@ class ImportConfig:
                 merged_tmp_json_path = f.name
             
             self.d3d11GameType:D3D11GameType = D3D11GameType(merged_tmp_json_path)
-            tmp_json_dict = base_tmp_json_dict
+            tmp_json_config = TmpJsonConfig.from_json_dict(base_tmp_json_dict)
             
             try:
                 os.unlink(merged_tmp_json_path)
             except:
                 pass
         else:
-            self.d3d11GameType:D3D11GameType = D3D11GameType(tmp_json_path)
-            tmp_json_dict = JsonUtils.LoadFromFile(tmp_json_path)
+            self.d3d11GameType:D3D11GameType = D3D11GameTypeRegistry.get_game_type(tmp_json_path)
+            tmp_json_config = TmpJsonConfig.load(tmp_json_path)
         
         '''
         读取tmp.json中的内容，后续会用于生成Mod的ini文件
         需要在确定了D3D11GameType之后再执行
-        注意：这里使用已经确定的 tmp_json_dict
+        注意：这里使用已经确定的 tmp_json_config，它是共享的，所以复制一份到当前实例
         '''
-        self.category_hash_dict = tmp_json_dict["CategoryHash"]
-        self.import_model_list = tmp_json_dict["ImportModelList"]
-        self.match_first_index_list = tmp_json_dict["MatchFirstIndex"]
-        self.part_name_list = tmp_json_dict["PartNameList"]
-        # print(self.partname_textureresourcereplace_dict)
-        self.vertex_limit_hash = tmp_json_dict["VertexLimitVB"]
-        self.work_game_type = tmp_json_dict["WorkGameType"]
-        self.vshash_list = tmp_json_dict.get("VSHashList",[])
-        self.original_vertex_count = tmp_json_dict.get("OriginalVertexCount",0)
-
-        # 自动贴图依赖于这个字典
-        partname_texturemarkupinfolist_jsondict = tmp_json_dict["ComponentTextureMarkUpInfoListDict"]
-
+        self.category_hash_dict = dict(tmp_json_config.category_hash_dict)
+        self.import_model_list = list(tmp_json_config.import_model_list)
+        self.match_first_index_list = list(tmp_json_config.match_first_index_list)
+        self.part_name_list = list(tmp_json_config.part_name_list)
+        self.vertex_limit_hash = tmp_json_config.vertex_limit_hash
+        self.work_game_type = tmp_json_config.work_game_type
+        self.vshash_list = list(tmp_json_config.vshash_list)
+        self.original_vertex_count = tmp_json_config.original_vertex_count
 
         print("读取配置: " + tmp_json_path)
-        # print(partname_textureresourcereplace_dict)
-        for partname, texture_markup_info_dict_list in partname_texturemarkupinfolist_jsondict.items():
-
-            texture_markup_info_list = []
-
-            for texture_markup_info_dict in texture_markup_info_dict_list:
-                markup_info = TextureMarkUpInfo()
-                markup_info.mark_name = texture_markup_info_dict["MarkName"]
-                markup_info.mark_type = texture_markup_info_dict["MarkType"]
-                markup_info.mark_slot = texture_markup_info_dict["MarkSlot"]
-                markup_info.mark_hash = texture_markup_info_dict["MarkHash"]
-                markup_info.mark_filename = texture_markup_info_dict["MarkFileName"]
-
-                texture_markup_info_list.append(markup_info)
-
-            self.partname_texturemarkinfolist_dict[partname] = texture_markup_info_list
-
-
-
-
-
-                
-
-
-                
-
-
+        for partname, texture_markup_info_list in tmp_json_config.partname_texturemarkinfolist_dict.items():
+            # 缓存中的TextureMarkUpInfo是共享的，调用方（例如GIMI的ORFix）会直接修改mark_slot，所以每个ImportConfig复制一份
+            self.partname_texturemarkinfolist_dict[partname] = [copy.copy(texture_markup_info) for texture_markup_info in texture_markup_info_list]
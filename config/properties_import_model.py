@@ -129,6 +129,20 @@ class Properties_ImportModel(bpy.types.PropertyGroup):
         '''
         return bpy.context.scene.properties_import_model.use_preprocess_cache
 
+    preprocess_cache_max_size_mb: bpy.props.IntProperty(
+        name="缓存容量上限(MB)",
+        description="预处理缓存的总大小上限，超出后优先删除最久未命中的缓存，0 表示不限制",
+        default=10240,
+        min=0,
+    )  # type: ignore
+
+    @classmethod
+    def get_preprocess_cache_max_size_bytes(cls):
+        '''
+        bpy.context.scene.properties_import_model.preprocess_cache_max_size_mb 换算为字节
+        '''
+        return bpy.context.scene.properties_import_model.preprocess_cache_max_size_mb * 1024 * 1024
+
 def register():
     bpy.utils.register_class(Properties_ImportModel)
     bpy.types.Scene.properties_import_model = bpy.props.PointerProperty(type=Properties_ImportModel)
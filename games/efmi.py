@@ -1,5 +1,6 @@
 import bpy
 import math
+import numpy
 import os
 import shutil
 
@@ -14,6 +15,7 @@ from ..common.m_ini_builder import M_IniBuilder,M_IniSection,M_SectionType
 from ..config.properties_generate_mod import Properties_GenerateMod
 from ..common.m_ini_helper import M_IniHelper,M_IniHelper
 from ..common.m_ini_helper_gui import M_IniHelperGUI
+from ..helper.buffer_export_helper import BufferExportHelper
 
 
 class DrawIBModelAdapter:
@@ -135,23 +137,18 @@ class ModModelEFMI:
             self._export_buffers()
     
     def _export_buffers(self):
-        import struct
-        
         buf_output_folder = GlobalConfig.path_generatemod_buffer_folder()
 
         for submesh_model in self._submesh_model_list:
             if len(submesh_model.ib) > 0:
                 ib_filename = submesh_model.unique_str + "-Index.buf"
                 ib_filepath = os.path.join(buf_output_folder, ib_filename)
-                packed_data = struct.pack(f'<{len(submesh_model.ib)}I', *submesh_model.ib)
-                with open(ib_filepath, 'wb') as ibf:
-                    ibf.write(packed_data)
+                BufferExportHelper.write_buffer(submesh_model.ib, ib_filepath, numpy.uint32)
 
             for category, category_buf in submesh_model.category_buffer_dict.items():
                 category_buf_filename = submesh_model.unique_str + "-" + category + ".buf"
                 category_buf_filepath = os.path.join(buf_output_folder, category_buf_filename)
-                with open(category_buf_filepath, 'wb') as f:
-                    category_buf.tofile(f)
+                BufferExportHelper.write_buffer(category_buf, category_buf_filepath)
 
     def parse_draw_ib_draw_ib_model_dict(self, skip_buffer_export:bool = False):
         for draw_ib in self.branch_model.draw_ib__component_count_list__dict.keys():
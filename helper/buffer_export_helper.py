@@ -1,5 +1,4 @@
 import os
-import struct
 import numpy
 
 
@@ -13,45 +12,100 @@ class BufferExportHelper:
             cls._global_config = GlobalConfig
         return cls._global_config
 
+    # 每次写入的最大字节数，需要转换dtype时也按这个大小分块转换，避免一次性复制整个数组
+    WRITE_CHUNK_BYTES = 16 * 1024 * 1024
+
+    @staticmethod
+    def as_buffer_array(data, dtype=None, byteorder: str = '<') -> numpy.ndarray:
+        '''
+        把要写出的数据统一成一维numpy数组，不做dtype转换，转换在写出时分块进行
+
+        data 可以是numpy数组、bytes/bytearray/memoryview等支持buffer协议的对象，或者Python序列
+        支持buffer协议的对象在没有指定dtype时按原始字节处理
+        '''
+        if isinstance(data, numpy.ndarray):
+            arr = data
+        elif isinstance(data, (bytes, bytearray, memoryview)):
+            target_dtype = BufferExportHelper.get_buffer_dtype(dtype, byteorder) if dtype is not None else numpy.dtype(numpy.uint8)
+            arr = numpy.frombuffer(data, dtype=target_dtype)
+        else:
+            arr = numpy.asarray(data)
+
+        if arr.ndim != 1:
+            arr = arr.reshape(-1)
+        return arr
+
+    @staticmethod
+    def get_buffer_dtype(dtype, byteorder: str = '<') -> numpy.dtype:
+        '''
+        获取带有明确字节序的dtype，结构化dtype保持各字段自己的字节序
+        '''
+        target_dtype = numpy.dtype(dtype)
+        if target_dtype.names is None and target_dtype.itemsize > 1:
+            target_dtype = target_dtype.newbyteorder(byteorder)
+        return target_dtype
+
+    @staticmethod
+    def write_buffer_to_file(file, data, dtype=None, byteorder: str = '<'):
+        '''
+        以固定大小的块把数据写入已经打开的二进制文件
+
+        dtype 为None时按数据本身的dtype写出，否则每块单独转换为目标dtype和字节序后写出，
+        全程不会生成Python的list或tuple，也不会一次性复制整个数组
+        '''
+        arr = BufferExportHelper.as_buffer_array(data, dtype, byteorder)
+        target_dtype = arr.dtype if dtype is None else BufferExportHelper.get_buffer_dtype(dtype, byteorder)
+
+        if arr.size == 0:
+            return
+
+        chunk_size = max(1, BufferExportHelper.WRITE_CHUNK_BYTES // max(arr.itemsize, target_dtype.itemsize))
+        for start in range(0, arr.size, chunk_size):
+            chunk = arr[start:start + chunk_size]
+            if chunk.dtype != target_dtype:
+                chunk = chunk.astype(target_dtype)
+            file.write(numpy.ascontiguousarray(chunk).view(numpy.uint8).data)
+
+    @staticmethod
+    def write_buffer(data, buf_path: str, dtype=None, byteorder: str = '<'):
+        '''
+        统一的.buf写出接口，见 write_buffer_to_file
+        '''
+        buf_folder = os.path.dirname(buf_path)
+        if buf_folder:
+            os.makedirs(buf_folder, exist_ok=True)
+        with open(buf_path, 'wb') as file:
+            BufferExportHelper.write_buffer_to_file(file, data, dtype, byteorder)
+
     @staticmethod
     def write_category_buffer_files(category_buffer_dict: dict, draw_ib: str):
         GlobalConfig = BufferExportHelper._get_global_config()
         for category_name, category_buf in category_buffer_dict.items():
             buf_path = GlobalConfig.path_generatemod_buffer_folder() + draw_ib + "-" + category_name + ".buf"
-            with open(buf_path, 'wb') as ibf:
-                category_buf.tofile(ibf)
+            BufferExportHelper.write_buffer(category_buf, buf_path)
 
     @staticmethod
-    def write_buf_ib_r32_uint(index_list: list[int], buf_file_name: str):
+    def write_buf_ib_r32_uint(index_list, buf_file_name: str):
         GlobalConfig = BufferExportHelper._get_global_config()
         ib_path = os.path.join(GlobalConfig.path_generatemod_buffer_folder(), buf_file_name)
-        packed_data = struct.pack(f'<{len(index_list)}I', *index_list)
-        with open(ib_path, 'wb') as ibf:
-            ibf.write(packed_data)
+        BufferExportHelper.write_buffer(index_list, ib_path, numpy.uint32)
 
     @staticmethod
     def write_buf_shapekey_offsets(shapekey_offsets, filename: str):
         GlobalConfig = BufferExportHelper._get_global_config()
-        with open(GlobalConfig.path_generatemod_buffer_folder() + filename, 'wb') as file:
-            for number in shapekey_offsets:
-                data = struct.pack('i', number)
-                file.write(data)
+        BufferExportHelper.write_buffer(shapekey_offsets, GlobalConfig.path_generatemod_buffer_folder() + filename, numpy.int32, byteorder='=')
 
     @staticmethod
     def write_buf_shapekey_vertex_ids(shapekey_vertex_ids, filename: str):
         GlobalConfig = BufferExportHelper._get_global_config()
-        with open(GlobalConfig.path_generatemod_buffer_folder() + filename, 'wb') as file:
-            for number in shapekey_vertex_ids:
-                data = struct.pack('i', number)
-                file.write(data)
+        BufferExportHelper.write_buffer(shapekey_vertex_ids, GlobalConfig.path_generatemod_buffer_folder() + filename, numpy.int32, byteorder='=')
 
     @staticmethod
     def write_buf_shapekey_vertex_offsets(shapekey_vertex_offsets, filename: str):
         GlobalConfig = BufferExportHelper._get_global_config()
-        float_array = numpy.array(shapekey_vertex_offsets, dtype=numpy.float32)
-        float_array = float_array.astype(numpy.float16)
-        with open(GlobalConfig.path_generatemod_buffer_folder() + filename, 'wb') as file:
-            float_array.tofile(file)
+        # 和以前一样先转float32再分块转float16，保证输出的字节不变
+        float_array = numpy.asarray(shapekey_vertex_offsets, dtype=numpy.float32)
+        BufferExportHelper.write_buffer(float_array, GlobalConfig.path_generatemod_buffer_folder() + filename, numpy.float16, byteorder='=')
 
     @staticmethod
     def write_buf_blendindices_uint16(blendindices, filename: str):
@@ -59,12 +113,5 @@ class BufferExportHelper:
         arr = numpy.asarray(blendindices)
         if arr.dtype.names:
             arr = arr[arr.dtype.names[0]]
-        if arr.ndim > 1:
-            arr_to_write = arr.reshape(-1)
-        else:
-            arr_to_write = arr
-        arr_uint16 = arr_to_write.astype(numpy.uint16)
         out_path = os.path.join(GlobalConfig.path_generatemod_buffer_folder(), filename)
-        os.makedirs(os.path.dirname(out_path), exist_ok=True)
-        with open(out_path, 'wb') as f:
-            arr_uint16.tofile(f)
+        BufferExportHelper.write_buffer(arr, out_path, numpy.uint16, byteorder='=')
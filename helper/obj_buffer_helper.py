@@ -1,4 +1,3 @@
-import collections
 from ..base.d3d11_gametype import D3D11GameType
 from ..base.fatal import Fatal
 
@@ -568,79 +567,129 @@ class ObjBufferHelper:
     
 
     @staticmethod
-    def calc_index_vertex_buffer_wwmi_v2(
-        mesh:bpy.types.Mesh, 
-        element_vertex_ndarray:numpy.ndarray, 
-        dtype:numpy.dtype,
-        d3d11_game_type:D3D11GameType):
+    def _get_loop_vertex_indices(mesh:bpy.types.Mesh) -> numpy.ndarray:
+        loop_vertex_indices = numpy.empty(len(mesh.loops), dtype=int)
+        mesh.loops.foreach_get("vertex_index", loop_vertex_indices)
+        return loop_vertex_indices
+
+    @staticmethod
+    def _get_polygon_loop_order(mesh:bpy.types.Mesh) -> numpy.ndarray:
         '''
-        - 用 numpy 将结构化顶点视图为一行字节，避免逐顶点 bytes() 与 dict 哈希。
-        - 使用 numpy.unique(..., axis=0, return_index=True, return_inverse=True) 在 C 层完成唯一化与逆映射。
-        - 仅在构建 per-polygon IB 时使用少量 Python 切片，整体效率大幅提高。
-        - 当 structured dtype 非连续时，内部会做一次拷贝（ascontiguousarray）；通常开销小于逐顶点哈希开销。
+        按 polygon 顺序展开后的 loop 索引序列，等价于：
+        for poly in mesh.polygons: for loop_index in range(poly.loop_start, poly.loop_start + poly.loop_total)
+        绝大多数情况下就是 arange(n_loops)，此时调用方可以跳过一次花式索引。
         '''
+        n_polys = len(mesh.polygons)
+        loop_starts = numpy.empty(n_polys, dtype=int)
+        loop_totals = numpy.empty(n_polys, dtype=int)
+        mesh.polygons.foreach_get("loop_start", loop_starts)
+        mesh.polygons.foreach_get("loop_total", loop_totals)
 
-        # (1) loop -> vertex mapping
-        loops = mesh.loops
-        n_loops = len(loops)
-        loop_vertex_indices = numpy.empty(n_loops, dtype=int)
-        loops.foreach_get("vertex_index", loop_vertex_indices)
+        total = int(loop_totals.sum())
+        poly_offsets = numpy.cumsum(loop_totals) - loop_totals
+        return numpy.repeat(loop_starts - poly_offsets, loop_totals) + numpy.arange(total, dtype=int)
 
-        # (2) 将 element_vertex_ndarray 保证为连续，并视为 (n_loops, row_bytes) uint8 矩阵
+    @staticmethod
+    def _dedup_loop_rows(
+        element_vertex_ndarray:numpy.ndarray,
+        loop_order:numpy.ndarray = None,
+        loop_vertex_indices:numpy.ndarray = None):
+        '''
+        统一的 IB/VB 去重引擎，所有游戏类型共用。
+        - 每个 loop 的结构化数据视为一行字节，如果传入 loop_vertex_indices 则在行尾追加 4 字节的 VertexId 一起参与唯一化。
+        - 行宽补齐到 8 字节的倍数后视为 uint64 记录，交给 numpy.unique 在 C 层完成唯一化与逆映射。
+        - 唯一结果按首次出现顺序重新编号，与旧的 OrderedDict.setdefault 写法输出完全一致。
+
+        返回:
+        - row_bytes: (n_loops, itemsize) 的 uint8 矩阵，按 loop 索引排列
+        - unique_loop_indices: 每个唯一顶点首次出现时对应的 loop 索引，按首次出现顺序排列
+        - inverse: 按 loop_order 顺序排列的每个 loop 对应的唯一顶点编号，也就是展开后的 IB
+        '''
         vb = numpy.ascontiguousarray(element_vertex_ndarray)
+        n_loops = vb.shape[0]
         row_size = vb.dtype.itemsize
         try:
             row_bytes = vb.view(numpy.uint8).reshape(n_loops, row_size)
         except Exception:
-            raw = vb.tobytes()
-            row_bytes = numpy.frombuffer(raw, dtype=numpy.uint8).reshape(n_loops, row_size)
-
-        # WWMI-Tools deduplicates loop rows including the loop's VertexId -> they
-        # effectively perform uniqueness on loop attributes + VertexId treated as
-        # a field. To replicate that reliably (preserving structured field layout
-        # and alignment) we build a structured array that copies all existing
-        # fields and appends a 'VERTEXID' uint32 field, then call numpy.unique on it.
-        # Afterwards we select unique rows from the original `row_bytes` using
-        # the indices returned by numpy.unique to preserve exact original layout.
-
-        # Build 4-byte vertex index array (little-endian) and concatenate to row bytes
-        # to form combined rows: [row_bytes | vid_bytes]. Use numpy.unique on combined
-        # rows to get uniqueness, then reorder unique results to match insertion
-        # order (first occurrence). This vectorized path keeps behavior identical
-        # to the OrderedDict+bytes approach but runs much faster in numpy.
-        # Build 4-byte vertex index array (little-endian)
-        vid_bytes = loop_vertex_indices.astype(numpy.uint32).view(numpy.uint8).reshape(n_loops, 4)
-
-        # Combine row bytes + vid bytes, but to make numpy.unique faster we pad the
-        # combined row to a multiple of 8 bytes and view it as uint64 blocks.
-        total_bytes = row_size + 4
-        pad = (-total_bytes) % 8
-        padded_width = total_bytes + pad
-
-        # Allocate padded combined buffer and fill
-        combined_padded = numpy.zeros((n_loops, padded_width), dtype=numpy.uint8)
-        combined_padded[:, :row_size] = row_bytes
-        combined_padded[:, row_size:row_size+4] = vid_bytes
-
-        # View as uint64 blocks (shape: n_loops x n_blocks)
-        n_blocks = padded_width // 8
-        combined_u64 = combined_padded.view(numpy.uint64).reshape(n_loops, n_blocks)
+            row_bytes = numpy.frombuffer(vb.tobytes(), dtype=numpy.uint8).reshape(n_loops, row_size)
 
-        # Create a structured view so numpy.unique treats each row as a single record
-        dtype_descr = [(f'f{i}', numpy.uint64) for i in range(n_blocks)]
-        structured = combined_u64.view(numpy.dtype(dtype_descr)).reshape(n_loops)
+        if loop_order is None:
+            loop_order = numpy.arange(n_loops, dtype=int)
 
-        unique_struct, unique_first_indices, inverse = numpy.unique(
-            structured, return_index=True, return_inverse=True
-        )
+        key_size = row_size + (4 if loop_vertex_indices is not None else 0)
+        padded_width = key_size + (-key_size) % 8
+
+        # 直接按 loop_order 的顺序填充 key，这样 numpy.unique 返回的首次出现位置就是 IB 中的首次出现位置
+        key_padded = numpy.zeros((len(loop_order), padded_width), dtype=numpy.uint8)
+        key_padded[:, :row_size] = row_bytes[loop_order]
+        if loop_vertex_indices is not None:
+            vid = loop_vertex_indices[loop_order].astype('<u4')
+            key_padded[:, row_size:row_size + 4] = vid.view(numpy.uint8).reshape(-1, 4)
+
+        n_blocks = padded_width // 8
+        key_struct = key_padded.view(numpy.uint64).view(
+            numpy.dtype([(f'f{i}', numpy.uint64) for i in range(n_blocks)])
+        ).reshape(len(loop_order))
+
+        _, unique_first_positions, inverse = numpy.unique(key_struct, return_index=True, return_inverse=True)
+        inverse = inverse.reshape(-1)
 
         # Remap unique ids to insertion order (first occurrence order)
-        order = numpy.argsort(unique_first_indices)
+        order = numpy.argsort(unique_first_positions, kind='stable')
         new_id = numpy.empty_like(order)
         new_id[order] = numpy.arange(len(order), dtype=new_id.dtype)
-        inverse = new_id[inverse]
+        inverse = new_id[inverse].astype(numpy.int32)
 
-        unique_first_indices_insertion = unique_first_indices[order]
+        unique_loop_indices = loop_order[unique_first_positions[order]]
+        return row_bytes, unique_loop_indices, inverse
+
+    @staticmethod
+    def _flip_triangle_winding(flat_ib:numpy.ndarray) -> numpy.ndarray:
+        '''
+        每 3 个索引为一组倒序排列，末尾不足 3 个的残余部分同样倒序，和旧的逐三角形切片写法结果一致。
+        '''
+        flat_ib = numpy.asarray(flat_ib)
+        full_size = flat_ib.size - flat_ib.size % 3
+        flipped = numpy.empty_like(flat_ib)
+        flipped[:full_size] = flat_ib[:full_size].reshape(-1, 3)[:, ::-1].reshape(-1)
+        flipped[full_size:] = flat_ib[full_size:][::-1]
+        return flipped
+
+    @staticmethod
+    def _split_category_buffer(unique_rows:numpy.ndarray, d3d11_game_type:D3D11GameType) -> dict:
+        category_buffer_dict = {}
+        for categoryname, category_stride in d3d11_game_type.CategoryStrideDict.items():
+            stride_offset = d3d11_game_type.CategoryByteOffsetDict[categoryname]
+            category_buffer_dict[categoryname] = unique_rows[:, stride_offset:stride_offset + category_stride].flatten()
+        return category_buffer_dict
+
+    @staticmethod
+    def _as_row_bytes(indexed_vertices:numpy.ndarray) -> numpy.ndarray:
+        indexed_vertices = numpy.ascontiguousarray(indexed_vertices)
+        return indexed_vertices.view(numpy.uint8).reshape(len(indexed_vertices), indexed_vertices.dtype.itemsize)
+
+    @staticmethod
+    def calc_index_vertex_buffer_wwmi_v2(
+        mesh:bpy.types.Mesh, 
+        element_vertex_ndarray:numpy.ndarray, 
+        dtype:numpy.dtype,
+        d3d11_game_type:D3D11GameType):
+        '''
+        - 用 numpy 将结构化顶点视图为一行字节，避免逐顶点 bytes() 与 dict 哈希。
+        - 使用 numpy.unique(..., axis=0, return_index=True, return_inverse=True) 在 C 层完成唯一化与逆映射。
+        - 仅在构建 per-polygon IB 时使用少量 Python 切片，整体效率大幅提高。
+        - 当 structured dtype 非连续时，内部会做一次拷贝（ascontiguousarray）；通常开销小于逐顶点哈希开销。
+        '''
+
+        # (1) loop -> vertex mapping
+        loop_vertex_indices = ObjBufferHelper._get_loop_vertex_indices(mesh)
+
+        # (2) WWMI-Tools deduplicates loop rows including the loop's VertexId,
+        # so the VertexId takes part in the uniqueness key.
+        row_bytes, unique_first_indices_insertion, inverse = ObjBufferHelper._dedup_loop_rows(
+            element_vertex_ndarray,
+            loop_vertex_indices=loop_vertex_indices,
+        )
 
         # Pick original unique rows from row_bytes using insertion-ordered indices
         unique_rows = row_bytes[unique_first_indices_insertion]
@@ -673,36 +722,44 @@ class ObjBufferHelper:
         original_vertex_ids = loop_vertex_indices[unique_first_indices_insertion]
         index_vertex_id_dict = dict(enumerate(original_vertex_ids.astype(int).tolist()))
 
-        # (4) 为每个 polygon 构建 IB（使用 inverse 映射）
-        # inverse is already ordered by loops; concatenating polygon slices in
-        # polygon order is equivalent to taking inverse in sequence.
-        flattened_ib_arr = inverse.astype(numpy.int32)
+        # (4) inverse 已经按 loop 顺序排列，直接就是展开后的 IB
+        flattened_ib_arr = inverse
 
         # (5) 按 category 从 unique_rows 切分 bytes 序列
-        category_stride_dict = d3d11_game_type.get_real_category_stride_dict()
-        category_buffer_dict = {}
-        stride_offset = 0
-        for cname, cstride in category_stride_dict.items():
-            category_buffer_dict[cname] = unique_rows[:, stride_offset:stride_offset + cstride].flatten()
-            stride_offset += cstride
+        category_buffer_dict = ObjBufferHelper._split_category_buffer(unique_rows, d3d11_game_type)
 
         # (6) 翻转三角形方向（高效）
         # 鸣潮需要翻转这一下
-        flat_arr = flattened_ib_arr
-        if flat_arr.size % 3 == 0:
-            flipped = flat_arr.reshape(-1, 3)[:, ::-1].flatten().tolist()
-        else:
-            # Rare irregular case: fallback to python loop on numpy array
-            flipped = []
-            iarr = flat_arr.tolist()
-            for i in range(0, len(iarr), 3):
-                tri = iarr[i:i + 3]
-                flipped.extend(tri[::-1])
+        flipped = ObjBufferHelper._flip_triangle_winding(flattened_ib_arr).tolist()
 
         ib = flipped
         return ib, category_buffer_dict, index_vertex_id_dict, unique_element_vertex_ndarray,unique_first_loop_indices
 
 
+    @staticmethod
+    def _group_by_position(positions:numpy.ndarray):
+        '''
+        把完全相同的位置分为一组，返回 (每个顶点所在的组编号, 组数)
+        位置的每一行打包成一个定长字节键交给 numpy.unique，和逐个比较坐标值的结果一致：
+        加 0 把 -0.0 统一成 0.0，因为两者数值相等但字节不同
+        '''
+        positions = numpy.ascontiguousarray(positions)
+        positions = positions.reshape(len(positions), -1) + positions.dtype.type(0)
+        position_keys = positions.view(numpy.dtype((numpy.void, positions.dtype.itemsize * positions.shape[1]))).reshape(-1)
+        unique_keys, position_indices = numpy.unique(position_keys, return_inverse=True)
+        return position_indices.reshape(-1), len(unique_keys)
+
+    @staticmethod
+    def _sum_by_group(values:numpy.ndarray, group_indices:numpy.ndarray, group_count:int) -> numpy.ndarray:
+        '''
+        按组累加每一列，bincount 按顶点顺序累加，和逐顶点相加的结果一致
+        '''
+        values = numpy.asarray(values, dtype=float).reshape(len(group_indices), -1)
+        accumulated = numpy.empty((group_count, values.shape[1]), dtype=float)
+        for column in range(values.shape[1]):
+            accumulated[:, column] = numpy.bincount(group_indices, weights=values[:, column], minlength=group_count)
+        return accumulated
+
     @staticmethod
     def average_normal_color(obj,indexed_vertices,d3d11GameType:D3D11GameType,dtype):
         '''
@@ -721,52 +778,21 @@ class ObjBufferHelper:
         # 开始重计算COLOR
         TimerUtils.Start("Recalculate COLOR")
 
-        # 不用担心这个转换的效率，速度非常快
-        vb = bytearray()
-        for vertex in indexed_vertices:
-            vb += bytes(vertex)
-        vb = numpy.frombuffer(vb, dtype = dtype)
-
-        # 首先提取所有唯一的位置，并创建一个索引映射
-        unique_positions, position_indices = numpy.unique(
-            [tuple(val['POSITION']) for val in vb], 
-            return_inverse=True, 
-            axis=0
-        )
-
-        # 初始化累积法线和计数器为零
-        accumulated_normals = numpy.zeros((len(unique_positions), 3), dtype=float)
-        counts = numpy.zeros(len(unique_positions), dtype=int)
+        # indexed_vertices 是去重后的结构化数组，这里复制一份再原地修改
+        vb = numpy.array(indexed_vertices, dtype=dtype, copy=True)
 
-        # 累加法线并增加计数（这里假设vb是一个list）
-        for i, val in enumerate(vb):
-            accumulated_normals[position_indices[i]] += numpy.array(val['NORMAL'], dtype=float)
-            counts[position_indices[i]] += 1
+        # 按位置分组，累加每组的法线后求算术平均
+        position_indices, position_count = ObjBufferHelper._group_by_position(vb['POSITION'])
+        accumulated_normals = ObjBufferHelper._sum_by_group(vb['NORMAL'][:, :3], position_indices, position_count)
+        counts = numpy.bincount(position_indices, minlength=position_count)
+        average_normals = accumulated_normals / counts[:, None]
 
-        # 对所有位置的法线进行一次性规范化处理
-        mask = counts > 0
-        average_normals = numpy.zeros_like(accumulated_normals)
-        average_normals[mask] = (accumulated_normals[mask] / counts[mask][:, None])
+        # 归一化到[0,1]，然后映射到颜色值，保留原来的Alpha通道
+        new_color_array = numpy.zeros((len(vb), 4), dtype=numpy.uint8)
+        new_color_array[:, :3] = ((average_normals + 1) / 2 * 255).astype(numpy.uint8)[position_indices]
+        new_color_array[:, 3] = numpy.asarray(vb['COLOR'][:, 3]).astype(numpy.uint8)
 
-        # 归一化到[0,1]，然后映射到颜色值
-        normalized_normals = ((average_normals + 1) / 2 * 255).astype(numpy.uint8)
-
-        # 更新颜色信息
-        new_color = []
-        for i, val in enumerate(vb):
-            color = [0, 0, 0, val['COLOR'][3]]  # 保留原来的Alpha通道
-            
-            if mask[position_indices[i]]:
-                color[:3] = normalized_normals[position_indices[i]]
-
-            new_color.append(color)
-
-        # 将新的颜色列表转换为NumPy数组
-        new_color_array = numpy.array(new_color, dtype=numpy.uint8)
-
-        # 更新vb中的颜色信息
-        for i, val in enumerate(vb):
-            val['COLOR'] = new_color_array[i]
+        vb['COLOR'] = new_color_array
 
         TimerUtils.End("Recalculate COLOR")
         return vb
@@ -793,44 +819,18 @@ class ObjBufferHelper:
         if not allow_calc:
             return indexed_vertices
         
-        # 不用担心这个转换的效率，速度非常快
-        vb = bytearray()
-        for vertex in indexed_vertices:
-            vb += bytes(vertex)
-        vb = numpy.frombuffer(vb, dtype = dtype)
-
-        # 开始重计算TANGENT
-        positions = numpy.array([val['POSITION'] for val in vb])
-        normals = numpy.array([val['NORMAL'] for val in vb], dtype=float)
-
-        # 对位置进行排序，以便相同的位置会相邻
-        sort_indices = numpy.lexsort(positions.T)
-        sorted_positions = positions[sort_indices]
-        sorted_normals = normals[sort_indices]
-
-        # 找出位置变化的地方，即我们需要分组的地方
-        group_indices = numpy.flatnonzero(numpy.any(sorted_positions[:-1] != sorted_positions[1:], axis=1))
-        group_indices = numpy.r_[0, group_indices + 1, len(sorted_positions)]
-
-        # 累加法线和计算计数
-        unique_positions = sorted_positions[group_indices[:-1]]
-        accumulated_normals = numpy.add.reduceat(sorted_normals, group_indices[:-1], axis=0)
-        counts = numpy.diff(group_indices)
-
-        # 归一化累积法线向量
-        normalized_normals = accumulated_normals / numpy.linalg.norm(accumulated_normals, axis=1)[:, numpy.newaxis]
-        normalized_normals[numpy.isnan(normalized_normals)] = 0  # 处理任何可能出现的零向量导致的除零错误
+        # indexed_vertices 是去重后的结构化数组，这里复制一份再原地修改
+        vb = numpy.array(indexed_vertices, dtype=dtype, copy=True)
 
-        # 构建结果字典
-        position_normal_dict = dict(zip(map(tuple, unique_positions), normalized_normals))
+        # 开始重计算TANGENT：按位置分组累加法线，归一化后写回每个顶点
+        position_indices, position_count = ObjBufferHelper._group_by_position(vb['POSITION'])
+        accumulated_normals = ObjBufferHelper._sum_by_group(vb['NORMAL'][:, :3], position_indices, position_count)
 
-        # TimerUtils.End("Recalculate TANGENT")
-
-        # 获取所有位置并转换为元组，用于查找字典
-        positions = [tuple(pos) for pos in vb['POSITION']]
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            normalized_normals = accumulated_normals / numpy.linalg.norm(accumulated_normals, axis=1)[:, numpy.newaxis]
+        normalized_normals[numpy.isnan(normalized_normals)] = 0  # 处理任何可能出现的零向量导致的除零错误
 
-        # 从字典中获取对应的标准化法线
-        normalized_normals = numpy.array([position_normal_dict[pos] for pos in positions])
+        normalized_normals = normalized_normals[position_indices]
 
         # 计算 w 并调整 tangent 的第四个分量
         w = numpy.where(vb['TANGENT'][:, 3] >= 0, -1.0, 1.0)
@@ -855,15 +855,12 @@ class ObjBufferHelper:
         # TimerUtils.Start("Calc IB VB")
         # (1) 统计模型的索引和唯一顶点
         '''
-        不保持相同顶点时，仍然使用经典而又快速的方法
+        不保持相同顶点时，仅以数据内容作为唯一标识
         '''
         # print("calc ivb universal")
-        indexed_vertices = collections.OrderedDict()
-        ib = [[indexed_vertices.setdefault(element_vertex_ndarray[blender_lvertex.index].tobytes(), len(indexed_vertices))
-                for blender_lvertex in mesh.loops[poly.loop_start:poly.loop_start + poly.loop_total]
-                    ]for poly in mesh.polygons] 
-            
-        flattened_ib = [item for sublist in ib for item in sublist]
+        loop_order = ObjBufferHelper._get_polygon_loop_order(mesh)
+        row_bytes, unique_loop_indices, flattened_ib = ObjBufferHelper._dedup_loop_rows(element_vertex_ndarray, loop_order=loop_order)
+        indexed_vertices = numpy.ascontiguousarray(row_bytes[unique_loop_indices]).view(dtype).reshape(-1)
         # TimerUtils.End("Calc IB VB")
 
         # 重计算TANGENT步骤
@@ -872,38 +869,14 @@ class ObjBufferHelper:
         # 重计算COLOR步骤
         indexed_vertices = ObjBufferHelper.average_normal_color(obj=obj, indexed_vertices=indexed_vertices, d3d11GameType=d3d11GameType,dtype=dtype)
 
-        # print("indexed_vertices:")
-        # print(str(len(indexed_vertices)))
-
         # (2) 转换为CategoryBufferDict
-        # TimerUtils.Start("Calc CategoryBuffer")
-        category_stride_dict = d3d11GameType.get_real_category_stride_dict()
-        category_buffer_dict:dict[str,list] = {}
-        for categoryname,category_stride in d3d11GameType.CategoryStrideDict.items():
-            category_buffer_dict[categoryname] = []
-
-        data_matrix = numpy.array([numpy.frombuffer(byte_data,dtype=numpy.uint8) for byte_data in indexed_vertices])
-        stride_offset = 0
-        for categoryname,category_stride in category_stride_dict.items():
-            category_buffer_dict[categoryname] = data_matrix[:,stride_offset:stride_offset + category_stride].flatten()
-            stride_offset += category_stride
-
-        ib = flattened_ib
+        category_buffer_dict = ObjBufferHelper._split_category_buffer(ObjBufferHelper._as_row_bytes(indexed_vertices), d3d11GameType)
+
         if GlobalConfig.logic_name == LogicName.YYSLS:
             print("导出时翻转面朝向")
+            flattened_ib = ObjBufferHelper._flip_triangle_winding(flattened_ib)
 
-            flipped_indices = []
-            # print(flattened_ib[0],flattened_ib[1],flattened_ib[2])
-            for i in range(0, len(flattened_ib), 3):
-                triangle = flattened_ib[i:i+3]
-                flipped_triangle = triangle[::-1]
-                flipped_indices.extend(flipped_triangle)
-            # print(flipped_indices[0],flipped_indices[1],flipped_indices[2])
-            ib = flipped_indices
-
-
-        
-        category_buffer_dict = category_buffer_dict
+        ib = flattened_ib.tolist()
         index_vertex_id_dict = None
 
         return ib,category_buffer_dict,index_vertex_id_dict
@@ -932,66 +905,57 @@ class ObjBufferHelper:
         
         1. Blender 的“顶点数”= mesh.vertices 长度，只要位置不同就算一个。
         2. 我们预分配同样长度的盒子列表，盒子下标 == 顶点下标，保证一一对应。
-        3. 遍历 loop 时，把真实数据写进对应盒子；没人引用的盒子留 dummy（坐标填对，其余 0）。
-        4. 最后按盒子顺序打包成字节数组，长度必然与 mesh.vertices 相同，导出数就能和 Blender 状态栏完全一致。
+        3. 把 loop 的真实数据批量写进对应盒子；没人引用的盒子留 dummy（坐标填对，其余 0）。
+        4. 盒子本身就是连续的结构化数组，按行切分即可，长度必然与 mesh.vertices 相同，导出数就能和 Blender 状态栏完全一致。
         '''
         print("calc ivb gf2")
 
-        loops = mesh.loops
+        element_vertex_ndarray = numpy.ascontiguousarray(element_vertex_ndarray)
+        n_loops = len(element_vertex_ndarray)
         v_cnt = len(mesh.vertices)
-        loop_vidx = numpy.empty(len(loops), dtype=int)
-        loops.foreach_get("vertex_index", loop_vidx)
-
-        # 1. 预分配：每条 Blender 顶点一条记录，先填“空”
-        dummy = numpy.zeros(1, dtype=element_vertex_ndarray.dtype)
-        vertex_buffer = [dummy.copy() for _ in range(v_cnt)]   # list[ndarray]
-        # 2. 标记哪些顶点被 loop 真正用到
+        loop_vidx = ObjBufferHelper._get_loop_vertex_indices(mesh)
+
+        # 1. 同一个 (POSITION, NORMAL) 共享第一次出现的 TANGENT：
+        #    只用这两个字段组成紧凑的 key 交给统一的去重引擎，得到每个 loop 应该使用哪个 loop 的 TANGENT
+        tangent_source_loop = numpy.arange(n_loops)
+        element_names = element_vertex_ndarray.dtype.names
+        if 'TANGENT' in element_names and 'POSITION' in element_names and 'NORMAL' in element_names:
+            key_dtype = numpy.dtype([
+                ('POSITION', element_vertex_ndarray.dtype.fields['POSITION'][0]),
+                ('NORMAL', element_vertex_ndarray.dtype.fields['NORMAL'][0]),
+            ])
+            pn_key = numpy.empty(n_loops, dtype=key_dtype)
+            # 加 0 把 -0.0 统一成 0.0，和按数值比较的结果一致
+            pn_key['POSITION'] = element_vertex_ndarray['POSITION'] + 0
+            pn_key['NORMAL'] = element_vertex_ndarray['NORMAL'] + 0
+            _, first_loop_indices, pn_inverse = ObjBufferHelper._dedup_loop_rows(pn_key)
+            tangent_source_loop = first_loop_indices[pn_inverse]
+
+        # 2. 每条 Blender 顶点一条记录，盒子下标 == 顶点下标；多个 loop 指向同一个顶点时，最后一个 loop 的数据生效
+        vertex_buffer = numpy.zeros(v_cnt, dtype=element_vertex_ndarray.dtype)
+        used_vertex_indices, reversed_first = numpy.unique(loop_vidx[::-1], return_index=True)
+        last_loop_indices = n_loops - 1 - reversed_first
+        vertex_buffer[used_vertex_indices] = element_vertex_ndarray[last_loop_indices]
+        if 'TANGENT' in element_names:
+            vertex_buffer['TANGENT'][used_vertex_indices] = element_vertex_ndarray['TANGENT'][tangent_source_loop[last_loop_indices]]
+
+        # 3. 没有被 loop 引用的“死顶点”只填位置，其余字段保持 0
         used_mask = numpy.zeros(v_cnt, dtype=bool)
-        used_mask[loop_vidx] = True
-
-        # 3. 共享 TANGENT 字典
-        pos_normal_key = {}   # (position_tuple, normal_tuple) -> tangent
-
-        # 4. 先给“被用到”的顶点填真实数据
-        for lp in loops:
-            v_idx = lp.vertex_index
-            if used_mask[v_idx]:          # 其实恒为 True，留着可读性
-                data = element_vertex_ndarray[lp.index].copy()
-                pn_key = (tuple(data['POSITION']), tuple(data['NORMAL']))
-                if pn_key in pos_normal_key:
-                    data['TANGENT'] = pos_normal_key[pn_key]
-                else:
-                    pos_normal_key[pn_key] = data['TANGENT']
-                vertex_buffer[v_idx] = data
+        used_mask[used_vertex_indices] = True
+        if not used_mask.all():
+            vertex_co = numpy.empty(v_cnt * 3, dtype=numpy.float32)
+            mesh.vertices.foreach_get("co", vertex_co)
+            vertex_buffer['POSITION'][~used_mask] = vertex_co.reshape(-1, 3)[~used_mask]
 
-        # 5. 给“死顶点”也填上 dummy，但位置必须对
-        for v_idx in range(v_cnt):
-            if not used_mask[v_idx]:
-                vertex_buffer[v_idx]['POSITION'] = mesh.vertices[v_idx].co
-                # 其余字段保持 0
+        # 4. 按 polygon 顺序展开 loop 的顶点索引，就是索引缓冲（IB）
+        loop_order = ObjBufferHelper._get_polygon_loop_order(mesh)
+        flattened_ib = loop_vidx[loop_order]
 
-        # 6. 现在 vertex_buffer 长度 == v_cnt，直接转 bytes 即可
-        indexed_vertices = [arr.tobytes() for arr in vertex_buffer]
-
-        # 7. 重建索引缓冲（IB）
-        ib = []
-        for poly in mesh.polygons:
-            ib.append([v_idx for lp in loops[poly.loop_start:poly.loop_start + poly.loop_total]
-                    for v_idx in [lp.vertex_index]])
-
-        flattened_ib = [i for sub in ib for i in sub]
-
-        # 8. 拆 CategoryBuffer
-        category_stride_dict = d3d11_game_type.get_real_category_stride_dict()
+        # 5. 拆 CategoryBuffer，长度必然与 mesh.vertices 相同
         category_buffer_dict = {name: [] for name in d3d11_game_type.CategoryStrideDict}
-        data_matrix = numpy.array([numpy.frombuffer(b, dtype=numpy.uint8) for b in indexed_vertices])
-        stride_offset = 0
-        for name, stride in category_stride_dict.items():
-            category_buffer_dict[name] = data_matrix[:, stride_offset:stride_offset + stride].flatten()
-            stride_offset += stride
-
-        # print("长度：", v_cnt)          
-        ib = flattened_ib
+        category_buffer_dict.update(ObjBufferHelper._split_category_buffer(ObjBufferHelper._as_row_bytes(vertex_buffer), d3d11_game_type))
+
+        ib = flattened_ib.tolist()
         index_vertex_id_dict = None
 
         return ib, category_buffer_dict, index_vertex_id_dict
@@ -1029,80 +993,39 @@ class ObjBufferHelper:
         # 统一逻辑：始终将 (数据 + 顶点索引) 作为唯一标识
         # 1. 彻底解决 ShapeKey 问题：防止 Basis 中重合但在 Morph 中分离的顶点被错误合并。
         # 2. 保持拓扑结构：确保 Blender 中不同的点导出后依然是不同的点。
-        unique_map = collections.OrderedDict()
-        
+        # 按 polygon 顺序遍历 loop，唯一顶点编号按首次出现顺序分配
+        loop_order = ObjBufferHelper._get_polygon_loop_order(mesh)
+        loop_vertex_indices = ObjBufferHelper._get_loop_vertex_indices(mesh)
+        row_bytes, unique_loop_indices, flattened_ib = ObjBufferHelper._dedup_loop_rows(
+            element_vertex_ndarray,
+            loop_order=loop_order,
+            loop_vertex_indices=loop_vertex_indices,
+        )
+
         # KEY: unique_vertex_index (buffer index), VALUE: first_loop_index
         # 记录每一个生成的 Buffer 顶点对应的是哪一个原始 Loop
         # 这对于 Shape Key 的法线导出至关重要，因为法线是存储在 Loop 上的
-        unique_loop_map = {} 
-
-        ib = []
-        for poly in mesh.polygons:
-            poly_indices = []
-            for loop_index in range(poly.loop_start, poly.loop_start + poly.loop_total):
-                loop = mesh.loops[loop_index]
-                data = element_vertex_ndarray[loop.index].tobytes()
-                
-                # 核心：Key 始终包含 vertex_index (data, index)
-                # 这样只有当 "数据完全一致" 且 "是同一个顶点(仅因硬边/UV断开)" 时才会共用索引
-                key = (data, loop.vertex_index)
-                
-                if key in unique_map:
-                    idx = unique_map[key]
-                else:
-                    idx = len(unique_map)
-                    unique_map[key] = idx
-                    unique_loop_map[idx] = loop.index
-                
-                poly_indices.append(idx)
-            ib.append(poly_indices)
-        
-        # 提取 vertex buffer 需要的数据 (也就是 key 中的 data 部分)
-        # vertex_data_list = [k[0] for k in unique_map.keys()]
-
-        # 同时构建 index -> blender_loop_index 的映射
-        # 这对于后续生成 ShapeKey Buffer 至关重要，因为我们需要知道当前生成的第 i 个点对应 Blender 的哪个 Loop
         # Loop Index 可进一步转换为 Vertex Index，但 Vertex Index 无法反推唯一的 Loop Index (Split Normals)
-        vertex_data_list = []
-        for i, (data_bytes, blender_v_idx) in enumerate(unique_map.keys()):
-            vertex_data_list.append(data_bytes)
-        
-        index_loop_id_dict = unique_loop_map
+        index_loop_id_dict = dict(enumerate(unique_loop_indices.tolist()))
 
-        flattened_ib = [item for sublist in ib for item in sublist]
+        indexed_vertices = numpy.ascontiguousarray(row_bytes[unique_loop_indices]).view(dtype).reshape(-1)
         # TimerUtils.End("Calc IB VB")
 
         # 重计算TANGENT步骤
-        indexed_vertices = ObjBufferHelper.average_normal_tangent(obj=obj, indexed_vertices=vertex_data_list, d3d11GameType=d3d11_game_type,dtype=dtype)
+        indexed_vertices = ObjBufferHelper.average_normal_tangent(obj=obj, indexed_vertices=indexed_vertices, d3d11GameType=d3d11_game_type,dtype=dtype)
         
         # 重计算COLOR步骤
         indexed_vertices = ObjBufferHelper.average_normal_color(obj=obj, indexed_vertices=indexed_vertices, d3d11GameType=d3d11_game_type,dtype=dtype)
 
         # (2) 转换为CategoryBufferDict
-        # TimerUtils.Start("Calc CategoryBuffer")
-        category_stride_dict = d3d11_game_type.get_real_category_stride_dict()
-        category_buffer_dict:dict[str,list] = {}
-        for categoryname,category_stride in d3d11_game_type.CategoryStrideDict.items():
-            category_buffer_dict[categoryname] = []
-
-        data_matrix = numpy.array([numpy.frombuffer(byte_data,dtype=numpy.uint8) for byte_data in indexed_vertices])
-        stride_offset = 0
-        for categoryname,category_stride in category_stride_dict.items():
-            category_buffer_dict[categoryname] = data_matrix[:,stride_offset:stride_offset + category_stride].flatten()
-            stride_offset += category_stride
+        category_buffer_dict = ObjBufferHelper._split_category_buffer(ObjBufferHelper._as_row_bytes(indexed_vertices), d3d11_game_type)
 
-        # 设置ib，准备返回
-        ib = flattened_ib
         # YYSLS是目前除了鸣潮外，唯一需要翻转面朝向的游戏
         if GlobalConfig.logic_name == LogicName.YYSLS:
-            flipped_indices = []
-            # print(flattened_ib[0],flattened_ib[1],flattened_ib[2])
-            for i in range(0, len(flattened_ib), 3):
-                triangle = flattened_ib[i:i+3]
-                flipped_triangle = triangle[::-1]
-                flipped_indices.extend(flipped_triangle)
-            # print(flipped_indices[0],flipped_indices[1],flipped_indices[2])
-            ib = flipped_indices
+            flattened_ib = ObjBufferHelper._flip_triangle_winding(flattened_ib)
+
+        # 设置ib，准备返回
+        ib = flattened_ib.tolist()
 
         return ib, category_buffer_dict,index_loop_id_dict
       
\ No newline at end of file
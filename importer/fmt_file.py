@@ -1,4 +1,5 @@
 from ..base.d3d11_element import D3D11Element
+from ..base.d3d11_gametype import D3D11GameTypeRegistry
 from ..utils.format_utils import FormatUtils
 import numpy
 
@@ -85,7 +86,7 @@ class FMTFile:
         fields = []
         for elemnt in self.elements:
             # Numpy类型由Format决定，此时即使是WWMI的特殊R8_UINT也能得到正确的numpy.uint8
-            numpy_type = FormatUtils.get_nptype_from_format(elemnt.Format)
+            numpy_type = D3D11GameTypeRegistry.get_nptype_from_format(elemnt.Format)
             
             # 这里我们用ByteWidth / numpy_type.itemsize 得到总的维度数量，也就是列数
             # XXX 注意这里计算出正常Size的前提是numpy_type确定是对应真实的字节数，且ByteWidth正确，也就是数据类型必须完全正确。
@@ -98,5 +99,6 @@ class FMTFile:
                 fields.append((elemnt.ElementName, numpy_type))
             else:
                 fields.append((elemnt.ElementName, numpy_type, size))
-        dtype = numpy.dtype(fields)
-        return dtype
\ No newline at end of file
+
+        # 相同的元素布局共用同一个dtype
+        return D3D11GameTypeRegistry.get_structured_dtype(tuple(fields))
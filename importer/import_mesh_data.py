@@ -0,0 +1,39 @@
+import numpy
+
+from dataclasses import dataclass, field
+
+from .migoto_binary_file import MigotoBinaryFile
+
+
+@dataclass
+class ImportMeshData:
+    '''
+    导入一个模型所需的全部数据，已经全部解码为numpy数组
+
+    由MeshImporter.prepare_mesh_data在后台线程中生成，这个阶段不调用任何bpy接口，
+    主线程只需要用这些数组通过foreach_set创建mesh即可
+    '''
+    mbf:MigotoBinaryFile
+
+    # 是否有可导入的数据，.ib或.vb为空时为False
+    valid:bool = field(default=True)
+
+    # 翻转面朝向后的IB，也就是每个loop对应的顶点索引
+    loop_vertex_indices:numpy.ndarray = field(default=None, repr=False)
+    positions:numpy.ndarray = field(default=None, repr=False)
+
+    # (ElementName, 每个loop的颜色数组)
+    color_layers:list = field(default_factory=list, repr=False)
+    # (UV名称, 每个loop的UV数组)
+    uv_layers:list = field(default_factory=list, repr=False)
+
+    # 顶点组权重表，每个数组长度相同
+    num_vertex_groups:int = field(default=0)
+    vg_vertex_ids:numpy.ndarray = field(default=None, repr=False)
+    vg_group_ids:numpy.ndarray = field(default=None, repr=False)
+    vg_weights:numpy.ndarray = field(default=None, repr=False)
+
+    shapekeys:dict = field(default_factory=dict, repr=False)
+
+    use_normals:bool = field(default=False)
+    normals:numpy.ndarray = field(default=None, repr=False)
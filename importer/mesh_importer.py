@@ -3,9 +3,11 @@
 import bpy
 import os
 import numpy
-import itertools
 import math
 
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
 from ..utils.timer_utils import TimerUtils
 from ..utils.translate_utils import TR
 from ..utils.format_utils import Fatal,FormatUtils
@@ -24,41 +26,93 @@ from ..base.d3d11_element import D3D11Element
 from ..common.extracted_object import ExtractedObjectHelper
 
 # 用于解决 AttributeError: 'IMPORT_MESH_OT_migoto_raw_buffers_mmt' object has no attribute 'filepath'
-from bpy_extras.io_utils import unpack_list, axis_conversion
+from bpy_extras.io_utils import axis_conversion
 
 from .fmt_file import FMTFile
 from .migoto_binary_file import MigotoBinaryFile
+from .import_mesh_data import ImportMeshData
 
 
 class MeshImporter:
     '''
     这个类依赖于提供的MigotoBinaryFile进行数据导入和处理
+
+    导入分为两个阶段：
+    - prepare_mesh_data: 读取文件、解析FMT、格式转换、TBN解码、UV/COLOR/顶点组数据准备，不调用bpy，可以在后台线程中执行
+    - create_mesh_obj_from_data: 在主线程中用准备好的numpy数组通过foreach_set创建mesh和obj
     '''
     @classmethod
     def create_mesh_obj_from_mbf(cls, mbf:MigotoBinaryFile,import_collection:bpy.types.Collection):
-        TimerUtils.Start("Import 3Dmigoto Raw")
-        print("导入模型: " + mbf.mesh_name)
-        
-        if not mbf.file_size_check():
+        import_mesh_data = MeshImporter.prepare_mesh_data(mbf=mbf, import_merged_vgmap=Properties_WWMI.import_merged_vgmap())
+        MeshImporter.create_mesh_obj_from_data(import_mesh_data=import_mesh_data, import_collection=import_collection)
+
+    @classmethod
+    def create_mesh_objs_parallel(cls, fmt_path_mesh_name_list:list[tuple[str,str]], import_collection:bpy.types.Collection):
+        '''
+        批量导入多个模型
+        - 后台线程池并行执行 MigotoBinaryFile 读取和 prepare_mesh_data
+        - 主线程按传入顺序依次创建mesh，保证物体名称和创建顺序与逐个导入时一致
+        - 同时最多只有max_workers个模型在准备中，mesh创建后立即释放准备好的数据，控制内存峰值
+        - 所有模型创建完成后统一刷新一次界面
+        '''
+        if len(fmt_path_mesh_name_list) == 0:
             return
 
-        # 创建mesh和obj
-        mesh = bpy.data.meshes.new(mbf.mesh_name)
-        obj = bpy.data.objects.new(mesh.name, mesh)
+        # bpy.context 只能在主线程中读取，所以先把用到的配置取出来
+        import_merged_vgmap = Properties_WWMI.import_merged_vgmap()
 
-        MeshImporter.set_import_coordinate(obj=obj)
-        MeshImporter.set_import_attributes(obj=obj, mbf=mbf)
-        MeshImporter.initialize_mesh(mesh, mbf)
+        def prepare(fmt_path:str, mesh_name:str) -> ImportMeshData:
+            mbf = MigotoBinaryFile(fmt_path=fmt_path, mesh_name=mesh_name)
+            return MeshImporter.prepare_mesh_data(mbf=mbf, import_merged_vgmap=import_merged_vgmap)
+
+        max_workers = min(len(fmt_path_mesh_name_list), os.cpu_count() or 1)
+        TimerUtils.Start("Import 3Dmigoto Raw Parallel")
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending_futures = deque()
+
+            def create_next():
+                # 出队后future不再被引用，创建完mesh后它持有的ImportMeshData就可以被回收
+                import_mesh_data = pending_futures.popleft().result()
+                MeshImporter.create_mesh_obj_from_data(import_mesh_data=import_mesh_data, import_collection=import_collection, redraw=False)
+
+            for fmt_path, mesh_name in fmt_path_mesh_name_list:
+                pending_futures.append(executor.submit(prepare, fmt_path, mesh_name))
+                if len(pending_futures) > max_workers:
+                    create_next()
+
+            while pending_futures:
+                create_next()
+
+        bpy.context.view_layer.update()
+        bpy.ops.wm.redraw_timer(type='DRAW_WIN_SWAP', iterations=1)
+        TimerUtils.End("Import 3Dmigoto Raw Parallel")
+
+    @classmethod
+    def prepare_mesh_data(cls, mbf:MigotoBinaryFile, import_merged_vgmap:bool) -> ImportMeshData:
+        '''
+        准备导入所需的全部数据，这里不能调用任何bpy接口，因为会在后台线程中执行
+        '''
+        print("准备导入模型数据: " + mbf.mesh_name)
+        import_mesh_data = ImportMeshData(mbf=mbf)
+
+        if not mbf.file_size_check():
+            mbf.release()
+            import_mesh_data.valid = False
+            return import_mesh_data
+
+        loop_vertex_indices = MeshImporter.get_loop_vertex_indices(mbf)
+        import_mesh_data.loop_vertex_indices = loop_vertex_indices
 
         blend_indices = {}
         blend_weights = {}
         texcoords = {}
         shapekeys = {}
-        use_normals = False
-        normals = []
-
 
         for element in mbf.fmt_file.elements:
+            # TANGENT和BINORMAL导入时用不到，直接跳过，不从vb文件中解码
+            if element.SemanticName == "TANGENT" or element.SemanticName == "BINORMAL":
+                continue
+
             data = mbf.vb_data[element.ElementName]
 
             print("当前Element: " + element.ElementName)
@@ -70,23 +124,22 @@ class MeshImporter:
                 if len(data[0]) == 4:
                     # Nico: 这里改为只要所有的第四位都是0或1就可以近似看为3D的 POSITION
                     # 这种处理是偷懒，第四位直接不管了，呵呵呵
-                    if not all(x[3] in (0, 1) for x in data):
-                    # if ([x[3] for x in data] != [1.0] * len(data)) and ([x[3] for x in data] != [0] * len(data)):
+                    if not numpy.all((data[:, 3] == 0) | (data[:, 3] == 1)):
                         raise Fatal('Positions are 4D')
                 
-                positions = [(x[0], x[1] , x[2] ) for x in data]
-                mesh.vertices.foreach_set('co', unpack_list(positions))
+                import_mesh_data.positions = numpy.ascontiguousarray(data[:, :3], dtype=numpy.float32)
             elif element.SemanticName.startswith("COLOR"):
-                mesh.vertex_colors.new(name=element.ElementName)
-                color_layer = mesh.vertex_colors[element.ElementName].data
-                for l in mesh.loops:
-                    color_layer[l.index].color = list(data[l.vertex_index]) + [0] * (4 - len(data[l.vertex_index]))
+                colors = numpy.asarray(data, dtype=numpy.float32)
+                colors = colors.reshape(len(colors), -1)
+                # 不足4个分量的补0
+                if colors.shape[1] < 4:
+                    colors = numpy.hstack((colors, numpy.zeros((len(colors), 4 - colors.shape[1]), dtype=numpy.float32)))
+                import_mesh_data.color_layers.append((element.ElementName, numpy.ascontiguousarray(colors[loop_vertex_indices]).ravel()))
                 
             elif element.SemanticName == "BLENDINDICES":
                 if data.ndim == 1:
-                    # 如果data是一维数组，转换为包含元组的2D数组，用于处理只有一个R32_UINT的情况
-                    data_2d = numpy.array([(x,) for x in data])
-                    blend_indices[element.SemanticIndex] = data_2d
+                    # 如果data是一维数组，转换为2D数组，用于处理只有一个R32_UINT的情况
+                    blend_indices[element.SemanticIndex] = data.reshape(-1, 1)
                 else:
                     blend_indices[element.SemanticIndex] = data
                 # print("Import BLENDINDICES Shape: " + str(blend_indices[element.SemanticIndex].shape))
@@ -99,9 +152,9 @@ class MeshImporter:
             elif element.SemanticName.startswith("TEXCOORD"):
                 texcoords[element.SemanticIndex] = data
             elif element.SemanticName.startswith("SHAPEKEY"):
-                shapekeys[element.SemanticIndex] = data
+                shapekeys[element.SemanticIndex] = numpy.asarray(data, dtype=numpy.float32).reshape(-1, 3)
             elif element.SemanticName.startswith("NORMAL"):
-                use_normals = True
+                import_mesh_data.use_normals = True
                 '''
                 燕云十六声在导入法线时，必须先进行处理。
                 这里要注意一个点，如果dump出来的法线数据，全部是正数的话，说明导出时进行了归一化
@@ -113,7 +166,7 @@ class MeshImporter:
                 '''
                 if GlobalConfig.logic_name == LogicName.YYSLS:
                     print("燕云十六声法线处理")
-                    normals = [(x[0] * 2 - 1, x[1] * 2 - 1, x[2] * 2 - 1) for x in data]
+                    import_mesh_data.normals = numpy.asarray(data[:, :3], dtype=numpy.float32) * 2 - 1
                 elif (mbf.fmt_file.logic_name == LogicName.AEMI or mbf.fmt_file.logic_name == LogicName.EFMI) and element.Format == "R32_UINT":
                     print("终末地压缩法线处理(Endfield Packed Normals) - 使用 TBNCodec")
                     
@@ -123,14 +176,14 @@ class MeshImporter:
                     if raw.ndim > 1:
                         raw = raw[:, 0]
                     
-                    normals = TBNCodec.decode_octahedral_r32_uint(raw).tolist()
+                    import_mesh_data.normals = TBNCodec.decode_octahedral_r32_uint(raw)
                     print("终末地压缩法线处理完成")
                 else:
-                    normals = [(x[0], x[1], x[2]) for x in data]
+                    import_mesh_data.normals = numpy.asarray(data[:, :3], dtype=numpy.float32)
             elif element.SemanticName == "ENCODEDDATA":
                 if mbf.fmt_file.logic_name == LogicName.AEMI or mbf.fmt_file.logic_name == LogicName.EFMI:
                     print("终末地 ENCODEDDATA 处理 - 使用 TBNCodec 解码 TBN 数据")
-                    use_normals = True
+                    import_mesh_data.use_normals = True
                     
                     raw = data
                     if raw.dtype != numpy.uint32:
@@ -138,34 +191,31 @@ class MeshImporter:
                     if raw.ndim > 1:
                         raw = raw[:, 0]
                     
-                    normals = TBNCodec.decode_octahedral_r32_uint(raw).tolist()
+                    import_mesh_data.normals = TBNCodec.decode_octahedral_r32_uint(raw)
                     print("终末地 ENCODEDDATA 处理完成")
                 else:
                     print(f"警告: ENCODEDDATA 元素仅在 EFMI/AEMI 格式中支持，当前游戏类型: {mbf.fmt_file.logic_name}")
-            elif element.SemanticName == "TANGENT":
-                pass
-            elif element.SemanticName == "BINORMAL":
-                pass
             else:
                 raise Fatal("Unknown ElementName: " + element.ElementName)
 
+        # 所有需要的Element都已经解码完毕，释放.ib/.vb文件句柄
+        mbf.release()
+
         # 导入完之后，如果发现blend_weights是空的，则自动补充默认值为1,0,0,0的BLENDWEIGHTS
         if len(blend_weights) == 0 and len(blend_indices) != 0:
             print("检测到BLENDWEIGHTS为空，但是含有BLENDINDICES数据，特殊情况，默认补充1,0,0,0的BLENDWEIGHTS")
             tmpi = 0
             for blendindices_turple in blend_indices.values():
-                # print(blendindices_turple)
-                new_dict = []
-                for indices in blendindices_turple:
-                    new_dict.append((1.0,0,0,0))
-                blend_weights[tmpi] = new_dict
+                default_weights = numpy.zeros((len(blendindices_turple), 4), dtype=numpy.float32)
+                default_weights[:, 0] = 1.0
+                blend_weights[tmpi] = default_weights
                 tmpi = tmpi + 1
 
-        MeshImporter.import_uv_layers(mesh, obj, texcoords)
+        import_mesh_data.uv_layers = MeshImporter.prepare_uv_layers(texcoords, loop_vertex_indices)
 
         #  metadata.json, if contains then we can import merged vgmap.
         component = None
-        if Properties_WWMI.import_merged_vgmap() and (GlobalConfig.logic_name == LogicName.WWMI or GlobalConfig.logic_name == LogicName.WuWa):
+        if import_merged_vgmap and (GlobalConfig.logic_name == LogicName.WWMI or GlobalConfig.logic_name == LogicName.WuWa):
             print("尝试读取Metadata.json")
             metadatajsonpath = os.path.join(os.path.dirname(mbf.fmt_path),'Metadata.json')
             if os.path.exists(metadatajsonpath):
@@ -175,22 +225,67 @@ class MeshImporter:
                     partname_count = int(mbf.mesh_name.split("-")[1]) - 1
                     print("import partname count: " + str(partname_count))
                     component = extracted_object.components[partname_count]
-        # print(len(blend_indices))
-        # print(len(blend_weights))
+
+        import_mesh_data.num_vertex_groups, import_mesh_data.vg_vertex_ids, import_mesh_data.vg_group_ids, import_mesh_data.vg_weights = MeshImporter.prepare_vertex_groups(
+            blend_indices=blend_indices,
+            blend_weights=blend_weights,
+            vertex_count=mbf.vb_vertex_count,
+            component=component,
+            gametypename=mbf.fmt_file.gametypename,
+        )
+
+        import_mesh_data.shapekeys = shapekeys
+        return import_mesh_data
+
+    @classmethod
+    def create_mesh_obj_from_data(cls, import_mesh_data:ImportMeshData, import_collection:bpy.types.Collection, redraw:bool = True):
+        '''
+        用prepare_mesh_data准备好的数据创建mesh和obj，必须在主线程中调用
+        redraw为False时不刷新界面，用于批量导入时最后统一刷新
+        '''
+        TimerUtils.Start("Import 3Dmigoto Raw")
+        mbf = import_mesh_data.mbf
+        print("导入模型: " + mbf.mesh_name)
+        
+        if not import_mesh_data.valid:
+            return
+
+        # 创建mesh和obj
+        mesh = bpy.data.meshes.new(mbf.mesh_name)
+        obj = bpy.data.objects.new(mesh.name, mesh)
+
+        MeshImporter.set_import_coordinate(obj=obj)
+        MeshImporter.set_import_attributes(obj=obj, mbf=mbf)
+        MeshImporter.initialize_mesh(mesh, import_mesh_data)
+
+        if import_mesh_data.positions is not None:
+            mesh.vertices.foreach_set('co', import_mesh_data.positions.ravel())
+
+        for color_name, loop_colors in import_mesh_data.color_layers:
+            mesh.vertex_colors.new(name=color_name)
+            mesh.vertex_colors[color_name].data.foreach_set('color', loop_colors)
+
+        MeshImporter.import_uv_layers(mesh, import_mesh_data.uv_layers)
 
         print("导入顶点组")
-        MeshImporter.import_vertex_groups(mesh, obj, blend_indices, blend_weights, component)
+        MeshImporter.import_vertex_groups(
+            obj,
+            import_mesh_data.num_vertex_groups,
+            import_mesh_data.vg_vertex_ids,
+            import_mesh_data.vg_group_ids,
+            import_mesh_data.vg_weights,
+        )
         print("导入顶点组完毕")
 
 
-        MeshImporter.import_shapekeys(mesh, obj, shapekeys)
+        MeshImporter.import_shapekeys(mesh, obj, import_mesh_data.shapekeys)
 
         # Validate closes the loops so they don't disappear after edit mode and probably other important things:
         mesh.validate(verbose=False, clean_customdata=False)  
         mesh.update()
         # XXX 这个方法还必须得在mesh.validate和mesh.update之后调用 3.6和4.2都可以用这个
-        if use_normals:
-            MeshUtils.set_import_normals_v2(mesh=mesh,normals=normals)
+        if import_mesh_data.use_normals:
+            MeshUtils.set_import_normals_v2(mesh=mesh,normals=import_mesh_data.normals)
         
         MeshImporter.create_bsdf_with_diffuse_linked(obj, mesh_name=mbf.mesh_name,directory=os.path.dirname(mbf.fmt_path))
         
@@ -239,11 +334,12 @@ class MeshImporter:
             print(f"非镜像工作流：对 {obj.name} 应用镜像变换和面朝向翻转")
             ObjUtils.apply_mirror_workflow(obj)
 
-        # 刷新视图以得到流畅的导入逐渐增多的视觉效果
-        bpy.context.view_layer.update()
+        if redraw:
+            # 刷新视图以得到流畅的导入逐渐增多的视觉效果
+            bpy.context.view_layer.update()
 
-        # 强制Blender刷新界面
-        bpy.ops.wm.redraw_timer(type='DRAW_WIN_SWAP', iterations=1)
+            # 强制Blender刷新界面
+            bpy.ops.wm.redraw_timer(type='DRAW_WIN_SWAP', iterations=1)
 
         TimerUtils.End("Import 3Dmigoto Raw")
     
@@ -275,30 +371,35 @@ class MeshImporter:
    
 
     @classmethod
-    def initialize_mesh(cls,mesh, mbf:MigotoBinaryFile):
+    def get_loop_vertex_indices(cls, mbf:MigotoBinaryFile) -> numpy.ndarray:
+        '''
+        获取每个loop对应的顶点索引，也就是最终写入mesh.loops的IB
+        '''
         # 翻转索引顺序以改变面朝向，只能改变面朝向，模型依然是镜像的
-        # print(mbf.ib_data[0],mbf.ib_data[1],mbf.ib_data[2])
+        ib_data = numpy.asarray(mbf.ib_data).astype(numpy.int32)
 
         # 部分游戏模型导入时必须翻转面朝向，并在生成Mod时翻转面朝向
         if (mbf.fmt_file.logic_name == LogicName.WWMI 
             or mbf.fmt_file.logic_name == LogicName.WuWa
             or mbf.fmt_file.logic_name == LogicName.YYSLS):
-            flipped_indices = []
-            for i in range(0, len(mbf.ib_data), 3):
-                triangle = mbf.ib_data[i:i+3]
-                flipped_triangle = triangle[::-1]
-                flipped_indices.extend(flipped_triangle)
-            mbf.ib_data = flipped_indices
-        
-        # 输出查看翻转后的前三个索引
-        # print(mbf.ib_data[0],mbf.ib_data[1],mbf.ib_data[2])
+            full_size = ib_data.size - ib_data.size % 3
+            flipped_indices = numpy.empty_like(ib_data)
+            flipped_indices[:full_size] = ib_data[:full_size].reshape(-1, 3)[:, ::-1].reshape(-1)
+            flipped_indices[full_size:] = ib_data[full_size:][::-1]
+            ib_data = flipped_indices
+
+        return ib_data
+
+    @classmethod
+    def initialize_mesh(cls,mesh, import_mesh_data:ImportMeshData):
+        mbf = import_mesh_data.mbf
 
         # 导入IB文件设置为mesh的三角形索引
         mesh.loops.add(mbf.ib_count)
         mesh.polygons.add(mbf.ib_polygon_count)
-        mesh.loops.foreach_set('vertex_index', mbf.ib_data)
-        mesh.polygons.foreach_set('loop_start', [x * 3 for x in range(mbf.ib_polygon_count)])
-        mesh.polygons.foreach_set('loop_total', [3] * mbf.ib_polygon_count)
+        mesh.loops.foreach_set('vertex_index', import_mesh_data.loop_vertex_indices)
+        mesh.polygons.foreach_set('loop_start', numpy.arange(mbf.ib_polygon_count, dtype=numpy.int32) * 3)
+        mesh.polygons.foreach_set('loop_total', numpy.full(mbf.ib_polygon_count, 3, dtype=numpy.int32))
 
         # 根据vb文件的顶点数设置mesh的顶点数
         mesh.vertices.add(mbf.vb_vertex_count)
@@ -307,11 +408,11 @@ class MeshImporter:
         mesh.update()
 
     @classmethod
-    def import_uv_layers(cls,mesh, obj, texcoords):
-        # 预先获取所有循环的顶点索引并转换为numpy数组
-        loops = mesh.loops
-        vertex_indices = numpy.array([l.vertex_index for l in loops], dtype=numpy.int32)
-        
+    def prepare_uv_layers(cls, texcoords:dict, vertex_indices:numpy.ndarray) -> list:
+        '''
+        计算每个UV层的逐loop UV数组，返回 [(uv_name, uv_array)]
+        '''
+        uv_layers = []
         for texcoord, data in sorted(texcoords.items()):
             # 将原始数据转换为numpy数组（只需转换一次）
             data_np = numpy.array(data, dtype=numpy.float32)
@@ -335,10 +436,7 @@ class MeshImporter:
             cmap = {'x': 0, 'y': 1, 'z': 2, 'w': 3}
             
             for components in components_list:
-                # 创建UV层
                 uv_name = f'TEXCOORD{texcoord if texcoord else ""}.{components}'
-                mesh.uv_layers.new(name=uv_name)
-                blender_uvs = mesh.uv_layers[uv_name]
                 
                 # 获取分量对应的索引
                 c0 = cmap[components[0]]
@@ -359,15 +457,23 @@ class MeshImporter:
                     uvs = numpy.vstack((uvs, padding))
 
                 # 通过顶点索引获取循环的UV数据并展平为一维数组
-                uv_array = uvs[vertex_indices].ravel()
-                
-                # 批量设置UV数据（自动处理numpy数组）
-                blender_uvs.data.foreach_set('uv', uv_array)
+                uv_layers.append((uv_name, uvs[vertex_indices].ravel()))
+        return uv_layers
+
+    @classmethod
+    def import_uv_layers(cls, mesh, uv_layers:list):
+        for uv_name, uv_array in uv_layers:
+            # 创建UV层
+            mesh.uv_layers.new(name=uv_name)
+            # 批量设置UV数据（自动处理numpy数组）
+            mesh.uv_layers[uv_name].data.foreach_set('uv', uv_array)
 
     @classmethod
-    def import_vertex_groups(cls,mesh, obj, blend_indices, blend_weights,component):
+    def prepare_vertex_groups(cls, blend_indices:dict, blend_weights:dict, vertex_count:int, component, gametypename:str):
         '''
         component: 如果是一键导入WWMI的模型则不为None，其它情况默认为None
+
+        返回 (num_vertex_groups, vertex_ids, group_ids, weights)
         '''
 
         # 注意，这里的打印，如果是CPU类型则会直接报错，不是测试时期不要开启
@@ -386,40 +492,116 @@ class MeshImporter:
         '''
         for semantic_index, bone_indices_list in blend_indices.items():
             # 转为 NumPy 数组处理
-            arr = numpy.array(bone_indices_list)
+            arr = numpy.array(bone_indices_list).astype(numpy.int64)
             arr = numpy.where(arr == 65535, -1, arr)
             blend_indices[semantic_index] = arr  # 或 .tolist() 如果后面要用 list
 
 
 
         assert (len(blend_indices) == len(blend_weights))
-        if blend_indices:
-            # We will need to make sure we re-export the same blend indices later -
-            # that they haven't been renumbered. Not positive whether it is better
-            # to use the vertex group index, vertex group name or attach some extra
-            # data. Make sure the indices and names match:
-            if component is None:
-                num_vertex_groups = max(itertools.chain(*itertools.chain(*blend_indices.values()))) + 1
-            else:
-                num_vertex_groups = max(component.vg_map.values()) + 1
-            
-            print("num_vertex_groups: " + str(num_vertex_groups))
+        if not blend_indices:
+            return 0, None, None, None
+
+        # We will need to make sure we re-export the same blend indices later -
+        # that they haven't been renumbered. Not positive whether it is better
+        # to use the vertex group index, vertex group name or attach some extra
+        # data. Make sure the indices and names match:
+        if component is None:
+            num_vertex_groups = int(max(numpy.max(indices) for indices in blend_indices.values())) + 1
+        else:
+            num_vertex_groups = max(component.vg_map.values()) + 1
+        
+        print("num_vertex_groups: " + str(num_vertex_groups))
 
-            if num_vertex_groups > 10000:
-                raise Fatal("检测到在当前导入的数据类型" + obj.get('3DMigoto:GameTypeName',"") + "描述下，BLENDINDICES顶点组数量为: " + str(num_vertex_groups) + " 基本不可能是正常情况，请更换其他数据类型重新导入")
-            
-            for i in range(num_vertex_groups):
-                obj.vertex_groups.new(name=str(i))
-            for vertex in mesh.vertices:
-                for semantic_index in sorted(blend_indices.keys()):
-                    for i, w in zip(blend_indices[semantic_index][vertex.index], blend_weights[semantic_index][vertex.index]):
-                        if w == 0.0:
-                            continue
-                        if component is None:
-                            obj.vertex_groups[i].add((vertex.index,), w, 'REPLACE')
-                        else:
-                            # 这里由于C++生成的json文件是无序的，所以我们这里读取的时候要用原始的map而不是转换成列表的索引，避免无序问题
-                            obj.vertex_groups[component.vg_map[str(i)]].add((vertex.index,), w, 'REPLACE')
+        if num_vertex_groups > 10000:
+            raise Fatal("检测到在当前导入的数据类型" + gametypename + "描述下，BLENDINDICES顶点组数量为: " + str(num_vertex_groups) + " 基本不可能是正常情况，请更换其他数据类型重新导入")
+
+        vertex_ids, group_ids, weights = cls.build_vertex_group_weight_table(
+            blend_indices=blend_indices,
+            blend_weights=blend_weights,
+            vertex_count=vertex_count,
+            num_vertex_groups=num_vertex_groups,
+            component=component,
+        )
+
+        # 按 (顶点组, 权重值) 排序，后面每个桶只需要调用一次 add
+        order = numpy.lexsort((vertex_ids, weights, group_ids))
+        return num_vertex_groups, vertex_ids[order], group_ids[order], weights[order]
+
+    @classmethod
+    def import_vertex_groups(cls, obj, num_vertex_groups:int, vertex_ids:numpy.ndarray, group_ids:numpy.ndarray, weights:numpy.ndarray):
+        '''
+        vertex_ids, group_ids, weights 为 prepare_vertex_groups 返回的按 (顶点组, 权重值) 排好序的权重表
+        '''
+        for i in range(num_vertex_groups):
+            obj.vertex_groups.new(name=str(i))
+
+        # 按 (顶点组, 权重值) 分桶，每个桶只调用一次 add，而不是每个顶点每个权重槽位调用一次
+        # 表中每个 (vertex, group) 只出现一次，所以桶之间的调用顺序不影响结果
+        if vertex_ids is None or len(vertex_ids) == 0:
+            return
+
+        bucket_starts = numpy.flatnonzero(
+            numpy.r_[True, (group_ids[1:] != group_ids[:-1]) | (weights[1:] != weights[:-1])]
+        )
+        bucket_ends = numpy.r_[bucket_starts[1:], len(vertex_ids)]
+        for start, end in zip(bucket_starts.tolist(), bucket_ends.tolist()):
+            obj.vertex_groups[int(group_ids[start])].add(vertex_ids[start:end].tolist(), float(weights[start]), 'REPLACE')
+
+    @classmethod
+    def build_vertex_group_weight_table(cls, blend_indices:dict, blend_weights:dict, vertex_count:int, num_vertex_groups:int, component=None):
+        '''
+        把 BLENDINDICES/BLENDWEIGHT 展开成一张稀疏的 (vertex, group, weight) 表，返回三个等长的 numpy 数组
+
+        - 展开顺序和逐顶点导入时一致：顶点 -> semantic_index(升序) -> 权重槽位
+        - 权重为 0 的槽位直接丢弃
+        - 同一个 (vertex, group) 出现多次时只保留最后一次，与 add(..., 'REPLACE') 逐个写入的结果一致
+        - component 不为 None 时，按 component.vg_map 把原始索引映射到合并后的顶点组索引
+        '''
+        index_columns = []
+        weight_columns = []
+        for semantic_index in sorted(blend_indices.keys()):
+            indices = numpy.asarray(blend_indices[semantic_index])[:vertex_count]
+            weights = numpy.asarray(blend_weights[semantic_index])[:vertex_count]
+            indices = indices.reshape(len(indices), -1)
+            weights = weights.reshape(len(weights), -1)
+            # 和 zip 的行为保持一致，槽位数取两者中较小的
+            slot_count = min(indices.shape[1], weights.shape[1])
+            index_columns.append(indices[:, :slot_count].astype(numpy.int64))
+            weight_columns.append(weights[:, :slot_count].astype(numpy.float64))
+
+        index_matrix = numpy.hstack(index_columns)
+        weight_matrix = numpy.hstack(weight_columns)
+        if len(index_matrix) < vertex_count:
+            raise Fatal("BLENDINDICES/BLENDWEIGHT 数据长度: " + str(len(index_matrix)) + " 小于顶点数: " + str(vertex_count))
+
+        # C 顺序展开后正好是 顶点 -> semantic_index -> 槽位 的顺序
+        slot_count = index_matrix.shape[1]
+        vertex_ids = numpy.repeat(numpy.arange(vertex_count, dtype=numpy.int64), slot_count)
+        group_ids = index_matrix.ravel()
+        weights = weight_matrix.ravel()
+
+        nonzero_mask = weights != 0.0
+        vertex_ids = vertex_ids[nonzero_mask]
+        group_ids = group_ids[nonzero_mask]
+        weights = weights[nonzero_mask]
+
+        if component is None:
+            # 和 obj.vertex_groups[i] 的行为一致，负数索引从末尾开始计数（例如 65535 被替换成的 -1）
+            group_ids = numpy.where(group_ids < 0, group_ids + num_vertex_groups, group_ids)
+        else:
+            # 这里由于C++生成的json文件是无序的，所以我们这里读取的时候要用原始的map而不是转换成列表的索引，避免无序问题
+            unique_group_ids, inverse = numpy.unique(group_ids, return_inverse=True)
+            mapped_group_ids = numpy.array([component.vg_map[str(int(i))] for i in unique_group_ids.tolist()], dtype=numpy.int64)
+            group_ids = mapped_group_ids[inverse.reshape(-1)] if len(unique_group_ids) > 0 else group_ids
+
+        # REPLACE 语义：同一 (vertex, group) 保留最后一次写入
+        pair_keys = vertex_ids * max(num_vertex_groups, 1) + group_ids
+        _, last_from_end = numpy.unique(pair_keys[::-1], return_index=True)
+        keep = len(pair_keys) - 1 - last_from_end
+        keep.sort()
+
+        return vertex_ids[keep], group_ids[keep], weights[keep]
 
     @classmethod
     def import_shapekeys(cls,mesh, obj, shapekeys):
@@ -7,6 +7,42 @@ from ..utils.log_utils import LOG
 import os
 import numpy
 
+
+class LazyElementData:
+    '''
+    按 ElementName 懒加载的 VB 数据
+
+    底层是 numpy.memmap 的结构化数组，只有在第一次访问某个 Element 时才会从磁盘读取并复制出来，
+    导入时用不到的 Element（例如 TANGENT、BINORMAL）完全不会被读取。
+    复制出来的数据与 memmap 无关，所以 release() 之后依然可以正常使用。
+    '''
+    def __init__(self, vb_memmap:numpy.ndarray):
+        self.vb_memmap = vb_memmap
+        self.dtype = vb_memmap.dtype
+        self.element_data_cache:dict[str,numpy.ndarray] = {}
+
+    def __getitem__(self, element_name:str) -> numpy.ndarray:
+        data = self.element_data_cache.get(element_name, None)
+        if data is None:
+            if self.vb_memmap is None:
+                raise Fatal("VB data has been released, can not read element: " + element_name)
+            data = numpy.array(self.vb_memmap[element_name])
+            self.element_data_cache[element_name] = data
+        return data
+
+    def __contains__(self, element_name:str) -> bool:
+        return element_name in self.dtype.names
+
+    def __len__(self) -> int:
+        return 0 if self.vb_memmap is None else len(self.vb_memmap)
+
+    def release(self):
+        '''
+        释放 memmap 的文件句柄，Windows 下不释放的话 .vb 文件会一直被占用无法覆盖
+        '''
+        self.vb_memmap = None
+
+
 class MigotoBinaryFile:
 
     '''
@@ -17,8 +53,13 @@ class MigotoBinaryFile:
     prefix是前缀，比如Body.ib Body.vb Body.fmt 那么此时Body就是prefix
     location_folder_path是存放这些文件的文件夹路径，比如当前工作空间中提取的对应数据类型文件夹
 
+    .ib和.vb通过numpy.memmap映射读取，VB中的每个Element在第一次访问时才会解码
+    first_index和index_count用于只导入IB中的一段，例如按FirstIndex/IndexCount切分多Component的IB，
+    index_count为-1时表示一直读取到文件末尾，切分得到的是memmap上的视图，不会复制数据
     '''
-    def __init__(self, fmt_path:str, mesh_name:str = ""):
+    def __init__(self, fmt_path:str, mesh_name:str = "", first_index:int = 0, index_count:int = -1):
+        self.first_index = first_index
+        self.index_count = index_count
         self.fmt_file = FMTFile(fmt_path)
         print("fmt_path: " + fmt_path)
         location_folder_path = os.path.dirname(fmt_path)
@@ -57,17 +98,48 @@ class MigotoBinaryFile:
 
     def init_data(self):
         ib_stride = FormatUtils.format_size(self.fmt_file.format)
+        ib_file_count = int(self.ib_file_size / ib_stride)
+        self.ib_memmap = self.open_memmap(self.ib_bin_path, FormatUtils.get_nptype_from_format(self.fmt_file.format), ib_file_count)
+        self.ib_data = self.read_ib_range(self.first_index, self.index_count)
 
-        self.ib_count = int(self.ib_file_size / ib_stride)
+        self.ib_count = len(self.ib_data)
         self.ib_polygon_count = int(self.ib_count / 3)
-        self.ib_data = numpy.fromfile(self.ib_bin_path, dtype=FormatUtils.get_nptype_from_format(self.fmt_file.format), count=self.ib_count)
         
         # 读取fmt文件，解析出后面要用的dtype
         fmt_dtype = self.fmt_file.get_dtype()
         vb_stride = fmt_dtype.itemsize
 
         self.vb_vertex_count = int(self.vb_file_size / vb_stride)
-        self.vb_data = numpy.fromfile(self.vb_bin_path, dtype=fmt_dtype, count=self.vb_vertex_count)
+        self.vb_data = LazyElementData(self.open_memmap(self.vb_bin_path, fmt_dtype, self.vb_vertex_count))
+
+    @staticmethod
+    def open_memmap(file_path:str, dtype, count:int) -> numpy.ndarray:
+        # 空文件无法创建memmap，这里返回一个空数组，后续由file_size_check跳过导入
+        if count <= 0:
+            return numpy.empty(0, dtype=dtype)
+        return numpy.memmap(file_path, dtype=dtype, mode='r', shape=(count,))
+
+    def read_ib_range(self, first_index:int = 0, index_count:int = -1) -> numpy.ndarray:
+        '''
+        按FirstIndex/IndexCount读取IB中的一段，返回memmap上的视图，不复制数据
+        '''
+        total_count = len(self.ib_memmap)
+        if first_index < 0 or first_index > total_count:
+            raise Fatal("FirstIndex " + str(first_index) + " out of range, IB index count: " + str(total_count) + " in " + self.ib_name)
+        if index_count < 0:
+            return self.ib_memmap[first_index:]
+        if first_index + index_count > total_count:
+            raise Fatal("FirstIndex " + str(first_index) + " + IndexCount " + str(index_count) + " out of range, IB index count: " + str(total_count) + " in " + self.ib_name)
+        return self.ib_memmap[first_index:first_index + index_count]
+
+    def release(self):
+        '''
+        导入完成后调用，释放.ib和.vb的memmap文件句柄
+        已经解码过的Element数据不受影响
+        '''
+        self.ib_data = numpy.array(self.ib_data)
+        self.ib_memmap = None
+        self.vb_data.release()
 
     
     def file_sanity_check(self):
@@ -65,6 +65,7 @@ class PanelBasicInformation(bpy.types.Panel):
             row = layout.row()
             row.label(text=f"缓存: {stats['total_entries']}个文件, {stats['total_size_mb']:.1f}MB")
             row.operator("ssmt.clear_preprocess_cache", text="清理缓存", icon='TRASH')
+            layout.prop(context.scene.properties_import_model,"preprocess_cache_max_size_mb",text="缓存容量上限(MB)")
         
         context = bpy.context  # 直接使用 bpy.context 获取完整上下文
         if len(context.selected_objects) != 0:
@@ -1,5 +1,6 @@
 import math
 import bpy
+import numpy
 
 from mathutils import *
 
@@ -83,102 +84,95 @@ class AlgorithmUtils:
             return degree
         return 0
     
+    @staticmethod
+    def _sum_by_group(values:numpy.ndarray, group_indices:numpy.ndarray, group_count:int) -> numpy.ndarray:
+        values = values.reshape(len(group_indices), -1)
+        accumulated = numpy.empty((group_count, values.shape[1]), dtype=numpy.float64)
+        for column in range(values.shape[1]):
+            accumulated[:, column] = numpy.bincount(group_indices, weights=values[:, column], minlength=group_count)
+        return accumulated
+
+    @staticmethod
+    def _foreach_get_vectors(collection, attribute:str, count:int, size:int = 3, dtype=numpy.float32) -> numpy.ndarray:
+        data = numpy.empty(count * size, dtype=dtype)
+        collection.foreach_get(attribute, data)
+        return data.reshape(count, size)
+
     @classmethod
     def smooth_normal_save_to_uv(cls):
+        '''
+        计算角度加权的平滑法线，转换到每个loop的切线空间后把XY分量存入名为SmoothNormalMap的UV
+
+        所有数据通过foreach_get一次性读取，面法线、角度权重、按位置分组累加全部用numpy批量完成：
+        - 每个面只取前三个loop组成三角形，面法线由两条边叉乘后归一化
+        - 每个角的权重是该角两条边的夹角
+        - 位置完全相同的顶点为一组（和之前把坐标转成字符串作为key一致），组内累加 法线*权重
+        '''
         mesh = bpy.context.active_object.data
         uvdata = mesh.uv_layers.active.data
         
         mesh.calc_tangents(uvmap="TEXCOORD.xy")
         # mesh.calc_tangents()
 
-        co_str_data_dict = {}
-
-        # 开始
-        for vertex in mesh.vertices:
-            co = vertex.co
-            co_str = cls.vector_to_string(co)
-            co_str_data_dict[co_str] = []
-        print("========")
-
-        for poly in mesh.polygons:
-            # 获取三角形的三个顶点
-            loop_0 = mesh.loops[poly.loop_start]
-            loop_1 = mesh.loops[poly.loop_start+1]
-            loop_2 = mesh.loops[poly.loop_start + 2]
-
-            # 获取顶点数据
-            vertex_loop0 = mesh.vertices[loop_0.vertex_index]
-            vertex_loop1 = mesh.vertices[loop_1.vertex_index]
-            vertex_loop2 = mesh.vertices[loop_2.vertex_index]
-
-            # 顶点数据转换为字符串格式
-            co0_str = cls.vector_to_string(vertex_loop0.co)
-            co1_str = cls.vector_to_string(vertex_loop1.co)
-            co2_str = cls.vector_to_string(vertex_loop2.co)
-
-            # 使用CorssProduct计算法线
-            normal_vector = cls.vector_cross_product(vertex_loop1.co-vertex_loop0.co,vertex_loop2.co-vertex_loop0.co)
-            # 法线归一化使其长度保持为1
-            normal_vector = cls.vector_normalize(normal_vector)
-
-            if co0_str in co_str_data_dict and cls.need_outline(vertex_loop0):
-                w = cls.calculate_angle_between_vectors(vertex_loop2.co-vertex_loop0.co,vertex_loop1.co-vertex_loop0.co)
-                co_str_data_dict[co0_str].append({"n":normal_vector,"w":w,"l":loop_0})
-            if co1_str in co_str_data_dict and cls.need_outline(vertex_loop1):
-                w = cls.calculate_angle_between_vectors(vertex_loop2.co-vertex_loop1.co,vertex_loop0.co-vertex_loop1.co)
-                co_str_data_dict[co1_str].append({"n":normal_vector,"w":w,"l":loop_1})
-            if co2_str in co_str_data_dict and cls.need_outline(vertex_loop0):
-                w = cls.calculate_angle_between_vectors(vertex_loop1.co-vertex_loop2.co,vertex_loop0.co-vertex_loop2.co)
-                co_str_data_dict[co2_str].append({"n":normal_vector,"w":w,"l":loop_2})
+        vertex_count = len(mesh.vertices)
+        loop_count = len(mesh.loops)
+        polygon_count = len(mesh.polygons)
+
+        vertex_co = cls._foreach_get_vectors(mesh.vertices, "co", vertex_count)
+        loop_vertex_indices = cls._foreach_get_vectors(mesh.loops, "vertex_index", loop_count, 1, numpy.int64).reshape(-1)
+        loop_tangents = cls._foreach_get_vectors(mesh.loops, "tangent", loop_count).astype(numpy.float64)
+        loop_bitangents = cls._foreach_get_vectors(mesh.loops, "bitangent", loop_count).astype(numpy.float64)
+        loop_starts = cls._foreach_get_vectors(mesh.polygons, "loop_start", polygon_count, 1, numpy.int64).reshape(-1)
+
+        # 位置完全相同的顶点分为一组，按坐标的原始字节比较
+        position_keys = numpy.ascontiguousarray(vertex_co).view(numpy.dtype((numpy.void, vertex_co.dtype.itemsize * 3))).reshape(-1)
+        unique_keys, vertex_group_indices = numpy.unique(position_keys, return_inverse=True)
+        vertex_group_indices = vertex_group_indices.reshape(-1)
+        group_count = len(unique_keys)
+
+        # (面数, 3) 每个三角形的三个顶点，(面数, 3, 3) 三个顶点的坐标
+        triangle_vertex_indices = loop_vertex_indices[loop_starts[:, None] + numpy.arange(3)]
+        triangle_co = vertex_co[triangle_vertex_indices].astype(numpy.float64)
+
+        # 使用CorssProduct计算法线，并归一化使其长度保持为1，退化三角形的法线为0
+        face_normals = numpy.cross(triangle_co[:, 1] - triangle_co[:, 0], triangle_co[:, 2] - triangle_co[:, 0])
+        face_normal_lengths = numpy.linalg.norm(face_normals, axis=1)
+        nonzero_faces = face_normal_lengths != 0
+        face_normals[nonzero_faces] /= face_normal_lengths[nonzero_faces, None]
+        face_normals[~nonzero_faces] = 0
+
+        # 每个角两条边的夹角作为权重，边长为0时权重为0
+        edge_a = numpy.roll(triangle_co, -1, axis=1) - triangle_co
+        edge_b = numpy.roll(triangle_co, -2, axis=1) - triangle_co
+        edge_length_product = numpy.linalg.norm(edge_a, axis=2) * numpy.linalg.norm(edge_b, axis=2)
+        corner_angles = numpy.zeros_like(edge_length_product)
+        nonzero_corners = edge_length_product != 0
+        corner_cos = numpy.einsum('ijk,ijk->ij', edge_a, edge_b)[nonzero_corners] / edge_length_product[nonzero_corners]
+        corner_angles[nonzero_corners] = numpy.arccos(numpy.clip(corner_cos, -1.0, 1.0))
+
+        # 基于相邻面的法线加权平均计算平滑法线
+        corner_group_indices = vertex_group_indices[triangle_vertex_indices].reshape(-1)
+        weighted_normals = (face_normals[:, None, :] * corner_angles[:, :, None]).reshape(-1, 3)
+        accumulated_normals = cls._sum_by_group(weighted_normals, corner_group_indices, group_count)
+        accumulated_weights = numpy.bincount(corner_group_indices, weights=corner_angles.reshape(-1), minlength=group_count)
+
+        smooth_normals = numpy.zeros_like(accumulated_normals)
+        nonzero_groups = numpy.any(accumulated_normals != 0, axis=1)
+        smooth_normals[nonzero_groups] = accumulated_normals[nonzero_groups] / accumulated_weights[nonzero_groups, None]
+        smooth_normal_lengths = numpy.linalg.norm(smooth_normals[nonzero_groups], axis=1)
+        smooth_normals[nonzero_groups] /= numpy.where(smooth_normal_lengths != 0, smooth_normal_lengths, 1.0)[:, None]
+
+        loop_smooth_normals = smooth_normals[vertex_group_indices[loop_vertex_indices]]
+
+        # 转换到切线空间，法线XY分量存储到UV贴图的坐标 (X:法线x, Y:法线y)
+        # 需要根据实际调整，例如UE为（x,1+y）
+        tx = numpy.einsum('ij,ij->i', loop_tangents, loop_smooth_normals)
+        ty = numpy.einsum('ij,ij->i', loop_bitangents, loop_smooth_normals)
+
+        uv = numpy.empty((loop_count, 2), dtype=numpy.float32)
+        uv[:, 0] = tx
+        uv[:, 1] = 1 + ty
 
         # 存入UV
         uv_layer = mesh.uv_layers.new(name="SmoothNormalMap")
-        for poly in mesh.polygons:
-            for loop_index in range(poly.loop_start,poly.loop_start+poly.loop_total):
-                vertex_index=mesh.loops[loop_index].vertex_index
-                vertex = mesh.vertices[vertex_index]
-
-                # 初始化平滑法线和平滑权重
-                smoothnormal=Vector((0,0,0))
-                weight = 0
-
-                # 基于相邻面的法线加权平均计算平滑法线
-                if cls.need_outline(vertex):
-                    costr=cls.vector_to_string(vertex.co)
-
-                    if costr in co_str_data_dict:
-                        a = co_str_data_dict[costr]
-                        # 对于共享此顶点的所有面的数据，遍历它们
-                        for d in a:
-                            # 分别获取面的法线和权重
-                            normal_vector=d['n']
-                            w = d['w']
-                            # 累加加权法线和权重
-                            smoothnormal  += normal_vector*w
-                            weight  += w
-                if smoothnormal != Vector((0,0,0)):
-                    smoothnormal /= weight
-                    smoothnormal = cls.vector_normalize(smoothnormal)
-
-                loop_normal = mesh.loops[loop_index].normal
-                loop_tangent = mesh.loops[loop_index].tangent
-                loop_bitangent = mesh.loops[loop_index].bitangent
-
-                tx = cls.vector_dot_product(loop_tangent,smoothnormal)
-                ty = cls.vector_dot_product(loop_bitangent,smoothnormal)
-                tz = cls.vector_dot_product(loop_normal,smoothnormal)
-
-                normalT=Vector((tx,ty,tz))
-                # print("nor:",smoothnormal)
-
-                # 将法线XY分量存储到UV贴图的坐标 (X:法线x, Y:法线y)
-                # 需要根据实际调整，例如UE为（x,1+y）
-
-                # uv = (normalT.x, 1 + normalT.y) 
-                uv = (normalT.x, 1 + normalT.y) 
-                uv_layer.data[loop_index].uv = uv
-
-        # 重新计算物体的UV贴图以应用更改
-        # bpy.ops.object.mode_set(mode="EDIT")
-        # bpy.ops.uv.unwrap(method='ANGLE_BASED')
-        # bpy.ops.object.mode_set(mode="OBJECT")
\ No newline at end of file
+        uv_layer.data.foreach_set("uv", uv.reshape(-1))
@@ -0,0 +1,149 @@
+import bpy
+import numpy
+
+from typing import Dict, Iterator
+
+from .mesh_merge_utils import MeshMergeUtils
+
+
+class AnimationSplitUtils:
+    '''
+    动画拆分工具：把物体在每一帧的求值结果拆成独立的网格或顶点位置数组
+
+    高精度模式需要从第0帧开始连续播放，物理/布料等模拟才能得到正确结果。
+    这里只从第0帧向后播放一遍，在播放过程中依次采集每个目标帧，
+    而不是每个目标帧都从第0帧重新播放一遍
+    '''
+
+    @staticmethod
+    def step_frames(scene, start_frame:int, end_frame:int, use_precise_mode:bool) -> Iterator[int]:
+        '''
+        依次跳转到每个目标帧并返回帧号，调用方在拿到帧号时读取当前帧的求值结果
+        use_precise_mode: 从第0帧开始逐帧播放，只在到达目标帧范围后返回
+        '''
+        first_frame = 0 if use_precise_mode else start_frame
+        for frame in range(first_frame, end_frame + 1):
+            scene.frame_set(frame)
+            if frame >= start_frame:
+                yield frame
+
+    @staticmethod
+    def get_world_positions(eval_mesh:bpy.types.Mesh, matrix_world) -> numpy.ndarray:
+        '''
+        读取求值后网格的顶点位置并变换到世界空间，返回 (顶点数, 3) 的 float32 数组
+        '''
+        vertex_count = len(eval_mesh.vertices)
+        positions = numpy.empty(vertex_count * 3, dtype=numpy.float32)
+        eval_mesh.vertices.foreach_get("co", positions)
+        positions = positions.reshape(vertex_count, 3)
+
+        matrix = numpy.array(matrix_world, dtype=numpy.float64)
+        return (positions @ matrix[:3, :3].T + matrix[:3, 3]).astype(numpy.float32)
+
+    @staticmethod
+    def _get_loop_vertex_indices(mesh:bpy.types.Mesh) -> numpy.ndarray:
+        loop_vertex_indices = numpy.empty(len(mesh.loops), dtype=numpy.int32)
+        mesh.loops.foreach_get("vertex_index", loop_vertex_indices)
+        return loop_vertex_indices
+
+    @staticmethod
+    def _get_copyable_attributes(mesh:bpy.types.Mesh) -> set:
+        '''
+        每一帧可能变化、需要从求值结果复制到模板副本的属性：UV层和颜色等通用属性，返回 {(名称, 域, 数据类型)}
+        内部属性（以.开头）和由网格结构决定的属性不复制
+        '''
+        return {
+            (attribute.name, attribute.domain, attribute.data_type)
+            for attribute in mesh.attributes
+            if not attribute.name.startswith('.') and attribute.name not in MeshMergeUtils.SKIPPED_ATTRIBUTE_NAMES
+        }
+
+    @classmethod
+    def is_same_topology(cls, eval_mesh:bpy.types.Mesh, template_mesh:bpy.types.Mesh) -> bool:
+        '''
+        顶点、loop、面数量一致，每个loop对应的顶点一致，UV层和属性的名称、类型也一致，
+        并且没有自定义法线时，可以复用模板网格，只替换顶点位置、UV和属性的数据
+        自定义法线在变换时会跟着旋转，只替换位置会让法线停留在模板帧的方向，所以这种情况不复用
+        '''
+        if template_mesh is None:
+            return False
+        if eval_mesh.has_custom_normals or template_mesh.has_custom_normals:
+            return False
+        if not (
+            len(eval_mesh.vertices) == len(template_mesh.vertices)
+            and len(eval_mesh.loops) == len(template_mesh.loops)
+            and len(eval_mesh.polygons) == len(template_mesh.polygons)
+        ):
+            return False
+        if [uv_layer.name for uv_layer in eval_mesh.uv_layers] != [uv_layer.name for uv_layer in template_mesh.uv_layers]:
+            return False
+        eval_attributes = cls._get_copyable_attributes(eval_mesh)
+        if eval_attributes != cls._get_copyable_attributes(template_mesh):
+            return False
+        if any(data_type not in MeshMergeUtils.ATTRIBUTE_FOREACH_INFO for _, _, data_type in eval_attributes):
+            return False
+        return numpy.array_equal(cls._get_loop_vertex_indices(eval_mesh), cls._get_loop_vertex_indices(template_mesh))
+
+    @classmethod
+    def _copy_frame_attributes(cls, eval_mesh:bpy.types.Mesh, mesh_data:bpy.types.Mesh):
+        '''把当前帧的UV和属性数据写入模板副本，UV变形、几何节点或动画颜色输出的结果每一帧都可能不同'''
+        loop_count = len(eval_mesh.loops)
+        for uv_layer in eval_mesh.uv_layers:
+            uvs = numpy.empty(loop_count * 2, dtype=numpy.float32)
+            uv_layer.data.foreach_get("uv", uvs)
+            mesh_data.uv_layers[uv_layer.name].data.foreach_set("uv", uvs)
+
+        uv_names = {uv_layer.name for uv_layer in eval_mesh.uv_layers}
+        for name, domain, data_type in cls._get_copyable_attributes(eval_mesh):
+            if name in uv_names:
+                continue
+            foreach_attr, width, dtype = MeshMergeUtils.ATTRIBUTE_FOREACH_INFO[data_type]
+            source_attribute = eval_mesh.attributes[name]
+            values = numpy.empty(len(source_attribute.data) * width, dtype=dtype)
+            source_attribute.data.foreach_get(foreach_attr, values)
+            mesh_data.attributes[name].data.foreach_set(foreach_attr, values)
+
+    @classmethod
+    def create_frame_mesh(cls, obj:bpy.types.Object, eval_obj:bpy.types.Object, template_mesh:bpy.types.Mesh = None) -> bpy.types.Mesh:
+        '''
+        为当前帧创建世界空间下的网格
+        拓扑和模板网格一致时复制模板网格（包括材质等数据），用foreach_set写入当前帧的顶点位置、UV和属性，
+        否则使用依赖图创建完整的网格数据（支持曲线、曲面等各种类型）
+        '''
+        eval_mesh = eval_obj.to_mesh()
+        try:
+            if cls.is_same_topology(eval_mesh, template_mesh):
+                mesh_data = template_mesh.copy()
+                world_positions = cls.get_world_positions(eval_mesh, eval_obj.matrix_world)
+                mesh_data.vertices.foreach_set("co", world_positions.ravel())
+                cls._copy_frame_attributes(eval_mesh, mesh_data)
+                mesh_data.update()
+                return mesh_data
+        finally:
+            eval_obj.to_mesh_clear()
+
+        mesh_data = bpy.data.meshes.new_from_object(eval_obj)
+        mesh_data.transform(eval_obj.matrix_world.copy())
+
+        # 复制材质
+        for slot in obj.material_slots:
+            if slot.material:
+                mesh_data.materials.append(slot.material)
+        return mesh_data
+
+    @classmethod
+    def capture_world_positions(cls, context, obj:bpy.types.Object, start_frame:int, end_frame:int, use_precise_mode:bool = True) -> Dict[int, numpy.ndarray]:
+        '''
+        不创建任何Blender物体，直接采集每一帧世界空间下的顶点位置
+        返回 帧号 -> (顶点数, 3) 的 float32 数组，调用方负责恢复当前帧
+        '''
+        frame_positions_dict:Dict[int, numpy.ndarray] = {}
+        for frame in cls.step_frames(context.scene, start_frame, end_frame, use_precise_mode):
+            depsgraph = context.evaluated_depsgraph_get()
+            eval_obj = obj.evaluated_get(depsgraph)
+            eval_mesh = eval_obj.to_mesh()
+            try:
+                frame_positions_dict[frame] = cls.get_world_positions(eval_mesh, eval_obj.matrix_world)
+            finally:
+                eval_obj.to_mesh_clear()
+        return frame_positions_dict
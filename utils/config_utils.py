@@ -2,7 +2,9 @@ import os
 import bpy
 import json
 import subprocess
+from types import MappingProxyType
 from ..config.main_config import *
+from ..config.config_cache import ConfigCache
 from .json_utils import *
 from .format_utils import Fatal
 
@@ -38,6 +40,14 @@ class ConfigUtils:
     
     @classmethod
     def get_draw_ib_alias_name_dict(cls) -> dict[str,str]:
+        '''
+        每个DrawIB导出时都会调用，结果按Config.json的修改时间缓存，返回只读字典
+        '''
+        game_config_path = os.path.join(GlobalConfig.path_workspace_folder(),"Config.json")
+        return ConfigCache.get("draw_ib_alias_name_dict", game_config_path, lambda path: MappingProxyType(cls._build_draw_ib_alias_name_dict()))
+
+    @classmethod
+    def _build_draw_ib_alias_name_dict(cls) -> dict[str,str]:
 
         draw_ib_alias_name_dict:dict[str,str] = {}
         draw_ib_pair_list= ConfigUtils.get_extract_drawib_list_from_workspace_config_json()
@@ -0,0 +1,174 @@
+"""
+增量导出清单
+在Buffer文件夹中记录每个DrawIB的输入指纹以及写出的.buf文件，
+再次导出时输入没有变化并且文件仍然完好的DrawIB直接复用已有文件，不再重新计算和写入
+"""
+import bpy
+import json
+import hashlib
+import os
+from typing import Dict, List, Optional
+
+from .preprocess_cache import FingerprintCalculator
+
+from ..config.main_config import GlobalConfig
+from ..config.plugin_config import PluginConfig
+
+
+class ExportInputHasher:
+    """计算一个DrawIB全部导出输入的哈希值"""
+
+    # 这些场景属性组里的设置会影响导出结果
+    SETTINGS_PROPERTY_GROUPS = ("properties_import_model", "properties_generate_mod")
+
+    @staticmethod
+    def get_property_group_values(property_group) -> dict:
+        """读取属性组中所有属性的当前值"""
+        values = {}
+        for prop in property_group.bl_rna.properties:
+            identifier = prop.identifier
+            if identifier == "rna_type":
+                continue
+            values[identifier] = repr(getattr(property_group, identifier, None))
+        return values
+
+    @classmethod
+    def get_export_settings(cls) -> dict:
+        scene = bpy.context.scene
+        settings = {
+            "logic_name": str(GlobalConfig.logic_name),
+            "addon_version": PluginConfig.get_version_string(),
+        }
+        for group_name in cls.SETTINGS_PROPERTY_GROUPS:
+            property_group = getattr(scene, group_name, None)
+            if property_group is not None:
+                settings[group_name] = cls.get_property_group_values(property_group)
+        return settings
+
+    @staticmethod
+    def get_game_type_description(d3d11_game_type) -> dict:
+        return {
+            "game_type_name": d3d11_game_type.GameTypeName,
+            "elements": [repr(sorted(vars(d3d11_element).items())) for d3d11_element in d3d11_game_type.D3D11ElementList],
+            "category_list": list(d3d11_game_type.OrderedCategoryNameList),
+            "category_stride": dict(d3d11_game_type.CategoryStrideDict),
+        }
+
+    @classmethod
+    def calculate_draw_ib_input_hash(cls, draw_ib: str, obj_data_model_list: list, d3d11_game_type,
+                                     part_name_list: List[str], node_parameters: dict) -> Optional[str]:
+        '''
+        obj_data_model_list 是蓝图中属于当前DrawIB的ObjDataModel，顺序决定了Buffer中的顶点顺序
+        任何一个物体不存在时返回None，表示无法使用增量导出
+        '''
+        hasher = hashlib.md5()
+        FingerprintCalculator.update_hasher_text(
+            hasher,
+            draw_ib,
+            json.dumps(cls.get_game_type_description(d3d11_game_type), sort_keys=True),
+            list(part_name_list),
+            json.dumps(node_parameters, sort_keys=True, default=str),
+            json.dumps(cls.get_export_settings(), sort_keys=True),
+        )
+
+        # 同一个物体可能在蓝图中被多次引用，只计算一次内容哈希
+        obj_name_content_hash_dict: Dict[str, str] = {}
+        for obj_model in obj_data_model_list:
+            obj_name = obj_model.obj_name
+            content_hash = obj_name_content_hash_dict.get(obj_name, None)
+            if content_hash is None:
+                obj = bpy.data.objects.get(obj_name)
+                if obj is None:
+                    return None
+                content_hash = FingerprintCalculator.calculate_content_hash(obj)
+                obj_name_content_hash_dict[obj_name] = content_hash
+            FingerprintCalculator.update_hasher_text(hasher, obj_name, obj_model.component_count, content_hash)
+
+        return hasher.hexdigest()
+
+
+class ExportManifest:
+    """
+    增量导出清单
+
+    每个DrawIB记录输入哈希、写出的文件的大小和修改时间，以及生成ini所需的轻量状态。
+    文件被后处理节点改写或者被删除后，大小或修改时间对不上，该DrawIB就会重新导出
+    """
+
+    MANIFEST_FILENAME = "export_manifest.json"
+    MANIFEST_VERSION = 1
+
+    def __init__(self, buffer_folder: str):
+        self.buffer_folder = buffer_folder
+        self.manifest_path = os.path.join(buffer_folder, self.MANIFEST_FILENAME)
+        self.draw_ib_entries: Dict[str, dict] = {}
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.manifest_path):
+            return
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"[ExportManifest] 读取导出清单失败，将全部重新导出: {e}")
+            return
+
+        if data.get("version") != self.MANIFEST_VERSION:
+            return
+        self.draw_ib_entries = data.get("draw_ibs", {})
+
+    def save(self):
+        data = {
+            "version": self.MANIFEST_VERSION,
+            "draw_ibs": self.draw_ib_entries,
+        }
+        tmp_path = self.manifest_path + ".tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, self.manifest_path)
+        except Exception as e:
+            print(f"[ExportManifest] 保存导出清单失败: {e}")
+
+    def _get_file_stat(self, filename: str) -> Optional[dict]:
+        try:
+            stat = os.stat(os.path.join(self.buffer_folder, filename))
+        except OSError:
+            return None
+        return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    def get_valid_entry(self, draw_ib: str, input_hash: str) -> Optional[dict]:
+        '''
+        输入哈希一致并且记录的文件全部未被改动时返回记录，否则返回None
+        '''
+        entry = self.draw_ib_entries.get(draw_ib, None)
+        if entry is None or entry.get("input_hash") != input_hash:
+            return None
+
+        for filename, recorded_stat in entry.get("files", {}).items():
+            if self._get_file_stat(filename) != recorded_stat:
+                print(f"[ExportManifest] {draw_ib} 的文件已变化: {filename}")
+                return None
+        return entry
+
+    def record(self, draw_ib: str, input_hash: str, filenames: List[str], state: dict):
+        files = {}
+        for filename in filenames:
+            file_stat = self._get_file_stat(filename)
+            if file_stat is None:
+                # 文件没有写出来，不能记录为可复用
+                self.invalidate(draw_ib)
+                return
+            files[filename] = file_stat
+
+        self.draw_ib_entries[draw_ib] = {
+            "input_hash": input_hash,
+            "files": files,
+            "state": state,
+        }
+        self.save()
+
+    def invalidate(self, draw_ib: str):
+        if self.draw_ib_entries.pop(draw_ib, None) is not None:
+            self.save()
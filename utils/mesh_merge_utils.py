@@ -0,0 +1,457 @@
+import bpy
+import numpy
+
+from .vertexgroup_utils import VertexGroupUtils
+
+
+class MeshMergeUtils:
+    '''
+    数据层面的物体合并：用foreach_get读取每个物体的网格数据，按索引偏移拼接后用foreach_set写入一个新网格，
+    代替逐个选中物体调用bpy.ops.object.join，不依赖上下文和选中状态，也不产生撤销记录
+
+    合并结果和join保持一致：
+    - 其它物体的网格变换到第一个物体的局部空间，合并结果保留在第一个物体上，其它物体被删除
+    - 材质、顶点组、UV、颜色等属性、形态键按名称合并，第一个物体的排在前面
+    - 某个物体缺少的属性填0，缺少的形态键使用它自己的顶点位置
+    - 和join一样读取物体的原始网格数据，第一个物体之外的修改器不参与合并
+    '''
+
+    # 属性数据类型 -> (foreach_get使用的字段, 每个元素的分量数, numpy类型)
+    ATTRIBUTE_FOREACH_INFO = {
+        'FLOAT': ('value', 1, numpy.float32),
+        'INT': ('value', 1, numpy.int32),
+        'INT8': ('value', 1, numpy.int32),
+        'BOOLEAN': ('value', 1, numpy.bool_),
+        'FLOAT_VECTOR': ('vector', 3, numpy.float32),
+        'FLOAT2': ('vector', 2, numpy.float32),
+        'INT16_2D': ('value', 2, numpy.int32),
+        'INT32_2D': ('value', 2, numpy.int32),
+        'FLOAT_COLOR': ('color', 4, numpy.float32),
+        'BYTE_COLOR': ('color', 4, numpy.float32),
+        'QUATERNION': ('value', 4, numpy.float32),
+        'FLOAT4X4': ('value', 16, numpy.float32),
+    }
+
+    # 这些属性由网格结构、材质、平滑、锐边、自定义法线单独处理，不按通用属性复制
+    SKIPPED_ATTRIBUTE_NAMES = {'position', 'material_index', 'sharp_face', 'sharp_edge', 'custom_normal'}
+
+    @staticmethod
+    def _foreach_get(collection, attr_name:str, count:int, width:int, dtype) -> numpy.ndarray:
+        values = numpy.empty(count * width, dtype=dtype)
+        if count > 0:
+            collection.foreach_get(attr_name, values)
+        return values.reshape(count, width) if width > 1 else values
+
+    @staticmethod
+    def _get_relative_matrix(target_obj:bpy.types.Object, obj:bpy.types.Object):
+        '''
+        obj的局部空间到target_obj局部空间的变换，两者相同时返回None，和join一样不做任何变换
+        '''
+        target_matrix = numpy.array(target_obj.matrix_world, dtype=numpy.float64)
+        obj_matrix = numpy.array(obj.matrix_world, dtype=numpy.float64)
+        if numpy.array_equal(target_matrix, obj_matrix):
+            return None
+        return numpy.linalg.inv(target_matrix) @ obj_matrix
+
+    @staticmethod
+    def _transform_positions(positions:numpy.ndarray, matrix) -> numpy.ndarray:
+        if matrix is None:
+            return positions
+        return (positions @ matrix[:3, :3].T + matrix[:3, 3]).astype(numpy.float32)
+
+    @staticmethod
+    def _transform_normals(normals:numpy.ndarray, matrix) -> numpy.ndarray:
+        if matrix is None:
+            return normals
+        normal_matrix = numpy.linalg.inv(matrix[:3, :3]).T
+        transformed = normals @ normal_matrix.T
+        lengths = numpy.linalg.norm(transformed, axis=1, keepdims=True)
+        lengths[lengths == 0] = 1.0
+        return (transformed / lengths).astype(numpy.float32)
+
+    @classmethod
+    def can_merge(cls, objects) -> bool:
+        '''
+        只处理最常见的情况，其它情况交给bpy.ops.object.join：
+        全部是网格物体、不在编辑模式、变换不含镜像、形态键都是相对形态键、所有属性类型都能用foreach读写
+        '''
+        target_obj = objects[0]
+        for obj in objects:
+            if obj.type != 'MESH' or obj.mode == 'EDIT':
+                return False
+
+            matrix = cls._get_relative_matrix(target_obj, obj)
+            if matrix is not None and numpy.linalg.det(matrix[:3, :3]) <= 0:
+                return False
+
+            shape_keys = obj.data.shape_keys
+            if shape_keys is not None and not shape_keys.use_relative:
+                return False
+
+            for attribute in obj.data.attributes:
+                if attribute.data_type not in cls.ATTRIBUTE_FOREACH_INFO and not attribute.name.startswith('.'):
+                    return False
+        return True
+
+    @classmethod
+    def _get_loop_normals(cls, mesh:bpy.types.Mesh) -> numpy.ndarray:
+        '''读取每个loop最终使用的法线'''
+        if bpy.app.version >= (4, 1, 0):
+            return cls._foreach_get(mesh.corner_normals, 'vector', len(mesh.loops), 3, numpy.float32)
+        mesh.calc_normals_split()
+        return cls._foreach_get(mesh.loops, 'normal', len(mesh.loops), 3, numpy.float32)
+
+    @staticmethod
+    def _get_merged_names(name_lists) -> list:
+        '''按出现顺序合并多个名称列表，第一个列表的名称排在前面'''
+        merged_names = []
+        seen = set()
+        for names in name_lists:
+            for name in names:
+                if name not in seen:
+                    seen.add(name)
+                    merged_names.append(name)
+        return merged_names
+
+    @classmethod
+    def _collect_generic_attributes(cls, meshes) -> list:
+        '''
+        需要按名称合并的通用属性，返回 [(名称, 域, 数据类型)]
+        UV层单独处理，内部属性（以.开头）不复制
+        '''
+        attribute_list = []
+        seen = set()
+        for mesh in meshes:
+            uv_names = {uv_layer.name for uv_layer in mesh.uv_layers}
+            for attribute in mesh.attributes:
+                name = attribute.name
+                if name in seen or name.startswith('.') or name in cls.SKIPPED_ATTRIBUTE_NAMES or name in uv_names:
+                    continue
+                seen.add(name)
+                attribute_list.append((name, attribute.domain, attribute.data_type))
+        return attribute_list
+
+    @staticmethod
+    def _get_domain_size(mesh:bpy.types.Mesh, domain:str) -> int:
+        if domain == 'POINT':
+            return len(mesh.vertices)
+        if domain == 'EDGE':
+            return len(mesh.edges)
+        if domain == 'FACE':
+            return len(mesh.polygons)
+        if domain == 'CORNER':
+            return len(mesh.loops)
+        return -1
+
+    @classmethod
+    def _build_merged_mesh(cls, target_obj:bpy.types.Object, objects, matrices, positions_list, material_list) -> bpy.types.Mesh:
+        '''
+        拼接所有物体的几何数据、材质索引、平滑、锐边、UV、通用属性和自定义法线，写入一个新网格
+        '''
+        meshes = [obj.data for obj in objects]
+        vertex_counts = numpy.array([len(mesh.vertices) for mesh in meshes], dtype=numpy.int64)
+        edge_counts = numpy.array([len(mesh.edges) for mesh in meshes], dtype=numpy.int64)
+        loop_counts = numpy.array([len(mesh.loops) for mesh in meshes], dtype=numpy.int64)
+        polygon_counts = numpy.array([len(mesh.polygons) for mesh in meshes], dtype=numpy.int64)
+
+        vertex_offsets = numpy.cumsum(vertex_counts) - vertex_counts
+        edge_offsets = numpy.cumsum(edge_counts) - edge_counts
+        loop_offsets = numpy.cumsum(loop_counts) - loop_counts
+
+        edge_vertices_list = []
+        loop_vertices_list = []
+        loop_edges_list = []
+        loop_starts_list = []
+        loop_totals_list = []
+        use_smooth_list = []
+        material_indices_list = []
+        use_seam_list = []
+        use_edge_sharp_list = []
+        for obj_index, (obj, mesh) in enumerate(zip(objects, meshes)):
+            edge_count = int(edge_counts[obj_index])
+            loop_count, polygon_count = int(loop_counts[obj_index]), int(polygon_counts[obj_index])
+
+            edge_vertices_list.append(cls._foreach_get(mesh.edges, 'vertices', edge_count, 2, numpy.int32) + vertex_offsets[obj_index])
+            use_seam_list.append(cls._foreach_get(mesh.edges, 'use_seam', edge_count, 1, numpy.bool_))
+            use_edge_sharp_list.append(cls._foreach_get(mesh.edges, 'use_edge_sharp', edge_count, 1, numpy.bool_))
+
+            loop_vertices_list.append(cls._foreach_get(mesh.loops, 'vertex_index', loop_count, 1, numpy.int32) + vertex_offsets[obj_index])
+            loop_edges_list.append(cls._foreach_get(mesh.loops, 'edge_index', loop_count, 1, numpy.int32) + edge_offsets[obj_index])
+
+            loop_starts_list.append(cls._foreach_get(mesh.polygons, 'loop_start', polygon_count, 1, numpy.int32) + loop_offsets[obj_index])
+            loop_totals_list.append(cls._foreach_get(mesh.polygons, 'loop_total', polygon_count, 1, numpy.int32))
+            use_smooth_list.append(cls._foreach_get(mesh.polygons, 'use_smooth', polygon_count, 1, numpy.bool_))
+
+            # 材质索引映射到合并后的材质列表
+            material_indices = cls._foreach_get(mesh.polygons, 'material_index', polygon_count, 1, numpy.int32)
+            slot_materials = [slot.material for slot in obj.material_slots]
+            if slot_materials:
+                material_map = numpy.array([material_list.index(material) for material in slot_materials], dtype=numpy.int32)
+                material_indices = material_map[numpy.clip(material_indices, 0, len(material_map) - 1)]
+            else:
+                material_indices = numpy.zeros(polygon_count, dtype=numpy.int32)
+            material_indices_list.append(material_indices)
+
+        # 自定义法线依赖网格结构，必须在修改任何数据之前读取
+        use_custom_normals = any(mesh.has_custom_normals for mesh in meshes)
+        loop_normals = None
+        if use_custom_normals:
+            loop_normals = numpy.concatenate([
+                cls._transform_normals(cls._get_loop_normals(mesh), matrices[obj_index])
+                for obj_index, mesh in enumerate(meshes)
+            ])
+
+        merged_mesh = bpy.data.meshes.new(target_obj.data.name)
+        merged_mesh.vertices.add(int(vertex_counts.sum()))
+        merged_mesh.edges.add(int(edge_counts.sum()))
+        merged_mesh.loops.add(int(loop_counts.sum()))
+        merged_mesh.polygons.add(int(polygon_counts.sum()))
+
+        merged_mesh.vertices.foreach_set('co', numpy.concatenate(positions_list).ravel())
+        merged_mesh.edges.foreach_set('vertices', numpy.concatenate(edge_vertices_list).astype(numpy.int32).ravel())
+        merged_mesh.loops.foreach_set('vertex_index', numpy.concatenate(loop_vertices_list).astype(numpy.int32))
+        merged_mesh.loops.foreach_set('edge_index', numpy.concatenate(loop_edges_list).astype(numpy.int32))
+        merged_mesh.polygons.foreach_set('loop_start', numpy.concatenate(loop_starts_list).astype(numpy.int32))
+        merged_mesh.polygons.foreach_set('loop_total', numpy.concatenate(loop_totals_list))
+        merged_mesh.update()
+
+        merged_mesh.polygons.foreach_set('use_smooth', numpy.concatenate(use_smooth_list))
+        merged_mesh.polygons.foreach_set('material_index', numpy.concatenate(material_indices_list))
+        merged_mesh.edges.foreach_set('use_seam', numpy.concatenate(use_seam_list))
+        merged_mesh.edges.foreach_set('use_edge_sharp', numpy.concatenate(use_edge_sharp_list))
+
+        for material in material_list:
+            merged_mesh.materials.append(material)
+
+        # 自动平滑设置沿用第一个物体（Blender 4.1之前）
+        target_mesh = target_obj.data
+        if hasattr(target_mesh, 'use_auto_smooth'):
+            merged_mesh.use_auto_smooth = target_mesh.use_auto_smooth
+            merged_mesh.auto_smooth_angle = target_mesh.auto_smooth_angle
+
+        cls._merge_uv_layers(merged_mesh, meshes, loop_counts)
+        cls._merge_generic_attributes(merged_mesh, meshes)
+
+        if use_custom_normals:
+            if hasattr(merged_mesh, 'use_auto_smooth'):
+                merged_mesh.use_auto_smooth = True
+            merged_mesh.normals_split_custom_set(loop_normals.tolist())
+
+        return merged_mesh
+
+    @classmethod
+    def _merge_uv_layers(cls, merged_mesh:bpy.types.Mesh, meshes, loop_counts):
+        uv_names = cls._get_merged_names([[uv_layer.name for uv_layer in mesh.uv_layers] for mesh in meshes])
+        for uv_name in uv_names:
+            uv_list = []
+            for mesh, loop_count in zip(meshes, loop_counts):
+                uv_layer = mesh.uv_layers.get(uv_name)
+                if uv_layer is None:
+                    uv_list.append(numpy.zeros((int(loop_count), 2), dtype=numpy.float32))
+                else:
+                    uv_list.append(cls._foreach_get(uv_layer.data, 'uv', int(loop_count), 2, numpy.float32))
+
+            merged_uv_layer = merged_mesh.uv_layers.new(name=uv_name, do_init=False)
+            merged_uv_layer.data.foreach_set('uv', numpy.concatenate(uv_list).ravel())
+
+        target_mesh = meshes[0]
+        if target_mesh.uv_layers.active is not None:
+            merged_mesh.uv_layers.active = merged_mesh.uv_layers.get(target_mesh.uv_layers.active.name)
+        for uv_layer in target_mesh.uv_layers:
+            if uv_layer.active_render:
+                merged_mesh.uv_layers[uv_layer.name].active_render = True
+
+    @classmethod
+    def _merge_generic_attributes(cls, merged_mesh:bpy.types.Mesh, meshes):
+        '''
+        颜色属性和其它自定义属性按名称合并，同名属性以第一次出现的域和类型为准，
+        域或类型不同的物体在这一段填0
+        '''
+        for name, domain, data_type in cls._collect_generic_attributes(meshes):
+            foreach_attr, width, dtype = cls.ATTRIBUTE_FOREACH_INFO[data_type]
+
+            value_list = []
+            for mesh in meshes:
+                size = cls._get_domain_size(mesh, domain)
+                attribute = mesh.attributes.get(name)
+                if attribute is None or attribute.domain != domain or attribute.data_type != data_type:
+                    value_list.append(numpy.zeros(size * width, dtype=dtype))
+                else:
+                    value_list.append(cls._foreach_get(attribute.data, foreach_attr, size, width, dtype).ravel())
+            values = numpy.concatenate(value_list)
+
+            merged_attribute = merged_mesh.attributes.get(name)
+            if merged_attribute is None:
+                merged_attribute = merged_mesh.attributes.new(name=name, type=data_type, domain=domain)
+            if len(values) != cls._get_domain_size(merged_mesh, domain) * width:
+                print(f"MeshMergeUtils: 属性 {name} 的长度和合并后的网格不一致，跳过")
+                continue
+            merged_attribute.data.foreach_set(foreach_attr, values)
+
+        target_mesh = meshes[0]
+        active_color = getattr(target_mesh.color_attributes, 'active_color', None)
+        if active_color is not None:
+            merged_active_color = merged_mesh.color_attributes.get(active_color.name)
+            if merged_active_color is not None:
+                merged_mesh.color_attributes.active_color = merged_active_color
+
+    @classmethod
+    def _merge_vertex_groups(cls, target_obj:bpy.types.Object, objects, meshes, vertex_offsets):
+        '''
+        顶点组按名称合并，第一个物体的顶点组保持原来的索引，其它物体新出现的顶点组追加在后面
+        '''
+        vg_names = cls._get_merged_names([[vg.name for vg in obj.vertex_groups] for obj in objects])
+        for vg_name in vg_names:
+            if target_obj.vertex_groups.get(vg_name) is None:
+                target_obj.vertex_groups.new(name=vg_name)
+        vg_name_index_dict = {vg.name: vg.index for vg in target_obj.vertex_groups}
+
+        vertex_ids_list = []
+        group_ids_list = []
+        weights_list = []
+        for obj_index, (obj, mesh) in enumerate(zip(objects, meshes)):
+            if obj_index == 0:
+                # 目标物体已有的顶点组索引不变
+                group_map = numpy.arange(len(obj.vertex_groups), dtype=numpy.int32)
+            else:
+                group_map = numpy.array([vg_name_index_dict[vg.name] for vg in obj.vertex_groups], dtype=numpy.int32)
+            if len(group_map) == 0:
+                continue
+            vertex_ids, group_ids, weights = VertexGroupUtils.get_vertex_group_weight_table(mesh, skip_zero_weights=False)
+            # 网格里可能残留指向已删除顶点组的权重，join会丢弃这些权重
+            valid = group_ids < len(group_map)
+            vertex_ids_list.append(vertex_ids[valid].astype(numpy.int64) + vertex_offsets[obj_index])
+            group_ids_list.append(group_map[group_ids[valid]])
+            weights_list.append(weights[valid])
+
+        if not vertex_ids_list:
+            return
+        cls._write_vertex_group_weights(
+            target_obj,
+            numpy.concatenate(vertex_ids_list),
+            numpy.concatenate(group_ids_list),
+            numpy.concatenate(weights_list),
+        )
+
+    @staticmethod
+    def _write_vertex_group_weights(obj:bpy.types.Object, vertex_ids:numpy.ndarray, group_ids:numpy.ndarray, weights:numpy.ndarray):
+        '''
+        Blender没有批量写入权重的接口，只能用VertexGroup.add一次写入多个相同权重的顶点
+        按 (顶点内的序号, 顶点组, 权重) 分批写入，调用次数等于不同组合的数量，
+        同时保持每个顶点内顶点组的原始顺序，和join的结果一致
+        vertex_ids 需要按顶点索引升序排列
+        '''
+        entry_count = len(vertex_ids)
+        if entry_count == 0:
+            return
+
+        vertex_starts = numpy.flatnonzero(numpy.r_[True, vertex_ids[1:] != vertex_ids[:-1]])
+        vertex_entry_counts = numpy.diff(numpy.r_[vertex_starts, entry_count])
+        ranks = numpy.arange(entry_count) - numpy.repeat(vertex_starts, vertex_entry_counts)
+
+        order = numpy.lexsort((weights, group_ids, ranks))
+        sorted_vertex_ids = vertex_ids[order]
+        sorted_group_ids = group_ids[order]
+        sorted_weights = weights[order]
+        sorted_ranks = ranks[order]
+
+        batch_starts = numpy.flatnonzero(numpy.r_[
+            True,
+            (sorted_ranks[1:] != sorted_ranks[:-1])
+            | (sorted_group_ids[1:] != sorted_group_ids[:-1])
+            | (sorted_weights[1:] != sorted_weights[:-1])
+        ])
+        batch_ends = numpy.r_[batch_starts[1:], entry_count]
+
+        vertex_groups = obj.vertex_groups
+        for start, end in zip(batch_starts.tolist(), batch_ends.tolist()):
+            vertex_groups[int(sorted_group_ids[start])].add(
+                sorted_vertex_ids[start:end].tolist(), float(sorted_weights[start]), 'REPLACE'
+            )
+
+    @classmethod
+    def _merge_shape_keys(cls, target_obj:bpy.types.Object, meshes, matrices, positions_list):
+        '''
+        形态键按名称合并，某个物体没有的形态键使用它自己的顶点位置
+        属性（数值、范围、静音、顶点组、参考形态键）沿用第一个拥有这个形态键的物体
+        '''
+        key_block_lists = [
+            list(mesh.shape_keys.key_blocks) if mesh.shape_keys is not None else []
+            for mesh in meshes
+        ]
+        key_names = cls._get_merged_names([[key_block.name for key_block in key_blocks] for key_blocks in key_block_lists])
+        if not key_names:
+            return
+
+        source_key_block_dict = {}
+        for key_blocks in key_block_lists:
+            for key_block in key_blocks:
+                source_key_block_dict.setdefault(key_block.name, key_block)
+
+        merged_key_blocks = []
+        for key_name in key_names:
+            key_co_list = []
+            for mesh, matrix, positions in zip(meshes, matrices, positions_list):
+                key_block = mesh.shape_keys.key_blocks.get(key_name) if mesh.shape_keys is not None else None
+                if key_block is None:
+                    key_co_list.append(positions)
+                else:
+                    key_co = cls._foreach_get(key_block.data, 'co', len(key_block.data), 3, numpy.float32)
+                    key_co_list.append(cls._transform_positions(key_co, matrix))
+            merged_key_blocks.append((key_name, numpy.concatenate(key_co_list)))
+
+        for key_name, key_co in merged_key_blocks:
+            new_key_block = target_obj.shape_key_add(name=key_name, from_mix=False)
+            new_key_block.data.foreach_set('co', key_co.ravel())
+
+            source_key_block = source_key_block_dict[key_name]
+            new_key_block.interpolation = source_key_block.interpolation
+            new_key_block.mute = source_key_block.mute
+            new_key_block.vertex_group = source_key_block.vertex_group
+            # 范围的最小值不能超过最大值，先放宽最大值再设置
+            new_key_block.slider_max = max(source_key_block.slider_max, new_key_block.slider_max)
+            new_key_block.slider_min = source_key_block.slider_min
+            new_key_block.slider_max = source_key_block.slider_max
+            new_key_block.value = source_key_block.value
+
+        merged_key_blocks_by_name = target_obj.data.shape_keys.key_blocks
+        for key_name in key_names:
+            relative_key = source_key_block_dict[key_name].relative_key
+            if relative_key is not None and relative_key.name in merged_key_blocks_by_name:
+                merged_key_blocks_by_name[key_name].relative_key = merged_key_blocks_by_name[relative_key.name]
+
+    @classmethod
+    def join_objects(cls, objects):
+        '''
+        把objects合并到第一个物体上，其它物体和它们不再使用的网格会被删除
+        调用前应先用can_merge检查
+        '''
+        target_obj = objects[0]
+        matrices = [None] + [cls._get_relative_matrix(target_obj, obj) for obj in objects[1:]]
+
+        material_list = cls._get_merged_names([[slot.material for slot in obj.material_slots] for obj in objects])
+
+        # 变换后的顶点位置在拼接网格和合并形态键时共用
+        positions_list = [
+            cls._transform_positions(cls._foreach_get(obj.data.vertices, 'co', len(obj.data.vertices), 3, numpy.float32), matrix)
+            for obj, matrix in zip(objects, matrices)
+        ]
+        vertex_counts = numpy.array([len(positions) for positions in positions_list], dtype=numpy.int64)
+        vertex_offsets = (numpy.cumsum(vertex_counts) - vertex_counts).tolist()
+
+        source_meshes = [obj.data for obj in objects]
+        merged_mesh = cls._build_merged_mesh(target_obj, objects, matrices, positions_list, material_list)
+
+        # 顶点组权重和形态键存储在网格上，替换网格之后仍然从源网格读取
+        old_target_mesh_name = source_meshes[0].name
+        target_obj.data = merged_mesh
+        cls._merge_vertex_groups(target_obj, objects, source_meshes, vertex_offsets)
+        cls._merge_shape_keys(target_obj, source_meshes, matrices, positions_list)
+
+        for obj in objects[1:]:
+            bpy.data.objects.remove(obj, do_unlink=True)
+        # 关联复制的物体会共用同一个网格，删除时去重，否则会读取已删除网格的users
+        for mesh in dict.fromkeys(source_meshes):
+            if mesh.users == 0:
+                bpy.data.meshes.remove(mesh)
+        merged_mesh.name = old_target_mesh_name
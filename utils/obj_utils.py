@@ -11,6 +11,7 @@ from typing import List, Dict, Union
 from dataclasses import dataclass, field, asdict
 
 from .format_utils import Fatal
+from .mesh_merge_utils import MeshMergeUtils
 from operator import attrgetter, itemgetter
 
 
@@ -456,6 +457,10 @@ class ObjUtils:
         '''
         if len(objects) == 1:
             return
+        # 常见情况直接在数据层面合并，不需要选中物体和调用join操作符
+        if MeshMergeUtils.can_merge(objects):
+            MeshMergeUtils.join_objects(objects)
+            return
         unused_meshes = []
         with OpenObject(context, objects[0], mode='OBJECT'):
             for obj in objects[1:]:
@@ -465,6 +470,25 @@ class ObjUtils:
         for mesh in unused_meshes:
             remove_mesh(mesh)
 
+    @staticmethod
+    def apply_rotation_scale(obj):
+        '''
+        效果和 bpy.ops.object.transform_apply(location=False, rotation=True, scale=True) 一致：
+        把物体的旋转和缩放（包括delta变换）写入网格和形态键，然后把物体的旋转和缩放清零
+        直接修改数据，不需要选中物体
+        '''
+        obj = ObjUtils.assert_object(obj)
+        obj.data.transform(obj.matrix_basis.to_3x3().to_4x4(), shape_keys=True)
+        obj.data.update()
+
+        obj.rotation_euler = (0.0, 0.0, 0.0)
+        obj.rotation_quaternion = (1.0, 0.0, 0.0, 0.0)
+        obj.rotation_axis_angle = (0.0, 0.0, 1.0, 0.0)
+        obj.scale = (1.0, 1.0, 1.0)
+        obj.delta_rotation_euler = (0.0, 0.0, 0.0)
+        obj.delta_rotation_quaternion = (1.0, 0.0, 0.0, 0.0)
+        obj.delta_scale = (1.0, 1.0, 1.0)
+
     @staticmethod
     def get_vertex_groups(obj):
         obj = ObjUtils.assert_object(obj)
@@ -579,23 +603,20 @@ class ObjUtils:
         if target_collection is None:
             target_collection = bpy.context.collection
         
-        # Deselect all objects
-        bpy.ops.object.select_all(action='DESELECT')
-
-        # Select and make one of the objects in the list active
+        # 和之前逐个选中时一样，列表中最后一个在当前视图层中的物体作为合并目标
+        active_obj = None
         for obj in obj_list:
-            obj.select_set(True)
             if obj.name in bpy.context.view_layer.objects:
-                bpy.context.view_layer.objects.active = obj
-        
-        # Ensure the active object is set to one of the objects to be merged
-        active_obj = bpy.context.view_layer.objects.active
-        
-        # Perform the join operation
-        bpy.ops.object.join()
+                active_obj = obj
+        if active_obj is None:
+            active_obj = bpy.context.view_layer.objects.active
+
+        # 合并目标放在第一个，其它物体合并到它上面
+        ordered_obj_list = [active_obj] + [obj for obj in obj_list if obj != active_obj]
+        cls.join_objects(bpy.context, ordered_obj_list)
 
         # After joining, the result is a single object. We can rename it if needed.
-        joined_obj = bpy.context.view_layer.objects.active
+        joined_obj = active_obj
         joined_obj.name = "MeshObject"
         
         # Optionally move the merged object to the specified collection
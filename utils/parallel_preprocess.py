@@ -1,5 +1,6 @@
 
 
+import bpy
 import os
 import sys
 import json
@@ -7,13 +8,18 @@ import shutil
 import tempfile
 import subprocess
 import multiprocessing
+import threading
+import queue
+import time
+import atexit
+import heapq
+from multiprocessing.connection import Listener
 from pathlib import Path
-from typing import List, Dict, Tuple, Optional, TYPE_CHECKING
-from dataclasses import dataclass, asdict
+from typing import List, Dict, Tuple, Optional
+from dataclasses import dataclass, field, asdict
 from datetime import datetime
 
-if TYPE_CHECKING:
-    import bpy
+from .performance_stats import get_performance_stats
 
 
 @dataclass
@@ -25,6 +31,8 @@ class PreprocessTask:
     output_blend: str
     mirror_workflow: bool
     vg_mapping_texts: Dict[str, str]
+    # 创建任务时项目文件的修改时间，和工作进程已加载的不一致时工作进程会重新加载项目文件
+    blend_mtime: float = 0.0
 
 
 @dataclass
@@ -36,6 +44,287 @@ class PreprocessResult:
     processed_objects: List[str]
     output_blend: str
     processing_time: float
+    # 每个物体的实际处理耗时（秒），用于下次调度的负载估计
+    object_times: Dict[str, float] = field(default_factory=dict)
+
+
+class _PreprocessWorker:
+    """一个常驻 Blender 工作进程及其通信连接"""
+    
+    def __init__(self, process: subprocess.Popen, log_file: str):
+        self.process = process
+        self.log_file = log_file
+        self.conn = None
+    
+    def is_alive(self) -> bool:
+        return self.conn is not None and self.process.poll() is None
+    
+    def kill(self):
+        if self.conn is not None:
+            try:
+                self.conn.close()
+            except OSError:
+                pass
+            self.conn = None
+        if self.process.poll() is None:
+            self.process.kill()
+            self.process.wait()
+    
+    def run_task(self, task: PreprocessTask, timeout: float) -> PreprocessResult:
+        """发送任务并等待结果，超时或进程退出时结束该进程"""
+        start_time = datetime.now()
+        error_message = ""
+        try:
+            self.conn.send({"op": "task", "task": asdict(task)})
+            if self.conn.poll(timeout):
+                reply = self.conn.recv()
+                return PreprocessResult(
+                    task_id=task.task_id,
+                    success=reply.get("success", False) and os.path.exists(task.output_blend),
+                    error_message=reply.get("error_message", ""),
+                    processed_objects=reply.get("processed_objects", []),
+                    output_blend=task.output_blend,
+                    processing_time=reply.get("processing_time", 0),
+                    object_times=reply.get("object_times", {})
+                )
+            error_message = "预处理超时"
+        except (EOFError, OSError) as e:
+            error_message = f"工作进程已退出: {e}"
+        
+        self.kill()
+        return PreprocessResult(
+            task_id=task.task_id,
+            success=False,
+            error_message=f"{error_message}，日志: {self.log_file}",
+            processed_objects=[],
+            output_blend="",
+            processing_time=(datetime.now() - start_time).total_seconds()
+        )
+
+
+class PreprocessWorkerPool:
+    """
+    常驻的 Blender 工作进程池
+    
+    每个工作进程启动时加载一次项目文件，然后通过本地 socket 循环接收任务，
+    重复导出时不再重复支付 Blender 启动的开销。
+    并行导出要求项目已保存且没有未保存的修改，所以物体变化必然伴随项目文件的修改时间变化，
+    任务中带有项目文件的修改时间，工作进程发现变化时在进程内重新加载项目文件。
+    进程池只在 Blender 路径、项目文件路径或进程数变化时重建，空闲超过 IDLE_TIMEOUT 秒后关闭。
+    """
+    
+    STARTUP_TIMEOUT = 300
+    TASK_TIMEOUT = 1800
+    IDLE_TIMEOUT = 600
+    WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "parallel_preprocess_worker.py")
+    
+    def __init__(self, blender_exe: str, blend_file: str, num_workers: int):
+        self.blender_exe = blender_exe
+        self.blend_file = blend_file
+        self.num_workers = num_workers
+        self.log_dir = tempfile.mkdtemp(prefix="ssmt_worker_pool_")
+        self.workers: List[_PreprocessWorker] = []
+        self._next_worker_id = 0
+        self._start_workers(num_workers)
+    
+    def is_valid_for(self, blender_exe: str, blend_file: str, num_workers: int) -> bool:
+        """检查进程池是否仍然对应当前的 Blender 和项目文件"""
+        return self.blender_exe == blender_exe and self.blend_file == blend_file and self.num_workers == num_workers
+    
+    def alive_worker_count(self) -> int:
+        return sum(1 for worker in self.workers if worker.is_alive())
+    
+    def _start_workers(self, count: int):
+        """启动 count 个工作进程并等待它们连接"""
+        if count <= 0:
+            return
+        
+        authkey = os.urandom(16)
+        listener = Listener(("127.0.0.1", 0), authkey=authkey)
+        port = listener.address[1]
+        
+        pending = {}
+        for _ in range(count):
+            worker_id = self._next_worker_id
+            self._next_worker_id += 1
+            log_file = os.path.join(self.log_dir, f"worker_{worker_id}_log.txt")
+            cmd = [
+                self.blender_exe,
+                '-b',
+                self.blend_file,
+                '-P', self.WORKER_SCRIPT,
+                '--', str(port), authkey.hex()
+            ]
+            with open(log_file, 'w', encoding='utf-8') as log:
+                process = subprocess.Popen(cmd, stdout=log, stderr=subprocess.STDOUT)
+            pending[process.pid] = _PreprocessWorker(process, log_file)
+        
+        print(f"[ParallelPreprocess] 启动 {count} 个常驻工作进程，日志目录: {self.log_dir}")
+        
+        def accept_all():
+            for _ in range(count):
+                try:
+                    conn = listener.accept()
+                    hello = conn.recv()
+                except (OSError, EOFError):
+                    return
+                worker = pending.pop(hello.get("pid"), None)
+                if worker is None and pending:
+                    # Blender 启动器可能再派生一次进程，pid 对不上时按顺序配对
+                    worker = pending.pop(next(iter(pending)))
+                if worker is not None:
+                    worker.conn = conn
+                    self.workers.append(worker)
+        
+        accept_thread = threading.Thread(target=accept_all, daemon=True)
+        accept_thread.start()
+        deadline = time.time() + self.STARTUP_TIMEOUT
+        while accept_thread.is_alive() and time.time() < deadline:
+            if all(worker.process.poll() is not None for worker in pending.values()) and pending:
+                break
+            accept_thread.join(timeout=0.5)
+        listener.close()
+        
+        for worker in list(pending.values()):
+            print(f"[ParallelPreprocess] 工作进程启动失败，日志: {worker.log_file}")
+            worker.kill()
+    
+    def ensure_workers(self):
+        """移除已退出的工作进程并补齐数量"""
+        for worker in [worker for worker in self.workers if not worker.is_alive()]:
+            worker.kill()
+            self.workers.remove(worker)
+        self._start_workers(self.num_workers - len(self.workers))
+    
+    def run_tasks(self, tasks: List[PreprocessTask], progress_callback=None) -> List[PreprocessResult]:
+        """
+        把任务放入共享队列，每个工作进程处理完一个任务后立即领取下一个，
+        结果在调用线程中收集，progress_callback 也在调用线程中执行
+        """
+        self.ensure_workers()
+        
+        task_queue = queue.Queue()
+        for task in tasks:
+            task_queue.put(task)
+        result_queue = queue.Queue()
+        
+        def worker_thread(worker: _PreprocessWorker):
+            while worker.is_alive():
+                try:
+                    task = task_queue.get_nowait()
+                except queue.Empty:
+                    return
+                print(f"[ParallelPreprocess] 开始任务 {task.task_id}")
+                result_queue.put(worker.run_task(task, self.TASK_TIMEOUT))
+        
+        threads = [threading.Thread(target=worker_thread, args=(worker,), daemon=True) for worker in self.workers if worker.is_alive()]
+        for thread in threads:
+            thread.start()
+        
+        results = []
+        total = len(tasks)
+        while len(results) < total:
+            try:
+                results.append(result_queue.get(timeout=1))
+            except queue.Empty:
+                if not any(thread.is_alive() for thread in threads) and result_queue.empty():
+                    break
+                continue
+            if progress_callback:
+                progress_callback(len(results) / total * 100)
+        
+        # 所有工作进程都退出后队列里剩下的任务
+        while not task_queue.empty():
+            task = task_queue.get_nowait()
+            results.append(PreprocessResult(
+                task_id=task.task_id,
+                success=False,
+                error_message="没有可用的工作进程",
+                processed_objects=[],
+                output_blend="",
+                processing_time=0
+            ))
+        
+        return results
+    
+    def shutdown(self):
+        """通知所有工作进程退出"""
+        for worker in self.workers:
+            if worker.is_alive():
+                try:
+                    worker.conn.send({"op": "quit"})
+                    worker.process.wait(timeout=10)
+                except (OSError, subprocess.TimeoutExpired):
+                    pass
+            worker.kill()
+        self.workers.clear()
+        shutil.rmtree(self.log_dir, ignore_errors=True)
+
+
+_global_worker_pool: Optional[PreprocessWorkerPool] = None
+_worker_pool_lock = threading.RLock()
+# 导出结束后启动的空闲计时器，下次获取进程池时取消
+_idle_timer: Optional[threading.Timer] = None
+
+
+def _cancel_idle_timer():
+    global _idle_timer
+    if _idle_timer is not None:
+        _idle_timer.cancel()
+        _idle_timer = None
+
+
+def get_worker_pool(blender_exe: str, blend_file: str, num_workers: int) -> PreprocessWorkerPool:
+    """获取常驻工作进程池，Blender 路径、项目文件路径或进程数变化时重建"""
+    global _global_worker_pool
+    
+    with _worker_pool_lock:
+        _cancel_idle_timer()
+        
+        if _global_worker_pool is not None and not _global_worker_pool.is_valid_for(blender_exe, blend_file, num_workers):
+            print(f"[ParallelPreprocess] 项目文件或进程数已变更，重启常驻工作进程")
+            _global_worker_pool.shutdown()
+            _global_worker_pool = None
+        
+        if _global_worker_pool is None:
+            _global_worker_pool = PreprocessWorkerPool(blender_exe, blend_file, num_workers)
+        
+        return _global_worker_pool
+
+
+def release_worker_pool():
+    """一次导出用完进程池后调用，空闲超过 IDLE_TIMEOUT 秒没有再次使用时关闭进程池"""
+    global _idle_timer
+    
+    def shutdown_if_idle():
+        with _worker_pool_lock:
+            # 计时器已被取消或替换时说明进程池又被使用了
+            if _idle_timer is not timer:
+                return
+            print(f"[ParallelPreprocess] 常驻工作进程空闲超时，关闭进程池")
+            shutdown_worker_pool()
+    
+    with _worker_pool_lock:
+        _cancel_idle_timer()
+        if _global_worker_pool is None:
+            return
+        timer = threading.Timer(PreprocessWorkerPool.IDLE_TIMEOUT, shutdown_if_idle)
+        timer.daemon = True
+        _idle_timer = timer
+        timer.start()
+
+
+def shutdown_worker_pool():
+    """关闭常驻工作进程池，插件注销和 Blender 退出时也会调用"""
+    global _global_worker_pool
+    with _worker_pool_lock:
+        _cancel_idle_timer()
+        if _global_worker_pool is not None:
+            _global_worker_pool.shutdown()
+            _global_worker_pool = None
+
+
+atexit.register(shutdown_worker_pool)
 
 
 class ParallelPreprocessManager:
@@ -103,29 +392,85 @@ class ParallelPreprocessManager:
             except Exception as e:
                 print(f"[ParallelPreprocess] 清理失败: {e}")
     
+    # 负载估计的经验系数：每个启用的修改器、每个形态键带来的额外开销比例
+    MODIFIER_COST_FACTOR = 0.5
+    SHAPE_KEY_COST_FACTOR = 1.0
+    # 每个物体的固定开销（复制、链接、写出），以面数为单位
+    OBJECT_BASE_COST = 1000
+    
+    @classmethod
+    def _estimate_object_cost(cls, obj) -> float:
+        """
+        根据面数、修改器和形态键估计一个物体的相对预处理开销
+        
+        三角化与面数成正比；启用的修改器越多应用越慢；
+        带形态键的物体应用修改器时要对每个形态键重复一次，开销乘以形态键数量
+        """
+        if obj is None or obj.type != 'MESH' or obj.data is None:
+            return cls.OBJECT_BASE_COST
+        
+        poly_count = len(obj.data.polygons)
+        enabled_modifiers = sum(1 for mod in obj.modifiers if mod.show_viewport)
+        shape_key_count = len(obj.data.shape_keys.key_blocks) if obj.data.shape_keys else 0
+        
+        cost = poly_count * (1 + cls.MODIFIER_COST_FACTOR * enabled_modifiers)
+        if enabled_modifiers > 0 and shape_key_count > 0:
+            cost *= 1 + cls.SHAPE_KEY_COST_FACTOR * shape_key_count
+        return cls.OBJECT_BASE_COST + cost
+    
+    @classmethod
+    def _estimate_object_costs(cls, object_names: List[str]) -> Dict[str, float]:
+        """
+        估计每个物体的预处理耗时
+        
+        有历史耗时的物体直接使用历史值；其余物体用启发式开销乘以换算系数，
+        换算系数由同时具有历史值和启发式开销的物体拟合得到，没有历史时为1
+        """
+        performance_stats = get_performance_stats()
+        heuristic_costs = {name: cls._estimate_object_cost(bpy.data.objects.get(name)) for name in object_names}
+        history_costs = {name: performance_stats.get_object_cost(name) for name in object_names}
+        history_costs = {name: cost for name, cost in history_costs.items() if cost is not None}
+        
+        scale = 1.0
+        history_heuristic_total = sum(heuristic_costs[name] for name in history_costs)
+        if history_costs and history_heuristic_total > 0:
+            scale = sum(history_costs.values()) / history_heuristic_total
+        
+        return {name: history_costs.get(name, heuristic_costs[name] * scale) for name in object_names}
+    
     def _split_objects(self, object_names: List[str]) -> List[List[str]]:
-        """将物体列表分割成多个子集"""
+        """
+        按估计耗时把物体分配到各个工作进程
+        
+        使用 LPT（最长处理时间优先）装箱：按耗时从大到小依次放入当前总耗时最小的子集，
+        各子集的总耗时尽量接近 总耗时/进程数，而不是由分到大模型的那个子集决定
+        """
         num_objects = len(object_names)
         actual_workers = min(self.num_workers, num_objects)
         
         if actual_workers == 0:
             return []
         
-        subset_size = num_objects // actual_workers
-        remainder = num_objects % actual_workers
+        object_costs = self._estimate_object_costs(object_names)
         
-        subsets = []
-        start = 0
+        # (子集总耗时, 子集编号)
+        bins = [(0.0, i) for i in range(actual_workers)]
+        subsets = [[] for _ in range(actual_workers)]
+        subset_costs = [0.0] * actual_workers
+        for obj_name in sorted(object_names, key=lambda name: object_costs[name], reverse=True):
+            total_cost, index = heapq.heappop(bins)
+            subsets[index].append(obj_name)
+            subset_costs[index] = total_cost + object_costs[obj_name]
+            heapq.heappush(bins, (subset_costs[index], index))
         
-        for i in range(actual_workers):
-            size = subset_size + (1 if i < remainder else 0)
-            if size > 0:
-                subsets.append(object_names[start:start + size])
-            start += size
+        # 耗时最大的子集排在最前面，最先分发
+        order = sorted((i for i in range(actual_workers) if subsets[i]), key=lambda i: subset_costs[i], reverse=True)
+        subset_costs = [subset_costs[i] for i in order]
+        subsets = [subsets[i] for i in order]
         
         print(f"[ParallelPreprocess] 分割 {num_objects} 个物体到 {len(subsets)} 个子集")
-        for i, subset in enumerate(subsets):
-            print(f"[ParallelPreprocess] 子集 {i}: {len(subset)} 个物体")
+        for i, (subset, cost) in enumerate(zip(subsets, subset_costs)):
+            print(f"[ParallelPreprocess] 子集 {i}: {len(subset)} 个物体, 估计负载 {cost:.2f}")
         return subsets
     
     def _create_tasks(
@@ -136,6 +481,7 @@ class ParallelPreprocessManager:
         vg_mapping_texts: Dict[str, str]
     ) -> None:
         """创建预处理任务"""
+        blend_mtime = os.path.getmtime(blend_file) if os.path.exists(blend_file) else 0.0
         for i, subset in enumerate(subsets):
             output_blend = os.path.join(self.temp_dir, f"preprocessed_{i}.blend")
             
@@ -145,19 +491,13 @@ class ParallelPreprocessManager:
                 object_names=subset,
                 output_blend=output_blend,
                 mirror_workflow=mirror_workflow,
-                vg_mapping_texts=vg_mapping_texts
+                vg_mapping_texts=vg_mapping_texts,
+                blend_mtime=blend_mtime
             )
             self.tasks.append(task)
-            
-            task_json = os.path.join(self.temp_dir, f"task_{i}.json")
-            with open(task_json, 'w', encoding='utf-8') as f:
-                json.dump(asdict(task), f, ensure_ascii=False, indent=2)
     
     def _run_workers(self, progress_callback=None) -> None:
-        """启动并运行所有工作进程"""
-        import threading
-        import queue
-        
+        """把任务分发给常驻工作进程池并等待全部完成"""
         print(f"[ParallelPreprocess] 准备查找 Blender 可执行文件...")
         blender_exe = self._find_blender_executable()
         print(f"[ParallelPreprocess] Blender 可执行文件: {blender_exe}")
@@ -166,859 +506,30 @@ class ParallelPreprocessManager:
             print(f"[ParallelPreprocess] 错误: Blender 可执行文件无效或不存在: {blender_exe}")
             return
         
-        print(f"[ParallelPreprocess] 启动 {len(self.tasks)} 个工作进程...")
-        
-        result_queue = queue.Queue()
-        threads = []
-        semaphore = threading.Semaphore(self.num_workers)
-        
-        def worker_thread(task: PreprocessTask):
-            with semaphore:
-                try:
-                    print(f"[ParallelPreprocess] 开始任务 {task.task_id}")
-                    result = self._run_single_worker(blender_exe, task)
-                    result_queue.put(result)
-                    print(f"[ParallelPreprocess] 任务 {task.task_id} 完成")
-                except Exception as e:
-                    print(f"[ParallelPreprocess] 任务 {task.task_id} 异常: {e}")
-                    import traceback
-                    traceback.print_exc()
-                    result_queue.put(PreprocessResult(
-                        task_id=task.task_id,
-                        success=False,
-                        error_message=str(e),
-                        processed_objects=[],
-                        output_blend="",
-                        processing_time=0
-                    ))
-        
-        for task in self.tasks:
-            print(f"[ParallelPreprocess] 创建线程 {task.task_id}")
-            thread = threading.Thread(target=worker_thread, args=(task,))
-            thread.start()
-            threads.append(thread)
-            print(f"[ParallelPreprocess] 线程 {task.task_id} 已启动")
-        
-        completed = 0
-        total = len(threads)
-        print(f"[ParallelPreprocess] 等待 {total} 个任务完成...")
-        
-        while completed < total:
-            try:
-                result = result_queue.get(timeout=1)
-                self.results.append(result)
-                completed += 1
-                
-                if progress_callback:
-                    progress_callback(completed / total * 100)
-                
-                status = "成功" if result.success else "失败"
-                print(f"[ParallelPreprocess] 任务 {result.task_id} {status}")
-                if not result.success:
-                    print(f"[ParallelPreprocess] 错误信息: {result.error_message}")
-            except queue.Empty:
-                continue
-        
-        print(f"[ParallelPreprocess] 所有任务完成，等待线程结束...")
-        for thread in threads:
-            thread.join(timeout=1)
-        print(f"[ParallelPreprocess] 所有线程已结束")
-    
-    @staticmethod
-    def _run_single_worker(blender_exe: str, task: PreprocessTask) -> PreprocessResult:
-        """运行单个工作进程 - 执行预处理（优化版）"""
-        start_time = datetime.now()
-        
-        try:
-            addon_name = "ssmt_theherta_plugin"
-            
-            # 优化：预生成脚本，避免每次都生成
-            script = f'''
-import bpy
-import sys
-import json
-import os
-import traceback
-import time
-
-# 优化：控制日志级别，减少不必要的输出
-VERBOSE = False
-
-if VERBOSE:
-    print("=" * 50)
-    print(f"[Worker {task.task_id}] 脚本开始执行")
-    print(f"[Worker {task.task_id}] Python 路径: {{sys.path[:3]}}")
-    print("=" * 50)
-
-# 任务参数
-task_id = {task.task_id}
-object_names = {json.dumps(task.object_names)}
-mirror_workflow = {str(task.mirror_workflow)}
-output_blend = r"{task.output_blend}"
-vg_mapping_texts = {json.dumps(task.vg_mapping_texts or {})}
-
-if VERBOSE:
-    print(f"[Worker {{task_id}}] 物体数量: {{len(object_names)}}")
-    print(f"[Worker {{task_id}}] 非镜像工作流: {{mirror_workflow}}")
-    print(f"[Worker {{task_id}}] 输出文件: {{output_blend}}")
-    print(f"[Worker {{task_id}}] 映射表数量: {{len(vg_mapping_texts)}}")
-
-# 检查物体是否存在
-if VERBOSE:
-    for obj_name in object_names:
-        obj = bpy.data.objects.get(obj_name)
-        if obj:
-            print(f"[Worker {{task_id}}] 找到物体: {{obj_name}} (类型: {{obj.type}})")
-        else:
-            print(f"[Worker {{task_id}}] 警告: 物体不存在 {{obj_name}}")
-
-
-def reset_shapekey_values(obj):
-    """重置所有形态键值为0"""
-    if obj.data.shape_keys is None:
-        return
-    for kb in obj.data.shape_keys.key_blocks:
-        kb.value = 0.0
-
-
-def apply_modifiers_for_object_with_shape_keys_optimized(context, selected_modifiers, disable_armatures=False):
-    """
-    优化版：使用 numpy 直接处理形态键数据
-    避免对每个形态键重复复制物体和应用修改器
-    """
-    import numpy
-    
-    if len(selected_modifiers) == 0:
-        return (True, None)
-    
-    obj = context.object
-    
-    modifiers_that_transform_vertices = {{'ARMATURE', 'CURVE', 'LATTICE', 'SHRINKWRAP', 'SIMPLE_DEFORM', 'BEND', 'HOOK'}}
-    has_transform_modifiers = False
-    for modifier in obj.modifiers:
-        if modifier.name in selected_modifiers and modifier.type in modifiers_that_transform_vertices and modifier.show_viewport:
-            has_transform_modifiers = True
-            break
-    
-    if has_transform_modifiers:
-        print(f"[Worker {{task_id}}] ShapeKeyOptimized: 检测到会变换顶点的修改器，回退到原始算法")
-        return apply_modifiers_for_object_with_shape_keys_legacy(context, selected_modifiers, disable_armatures)
-    
-    start_time = time.time()
-    
-    contains_mirror_with_merge = False
-    for modifier in obj.modifiers:
-        if modifier.name in selected_modifiers:
-            if modifier.type == 'MIRROR' and modifier.use_mirror_merge == True:
-                contains_mirror_with_merge = True
-    
-    disabled_armature_modifiers = []
-    if disable_armatures:
-        for modifier in obj.modifiers:
-            if modifier.name not in selected_modifiers and modifier.type == 'ARMATURE' and modifier.show_viewport == True:
-                disabled_armature_modifiers.append(modifier)
-                modifier.show_viewport = False
-    
-    if not obj.data.shape_keys:
-        for modifier_name in selected_modifiers:
-            mod = obj.modifiers.get(modifier_name)
-            if mod and mod.show_viewport:
-                bpy.ops.object.modifier_apply(modifier=modifier_name)
-        return (True, None)
-    
-    shapes_count = len(obj.data.shape_keys.key_blocks)
-    
-    if shapes_count == 0:
-        for modifier_name in selected_modifiers:
-            mod = obj.modifiers.get(modifier_name)
-            if mod and mod.show_viewport:
-                bpy.ops.object.modifier_apply(modifier=modifier_name)
-        return (True, None)
-    
-    print(f"[Worker {{task_id}}] ShapeKeyOptimized: 开始处理 {{shapes_count}} 个形态键")
-    
-    properties_list = []
-    properties = ["interpolation", "mute", "name", "relative_key", "slider_max", "slider_min", "value", "vertex_group"]
-    
-    for i in range(shapes_count):
-        key_b = obj.data.shape_keys.key_blocks[i]
-        props = {{p: None for p in properties}}
-        props["name"] = key_b.name
-        props["mute"] = key_b.mute
-        props["interpolation"] = key_b.interpolation
-        props["relative_key"] = key_b.relative_key.name
-        props["slider_max"] = key_b.slider_max
-        props["slider_min"] = key_b.slider_min
-        props["value"] = key_b.value
-        props["vertex_group"] = key_b.vertex_group
-        properties_list.append(props)
-    
-    original_vert_count = len(obj.data.vertices)
-    
-    shape_key_coords = []
-    for i in range(shapes_count):
-        key_b = obj.data.shape_keys.key_blocks[i]
-        coords = numpy.empty((original_vert_count, 3), dtype=numpy.float32)
-        key_b.data.foreach_get('co', coords.ravel())
-        shape_key_coords.append(coords)
-    
-    print(f"[Worker {{task_id}}] ShapeKeyOptimized: 已提取 {{shapes_count}} 个形态键坐标数据")
-    
-    bpy.ops.object.shape_key_remove(all=True)
-    
-    for modifier_name in selected_modifiers:
-        bpy.ops.object.modifier_apply(modifier=modifier_name)
-    
-    new_vert_count = len(obj.data.vertices)
-    
-    if original_vert_count != new_vert_count:
-        error_hint = ""
-        if contains_mirror_with_merge:
-            error_hint = "\\n提示: 镜像修改器启用了 'Merge' 选项可能导致问题。"
-        error_info = (f"顶点数量变化: {{original_vert_count}} -> {{new_vert_count}}！\\n"
-                     f"形态键要求修改器应用后顶点数量不变。{{error_hint}}")
-        
-        for modifier in disabled_armature_modifiers:
-            modifier.show_viewport = True
-        return (False, error_info)
-    
-    bpy.ops.object.shape_key_add(from_mix=False)
-    
-    for i in range(1, shapes_count):
-        key_b = obj.shape_key_add(name=properties_list[i]["name"], from_mix=False)
-        key_b.data.foreach_set('co', shape_key_coords[i].ravel())
-    
-    print(f"[Worker {{task_id}}] ShapeKeyOptimized: 已重新创建 {{shapes_count - 1}} 个形态键")
-    
-    for i in range(shapes_count):
-        key_b = obj.data.shape_keys.key_blocks[i]
-        key_b.name = properties_list[i]["name"]
-        key_b.interpolation = properties_list[i]["interpolation"]
-        key_b.mute = properties_list[i]["mute"]
-        key_b.slider_max = properties_list[i]["slider_max"]
-        key_b.slider_min = properties_list[i]["slider_min"]
-        key_b.value = properties_list[i]["value"]
-        key_b.vertex_group = properties_list[i]["vertex_group"]
-        
-        rel_key = properties_list[i]["relative_key"]
-        for j in range(shapes_count):
-            key_brel = obj.data.shape_keys.key_blocks[j]
-            if rel_key == key_brel.name:
-                key_b.relative_key = key_brel
-                break
-    
-    for modifier in disabled_armature_modifiers:
-        modifier.show_viewport = True
-    
-    elapsed = time.time() - start_time
-    print(f"[Worker {{task_id}}] ShapeKeyOptimized: 完成，耗时: {{elapsed:.2f}}秒")
-    
-    return (True, None)
-
-
-def apply_modifiers_for_object_with_shape_keys(context, selected_modifiers, disable_armatures=False):
-    """兼容接口：调用优化版"""
-    return apply_modifiers_for_object_with_shape_keys_optimized(context, selected_modifiers, disable_armatures)
-
-
-def apply_modifiers_for_object_with_shape_keys_legacy(context, selected_modifiers, disable_armatures=False):
-    """原始算法：用于处理会变换顶点的修改器"""
-    if len(selected_modifiers) == 0:
-        return (True, None)
-    
-    properties = ["interpolation", "mute", "name", "relative_key", "slider_max", "slider_min", "value", "vertex_group"]
-    list_properties = []
-    shapes_count = 0
-    vert_count = -1
-    start_time_inner = time.time()
-    
-    contains_mirror_with_merge = False
-    for modifier in context.object.modifiers:
-        if modifier.name in selected_modifiers:
-            if modifier.type == 'MIRROR' and modifier.use_mirror_merge == True:
-                contains_mirror_with_merge = True
-    
-    disabled_armature_modifiers = []
-    if disable_armatures:
-        for modifier in context.object.modifiers:
-            if modifier.name not in selected_modifiers and modifier.type == 'ARMATURE' and modifier.show_viewport == True:
-                disabled_armature_modifiers.append(modifier)
-                modifier.show_viewport = False
-    
-    if context.object.data.shape_keys:
-        shapes_count = len(context.object.data.shape_keys.key_blocks)
-    
-    if shapes_count == 0:
-        for modifier_name in selected_modifiers:
-            bpy.ops.object.modifier_apply(modifier=modifier_name)
-        return (True, None)
-    
-    original_object = context.view_layer.objects.active
-    bpy.ops.object.select_all(action='DESELECT')
-    original_object.select_set(True)
-    
-    bpy.ops.object.duplicate_move(OBJECT_OT_duplicate={{"linked":False, "mode":'TRANSLATION'}}, TRANSFORM_OT_translate={{"value":(0, 0, 0)}})
-    copy_object = context.view_layer.objects.active
-    copy_object.select_set(False)
-    
-    context.view_layer.objects.active = original_object
-    original_object.select_set(True)
-    
-    for i in range(0, shapes_count):
-        key_b = original_object.data.shape_keys.key_blocks[i]
-        properties_object = {{p:None for p in properties}}
-        properties_object["name"] = key_b.name
-        properties_object["mute"] = key_b.mute
-        properties_object["interpolation"] = key_b.interpolation
-        properties_object["relative_key"] = key_b.relative_key.name
-        properties_object["slider_max"] = key_b.slider_max
-        properties_object["slider_min"] = key_b.slider_min
-        properties_object["value"] = key_b.value
-        properties_object["vertex_group"] = key_b.vertex_group
-        list_properties.append(properties_object)
-    
-    print(f"[Worker {{task_id}}] Legacy: Applying base shape key")
-    bpy.ops.object.shape_key_remove(all=True)
-    for modifier_name in selected_modifiers:
-        bpy.ops.object.modifier_apply(modifier=modifier_name)
-    vert_count = len(original_object.data.vertices)
-    bpy.ops.object.shape_key_add(from_mix=False)
-    original_object.select_set(False)
-    
-    for i in range(1, shapes_count):
-        curr_time = time.time()
-        elapsed_time = curr_time - start_time_inner
-        print(f"[Worker {{task_id}}] Legacy: Applying shape key " + str(i+1) + "/" + str(shapes_count) + " ('" + str(list_properties[i]['name']) + "', " + str(round(elapsed_time, 2)) + "s)")
-        
-        context.view_layer.objects.active = copy_object
-        copy_object.select_set(True)
-        
-        bpy.ops.object.duplicate_move(OBJECT_OT_duplicate={{"linked":False, "mode":'TRANSLATION'}}, TRANSFORM_OT_translate={{"value":(0, 0, 0)}})
-        tmp_object = context.view_layer.objects.active
-        bpy.ops.object.shape_key_remove(all=True)
-        copy_object.select_set(True)
-        copy_object.active_shape_key_index = i
-        
-        bpy.ops.object.shape_key_transfer()
-        context.object.active_shape_key_index = 0
-        bpy.ops.object.shape_key_remove()
-        bpy.ops.object.shape_key_remove(all=True)
-        
-        for modifier_name in selected_modifiers:
-            bpy.ops.object.modifier_apply(modifier=modifier_name)
-        
-        if vert_count != len(tmp_object.data.vertices):
-            error_info_hint = ""
-            if contains_mirror_with_merge == True:
-                error_info_hint = "There is mirror modifier with 'Merge' property enabled."
-            if error_info_hint:
-                error_info_hint = "\\nHint: " + error_info_hint
-            error_info = ("Shape keys ended up with different number of vertices!\\n"
-                        "All shape keys needs to have the same number of vertices after modifier is applied." + error_info_hint)
-            return (False, error_info)
-        
-        copy_object.select_set(False)
-        context.view_layer.objects.active = original_object
-        original_object.select_set(True)
-        bpy.ops.object.join_shapes()
-        original_object.select_set(False)
-        context.view_layer.objects.active = tmp_object
-        
-        tmp_mesh = tmp_object.data
-        bpy.ops.object.delete(use_global=False)
-        bpy.data.meshes.remove(tmp_mesh)
-    
-    context.view_layer.objects.active = original_object
-    for i in range(0, shapes_count):
-        key_b = context.view_layer.objects.active.data.shape_keys.key_blocks[i]
-        key_b.name = list_properties[i]["name"]
-    
-    for i in range(0, shapes_count):
-        key_b = context.view_layer.objects.active.data.shape_keys.key_blocks[i]
-        key_b.interpolation = list_properties[i]["interpolation"]
-        key_b.mute = list_properties[i]["mute"]
-        key_b.slider_max = list_properties[i]["slider_max"]
-        key_b.slider_min = list_properties[i]["slider_min"]
-        key_b.value = list_properties[i]["value"]
-        key_b.vertex_group = list_properties[i]["vertex_group"]
-        rel_key = list_properties[i]["relative_key"]
-        
-        for j in range(0, shapes_count):
-            key_brel = context.view_layer.objects.active.data.shape_keys.key_blocks[j]
-            if rel_key == key_brel.name:
-                key_b.relative_key = key_brel
-                break
-    
-    copy_mesh = copy_object.data
-    bpy.data.objects.remove(copy_object, do_unlink=True)
-    bpy.data.meshes.remove(copy_mesh)
-    
-    for modifier in disabled_armature_modifiers:
-        modifier.show_viewport = True
-    
-    return (True, None)
-
-
-def apply_all_modifiers(obj):
-    """应用物体上的所有修改器（优化版）
-    
-    优化：
-    1. 先删除禁用的修改器（不应用）
-    2. 只应用启用的修改器
-    """
-    if obj.type != 'MESH':
-        return
-    if not obj.modifiers:
-        return
-    
-    disabled_modifiers = [mod for mod in obj.modifiers if not mod.show_viewport]
-    for mod in reversed(disabled_modifiers):
-        obj.modifiers.remove(mod)
-    
-    if not obj.modifiers:
-        return
-    
-    has_shape_keys = obj.data.shape_keys is not None
-    
-    if has_shape_keys:
-        modifier_names = [mod.name for mod in obj.modifiers]
-        apply_modifiers_for_object_with_shape_keys(
-            bpy.context, 
-            modifier_names, 
-            disable_armatures=False
-        )
-    else:
-        bpy.ops.object.select_all(action='DESELECT')
-        obj.select_set(True)
-        bpy.context.view_layer.objects.active = obj
-        
-        for modifier in obj.modifiers[:]:
-            try:
-                bpy.ops.object.modifier_apply(modifier=modifier.name)
-            except Exception as e:
-                print(f"[Worker {{task_id}}] 应用修改器失败 {{modifier.name}}: {{e}}")
-
-
-def prepare_copy_for_mirror_workflow(copy_obj):
-    """
-    为非镜像工作流准备副本 - 与单进程模式完全一致
-    
-    优化：
-    1. 只检查启用的骨骼修改器
-    2. 禁用的修改器会在 apply_all_modifiers 中删除
-    
-    情况一：物体包含启用的骨骼绑定但无形态键 -> 应用所有修改器
-    情况二：物体同时包含启用的骨骼绑定和形态键 -> 使用特殊方式处理
-    情况三：物体没有启用的骨骼绑定 -> 跳过前处理
-    """
-    if copy_obj.type != 'MESH':
-        return
-    
-    has_enabled_armature = any(
-        mod.type == 'ARMATURE' and mod.show_viewport 
-        for mod in copy_obj.modifiers
-    )
-    has_shape_keys = copy_obj.data.shape_keys is not None
-    
-    if not has_enabled_armature:
-        return
-    
-    if has_shape_keys:
-        shape_key_values = {{}}
-        for kb in copy_obj.data.shape_keys.key_blocks:
-            shape_key_values[kb.name] = kb.value
-        
-        reset_shapekey_values(copy_obj)
-        
-        disabled_modifiers = [mod for mod in copy_obj.modifiers if not mod.show_viewport]
-        for mod in reversed(disabled_modifiers):
-            copy_obj.modifiers.remove(mod)
-        
-        modifier_names = [mod.name for mod in copy_obj.modifiers]
-        if modifier_names:
-            bpy.context.view_layer.objects.active = copy_obj
-            apply_modifiers_for_object_with_shape_keys(
-                bpy.context,
-                modifier_names,
-                disable_armatures=False
-            )
-        
-        if copy_obj.data.shape_keys:
-            for kb in copy_obj.data.shape_keys.key_blocks:
-                if kb.name in shape_key_values:
-                    kb.value = shape_key_values[kb.name]
-    else:
-        apply_all_modifiers(copy_obj)
-
-
-def clear_materials(obj):
-    """清除物体的所有材质槽，减少文件体积"""
-    if obj.type != 'MESH':
-        return
-    
-    if obj.data.materials:
-        obj.data.materials.clear()
-    
-    for slot in obj.material_slots[:]:
-        obj.active_material_index = slot.slot_index
-        bpy.ops.object.material_slot_remove()
-
-
-def mesh_triangulate_beauty(obj):
-    """使用 BEAUTY 算法进行三角化（布线优化）"""
-    if obj.type != 'MESH':
-        return
-    
-    bpy.ops.object.select_all(action='DESELECT')
-    obj.select_set(True)
-    bpy.context.view_layer.objects.active = obj
-    
-    bpy.ops.object.mode_set(mode='EDIT')
-    bpy.ops.mesh.select_all(action='SELECT')
-    bpy.ops.mesh.quads_convert_to_tris(quad_method='BEAUTY', ngon_method='BEAUTY')
-    bpy.ops.object.mode_set(mode='OBJECT')
-
-
-def apply_mirror_transform(obj):
-    """应用镜像变换：Scale X = -1"""
-    if obj.type != 'MESH':
-        return
-    
-    bpy.ops.object.select_all(action='DESELECT')
-    obj.select_set(True)
-    bpy.context.view_layer.objects.active = obj
-    
-    obj.scale[0] = -obj.scale[0]
-    bpy.ops.object.transform_apply(location=False, rotation=False, scale=True)
-
-
-def flip_face_normals(obj):
-    """翻转面朝向"""
-    if obj.type != 'MESH':
-        return
-    
-    bpy.ops.object.select_all(action='DESELECT')
-    obj.select_set(True)
-    bpy.context.view_layer.objects.active = obj
-    
-    bpy.ops.object.mode_set(mode='EDIT')
-    bpy.ops.mesh.select_all(action='SELECT')
-    bpy.ops.mesh.flip_normals()
-    bpy.ops.object.mode_set(mode='OBJECT')
-
-
-def process_vertex_groups(obj, vg_mapping_texts):
-    """处理顶点组：重命名、合并、清理、填充、排序（优化版）"""
-    if obj.type != 'MESH':
-        return {{"renamed": 0, "merged": 0, "cleaned": 0, "filled": 0}}
-    
-    stats = {{"renamed": 0, "merged": 0, "cleaned": 0, "filled": 0}}
-    
-    # 1. 重命名顶点组
-    if vg_mapping_texts:
-        mapping = {{}}
-        for text_name, text_content in vg_mapping_texts.items():
-            for line in text_content.split('\\n'):
-                line = line.strip()
-                if not line or '=' not in line:
-                    continue
-                parts = line.split('=', 1)
-                if len(parts) == 2:
-                    left = parts[0].strip()
-                    right = parts[1].strip()
-                    if left and right:
-                        mapping[left] = right
-        
-        if mapping:
-            for vg in obj.vertex_groups:
-                if vg.name in mapping:
-                    new_name = mapping[vg.name]
-                    if vg.name != new_name:
-                        if new_name in obj.vertex_groups:
-                            existing_vg = obj.vertex_groups[new_name]
-                            existing_vg.name = new_name + ".001"
-                        vg.name = new_name
-                        stats["renamed"] += 1
-    
-    # 2. 合并顶点组（按数字前缀）- 优化版
-    from collections import defaultdict
-    import re
-    prefix_map = defaultdict(list)
-    for vg in obj.vertex_groups:
-        match = re.match(r'^(\d+)', vg.name)
-        if match:
-            prefix_map[match.group(1)].append(vg)
-    
-    for prefix, source_groups in prefix_map.items():
-        if len(source_groups) > 1 or (len(source_groups) == 1 and source_groups[0].name != prefix):
-            target_vg = obj.vertex_groups.get(prefix) or obj.vertex_groups.new(name=prefix)
-            
-            # 优化：批量收集顶点权重，减少API调用
-            vertex_weights = []
-            for vert in obj.data.vertices:
-                total_weight = 0.0
-                for source_vg in source_groups:
-                    try:
-                        total_weight += source_vg.weight(vert.index)
-                    except RuntimeError:
-                        continue
-                
-                if total_weight > 0:
-                    vertex_weights.append((vert.index, min(1.0, total_weight)))
-            
-            # 批量添加权重
-            if vertex_weights:
-                for vert_idx, weight in vertex_weights:
-                    target_vg.add([vert_idx], weight, 'REPLACE')
-            
-            for vg in source_groups:
-                if vg.name in obj.vertex_groups and vg.name != prefix:
-                    obj.vertex_groups.remove(vg)
-            stats["merged"] += 1
-    
-    # 3. 清理非数字顶点组 - 优化版：使用集合操作
-    groups_to_remove = [vg for vg in obj.vertex_groups if not vg.name.isdigit()]
-    for vg in reversed(groups_to_remove):
-        obj.vertex_groups.remove(vg)
-    stats["cleaned"] = len(groups_to_remove)
-    
-    # 4. 填充顶点组间隙 - 优化版：使用集合差集
-    numeric_names = set(vg.name for vg in obj.vertex_groups if vg.name.isdigit())
-    if numeric_names:
-        max_num = max(int(name) for name in numeric_names)
-        # 使用集合差集快速找出缺失的数字
-        existing_nums = set(int(name) for name in numeric_names)
-        missing_nums = set(range(max_num + 1)) - existing_nums
-        
-        for num in sorted(missing_nums):
-            obj.vertex_groups.new(name=str(num))
-            stats["filled"] += 1
-    
-    # 5. 排序顶点组
-    try:
-        bpy.context.view_layer.objects.active = obj
-        bpy.ops.object.vertex_group_sort(sort_type='NAME')
-    except Exception:
-        pass
-    
-    return stats
-
-
-processed_objects = []
-
-for obj_name in object_names:
-    try:
-        obj = bpy.data.objects.get(obj_name)
-        if not obj:
-            print(f"[Worker {{task_id}}] 跳过不存在的物体: {{obj_name}}")
-            continue
-        
-        if obj.type != 'MESH':
-            continue
-        
-        # 1. 创建副本，使用标准命名规范
-        copy_obj = obj.copy()
-        copy_obj.data = obj.data.copy()
-        if obj_name.endswith("-Original"):
-            copy_obj.name = obj_name.replace("-Original", "-copy_Original")
-        else:
-            copy_obj.name = obj_name + "_copy"
-        bpy.context.scene.collection.objects.link(copy_obj)
-        
-        # 优化：先删除禁用的修改器，减少后续处理开销
-        disabled_modifiers = [mod for mod in copy_obj.modifiers if not mod.show_viewport]
-        for mod in reversed(disabled_modifiers):
-            copy_obj.modifiers.remove(mod)
+        if not self.tasks:
+            return
         
-        # 2. 应用修改器 - 与单进程模式完全一致
-        # 优化：只检查启用的骨骼修改器
-        has_enabled_armature = any(
-            mod.type == 'ARMATURE' and mod.show_viewport 
-            for mod in copy_obj.modifiers
-        )
-        if mirror_workflow:
-            try:
-                prepare_copy_for_mirror_workflow(copy_obj)
-            except Exception as e:
-                print(f"[Worker {{task_id}}] 前处理失败 {{copy_obj.name}}: {{e}}")
-                traceback.print_exc()
-        elif has_enabled_armature:
-            try:
-                apply_all_modifiers(copy_obj)
-            except Exception as e:
-                print(f"[Worker {{task_id}}] 应用修改器失败 {{copy_obj.name}}: {{e}}")
-                traceback.print_exc()
+        blend_file = self.tasks[0].blend_file
+        if not os.path.exists(blend_file):
+            print(f"[ParallelPreprocess] 错误: 项目文件不存在: {blend_file}")
+            return
         
-        # 3. BEAUTY三角化
-        try:
-            mesh_triangulate_beauty(copy_obj)
-        except Exception as e:
-            print(f"[Worker {{task_id}}] 三角化失败 {{copy_obj.name}}: {{e}}")
-            traceback.print_exc()
+        pool = get_worker_pool(blender_exe, blend_file, self.num_workers)
         
-        # 4. 清除材质，减少文件体积
+        print(f"[ParallelPreprocess] 分发 {len(self.tasks)} 个任务到 {pool.alive_worker_count()} 个常驻工作进程...")
+        performance_stats = get_performance_stats()
         try:
-            clear_materials(copy_obj)
-        except Exception as e:
-            print(f"[Worker {{task_id}}] 清除材质失败 {{copy_obj.name}}: {{e}}")
-        
-        # 5. 非镜像工作流后处理 - 与单进程模式完全一致
-        if mirror_workflow:
-            try:
-                apply_mirror_transform(copy_obj)
-                flip_face_normals(copy_obj)
-            except Exception as e:
-                print(f"[Worker {{task_id}}] 后处理失败 {{copy_obj.name}}: {{e}}")
-                traceback.print_exc()
-        
-        # 记录副本名称（用于加载时匹配）
-        processed_objects.append(copy_obj.name)
-        
-    except Exception as e:
-        print(f"[Worker {{task_id}}] 处理物体 {{obj_name}} 时出错: {{e}}")
-        traceback.print_exc()
-
-# 删除所有非副本物体，只保留预处理后的副本
-copy_names_set = set(processed_objects)
-objects_to_remove = [obj for obj in bpy.data.objects if obj.name not in copy_names_set]
-for obj in objects_to_remove:
-    bpy.data.objects.remove(obj, do_unlink=True)
-
-# 清理未使用的材质和数据块，进一步减小体积
-try:
-    bpy.ops.outliner.orphans_purge(do_local_ids=True, do_linked_ids=True, do_recursive=True)
-except:
-    pass
-
-# 保存预处理结果
-try:
-    bpy.ops.wm.save_as_mainfile(filepath=output_blend, compress=True)
-except Exception as e:
-    print(f"[Worker {{task_id}}] 保存失败: {{e}}")
-    traceback.print_exc()
-
-# 写入结果文件
-result_file = output_blend.replace('.blend', '_result.json')
-result_data = {{
-    "task_id": task_id,
-    "success": True,
-    "processed_objects": processed_objects,
-    "output_blend": output_blend
-}}
-try:
-    with open(result_file, 'w', encoding='utf-8') as f:
-        json.dump(result_data, f, ensure_ascii=False)
-except Exception as e:
-    print(f"[Worker {{task_id}}] 写入结果失败: {{e}}")
-
-print(f"[Worker {{task_id}}] 完成: {{len(processed_objects)}} 个物体")
-'''
-            
-            script_file = os.path.join(
-                os.path.dirname(task.output_blend),
-                f"preprocess_script_{task.task_id}.py"
-            )
-            
-            with open(script_file, 'w', encoding='utf-8') as f:
-                f.write(script)
-            
-            print(f"[Worker {task.task_id}] 启动 Blender: {blender_exe}")
-            print(f"[Worker {task.task_id}] 项目文件: {task.blend_file}")
-            print(f"[Worker {task.task_id}] 脚本文件: {script_file}")
-            print(f"[Worker {task.task_id}] 输出文件: {task.output_blend}")
-            print(f"[Worker {task.task_id}] 物体数量: {len(task.object_names)}")
-            
-            cmd = [
-                blender_exe,
-                '-b',
-                task.blend_file,
-                '-P', script_file
-            ]
-            
-            print(f"[Worker {task.task_id}] 命令: {' '.join(cmd)}")
-            
-            # 检查文件是否存在
-            if not os.path.exists(blender_exe):
-                print(f"[Worker {task.task_id}] 错误: Blender可执行文件不存在: {blender_exe}")
-                return PreprocessResult(
-                    task_id=task.task_id,
-                    success=False,
-                    error_message=f"Blender可执行文件不存在: {blender_exe}",
-                    processed_objects=[],
-                    output_blend="",
-                    processing_time=0
-                )
-            
-            if not os.path.exists(task.blend_file):
-                print(f"[Worker {task.task_id}] 错误: 项目文件不存在: {task.blend_file}")
-                return PreprocessResult(
-                    task_id=task.task_id,
-                    success=False,
-                    error_message=f"项目文件不存在: {task.blend_file}",
-                    processed_objects=[],
-                    output_blend="",
-                    processing_time=0
-                )
-            
-            process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True
-            )
-            
-            stdout, _ = process.communicate(timeout=1800)
-            
-            log_file = os.path.join(
-                os.path.dirname(task.output_blend),
-                f"worker_{task.task_id}_log.txt"
-            )
-            with open(log_file, 'w', encoding='utf-8') as f:
-                f.write(stdout)
-            
-            print(f"[Worker {task.task_id}] 日志文件: {log_file}")
-            print(f"[Worker {task.task_id}] 返回码: {process.returncode}")
-            
-            lines = stdout.split('\n')
-            for line in lines[-50:]:
-                if line.strip():
-                    print(f"[Worker {task.task_id}] {line}")
-            
-            processed_objects = []
-            if os.path.exists(task.output_blend):
-                processed_objects = task.object_names
-            
-            processing_time = (datetime.now() - start_time).total_seconds()
-            
-            return PreprocessResult(
-                task_id=task.task_id,
-                success=process.returncode == 0 and os.path.exists(task.output_blend),
-                error_message=stdout if process.returncode != 0 else "",
-                processed_objects=processed_objects,
-                output_blend=task.output_blend,
-                processing_time=processing_time
-            )
-            
-        except subprocess.TimeoutExpired:
-            process.kill()
-            process.wait()
-            return PreprocessResult(
-                task_id=task.task_id,
-                success=False,
-                error_message="预处理超时",
-                processed_objects=[],
-                output_blend="",
-                processing_time=600
-            )
-        except Exception as e:
-            return PreprocessResult(
-                task_id=task.task_id,
-                success=False,
-                error_message=str(e),
-                processed_objects=[],
-                output_blend="",
-                processing_time=(datetime.now() - start_time).total_seconds()
-            )
+            results = pool.run_tasks(self.tasks, progress_callback)
+        finally:
+            release_worker_pool()
+        for result in results:
+            self.results.append(result)
+            for obj_name, duration in result.object_times.items():
+                performance_stats.record_object_cost(obj_name, duration)
+            status = "成功" if result.success else "失败"
+            print(f"[ParallelPreprocess] 任务 {result.task_id} {status}")
+            if not result.success:
+                print(f"[ParallelPreprocess] 错误信息: {result.error_message}")
     
     def _collect_results(self) -> Dict[str, str]:
         """收集预处理结果，返回副本名到blend文件的映射"""
@@ -1052,7 +563,6 @@ print(f"[Worker {{task_id}}] 完成: {{len(processed_objects)}} 个物体")
             print(f"[ParallelPreprocess] 使用用户指定的 Blender: {user_path}")
             return user_path
         
-        import bpy
         current_blender = bpy.app.binary_path
         if current_blender and os.path.exists(current_blender):
             print(f"[ParallelPreprocess] 使用当前 Blender: {current_blender}")
@@ -1094,10 +604,11 @@ def load_preprocessed_objects(object_blend_map: Dict[str, str]):
     Returns:
         {副本名: 加载的物体对象}
     """
-    import bpy
-    
     loaded_objects = {}
     
+    # 追加之前已经存在的数据块，用来区分本次追加进来的数据
+    existing_id_pointers = _get_id_pointers()
+    
     blend_files = set(object_blend_map.values())
     print(f"[LoadPreprocessed] 需要加载 {len(object_blend_map)} 个副本，来自 {len(blend_files)} 个文件")
     print(f"[LoadPreprocessed] 期望的副本名称: {list(object_blend_map.keys())}")
@@ -1111,7 +622,7 @@ def load_preprocessed_objects(object_blend_map: Dict[str, str]):
         
         with bpy.data.libraries.load(blend_file, link=False) as (data_from, data_to):
             print(f"[LoadPreprocessed] 文件中的物体列表: {data_from.objects}")
-            data_to.objects = data_from.objects
+            data_to.objects = [name for name in data_from.objects if name in object_blend_map]
         
         loaded_count = 0
         for obj in data_to.objects:
@@ -1129,5 +640,56 @@ def load_preprocessed_objects(object_blend_map: Dict[str, str]):
         
         print(f"[LoadPreprocessed] 从 {blend_file} 加载了 {loaded_count} 个副本")
     
+    _remove_indirectly_appended_data(existing_id_pointers, loaded_objects.values())
+    
     print(f"[LoadPreprocessed] 总共加载了 {len(loaded_objects)} 个副本")
     return loaded_objects
+
+
+# 预处理文件中可能被副本间接引用的数据类型
+_APPENDED_ID_COLLECTION_NAMES = (
+    "objects", "meshes", "materials", "armatures", "actions", "images", "textures",
+    "node_groups", "curves", "lattices", "collections",
+)
+
+
+def _get_id_pointers() -> set:
+    id_pointers = set()
+    for collection_name in _APPENDED_ID_COLLECTION_NAMES:
+        for id_data in getattr(bpy.data, collection_name, ()):
+            id_pointers.add(id_data.as_pointer())
+    return id_pointers
+
+
+def _remove_indirectly_appended_data(existing_id_pointers: set, loaded_objects):
+    """
+    bpy.data.libraries.write 会连同副本间接引用的数据（骨骼、材质、原始网格等）一起写出，
+    追加副本时这些数据也会作为重复的数据块被追加进来。
+    和之前删除非副本物体后再保存的结果一致：删除追加进来的非副本物体，
+    再删除追加进来且不再被使用的其它数据块
+    """
+    kept_pointers = set()
+    for obj in loaded_objects:
+        kept_pointers.add(obj.as_pointer())
+        if obj.data is not None:
+            kept_pointers.add(obj.data.as_pointer())
+    
+    def is_appended(id_data) -> bool:
+        pointer = id_data.as_pointer()
+        return pointer not in existing_id_pointers and pointer not in kept_pointers
+    
+    for obj in [obj for obj in bpy.data.objects if is_appended(obj)]:
+        print(f"[LoadPreprocessed] 删除间接追加的物体: {obj.name}")
+        bpy.data.objects.remove(obj, do_unlink=True)
+    
+    # 删除一个数据块后，它引用的数据块可能也不再被使用，重复直到没有可删除的数据块
+    removed = True
+    while removed:
+        removed = False
+        for collection_name in _APPENDED_ID_COLLECTION_NAMES:
+            id_collection = getattr(bpy.data, collection_name, None)
+            if id_collection is None:
+                continue
+            for id_data in [id_data for id_data in id_collection if is_appended(id_data) and id_data.users == 0]:
+                id_collection.remove(id_data)
+                removed = True
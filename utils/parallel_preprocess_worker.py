@@ -0,0 +1,789 @@
+"""
+并行预处理的常驻工作进程脚本
+
+由 ParallelPreprocessManager 通过 `blender -b <项目文件> -P <本脚本> -- <端口> <密钥>` 启动，
+项目文件只在启动时加载一次，之后通过本地 socket 循环接收任务：
+每个任务只创建并处理副本，写出到独立的 .blend 文件后删除副本，原始物体保持不变，
+因此同一个进程可以连续处理任意多次导出。任务中的项目文件修改时间和已加载的不一致时，
+在进程内重新打开项目文件，不需要重启进程
+
+该脚本运行在独立的 Blender 进程中，不能导入插件包内的任何模块
+"""
+import bpy
+import sys
+import json
+import os
+import traceback
+import time
+from multiprocessing.connection import Client
+
+# 优化：控制日志级别，减少不必要的输出
+VERBOSE = False
+
+# 当前任务ID，供各处理函数的日志使用
+task_id = -1
+
+
+def reset_shapekey_values(obj):
+    """重置所有形态键值为0"""
+    if obj.data.shape_keys is None:
+        return
+    for kb in obj.data.shape_keys.key_blocks:
+        kb.value = 0.0
+
+
+def apply_modifiers_for_object_with_shape_keys_optimized(context, selected_modifiers, disable_armatures=False):
+    """
+    优化版：使用 numpy 直接处理形态键数据
+    避免对每个形态键重复复制物体和应用修改器
+    """
+    import numpy
+    
+    if len(selected_modifiers) == 0:
+        return (True, None)
+    
+    obj = context.object
+    
+    modifiers_that_transform_vertices = {'ARMATURE', 'CURVE', 'LATTICE', 'SHRINKWRAP', 'SIMPLE_DEFORM', 'BEND', 'HOOK'}
+    has_transform_modifiers = False
+    for modifier in obj.modifiers:
+        if modifier.name in selected_modifiers and modifier.type in modifiers_that_transform_vertices and modifier.show_viewport:
+            has_transform_modifiers = True
+            break
+    
+    if has_transform_modifiers:
+        print(f"[Worker {task_id}] ShapeKeyOptimized: 检测到会变换顶点的修改器，回退到原始算法")
+        return apply_modifiers_for_object_with_shape_keys_legacy(context, selected_modifiers, disable_armatures)
+    
+    start_time = time.time()
+    
+    contains_mirror_with_merge = False
+    for modifier in obj.modifiers:
+        if modifier.name in selected_modifiers:
+            if modifier.type == 'MIRROR' and modifier.use_mirror_merge == True:
+                contains_mirror_with_merge = True
+    
+    disabled_armature_modifiers = []
+    if disable_armatures:
+        for modifier in obj.modifiers:
+            if modifier.name not in selected_modifiers and modifier.type == 'ARMATURE' and modifier.show_viewport == True:
+                disabled_armature_modifiers.append(modifier)
+                modifier.show_viewport = False
+    
+    if not obj.data.shape_keys:
+        for modifier_name in selected_modifiers:
+            mod = obj.modifiers.get(modifier_name)
+            if mod and mod.show_viewport:
+                bpy.ops.object.modifier_apply(modifier=modifier_name)
+        return (True, None)
+    
+    shapes_count = len(obj.data.shape_keys.key_blocks)
+    
+    if shapes_count == 0:
+        for modifier_name in selected_modifiers:
+            mod = obj.modifiers.get(modifier_name)
+            if mod and mod.show_viewport:
+                bpy.ops.object.modifier_apply(modifier=modifier_name)
+        return (True, None)
+    
+    print(f"[Worker {task_id}] ShapeKeyOptimized: 开始处理 {shapes_count} 个形态键")
+    
+    properties_list = []
+    properties = ["interpolation", "mute", "name", "relative_key", "slider_max", "slider_min", "value", "vertex_group"]
+    
+    for i in range(shapes_count):
+        key_b = obj.data.shape_keys.key_blocks[i]
+        props = {p: None for p in properties}
+        props["name"] = key_b.name
+        props["mute"] = key_b.mute
+        props["interpolation"] = key_b.interpolation
+        props["relative_key"] = key_b.relative_key.name
+        props["slider_max"] = key_b.slider_max
+        props["slider_min"] = key_b.slider_min
+        props["value"] = key_b.value
+        props["vertex_group"] = key_b.vertex_group
+        properties_list.append(props)
+    
+    original_vert_count = len(obj.data.vertices)
+    
+    shape_key_coords = []
+    for i in range(shapes_count):
+        key_b = obj.data.shape_keys.key_blocks[i]
+        coords = numpy.empty((original_vert_count, 3), dtype=numpy.float32)
+        key_b.data.foreach_get('co', coords.ravel())
+        shape_key_coords.append(coords)
+    
+    print(f"[Worker {task_id}] ShapeKeyOptimized: 已提取 {shapes_count} 个形态键坐标数据")
+    
+    bpy.ops.object.shape_key_remove(all=True)
+    
+    for modifier_name in selected_modifiers:
+        bpy.ops.object.modifier_apply(modifier=modifier_name)
+    
+    new_vert_count = len(obj.data.vertices)
+    
+    if original_vert_count != new_vert_count:
+        error_hint = ""
+        if contains_mirror_with_merge:
+            error_hint = "\n提示: 镜像修改器启用了 'Merge' 选项可能导致问题。"
+        error_info = (f"顶点数量变化: {original_vert_count} -> {new_vert_count}！\n"
+                     f"形态键要求修改器应用后顶点数量不变。{error_hint}")
+        
+        for modifier in disabled_armature_modifiers:
+            modifier.show_viewport = True
+        return (False, error_info)
+    
+    bpy.ops.object.shape_key_add(from_mix=False)
+    
+    for i in range(1, shapes_count):
+        key_b = obj.shape_key_add(name=properties_list[i]["name"], from_mix=False)
+        key_b.data.foreach_set('co', shape_key_coords[i].ravel())
+    
+    print(f"[Worker {task_id}] ShapeKeyOptimized: 已重新创建 {shapes_count - 1} 个形态键")
+    
+    for i in range(shapes_count):
+        key_b = obj.data.shape_keys.key_blocks[i]
+        key_b.name = properties_list[i]["name"]
+        key_b.interpolation = properties_list[i]["interpolation"]
+        key_b.mute = properties_list[i]["mute"]
+        key_b.slider_max = properties_list[i]["slider_max"]
+        key_b.slider_min = properties_list[i]["slider_min"]
+        key_b.value = properties_list[i]["value"]
+        key_b.vertex_group = properties_list[i]["vertex_group"]
+        
+        rel_key = properties_list[i]["relative_key"]
+        for j in range(shapes_count):
+            key_brel = obj.data.shape_keys.key_blocks[j]
+            if rel_key == key_brel.name:
+                key_b.relative_key = key_brel
+                break
+    
+    for modifier in disabled_armature_modifiers:
+        modifier.show_viewport = True
+    
+    elapsed = time.time() - start_time
+    print(f"[Worker {task_id}] ShapeKeyOptimized: 完成，耗时: {elapsed:.2f}秒")
+    
+    return (True, None)
+
+
+def apply_modifiers_for_object_with_shape_keys(context, selected_modifiers, disable_armatures=False):
+    """兼容接口：调用优化版"""
+    return apply_modifiers_for_object_with_shape_keys_optimized(context, selected_modifiers, disable_armatures)
+
+
+def apply_modifiers_for_object_with_shape_keys_legacy(context, selected_modifiers, disable_armatures=False):
+    """原始算法：用于处理会变换顶点的修改器"""
+    if len(selected_modifiers) == 0:
+        return (True, None)
+    
+    properties = ["interpolation", "mute", "name", "relative_key", "slider_max", "slider_min", "value", "vertex_group"]
+    list_properties = []
+    shapes_count = 0
+    vert_count = -1
+    start_time_inner = time.time()
+    
+    contains_mirror_with_merge = False
+    for modifier in context.object.modifiers:
+        if modifier.name in selected_modifiers:
+            if modifier.type == 'MIRROR' and modifier.use_mirror_merge == True:
+                contains_mirror_with_merge = True
+    
+    disabled_armature_modifiers = []
+    if disable_armatures:
+        for modifier in context.object.modifiers:
+            if modifier.name not in selected_modifiers and modifier.type == 'ARMATURE' and modifier.show_viewport == True:
+                disabled_armature_modifiers.append(modifier)
+                modifier.show_viewport = False
+    
+    if context.object.data.shape_keys:
+        shapes_count = len(context.object.data.shape_keys.key_blocks)
+    
+    if shapes_count == 0:
+        for modifier_name in selected_modifiers:
+            bpy.ops.object.modifier_apply(modifier=modifier_name)
+        return (True, None)
+    
+    original_object = context.view_layer.objects.active
+    bpy.ops.object.select_all(action='DESELECT')
+    original_object.select_set(True)
+    
+    bpy.ops.object.duplicate_move(OBJECT_OT_duplicate={"linked":False, "mode":'TRANSLATION'}, TRANSFORM_OT_translate={"value":(0, 0, 0)})
+    copy_object = context.view_layer.objects.active
+    copy_object.select_set(False)
+    
+    context.view_layer.objects.active = original_object
+    original_object.select_set(True)
+    
+    for i in range(0, shapes_count):
+        key_b = original_object.data.shape_keys.key_blocks[i]
+        properties_object = {p:None for p in properties}
+        properties_object["name"] = key_b.name
+        properties_object["mute"] = key_b.mute
+        properties_object["interpolation"] = key_b.interpolation
+        properties_object["relative_key"] = key_b.relative_key.name
+        properties_object["slider_max"] = key_b.slider_max
+        properties_object["slider_min"] = key_b.slider_min
+        properties_object["value"] = key_b.value
+        properties_object["vertex_group"] = key_b.vertex_group
+        list_properties.append(properties_object)
+    
+    print(f"[Worker {task_id}] Legacy: Applying base shape key")
+    bpy.ops.object.shape_key_remove(all=True)
+    for modifier_name in selected_modifiers:
+        bpy.ops.object.modifier_apply(modifier=modifier_name)
+    vert_count = len(original_object.data.vertices)
+    bpy.ops.object.shape_key_add(from_mix=False)
+    original_object.select_set(False)
+    
+    for i in range(1, shapes_count):
+        curr_time = time.time()
+        elapsed_time = curr_time - start_time_inner
+        print(f"[Worker {task_id}] Legacy: Applying shape key " + str(i+1) + "/" + str(shapes_count) + " ('" + str(list_properties[i]['name']) + "', " + str(round(elapsed_time, 2)) + "s)")
+        
+        context.view_layer.objects.active = copy_object
+        copy_object.select_set(True)
+        
+        bpy.ops.object.duplicate_move(OBJECT_OT_duplicate={"linked":False, "mode":'TRANSLATION'}, TRANSFORM_OT_translate={"value":(0, 0, 0)})
+        tmp_object = context.view_layer.objects.active
+        bpy.ops.object.shape_key_remove(all=True)
+        copy_object.select_set(True)
+        copy_object.active_shape_key_index = i
+        
+        bpy.ops.object.shape_key_transfer()
+        context.object.active_shape_key_index = 0
+        bpy.ops.object.shape_key_remove()
+        bpy.ops.object.shape_key_remove(all=True)
+        
+        for modifier_name in selected_modifiers:
+            bpy.ops.object.modifier_apply(modifier=modifier_name)
+        
+        if vert_count != len(tmp_object.data.vertices):
+            error_info_hint = ""
+            if contains_mirror_with_merge == True:
+                error_info_hint = "There is mirror modifier with 'Merge' property enabled."
+            if error_info_hint:
+                error_info_hint = "\nHint: " + error_info_hint
+            error_info = ("Shape keys ended up with different number of vertices!\n"
+                        "All shape keys needs to have the same number of vertices after modifier is applied." + error_info_hint)
+            return (False, error_info)
+        
+        copy_object.select_set(False)
+        context.view_layer.objects.active = original_object
+        original_object.select_set(True)
+        bpy.ops.object.join_shapes()
+        original_object.select_set(False)
+        context.view_layer.objects.active = tmp_object
+        
+        tmp_mesh = tmp_object.data
+        bpy.ops.object.delete(use_global=False)
+        bpy.data.meshes.remove(tmp_mesh)
+    
+    context.view_layer.objects.active = original_object
+    for i in range(0, shapes_count):
+        key_b = context.view_layer.objects.active.data.shape_keys.key_blocks[i]
+        key_b.name = list_properties[i]["name"]
+    
+    for i in range(0, shapes_count):
+        key_b = context.view_layer.objects.active.data.shape_keys.key_blocks[i]
+        key_b.interpolation = list_properties[i]["interpolation"]
+        key_b.mute = list_properties[i]["mute"]
+        key_b.slider_max = list_properties[i]["slider_max"]
+        key_b.slider_min = list_properties[i]["slider_min"]
+        key_b.value = list_properties[i]["value"]
+        key_b.vertex_group = list_properties[i]["vertex_group"]
+        rel_key = list_properties[i]["relative_key"]
+        
+        for j in range(0, shapes_count):
+            key_brel = context.view_layer.objects.active.data.shape_keys.key_blocks[j]
+            if rel_key == key_brel.name:
+                key_b.relative_key = key_brel
+                break
+    
+    copy_mesh = copy_object.data
+    bpy.data.objects.remove(copy_object, do_unlink=True)
+    bpy.data.meshes.remove(copy_mesh)
+    
+    for modifier in disabled_armature_modifiers:
+        modifier.show_viewport = True
+    
+    return (True, None)
+
+
+def apply_all_modifiers(obj):
+    """应用物体上的所有修改器（优化版）
+    
+    优化：
+    1. 先删除禁用的修改器（不应用）
+    2. 只应用启用的修改器
+    """
+    if obj.type != 'MESH':
+        return
+    if not obj.modifiers:
+        return
+    
+    disabled_modifiers = [mod for mod in obj.modifiers if not mod.show_viewport]
+    for mod in reversed(disabled_modifiers):
+        obj.modifiers.remove(mod)
+    
+    if not obj.modifiers:
+        return
+    
+    has_shape_keys = obj.data.shape_keys is not None
+    
+    if has_shape_keys:
+        modifier_names = [mod.name for mod in obj.modifiers]
+        apply_modifiers_for_object_with_shape_keys(
+            bpy.context, 
+            modifier_names, 
+            disable_armatures=False
+        )
+    else:
+        bpy.ops.object.select_all(action='DESELECT')
+        obj.select_set(True)
+        bpy.context.view_layer.objects.active = obj
+        
+        for modifier in obj.modifiers[:]:
+            try:
+                bpy.ops.object.modifier_apply(modifier=modifier.name)
+            except Exception as e:
+                print(f"[Worker {task_id}] 应用修改器失败 {modifier.name}: {e}")
+
+
+def prepare_copy_for_mirror_workflow(copy_obj):
+    """
+    为非镜像工作流准备副本 - 与单进程模式完全一致
+    
+    优化：
+    1. 只检查启用的骨骼修改器
+    2. 禁用的修改器会在 apply_all_modifiers 中删除
+    
+    情况一：物体包含启用的骨骼绑定但无形态键 -> 应用所有修改器
+    情况二：物体同时包含启用的骨骼绑定和形态键 -> 使用特殊方式处理
+    情况三：物体没有启用的骨骼绑定 -> 跳过前处理
+    """
+    if copy_obj.type != 'MESH':
+        return
+    
+    has_enabled_armature = any(
+        mod.type == 'ARMATURE' and mod.show_viewport 
+        for mod in copy_obj.modifiers
+    )
+    has_shape_keys = copy_obj.data.shape_keys is not None
+    
+    if not has_enabled_armature:
+        return
+    
+    if has_shape_keys:
+        shape_key_values = {}
+        for kb in copy_obj.data.shape_keys.key_blocks:
+            shape_key_values[kb.name] = kb.value
+        
+        reset_shapekey_values(copy_obj)
+        
+        disabled_modifiers = [mod for mod in copy_obj.modifiers if not mod.show_viewport]
+        for mod in reversed(disabled_modifiers):
+            copy_obj.modifiers.remove(mod)
+        
+        modifier_names = [mod.name for mod in copy_obj.modifiers]
+        if modifier_names:
+            bpy.context.view_layer.objects.active = copy_obj
+            apply_modifiers_for_object_with_shape_keys(
+                bpy.context,
+                modifier_names,
+                disable_armatures=False
+            )
+        
+        if copy_obj.data.shape_keys:
+            for kb in copy_obj.data.shape_keys.key_blocks:
+                if kb.name in shape_key_values:
+                    kb.value = shape_key_values[kb.name]
+    else:
+        apply_all_modifiers(copy_obj)
+
+
+def clear_materials(obj):
+    """清除物体的所有材质槽，减少文件体积"""
+    if obj.type != 'MESH':
+        return
+    
+    if obj.data.materials:
+        obj.data.materials.clear()
+    
+    for slot in obj.material_slots[:]:
+        obj.active_material_index = slot.slot_index
+        bpy.ops.object.material_slot_remove()
+
+
+def mesh_triangulate_beauty(obj):
+    """使用 BEAUTY 算法进行三角化（布线优化）"""
+    if obj.type != 'MESH':
+        return
+    
+    bpy.ops.object.select_all(action='DESELECT')
+    obj.select_set(True)
+    bpy.context.view_layer.objects.active = obj
+    
+    bpy.ops.object.mode_set(mode='EDIT')
+    bpy.ops.mesh.select_all(action='SELECT')
+    bpy.ops.mesh.quads_convert_to_tris(quad_method='BEAUTY', ngon_method='BEAUTY')
+    bpy.ops.object.mode_set(mode='OBJECT')
+
+
+def apply_mirror_transform(obj):
+    """应用镜像变换：Scale X = -1"""
+    if obj.type != 'MESH':
+        return
+    
+    bpy.ops.object.select_all(action='DESELECT')
+    obj.select_set(True)
+    bpy.context.view_layer.objects.active = obj
+    
+    obj.scale[0] = -obj.scale[0]
+    bpy.ops.object.transform_apply(location=False, rotation=False, scale=True)
+
+
+def flip_face_normals(obj):
+    """翻转面朝向"""
+    if obj.type != 'MESH':
+        return
+    
+    bpy.ops.object.select_all(action='DESELECT')
+    obj.select_set(True)
+    bpy.context.view_layer.objects.active = obj
+    
+    bpy.ops.object.mode_set(mode='EDIT')
+    bpy.ops.mesh.select_all(action='SELECT')
+    bpy.ops.mesh.flip_normals()
+    bpy.ops.object.mode_set(mode='OBJECT')
+
+
+def process_vertex_groups(obj, vg_mapping_texts):
+    """处理顶点组：重命名、合并、清理、填充、排序（优化版）"""
+    if obj.type != 'MESH':
+        return {"renamed": 0, "merged": 0, "cleaned": 0, "filled": 0}
+    
+    stats = {"renamed": 0, "merged": 0, "cleaned": 0, "filled": 0}
+    
+    # 1. 重命名顶点组
+    if vg_mapping_texts:
+        mapping = {}
+        for text_name, text_content in vg_mapping_texts.items():
+            for line in text_content.split('\n'):
+                line = line.strip()
+                if not line or '=' not in line:
+                    continue
+                parts = line.split('=', 1)
+                if len(parts) == 2:
+                    left = parts[0].strip()
+                    right = parts[1].strip()
+                    if left and right:
+                        mapping[left] = right
+        
+        if mapping:
+            for vg in obj.vertex_groups:
+                if vg.name in mapping:
+                    new_name = mapping[vg.name]
+                    if vg.name != new_name:
+                        if new_name in obj.vertex_groups:
+                            existing_vg = obj.vertex_groups[new_name]
+                            existing_vg.name = new_name + ".001"
+                        vg.name = new_name
+                        stats["renamed"] += 1
+    
+    # 2. 合并顶点组（按数字前缀）- 优化版
+    from collections import defaultdict
+    import re
+    prefix_map = defaultdict(list)
+    for vg in obj.vertex_groups:
+        match = re.match(r'^(\d+)', vg.name)
+        if match:
+            prefix_map[match.group(1)].append(vg)
+    
+    for prefix, source_groups in prefix_map.items():
+        if len(source_groups) > 1 or (len(source_groups) == 1 and source_groups[0].name != prefix):
+            target_vg = obj.vertex_groups.get(prefix) or obj.vertex_groups.new(name=prefix)
+            
+            # 优化：批量收集顶点权重，减少API调用
+            vertex_weights = []
+            for vert in obj.data.vertices:
+                total_weight = 0.0
+                for source_vg in source_groups:
+                    try:
+                        total_weight += source_vg.weight(vert.index)
+                    except RuntimeError:
+                        continue
+                
+                if total_weight > 0:
+                    vertex_weights.append((vert.index, min(1.0, total_weight)))
+            
+            # 批量添加权重
+            if vertex_weights:
+                for vert_idx, weight in vertex_weights:
+                    target_vg.add([vert_idx], weight, 'REPLACE')
+            
+            for vg in source_groups:
+                if vg.name in obj.vertex_groups and vg.name != prefix:
+                    obj.vertex_groups.remove(vg)
+            stats["merged"] += 1
+    
+    # 3. 清理非数字顶点组 - 优化版：使用集合操作
+    groups_to_remove = [vg for vg in obj.vertex_groups if not vg.name.isdigit()]
+    for vg in reversed(groups_to_remove):
+        obj.vertex_groups.remove(vg)
+    stats["cleaned"] = len(groups_to_remove)
+    
+    # 4. 填充顶点组间隙 - 优化版：使用集合差集
+    numeric_names = set(vg.name for vg in obj.vertex_groups if vg.name.isdigit())
+    if numeric_names:
+        max_num = max(int(name) for name in numeric_names)
+        # 使用集合差集快速找出缺失的数字
+        existing_nums = set(int(name) for name in numeric_names)
+        missing_nums = set(range(max_num + 1)) - existing_nums
+        
+        for num in sorted(missing_nums):
+            obj.vertex_groups.new(name=str(num))
+            stats["filled"] += 1
+    
+    # 5. 排序顶点组
+    try:
+        bpy.context.view_layer.objects.active = obj
+        bpy.ops.object.vertex_group_sort(sort_type='NAME')
+    except Exception:
+        pass
+    
+    return stats
+
+
+# 任务过程中可能新建的数据类型（副本网格、修改器应用和复制过程中产生的材质、动作等）
+SESSION_ID_COLLECTION_NAMES = (
+    "meshes", "materials", "images", "textures", "node_groups", "actions",
+    "armatures", "curves", "lattices", "collections",
+)
+
+
+def _get_session_id_names():
+    """记录当前会话中已有的数据块名称，{数据类型: 名称集合}，物体单独记录在 "objects" 中"""
+    id_names = {"objects": set(bpy.data.objects.keys())}
+    for collection_name in SESSION_ID_COLLECTION_NAMES:
+        id_collection = getattr(bpy.data, collection_name, None)
+        if id_collection is not None:
+            id_names[collection_name] = set(id_collection.keys())
+    return id_names
+
+
+def _remove_session_data(baseline_id_names):
+    """删除任务过程中新建的物体和其它数据块，让会话回到刚加载项目文件时的状态"""
+    if bpy.context.object and bpy.context.object.mode != 'OBJECT':
+        try:
+            bpy.ops.object.mode_set(mode='OBJECT')
+        except Exception:
+            pass
+    
+    for obj in [obj for obj in bpy.data.objects if obj.name not in baseline_id_names["objects"]]:
+        bpy.data.objects.remove(obj, do_unlink=True)
+    
+    # 删除一个数据块后，它引用的数据块可能也不再被使用，重复直到没有可删除的数据块
+    while True:
+        orphan_ids = []
+        for collection_name in SESSION_ID_COLLECTION_NAMES:
+            id_collection = getattr(bpy.data, collection_name, None)
+            if id_collection is None:
+                continue
+            baseline_names = baseline_id_names.get(collection_name, set())
+            orphan_ids.extend(
+                id_data for id_data in id_collection
+                if id_data.name not in baseline_names and id_data.users == 0
+            )
+        if not orphan_ids:
+            break
+        bpy.data.batch_remove(orphan_ids)
+
+
+def run_task(task):
+    """处理一个任务：创建副本、应用修改器、三角化，并把副本写出到 task['output_blend']"""
+    global task_id
+    task_id = task["task_id"]
+    object_names = task["object_names"]
+    mirror_workflow = task["mirror_workflow"]
+    output_blend = task["output_blend"]
+    
+    start_time = time.time()
+    processed_objects = []
+    # 每个物体的处理耗时，主进程用来估计下次导出的负载
+    object_times = {}
+    
+    for obj_name in object_names:
+        object_start_time = time.time()
+        try:
+            obj = bpy.data.objects.get(obj_name)
+            if not obj:
+                print(f"[Worker {task_id}] 跳过不存在的物体: {obj_name}")
+                continue
+
+            if obj.type != 'MESH':
+                continue
+
+            # 1. 创建副本，使用标准命名规范
+            copy_obj = obj.copy()
+            copy_obj.data = obj.data.copy()
+            if obj_name.endswith("-Original"):
+                copy_obj.name = obj_name.replace("-Original", "-copy_Original")
+            else:
+                copy_obj.name = obj_name + "_copy"
+            bpy.context.scene.collection.objects.link(copy_obj)
+
+            # 优化：先删除禁用的修改器，减少后续处理开销
+            disabled_modifiers = [mod for mod in copy_obj.modifiers if not mod.show_viewport]
+            for mod in reversed(disabled_modifiers):
+                copy_obj.modifiers.remove(mod)
+
+            # 2. 应用修改器 - 与单进程模式完全一致
+            # 优化：只检查启用的骨骼修改器
+            has_enabled_armature = any(
+                mod.type == 'ARMATURE' and mod.show_viewport 
+                for mod in copy_obj.modifiers
+            )
+            if mirror_workflow:
+                try:
+                    prepare_copy_for_mirror_workflow(copy_obj)
+                except Exception as e:
+                    print(f"[Worker {task_id}] 前处理失败 {copy_obj.name}: {e}")
+                    traceback.print_exc()
+            elif has_enabled_armature:
+                try:
+                    apply_all_modifiers(copy_obj)
+                except Exception as e:
+                    print(f"[Worker {task_id}] 应用修改器失败 {copy_obj.name}: {e}")
+                    traceback.print_exc()
+
+            # 3. BEAUTY三角化
+            try:
+                mesh_triangulate_beauty(copy_obj)
+            except Exception as e:
+                print(f"[Worker {task_id}] 三角化失败 {copy_obj.name}: {e}")
+                traceback.print_exc()
+
+            # 4. 清除材质，减少文件体积
+            try:
+                clear_materials(copy_obj)
+            except Exception as e:
+                print(f"[Worker {task_id}] 清除材质失败 {copy_obj.name}: {e}")
+
+            # 5. 非镜像工作流后处理 - 与单进程模式完全一致
+            if mirror_workflow:
+                try:
+                    apply_mirror_transform(copy_obj)
+                    flip_face_normals(copy_obj)
+                except Exception as e:
+                    print(f"[Worker {task_id}] 后处理失败 {copy_obj.name}: {e}")
+                    traceback.print_exc()
+
+            # 记录副本名称（用于加载时匹配）
+            processed_objects.append(copy_obj.name)
+            object_times[obj_name] = time.time() - object_start_time
+
+        except Exception as e:
+            print(f"[Worker {task_id}] 处理物体 {obj_name} 时出错: {e}")
+            traceback.print_exc()
+    
+    # 只写出副本及其网格，不修改当前会话中的原始数据
+    copy_objects = [bpy.data.objects[name] for name in processed_objects if name in bpy.data.objects]
+    data_blocks = set(copy_objects)
+    data_blocks.update(obj.data for obj in copy_objects if obj.data)
+    success = True
+    error_message = ""
+    try:
+        bpy.data.libraries.write(output_blend, data_blocks, compress=True)
+    except Exception as e:
+        print(f"[Worker {task_id}] 保存失败: {e}")
+        traceback.print_exc()
+        success = False
+        error_message = str(e)
+    
+    # 写入结果文件
+    result_file = output_blend.replace('.blend', '_result.json')
+    result_data = {
+        "task_id": task_id,
+        "success": success,
+        "processed_objects": processed_objects,
+        "output_blend": output_blend
+    }
+    try:
+        with open(result_file, 'w', encoding='utf-8') as f:
+            json.dump(result_data, f, ensure_ascii=False)
+    except Exception as e:
+        print(f"[Worker {task_id}] 写入结果失败: {e}")
+    
+    print(f"[Worker {task_id}] 完成: {len(processed_objects)} 个物体")
+    
+    result_data["object_times"] = object_times
+    result_data["error_message"] = error_message
+    result_data["processing_time"] = time.time() - start_time
+    return result_data
+
+
+def main():
+    argv = sys.argv[sys.argv.index("--") + 1:]
+    port = int(argv[0])
+    authkey = bytes.fromhex(argv[1])
+    
+    conn = Client(("127.0.0.1", port), authkey=authkey)
+    conn.send({"op": "ready", "pid": os.getpid()})
+    
+    baseline_id_names = _get_session_id_names()
+    loaded_blend_mtime = os.path.getmtime(bpy.data.filepath)
+    
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            break
+        
+        if message.get("op") == "quit":
+            break
+        
+        task = message["task"]
+        # 用户保存过项目文件后，重新打开项目文件，而不是重启工作进程
+        if task.get("blend_mtime") != loaded_blend_mtime:
+            try:
+                print(f"[Worker {task.get('task_id', -1)}] 项目文件已更新，重新加载: {task['blend_file']}")
+                bpy.ops.wm.open_mainfile(filepath=task["blend_file"])
+                baseline_id_names = _get_session_id_names()
+                loaded_blend_mtime = os.path.getmtime(bpy.data.filepath)
+            except Exception:
+                traceback.print_exc()
+        
+        try:
+            result = run_task(task)
+        except Exception as e:
+            traceback.print_exc()
+            result = {
+                "task_id": task.get("task_id", -1),
+                "success": False,
+                "processed_objects": [],
+                "output_blend": "",
+                "error_message": str(e),
+                "processing_time": 0,
+            }
+        finally:
+            try:
+                _remove_session_data(baseline_id_names)
+            except Exception:
+                traceback.print_exc()
+        
+        # 原始物体在任务中被意外修改或删除时，重新加载项目文件恢复
+        if not baseline_id_names["objects"].issubset(bpy.data.objects.keys()):
+            print(f"[Worker {task_id}] 检测到原始物体变化，重新加载项目文件")
+            bpy.ops.wm.revert_mainfile()
+            baseline_id_names = _get_session_id_names()
+            loaded_blend_mtime = os.path.getmtime(bpy.data.filepath)
+        
+        sys.stdout.flush()
+        conn.send(result)
+    
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
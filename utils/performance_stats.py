@@ -14,6 +14,12 @@ PERFORMANCE_STATS_ENABLED = True
 class PerformanceStats:
     """性能统计类"""
     
+    # 计入物体预处理耗时的操作，用于并行预处理的负载估计
+    PREPROCESS_OPERATIONS = ('CreateCopy', 'ApplyArmature', 'MirrorWorkflow_Pre', 'Triangulate', 'MirrorWorkflow_Post')
+    
+    # 历史耗时的指数滑动平均系数
+    OBJECT_COST_SMOOTHING = 0.5
+    
     def __init__(self):
         self.stats = defaultdict(lambda: {
             'total_time': 0.0,
@@ -26,6 +32,28 @@ class PerformanceStats:
             'total_time': 0.0,
             'operations': []
         })
+        # 每个物体的历史预处理耗时（秒），reset 时不清空，跨多次导出累积
+        self.object_cost_history: Dict[str, float] = {}
+    
+    def record_object_cost(self, obj_name: str, duration: float):
+        """记录一个物体的预处理耗时，和历史值做指数滑动平均"""
+        previous = self.object_cost_history.get(obj_name)
+        if previous is None:
+            self.object_cost_history[obj_name] = duration
+        else:
+            alpha = self.OBJECT_COST_SMOOTHING
+            self.object_cost_history[obj_name] = alpha * duration + (1 - alpha) * previous
+    
+    def get_object_cost(self, obj_name: str):
+        """获取物体的历史预处理耗时（秒），没有记录时返回 None"""
+        return self.object_cost_history.get(obj_name)
+    
+    def _collect_object_costs(self):
+        """把本次导出中单进程预处理各物体的耗时汇总进历史记录"""
+        for obj_name, obj_stats in self.object_stats.items():
+            duration = sum(op['duration'] for op in obj_stats['operations'] if op['operation'] in self.PREPROCESS_OPERATIONS)
+            if duration > 0:
+                self.record_object_cost(obj_name, duration)
     
     def start_operation(self, operation_name: str, obj_name: str = None):
         """开始一个操作"""
@@ -298,7 +326,8 @@ class PerformanceStats:
             return False
     
     def reset(self):
-        """重置统计"""
+        """重置统计，物体的历史预处理耗时会保留"""
+        self._collect_object_costs()
         self.stats.clear()
         self.operation_stack.clear()
         self.object_stats.clear()
@@ -11,6 +11,8 @@ from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass, asdict
 import numpy as np
 
+from .vertexgroup_utils import VertexGroupUtils
+
 
 @dataclass
 class ObjectFingerprint:
@@ -51,7 +53,26 @@ class ObjectFingerprint:
 
 
 class FingerprintCalculator:
-    """指纹计算器"""
+    """指纹计算器
+    
+    网格相关的数据全部通过 foreach_get 读取到连续的 numpy 缓冲区，
+    再把原始字节流式送入哈希器，避免逐元素的 Python 循环和 JSON 序列化
+    """
+    
+    @staticmethod
+    def _update_hasher(hasher, *arrays: np.ndarray):
+        """把数组的 dtype/shape 和原始字节依次送入哈希器"""
+        for array in arrays:
+            array = np.ascontiguousarray(array)
+            hasher.update(f"{array.dtype.str}{array.shape}".encode())
+            hasher.update(memoryview(array).cast('B'))
+    
+    @staticmethod
+    def update_hasher_text(hasher, *values):
+        """把少量元数据以文本形式送入哈希器，用分隔符避免拼接歧义"""
+        for value in values:
+            hasher.update(repr(value).encode())
+            hasher.update(b'\x1f')
     
     @staticmethod
     def calculate_vertex_hash(obj: bpy.types.Object) -> Tuple[int, str]:
@@ -106,17 +127,23 @@ class FingerprintCalculator:
         
         mesh = obj.data
         
-        if len(mesh.polygons) == 0:
+        n_polys = len(mesh.polygons)
+        if n_polys == 0:
             return ""
         
-        face_data = []
+        loop_starts = np.empty(n_polys, dtype=np.int32)
+        loop_totals = np.empty(n_polys, dtype=np.int32)
+        use_smooth = np.empty(n_polys, dtype=np.bool_)
+        mesh.polygons.foreach_get('loop_start', loop_starts)
+        mesh.polygons.foreach_get('loop_total', loop_totals)
+        mesh.polygons.foreach_get('use_smooth', use_smooth)
         
-        for poly in mesh.polygons:
-            face_data.append(list(poly.vertices))
-            face_data.append(poly.use_smooth)
+        loop_vertex_indices = np.empty(len(mesh.loops), dtype=np.int32)
+        mesh.loops.foreach_get('vertex_index', loop_vertex_indices)
         
-        face_json = json.dumps(face_data, sort_keys=True)
-        return hashlib.md5(face_json.encode()).hexdigest()
+        hasher = hashlib.md5()
+        FingerprintCalculator._update_hasher(hasher, loop_starts, loop_totals, use_smooth, loop_vertex_indices)
+        return hasher.hexdigest()
     
     @staticmethod
     def calculate_vertex_group_hash(obj: bpy.types.Object) -> str:
@@ -125,28 +152,15 @@ class FingerprintCalculator:
             return ""
         
         mesh = obj.data
-        vg_data = []
+        hasher = hashlib.md5()
         
         for vg in obj.vertex_groups:
-            vg_info = {
-                'name': vg.name,
-                'lock_weight': vg.lock_weight,
-            }
-            
-            weights = []
-            for i, vert in enumerate(mesh.vertices):
-                for group in vert.groups:
-                    if group.group == vg.index:
-                        weights.append((i, group.weight))
-                        break
-            
-            vg_info['weights_hash'] = hashlib.md5(
-                json.dumps(weights, sort_keys=True).encode()
-            ).hexdigest()
-            vg_data.append(vg_info)
+            FingerprintCalculator.update_hasher_text(hasher, vg.index, vg.name, vg.lock_weight)
         
-        vg_json = json.dumps(vg_data, sort_keys=True)
-        return hashlib.md5(vg_json.encode()).hexdigest()
+        # 一次遍历得到全部 (vertex, group, weight)，而不是每个顶点组都遍历一遍所有顶点
+        vertex_ids, group_ids, weights = VertexGroupUtils.get_vertex_group_weight_table(mesh, skip_zero_weights=False)
+        FingerprintCalculator._update_hasher(hasher, vertex_ids, group_ids, weights)
+        return hasher.hexdigest()
     
     @staticmethod
     def calculate_modifier_hash(obj: bpy.types.Object) -> str:
@@ -245,28 +259,28 @@ class FingerprintCalculator:
         if not obj.data or not obj.data.shape_keys or not obj.data.shape_keys.key_blocks:
             return ""
         
-        shape_key_data = []
+        hasher = hashlib.md5()
+        coords = None
         for kb in obj.data.shape_keys.key_blocks:
-            kb_info = {
-                'name': kb.name,
-                'value': kb.value,
-                'mute': kb.mute,
-                'vertex_group': kb.vertex_group,
-                'interpolation': kb.interpolation if hasattr(kb, 'interpolation') else 'KEY_LINEAR',
-            }
-            
-            if kb.relative_key:
-                kb_info['relative_key'] = kb.relative_key.name
+            FingerprintCalculator.update_hasher_text(
+                hasher,
+                kb.name,
+                kb.value,
+                kb.mute,
+                kb.vertex_group,
+                kb.interpolation if hasattr(kb, 'interpolation') else 'KEY_LINEAR',
+                kb.relative_key.name if kb.relative_key else "",
+            )
             
-            if len(kb.data) > 0:
-                coords = np.empty(len(kb.data) * 3, dtype=np.float32)
+            n_coords = len(kb.data) * 3
+            if n_coords > 0:
+                # 所有形态键长度相同，复用同一块缓冲区
+                if coords is None or coords.size != n_coords:
+                    coords = np.empty(n_coords, dtype=np.float32)
                 kb.data.foreach_get('co', coords)
-                kb_info['data_hash'] = hashlib.md5(coords.tobytes()).hexdigest()
-            
-            shape_key_data.append(kb_info)
+                FingerprintCalculator._update_hasher(hasher, coords)
         
-        shape_key_json = json.dumps(shape_key_data, sort_keys=True)
-        return hashlib.md5(shape_key_json.encode()).hexdigest()
+        return hasher.hexdigest()
     
     @staticmethod
     def calculate_transform_hash(obj: bpy.types.Object) -> str:
@@ -293,34 +307,83 @@ class FingerprintCalculator:
         if not armature_modifiers:
             return ""
         
-        pose_data = []
+        hasher = hashlib.md5()
+        has_pose = False
         for mod in armature_modifiers:
             armature = mod.object
             if armature and armature.pose:
-                armature_info = {
-                    'armature_name': armature.name,
-                    'bones': []
-                }
+                has_pose = True
+                pose_bones = armature.pose.bones
+                FingerprintCalculator.update_hasher_text(hasher, armature.name, [bone.name for bone in pose_bones])
                 
-                for bone in armature.pose.bones:
-                    bone_info = {
-                        'name': bone.name,
-                        'location': list(bone.location),
-                        'rotation_mode': bone.rotation_mode,
-                        'rotation_euler': list(bone.rotation_euler) if bone.rotation_mode == 'EULER' else [],
-                        'rotation_quaternion': list(bone.rotation_quaternion) if bone.rotation_mode == 'QUATERNION' else [],
-                        'scale': list(bone.scale),
-                    }
-                    armature_info['bones'].append(bone_info)
-                
-                pose_data.append(armature_info)
+                # matrix_basis 由 location/rotation/scale 组合而成，一次 foreach_get 取出所有骨骼的局部变换
+                matrices = np.empty(len(pose_bones) * 16, dtype=np.float32)
+                pose_bones.foreach_get('matrix_basis', matrices)
+                FingerprintCalculator._update_hasher(hasher, matrices)
         
-        if not pose_data:
+        if not has_pose:
             return ""
         
-        pose_json = json.dumps(pose_data, sort_keys=True)
-        return hashlib.md5(pose_json.encode()).hexdigest()
+        return hasher.hexdigest()
     
+    @staticmethod
+    def calculate_custom_property_hash(obj: bpy.types.Object) -> str:
+        """
+        计算物体自定义属性的哈希值
+        例如 3DMigoto:RecalculateTANGENT / 3DMigoto:RecalculateCOLOR 会改变导出的Buffer内容
+        """
+        hasher = hashlib.md5()
+        for key in sorted(obj.keys()):
+            value = obj[key]
+            if hasattr(value, "to_dict"):
+                value = value.to_dict()
+            elif hasattr(value, "to_list"):
+                value = value.to_list()
+            FingerprintCalculator.update_hasher_text(hasher, key, value)
+        return hasher.hexdigest()
+
+    @staticmethod
+    def calculate_attribute_hash(obj: bpy.types.Object) -> str:
+        """计算UV、颜色属性和Loop法线的哈希值，这些数据会直接写入导出的Buffer"""
+        if obj.type != 'MESH' or not obj.data:
+            return ""
+
+        mesh = obj.data
+        n_loops = len(mesh.loops)
+        if n_loops == 0:
+            return ""
+
+        hasher = hashlib.md5()
+
+        for uv_layer in mesh.uv_layers:
+            uvs = np.empty(n_loops * 2, dtype=np.float32)
+            uv_layer.data.foreach_get('uv', uvs)
+            FingerprintCalculator.update_hasher_text(hasher, uv_layer.name)
+            FingerprintCalculator._update_hasher(hasher, uvs)
+
+        for color_attribute in mesh.color_attributes:
+            colors = np.empty(len(color_attribute.data) * 4, dtype=np.float32)
+            color_attribute.data.foreach_get('color', colors)
+            FingerprintCalculator.update_hasher_text(hasher, color_attribute.name, color_attribute.domain, color_attribute.data_type)
+            FingerprintCalculator._update_hasher(hasher, colors)
+
+        # Loop法线同时包含了自定义法线和平滑设置的结果，和导出时读取的数据一致
+        normals = np.empty(n_loops * 3, dtype=np.float32)
+        mesh.loops.foreach_get('normal', normals)
+        FingerprintCalculator._update_hasher(hasher, normals)
+
+        return hasher.hexdigest()
+
+    @classmethod
+    def calculate_content_hash(cls, obj: bpy.types.Object) -> str:
+        """计算物体导出内容的哈希值，在指纹的基础上加入UV、颜色、法线和物体的自定义属性"""
+        fingerprint = cls.calculate_fingerprint(obj)
+        hasher = hashlib.md5()
+        FingerprintCalculator.update_hasher_text(hasher, obj.name, json.dumps(fingerprint.to_dict(), sort_keys=True))
+        FingerprintCalculator.update_hasher_text(hasher, cls.calculate_attribute_hash(obj))
+        FingerprintCalculator.update_hasher_text(hasher, cls.calculate_custom_property_hash(obj))
+        return hasher.hexdigest()
+
     @classmethod
     def calculate_fingerprint(cls, obj: bpy.types.Object, mirror_workflow: bool = False) -> ObjectFingerprint:
         """计算物体的完整指纹"""
@@ -348,13 +411,45 @@ class FingerprintCalculator:
 
 
 class PreprocessCacheManager:
-    """预处理缓存管理器"""
+    """预处理缓存管理器
     
-    CACHE_VERSION = 1
+    索引由两部分组成：
+    - cache_index.json：某一时刻的完整快照
+    - cache_journal.jsonl：快照之后的追加日志，每行一条 put/hit/del 记录
     
-    def __init__(self, cache_dir: Optional[str] = None):
+    存储和命中只需要向日志追加一行，不再每次重写整个索引。
+    日志中的记录都是绝对值（覆盖写），重复回放结果不变，
+    因此压缩过程中任意时刻崩溃，重新加载后都能得到一致的索引。
+    
+    缓存总大小超过 max_size_bytes 时按淘汰策略删除条目，直到降到低水位线以下。
+    """
+    
+    CACHE_VERSION = 2
+    
+    # 默认容量上限 10 GB，0 表示不限制
+    DEFAULT_MAX_SIZE_BYTES = 10 * 1024 * 1024 * 1024
+    
+    # 淘汰后保留的容量比例，避免每次存储都触发淘汰
+    EVICTION_LOW_WATERMARK = 0.9
+    
+    # 日志记录数超过该值且超过条目数的两倍时压缩
+    COMPACT_MIN_RECORDS = 256
+    
+    # 多个 Blender 会话可以共用同一个缓存目录，其它会话可能刚写出缓存文件还没来得及追加日志，
+    # 压缩时只删除修改时间早于该秒数的孤立缓存文件
+    ORPHAN_GRACE_SECONDS = 3600
+    
+    EVICTION_POLICY_LRU = "LRU"
+    EVICTION_POLICY_LFU = "LFU"
+    
+    def __init__(self, cache_dir: Optional[str] = None, max_size_bytes: Optional[int] = None,
+                 eviction_policy: str = EVICTION_POLICY_LRU):
         self._cache_dir_override = cache_dir
         self.cache_index: Dict[str, dict] = {}
+        self.max_size_bytes = self.DEFAULT_MAX_SIZE_BYTES if max_size_bytes is None else max_size_bytes
+        self.eviction_policy = eviction_policy
+        self._total_size = 0
+        self._journal_records = 0
         self._ensure_cache_dir()
         self._load_cache_index()
     
@@ -378,6 +473,11 @@ class PreprocessCacheManager:
         """动态获取索引文件路径"""
         return os.path.join(self.cache_dir, "cache_index.json")
     
+    @property
+    def journal_file(self) -> str:
+        """动态获取追加日志路径"""
+        return os.path.join(self.cache_dir, "cache_journal.jsonl")
+    
     def _get_default_cache_dir(self) -> str:
         """获取默认缓存目录"""
         blend_file = bpy.data.filepath
@@ -395,30 +495,186 @@ class PreprocessCacheManager:
         if not os.path.exists(self.cache_dir):
             os.makedirs(self.cache_dir)
     
+    def _normalize_entry(self, cache_key: str, entry: dict) -> dict:
+        """补全旧版本索引中缺失的大小和命中信息"""
+        if 'size' not in entry:
+            cache_file = self._get_cache_file_path(cache_key)
+            entry['size'] = os.path.getsize(cache_file) if os.path.exists(cache_file) else 0
+        entry.setdefault('created', entry.get('last_hit', 0.0))
+        entry.setdefault('last_hit', entry['created'])
+        entry.setdefault('hit_count', 0)
+        return entry
+    
     def _load_cache_index(self):
-        """加载缓存索引"""
+        """加载快照并回放追加日志"""
+        self.cache_index = {}
         if os.path.exists(self.index_file):
             try:
                 with open(self.index_file, 'r', encoding='utf-8') as f:
                     data = json.load(f)
-                    if data.get('version') == self.CACHE_VERSION:
+                    # 版本1没有大小和命中信息，可以直接迁移
+                    if data.get('version') in (1, self.CACHE_VERSION):
                         self.cache_index = data.get('entries', {})
             except Exception as e:
                 print(f"[PreprocessCache] 加载缓存索引失败: {e}")
                 self.cache_index = {}
+        
+        self._journal_records = 0
+        self._journal_offset = 0
+        if os.path.exists(self.journal_file):
+            try:
+                with open(self.journal_file, 'rb') as f:
+                    journal_bytes = f.read()
+                self._journal_offset = self._replay_journal_bytes(journal_bytes)
+            except Exception as e:
+                print(f"[PreprocessCache] 回放缓存日志失败: {e}")
+        
+        for cache_key, entry in self.cache_index.items():
+            self._normalize_entry(cache_key, entry)
+        self._total_size = sum(entry['size'] for entry in self.cache_index.values())
+    
+    def _replay_journal_bytes(self, journal_bytes: bytes) -> int:
+        """回放日志内容，返回已回放部分的字节数（最后一个换行符之后的内容还没有写完，不计入）"""
+        complete_size = journal_bytes.rfind(b"\n") + 1
+        for line in journal_bytes[:complete_size].decode('utf-8', errors='replace').splitlines():
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # 崩溃时写了一半的行，直接忽略
+                continue
+            self._apply_journal_record(record)
+            self._journal_records += 1
+        return complete_size
+    
+    def _apply_journal_record(self, record: dict):
+        """把一条日志记录应用到内存索引"""
+        op = record.get('op')
+        cache_key = record.get('key')
+        if op == 'put':
+            self.cache_index[cache_key] = record['entry']
+        elif op == 'hit':
+            entry = self.cache_index.get(cache_key)
+            if entry is not None:
+                entry['last_hit'] = record['last_hit']
+                entry['hit_count'] = record['hit_count']
+        elif op == 'del':
+            self.cache_index.pop(cache_key, None)
+    
+    def _append_journal(self, record: dict):
+        """向追加日志写入一条记录，必要时触发压缩"""
+        try:
+            with open(self.journal_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._journal_records += 1
+        except Exception as e:
+            print(f"[PreprocessCache] 写入缓存日志失败: {e}")
+            return
+        
+        if self._journal_records > max(self.COMPACT_MIN_RECORDS, 2 * len(self.cache_index)):
+            self.compact()
     
     def _save_cache_index(self):
-        """保存缓存索引"""
+        """保存缓存索引快照
+        
+        先写临时文件并 fsync，再用 os.replace 原子替换，最后从日志中去掉已经包含在快照中的记录。
+        在此之前崩溃也没关系：日志记录是幂等的，回放到新快照上结果不变。
+        其它会话在加载之后追加的记录会保留在日志中，并回放到内存索引。
+        """
         try:
             data = {
                 'version': self.CACHE_VERSION,
                 'entries': self.cache_index
             }
-            with open(self.index_file, 'w', encoding='utf-8') as f:
+            temp_file = self.index_file + ".tmp"
+            with open(temp_file, 'w', encoding='utf-8') as f:
                 json.dump(data, f, ensure_ascii=False, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_file, self.index_file)
+            
+            journal_tail = b""
+            if os.path.exists(self.journal_file):
+                with open(self.journal_file, 'rb') as f:
+                    f.seek(self._journal_offset)
+                    journal_tail = f.read()
+            temp_journal = self.journal_file + ".tmp"
+            with open(temp_journal, 'wb') as f:
+                f.write(journal_tail)
+            os.replace(temp_journal, self.journal_file)
+            
+            self._journal_records = 0
+            self._journal_offset = self._replay_journal_bytes(journal_tail)
+            self._total_size = sum(self._normalize_entry(k, entry)['size'] for k, entry in self.cache_index.items())
         except Exception as e:
             print(f"[PreprocessCache] 保存缓存索引失败: {e}")
     
+    def compact(self):
+        """
+        压缩索引：先重新加载快照和日志，合并其它会话追加的记录，
+        再丢弃文件已丢失的条目，删除不在索引中并且超过宽限期的孤立缓存文件，然后重写快照
+        """
+        self._load_cache_index()
+        
+        for cache_key in [k for k in self.cache_index if not os.path.exists(self._get_cache_file_path(k))]:
+            self._total_size -= self.cache_index.pop(cache_key)['size']
+        
+        orphan_deadline = time.time() - self.ORPHAN_GRACE_SECONDS
+        try:
+            for file_name in os.listdir(self.cache_dir):
+                if file_name.endswith(".blend") and file_name[:-len(".blend")] not in self.cache_index:
+                    file_path = os.path.join(self.cache_dir, file_name)
+                    try:
+                        if os.path.getmtime(file_path) < orphan_deadline:
+                            os.remove(file_path)
+                    except OSError:
+                        pass
+        except OSError as e:
+            print(f"[PreprocessCache] 清理孤立缓存文件失败: {e}")
+        
+        self._save_cache_index()
+        print(f"[PreprocessCache] 已压缩缓存索引: {len(self.cache_index)} 个条目")
+    
+    def _eviction_order(self, protected_key: Optional[str] = None) -> List[str]:
+        """按淘汰优先级排序的缓存键，越靠前越先被淘汰
+        
+        LRU：最久未命中的优先，同样久的先淘汰更大的条目
+        LFU：命中次数最少的优先，再按最久未命中、条目大小排序
+        """
+        if self.eviction_policy == self.EVICTION_POLICY_LFU:
+            sort_key = lambda k: (self.cache_index[k]['hit_count'], self.cache_index[k]['last_hit'], -self.cache_index[k]['size'])
+        else:
+            sort_key = lambda k: (self.cache_index[k]['last_hit'], -self.cache_index[k]['size'])
+        return sorted((k for k in self.cache_index if k != protected_key), key=sort_key)
+    
+    def _remove_entry(self, cache_key: str):
+        """删除缓存文件和索引条目"""
+        cache_file = self._get_cache_file_path(cache_key)
+        if os.path.exists(cache_file):
+            try:
+                os.remove(cache_file)
+            except OSError:
+                pass
+        entry = self.cache_index.pop(cache_key, None)
+        if entry is not None:
+            self._total_size -= entry['size']
+    
+    def _evict_if_needed(self, protected_key: Optional[str] = None):
+        """超出容量上限时淘汰条目，直到总大小降到低水位线以下"""
+        if self.max_size_bytes <= 0 or self._total_size <= self.max_size_bytes:
+            return
+        
+        target_size = int(self.max_size_bytes * self.EVICTION_LOW_WATERMARK)
+        evicted = 0
+        for cache_key in self._eviction_order(protected_key):
+            if self._total_size <= target_size:
+                break
+            self._remove_entry(cache_key)
+            self._append_journal({'op': 'del', 'key': cache_key})
+            evicted += 1
+        
+        if evicted:
+            print(f"[PreprocessCache] 超出容量上限，已淘汰 {evicted} 个缓存条目，当前 {self._total_size / (1024 * 1024):.1f}MB")
+    
     def _get_cache_key(self, obj_name: str, fingerprint: ObjectFingerprint) -> str:
         """生成缓存键"""
         fp_dict = fingerprint.to_dict()
@@ -483,12 +739,31 @@ class PreprocessCacheManager:
             if mesh_data and mesh_data.name in bpy.data.meshes:
                 bpy.data.meshes.remove(mesh_data, do_unlink=True)
             
-            self.cache_index[cache_key] = {
+            size = os.path.getsize(cache_file)
+            if self.max_size_bytes > 0 and size > self.max_size_bytes:
+                print(f"[PreprocessCache] 缓存文件超过容量上限，不缓存: {obj_name}")
+                self._remove_entry(cache_key)
+                self._append_journal({'op': 'del', 'key': cache_key})
+                return ""
+            
+            old_entry = self.cache_index.get(cache_key)
+            if old_entry is not None:
+                self._total_size -= old_entry['size']
+            
+            now = time.time()
+            entry = {
                 'obj_name': obj_name,
                 'fingerprint': fingerprint.to_dict(),
-                'file': cache_file
+                'file': cache_file,
+                'size': size,
+                'created': now,
+                'last_hit': now,
+                'hit_count': 0,
             }
-            self._save_cache_index()
+            self.cache_index[cache_key] = entry
+            self._total_size += size
+            self._append_journal({'op': 'put', 'key': cache_key, 'entry': entry})
+            self._evict_if_needed(protected_key=cache_key)
             
             print(f"[PreprocessCache] 已缓存: {obj_name}")
             return cache_file
@@ -520,6 +795,7 @@ class PreprocessCacheManager:
                     bpy.data.objects.remove(obj, do_unlink=True)
             
             if loaded_obj:
+                self._record_hit(self._get_cache_key(obj_name, fingerprint))
                 print(f"[PreprocessCache] 从缓存加载: {obj_name}")
                 return loaded_obj
             
@@ -531,43 +807,38 @@ class PreprocessCacheManager:
             traceback.print_exc()
             return None
     
+    def _record_hit(self, cache_key: str):
+        """记录一次缓存命中，供淘汰策略使用"""
+        entry = self.cache_index.get(cache_key)
+        if entry is None:
+            return
+        entry['last_hit'] = time.time()
+        entry['hit_count'] += 1
+        self._append_journal({'op': 'hit', 'key': cache_key, 'last_hit': entry['last_hit'], 'hit_count': entry['hit_count']})
+    
     def clear_cache(self, obj_name: Optional[str] = None):
         """清理缓存"""
+        # 先合并其它会话追加的记录，避免重写快照时丢失
+        self._load_cache_index()
         if obj_name:
             keys_to_remove = [k for k in self.cache_index if k.startswith(obj_name)]
             for key in keys_to_remove:
-                cache_file = self._get_cache_file_path(key)
-                if os.path.exists(cache_file):
-                    try:
-                        os.remove(cache_file)
-                    except:
-                        pass
-                del self.cache_index[key]
+                self._remove_entry(key)
         else:
-            for key in self.cache_index:
-                cache_file = self._get_cache_file_path(key)
-                if os.path.exists(cache_file):
-                    try:
-                        os.remove(cache_file)
-                    except:
-                        pass
-            self.cache_index.clear()
+            for key in list(self.cache_index):
+                self._remove_entry(key)
+            self._total_size = 0
         
         self._save_cache_index()
         print(f"[PreprocessCache] 已清理缓存")
     
     def get_cache_stats(self) -> dict:
-        """获取缓存统计信息"""
-        total_size = 0
-        for key in self.cache_index:
-            cache_file = self._get_cache_file_path(key)
-            if os.path.exists(cache_file):
-                total_size += os.path.getsize(cache_file)
-        
+        """获取缓存统计信息，大小在存储和淘汰时增量维护，不需要逐个读取文件"""
         return {
             'total_entries': len(self.cache_index),
-            'total_size_bytes': total_size,
-            'total_size_mb': total_size / (1024 * 1024)
+            'total_size_bytes': self._total_size,
+            'total_size_mb': self._total_size / (1024 * 1024),
+            'max_size_mb': self.max_size_bytes / (1024 * 1024),
         }
 
 
@@ -614,6 +885,12 @@ def get_cache_manager(blend_file: Optional[str] = None) -> PreprocessCacheManage
         
         _global_cache_blend_file = current_blend
     
+    try:
+        from ..config.properties_import_model import Properties_ImportModel
+        _global_cache_manager.max_size_bytes = Properties_ImportModel.get_preprocess_cache_max_size_bytes()
+    except Exception:
+        pass
+    
     return _global_cache_manager
 
 
@@ -3,10 +3,8 @@ import bpy
 import time
 import numpy
 import re
-from mathutils import Vector
 
 from .timer_utils import TimerUtils
-from typing import List, Tuple, Dict, Optional
 
 class ShapeKeyUtils:
     # Github: https://github.com/przemir/ApplyModifierForObjectWithShapeKeys
@@ -41,7 +39,7 @@ class ShapeKeyUtils:
                 break
         
         if has_transform_modifiers:
-            print(f"[ShapeKeyOptimized] 检测到会变换顶点的修改器，回退到原始算法")
+            print("[ShapeKeyOptimized] 检测到会变换顶点的修改器，回退到原始算法")
             return cls.apply_modifiers_for_object_with_shape_keys(context, selected_modifiers, disable_armatures)
         
         start_time = time.time()
@@ -501,3 +499,89 @@ class ShapeKeyUtils:
                     # 如果不是当前正在处理的形态键，则归零
                     if key_block.name != current_shapekey_name:
                         key_block.value = 0.0
+
+    @staticmethod
+    def get_key_block_coords(key_blocks) -> numpy.ndarray:
+        '''
+        用 foreach_get 一次性读取所有形态键的顶点坐标，返回 (K, V, 3) 的 float32 数组
+        '''
+        key_count = len(key_blocks)
+        vertex_count = len(key_blocks[0].data) if key_count > 0 else 0
+        coords = numpy.empty((key_count, vertex_count, 3), dtype=numpy.float32)
+        for i, key_block in enumerate(key_blocks):
+            key_block.data.foreach_get('co', coords[i].ravel())
+        return coords
+
+    @classmethod
+    def evaluate_shapekey_positions(cls, obj, configured_shapekey_names, shapekey_names):
+        '''
+        不经过depsgraph，直接用形态键数据计算每个形态键单独为1时的顶点坐标
+
+        与逐个设置形态键值并计算evaluated mesh的结果一致：
+        配置列表中的其它形态键视为0，未配置的形态键保留当前值，
+        按key_blocks的顺序依次累加 value * (co - relative_key.co)，和Blender的相对形态键求值顺序相同
+
+        返回字典，value为该形态键为1时的顶点坐标 (V, 3)，
+        形态键不改变任何顶点时为None，此时结果与所有配置的形态键都为0时相同
+        物体有启用的修改器、使用绝对形态键、或者形态键使用了顶点组时无法保证结果一致，返回None
+        '''
+        shape_keys = obj.data.shape_keys
+        if shape_keys is None or not shape_keys.use_relative or obj.show_only_shape_key:
+            return None
+        if any(modifier.show_viewport for modifier in obj.modifiers):
+            return None
+
+        key_blocks = list(shape_keys.key_blocks)
+        name_index_dict = {key_block.name: i for i, key_block in enumerate(key_blocks)}
+        reference_index = name_index_dict.get(shape_keys.reference_key.name, 0)
+        relative_indices = [name_index_dict.get(key_block.relative_key.name, i) for i, key_block in enumerate(key_blocks)]
+        configured_shapekey_names = set(configured_shapekey_names)
+
+        # 未配置且当前值不为0的形态键，在每个形态键的求值中都会参与
+        base_influences = {}
+        for i, key_block in enumerate(key_blocks):
+            if i == reference_index or key_block.mute or key_block.name in configured_shapekey_names:
+                continue
+            if key_block.value != 0.0:
+                base_influences[i] = key_block.value
+
+        target_influences = {}
+        for name in shapekey_names:
+            i = name_index_dict[name]
+            key_block = key_blocks[i]
+            # 对应 sk.value = 1.0，RNA会把值限制在滑块范围内
+            value = min(max(1.0, key_block.slider_min), key_block.slider_max)
+            target_influences[name] = 0.0 if (key_block.mute or i == reference_index) else value
+
+        involved_indices = set(base_influences) | {name_index_dict[name] for name, value in target_influences.items() if value != 0.0}
+        if any(key_blocks[i].vertex_group for i in involved_indices):
+            return None
+
+        coords = cls.get_key_block_coords(key_blocks)
+
+        def evaluate(influences):
+            positions = coords[reference_index].copy()
+            for i in sorted(influences):
+                value = influences[i]
+                if value != 0.0:
+                    positions += numpy.float32(value) * (coords[i] - coords[relative_indices[i]])
+            return positions
+
+        target_indices = numpy.array([name_index_dict[name] for name in shapekey_names], dtype=numpy.int64)
+        target_values = numpy.array([target_influences[name] for name in shapekey_names], dtype=numpy.float32)
+        # (K, V, 3) 所有目标形态键相对各自参考形态键的偏移
+        deltas = coords[target_indices] - coords[numpy.asarray(relative_indices, dtype=numpy.int64)[target_indices]]
+        changed = numpy.any(deltas != 0, axis=(1, 2)) & (target_values != 0)
+
+        positions_dict = {}
+        for k, name in enumerate(shapekey_names):
+            if not changed[k]:
+                positions_dict[name] = None
+            elif not base_influences:
+                positions_dict[name] = coords[reference_index] + target_values[k] * deltas[k]
+            else:
+                influences = dict(base_influences)
+                influences[target_indices[k]] = float(target_values[k])
+                positions_dict[name] = evaluate(influences)
+
+        return positions_dict
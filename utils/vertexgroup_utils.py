@@ -562,6 +562,34 @@ class VertexGroupUtils:
 
 
 
+    @classmethod
+    def get_vertex_group_weight_table(cls, mesh, skip_zero_weights: bool = True):
+        '''
+        只遍历一次所有顶点，收集稀疏的 (vertex_index, group_index, weight) 权重表
+        返回三个等长的numpy数组 (int32, int32, float32)，按顶点索引升序，同一顶点内保持 v.groups 的原始顺序
+
+        Blender没有提供 vertex.groups 的 foreach_get，这里是能做到的最少次数的RNA访问，
+        后续的分组、排序、统计全部交给numpy处理
+        '''
+        v_idx_list = []
+        g_id_list = []
+        w_list = []
+        for v in mesh.vertices:
+            v_index = v.index
+            for g in v.groups:
+                weight = g.weight
+                if skip_zero_weights and weight <= 0:
+                    continue
+                v_idx_list.append(v_index)
+                g_id_list.append(g.group)
+                w_list.append(weight)
+
+        return (
+            numpy.asarray(v_idx_list, dtype=numpy.int32),
+            numpy.asarray(g_id_list, dtype=numpy.int32),
+            numpy.asarray(w_list, dtype=numpy.float32),
+        )
+
     @classmethod
     def get_blendweights_blendindices_v4_fast(cls, mesh, normalize_weights: bool = False, blend_size=4):
         '''
@@ -583,29 +611,16 @@ class VertexGroupUtils:
         loop_vertex_indices = np.empty(n_loops, dtype=int)
         mesh_loops.foreach_get("vertex_index", loop_vertex_indices)
 
-        # 1) collect flat lists of (v_idx, group_id, weight)
-        v_idx_list = []
-        g_id_list = []
-        w_list = []
-        for v in mesh_verts:
-            # v.groups is typically small; we collect all triplets into flat lists
-            for g in v.groups:
-                if g.weight > 0:
-                    v_idx_list.append(v.index)
-                    g_id_list.append(g.group)
-                    w_list.append(g.weight)
+        # 1) collect flat arrays of (v_idx, group_id, weight)
+        v_idx_arr, g_arr, w_arr = cls.get_vertex_group_weight_table(mesh)
 
-        if len(v_idx_list) == 0:
+        if len(v_idx_arr) == 0:
             # no weights at all: return zeros compatible with old interface
             aligned_max_groups = max(4, blend_size)
             blendweights = np.zeros((n_loops, aligned_max_groups), dtype=np.float32)
             blendindices = np.zeros((n_loops, aligned_max_groups), dtype=np.uint32)
             return {0: blendweights}, {0: blendindices}
 
-        v_idx_arr = np.asarray(v_idx_list, dtype=np.int32)
-        g_arr = np.asarray(g_id_list, dtype=np.int32)
-        w_arr = np.asarray(w_list, dtype=np.float32)
-
         # 2) figure out aligned_max_groups (multiple of 4, at least blend_size)
         # real_max_groups = max groups any vertex has
         # we can compute counts via bincount